@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+'''
+Benchmark for paging through the workout logs of the REST API
+
+Creates a user with many workout logs and reads all of them, once with page
+numbers (as the API did before) and once with the keyset pagination, and
+prints how long the pages at the beginning, the middle and the end took.
+Everything happens in a transaction that is rolled back, so this can be run
+against any database with the exercises loaded:
+
+    cd extras/bench
+    python api_pagination.py --logs 100000
+'''
+
+import os
+import sys
+import time
+import argparse
+import datetime
+
+import django
+
+sys.path.insert(0, os.path.join('..', '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+django.setup()
+
+# Must happen after calling django.setup()
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import Client
+from rest_framework.pagination import PageNumberPagination
+
+from wger.exercises.models import Exercise
+from wger.manager.api.views import WorkoutLogViewSet
+from wger.manager.models import Workout, WorkoutLog
+
+
+parser = argparse.ArgumentParser(description='Benchmark the pagination of the workout logs')
+parser.add_argument('--logs', type=int, default=100000, help='Number of logs, default: 100000')
+parser.add_argument('--limit', type=int, default=100, help='Logs per page, default: 100')
+args = parser.parse_args()
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_logs():
+    '''
+    Creates a user with 30 logs per day
+    '''
+    user = User.objects.create_user('pagination-benchmark', 'pagination-benchmark@example.com')
+    workout = Workout.objects.create(user=user, comment='Pagination benchmark')
+    exercises = list(Exercise.objects.all()[:10])
+    start = datetime.date(2000, 1, 1)
+    WorkoutLog.objects.bulk_create(
+        (WorkoutLog(user=user,
+                    workout=workout,
+                    exercise=exercises[i % len(exercises)],
+                    reps=8 + i % 5,
+                    weight=20 + i % 40,
+                    date=start + datetime.timedelta(days=i // 30))
+         for i in range(args.logs)),
+        batch_size=500)
+    return user
+
+
+def page_numbers(client):
+    '''
+    Reads all pages using the page number
+    '''
+    page = 1
+    while True:
+        response = client.get('/api/v2/workoutlog/',
+                              {'limit': args.limit, 'page': page, 'format': 'json'})
+        if response.status_code == 404:
+            return
+        yield
+        page += 1
+
+
+def keyset(client):
+    '''
+    Reads all pages following the next links
+    '''
+    url = '/api/v2/workoutlog/?limit={0}&format=json'.format(args.limit)
+    while url:
+        response = client.get(url)
+        yield
+        url = response.data['next']
+
+
+def benchmark(name, pages):
+    '''
+    Times each page and prints the averages
+    '''
+    times = []
+    start = time.time()
+    for i in pages:
+        times.append(time.time() - start)
+        start = time.time()
+
+    tenth = max(len(times) // 10, 1)
+    middle = len(times) // 2
+    print('{0:<14} pages: {1:5}  first: {2:7.2f}ms  middle: {3:7.2f}ms  last: {4:7.2f}ms  '
+          'total: {5:6.2f}s'.format(name,
+                                    len(times),
+                                    1000 * sum(times[:tenth]) / tenth,
+                                    1000 * sum(times[middle:middle + tenth]) / tenth,
+                                    1000 * sum(times[-tenth:]) / tenth,
+                                    sum(times)))
+
+
+settings.ALLOWED_HOSTS = ['*']
+try:
+    with transaction.atomic():
+        user = create_logs()
+        client = Client()
+        client.force_login(user)
+
+        # The pagination used before
+        pagination_class = WorkoutLogViewSet.pagination_class
+        WorkoutLogViewSet.pagination_class = PageNumberPagination
+        PageNumberPagination.page_size_query_param = 'limit'
+        benchmark('page numbers', page_numbers(client))
+
+        WorkoutLogViewSet.pagination_class = pagination_class
+        benchmark('keyset', keyset(client))
+
+        raise Rollback()
+except Rollback:
+    pass
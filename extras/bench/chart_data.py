@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Benchmark for the data of the weight and workout log charts
+
+Creates a user with years of daily weight entries and logs of one exercise
+and prepares the chart data several times, once from model instances as
+before and once from the values with the time series helper, with and
+without downsampling. Everything happens in a transaction that is rolled
+back, so this can be run against any database with the exercises loaded:
+
+    cd extras/bench
+    python chart_data.py --runs 10 --years 10
+'''
+
+import os
+import sys
+import time
+import argparse
+import datetime
+
+import django
+
+sys.path.insert(0, os.path.join('..', '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+django.setup()
+
+# Must happen after calling django.setup()
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from wger.exercises.models import Exercise
+from wger.manager.models import Workout, WorkoutLog
+from wger.utils.timeseries import TimeSeries
+from wger.weight.helpers import process_log_entries
+from wger.weight.models import WeightEntry
+
+
+parser = argparse.ArgumentParser(description='Benchmark the data of the charts')
+parser.add_argument('--runs', type=int, default=10, help='Runs per variant, default: 10')
+parser.add_argument('--years', type=int, default=10, help='Years of daily entries, default: 10')
+parser.add_argument('--points', type=int, default=500, help='Downsampled points, default: 500')
+args = parser.parse_args()
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_entries():
+    '''
+    Creates a user with a weight entry and 4 logged sets for every day
+    '''
+    user = User.objects.create_user('chart-benchmark', 'chart-benchmark@example.com')
+    workout = Workout.objects.create(user=user, comment='Chart benchmark')
+    exercise = Exercise.objects.first()
+    if not exercise:
+        sys.exit('No exercises in the database, load the fixtures first')
+
+    days = 365 * args.years
+    start = datetime.date.today() - datetime.timedelta(days=days)
+    WeightEntry.objects.bulk_create(
+        (WeightEntry(user=user,
+                     weight=70 + (day % 300) / 20.0,
+                     date=start + datetime.timedelta(days=day))
+         for day in range(days)),
+        batch_size=500)
+    WorkoutLog.objects.bulk_create(
+        (WorkoutLog(user=user,
+                    workout=workout,
+                    exercise=exercise,
+                    reps=8 + i % 2,
+                    weight=20 + (day + i) % 40,
+                    date=start + datetime.timedelta(days=day))
+         for day in range(days)
+         for i in range(4)),
+        batch_size=500)
+    return user, exercise
+
+
+def weight_instances(user):
+    '''
+    The weight chart data built from model instances
+    '''
+    return JSONRenderer().render([{'date': i.date, 'weight': i.weight}
+                                  for i in WeightEntry.objects.filter(user=user)])
+
+
+def weight_series(user, points=None):
+    '''
+    The weight chart data built with the time series
+    '''
+    series = TimeSeries.from_rows(WeightEntry.objects.filter(user=user).order_by('date')
+                                  .values_list('date', 'weight').iterator())
+    if points:
+        series = series.downsample(points)
+    return JSONRenderer().render(series.get_chart_data('weight'))
+
+
+def benchmark(name, function):
+    '''
+    Runs the function several times and prints the timings
+    '''
+    times = []
+    for i in range(args.runs):
+        start = time.time()
+        result = function()
+        times.append(time.time() - start)
+
+    print('{0:<26} first: {1:8.2f}ms  average of the rest: {2:8.2f}ms  size: {3:8.1f} KiB'.format(
+        name,
+        1000 * times[0],
+        1000 * sum(times[1:]) / max(len(times) - 1, 1),
+        len(result) / 1024.0))
+
+
+# The debug toolbar would take most of the time
+settings.DEBUG = False
+try:
+    with transaction.atomic():
+        user, exercise = create_entries()
+        logs = WorkoutLog.objects.filter(user=user, exercise=exercise)
+        print('Weight entries: {0}, logs: {1}'.format(WeightEntry.objects.filter(user=user).count(),
+                                                      logs.count()))
+
+        benchmark('weight, instances', lambda: weight_instances(user))
+        benchmark('weight, series', lambda: weight_series(user))
+        benchmark('weight, downsampled', lambda: weight_series(user, args.points))
+        benchmark('logs, instances', lambda: process_log_entries(list(logs.all()))[1])
+        benchmark('logs, values', lambda: process_log_entries(logs.all())[1])
+        benchmark('logs, downsampled', lambda: process_log_entries(logs.all(), args.points)[1])
+
+        raise Rollback()
+except Rollback:
+    pass
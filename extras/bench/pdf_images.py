@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Benchmark for the workout PDFs with exercise images
+
+Creates a 6 day workout whose exercises all have a large main image and
+renders it with the original uploads and with the downscaled 'pdf'
+thumbnails. Everything happens in a transaction that is rolled back and the
+images are saved in a temporary folder, so this can be run against any
+database with the exercises loaded:
+
+    cd extras/bench
+    python pdf_images.py --runs 5
+'''
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from io import BytesIO
+
+import django
+
+sys.path.insert(0, os.path.join('..', '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+django.setup()
+
+# Must happen after calling django.setup()
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image
+
+from wger.core.models import DaysOfWeek
+from wger.exercises.models import Exercise, ExerciseImage
+from wger.manager.pdf import build_workout_pdf, render_workout_pdf
+from wger.manager.models import Workout, Day, Set, Setting
+from wger.utils import pdf
+from wger.utils.cache import cache_mapper, reference_cache
+
+
+parser = argparse.ArgumentParser(description='Benchmark the workout PDFs with images')
+parser.add_argument('--runs', type=int, default=5, help='Renders per variant, default: 5')
+parser.add_argument('--exercises', type=int, default=8, help='Exercises per day, default: 8')
+parser.add_argument('--image-size',
+                    type=int,
+                    default=2000,
+                    help='Width of the generated images in pixels, default: 2000')
+args = parser.parse_args()
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_image(width):
+    '''
+    Returns a noisy JPEG, which compresses about as badly as a photo
+    '''
+    image = Image.frombytes('RGB', (width, width * 2 // 3), os.urandom(width * width * 2))
+    output = BytesIO()
+    image.save(output, 'JPEG', quality=90)
+    return output.getvalue()
+
+
+def create_workout():
+    '''
+    Creates a 6 day workout where every exercise has a main image
+    '''
+    user = User.objects.create_user('pdf-benchmark', 'pdf-benchmark@example.com')
+    workout = Workout.objects.create(user=user, comment='PDF benchmark')
+    exercises = list(Exercise.objects.all()[:6 * args.exercises])
+    if len(exercises) < 6 * args.exercises:
+        sys.exit('Not enough exercises in the database, load the fixtures first')
+
+    for exercise in exercises:
+        image = ExerciseImage(exercise=exercise,
+                              status=ExerciseImage.STATUS_ACCEPTED,
+                              is_main=True)
+        image.image.save('benchmark.jpg', ContentFile(create_image(args.image_size)), save=False)
+        image.save()
+
+    for day_nr, weekday in enumerate(DaysOfWeek.objects.all()[:6]):
+        day = Day.objects.create(training=workout, description='Day {0}'.format(day_nr + 1))
+        day.day.add(weekday)
+        for order, exercise in enumerate(exercises[day_nr * args.exercises:
+                                                   (day_nr + 1) * args.exercises]):
+            day_set = Set.objects.create(exerciseday=day, sets=4, order=order)
+            day_set.exercises.add(exercise)
+            Setting.objects.create(set=day_set, exercise=exercise, reps=10, order=order)
+    return workout
+
+
+def render(workout):
+    '''
+    Renders the PDF and returns its size
+    '''
+    output = BytesIO()
+    elements = render_workout_pdf(workout,
+                                  workout.canonical_representation['day_list'],
+                                  'http://localhost/',
+                                  images=True)
+    build_workout_pdf(output, elements, 'PDF benchmark')
+    return len(output.getvalue())
+
+
+def benchmark(name, workout):
+    '''
+    Renders the PDF several times and prints the timings
+    '''
+    reference_cache.invalidate(cache_mapper.PDF_IMAGE_VERSION)
+    times = []
+    for i in range(args.runs):
+        start = time.time()
+        size = render(workout)
+        times.append(time.time() - start)
+
+    print('{0:<12} first: {1:6.3f}s  average of the rest: {2:6.3f}s  size: {3:8.1f} KiB'.format(
+        name,
+        times[0],
+        sum(times[1:]) / max(len(times) - 1, 1),
+        size / 1024.0))
+
+
+settings.MEDIA_ROOT = tempfile.mkdtemp()
+try:
+    with transaction.atomic():
+        start = time.time()
+        pdf.register_fonts()
+        print('Registering the fonts: {0:.3f}s'.format(time.time() - start))
+
+        workout = create_workout()
+
+        # The original uploads, as the PDFs used them before
+        load_pdf_thumbnail = pdf._load_pdf_thumbnail
+        pdf._load_pdf_thumbnail = lambda image: None
+        benchmark('original', workout)
+
+        # The 'pdf' thumbnails, the first run also creates them
+        pdf._load_pdf_thumbnail = load_pdf_thumbnail
+        benchmark('thumbnails', workout)
+
+        raise Rollback()
+except Rollback:
+    pass
+finally:
+    shutil.rmtree(settings.MEDIA_ROOT)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Benchmark for the log overview of a workout
+
+Creates a 6 day workout with a year of logs and renders its log page several
+times, printing the time and the number of queries needed for the whole page
+and for preparing the logs (the view's context) alone. Everything happens
+in a transaction that is rolled back, so this can be run against any database
+with the exercises loaded:
+
+    cd extras/bench
+    python workout_log.py --runs 10
+'''
+
+import os
+import sys
+import time
+import argparse
+import datetime
+
+import django
+
+sys.path.insert(0, os.path.join('..', '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+django.setup()
+
+# Must happen after calling django.setup()
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import connection, transaction
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from wger.core.models import DaysOfWeek
+from wger.exercises.models import Exercise
+from wger.manager.models import Workout, Day, Set, Setting, WorkoutLog
+from wger.manager.views.log import WorkoutLogDetailView
+
+
+parser = argparse.ArgumentParser(description='Benchmark the log overview of a workout')
+parser.add_argument('--runs', type=int, default=10, help='Page views, default: 10')
+parser.add_argument('--exercises', type=int, default=5, help='Exercises per day, default: 5')
+parser.add_argument('--days', type=int, default=365, help='Days with logs, default: 365')
+args = parser.parse_args()
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_workout():
+    '''
+    Creates a 6 day workout with 4 logged sets per exercise and training day
+    '''
+    user = User.objects.create_user('log-benchmark', 'log-benchmark@example.com')
+    workout = Workout.objects.create(user=user, comment='Log benchmark')
+    exercises = list(Exercise.objects.all()[:6 * args.exercises])
+    if len(exercises) < 6 * args.exercises:
+        sys.exit('Not enough exercises in the database, load the fixtures first')
+
+    days = []
+    for day_nr, weekday in enumerate(DaysOfWeek.objects.all()[:6]):
+        day = Day.objects.create(training=workout, description='Day {0}'.format(day_nr + 1))
+        day.day.add(weekday)
+        day_exercises = exercises[day_nr * args.exercises:(day_nr + 1) * args.exercises]
+        for order, exercise in enumerate(day_exercises):
+            day_set = Set.objects.create(exerciseday=day, sets=4, order=order)
+            day_set.exercises.add(exercise)
+            Setting.objects.create(set=day_set, exercise=exercise, reps=10, order=order)
+        days.append(day_exercises)
+
+    start = datetime.date.today() - datetime.timedelta(days=args.days)
+    WorkoutLog.objects.bulk_create(
+        (WorkoutLog(user=user,
+                    workout=workout,
+                    exercise=exercise,
+                    reps=8 + i,
+                    weight=20 + (day + i) % 40,
+                    date=start + datetime.timedelta(days=day))
+         for day in range(args.days)
+         for exercise in days[day % len(days)]
+         for i in range(4)),
+        batch_size=500)
+    return user, workout
+
+
+# The debug toolbar would take most of the time
+settings.DEBUG = False
+settings.ALLOWED_HOSTS = ['*']
+try:
+    with transaction.atomic():
+        user, workout = create_workout()
+        client = Client()
+        client.force_login(user)
+        url = reverse('manager:log:log', kwargs={'pk': workout.pk})
+
+        def page():
+            client.get(url)
+
+        def context():
+            view = WorkoutLogDetailView(request=request, kwargs={'pk': workout.pk})
+            view.owner_user = user
+            view.object = workout
+            view.get_context_data()
+
+        request = RequestFactory().get(url)
+        request.user = user
+        print('Logs: {0}'.format(WorkoutLog.objects.filter(user=user).count()))
+        for name, function in (('page', page), ('context', context)):
+            times = []
+            for i in range(args.runs):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.time()
+                    function()
+                    times.append(time.time() - start)
+
+            print('{0:<8} first: {1:7.2f}ms  average of the rest: {2:7.2f}ms  '
+                  'queries: {3}'.format(name,
+                                        1000 * times[0],
+                                        1000 * sum(times[1:]) / max(len(times) - 1, 1),
+                                        len(queries)))
+
+        raise Rollback()
+except Rollback:
+    pass
@@ -0,0 +1,549 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Generator for large amounts of realistic data, e.g. for load tests
+
+The rows are written with plain multi-row inserts, without model instances,
+save() methods or signals. The primary keys are assigned here, continuing
+after the highest existing ones, so that the rows can reference each other
+without reading them back. Because of this, nothing else must write to the
+database while the generator runs. The rows that are normally created by
+signals (profiles, user caches, gym configurations, the monthly activity index
+and the exercise volume) are generated as well.
+
+The amounts follow simple distributions around the given averages and only
+depend on the seed and the end date, so the same arguments always produce
+the same data.
+'''
+
+import bisect
+import csv
+import datetime
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from wger.core.models import UserCache, UserProfile
+from wger.exercises.models import Exercise
+from wger.gym.models import Gym, GymConfig, GymUserConfig
+from wger.manager.helpers import find_records, summarize_logs, summarize_weeks
+from wger.manager.models import (
+    Day,
+    ExerciseRecord,
+    ExerciseVolume,
+    Schedule,
+    ScheduleStep,
+    Set,
+    Setting,
+    Workout,
+    WorkoutActivityMonth,
+    WorkoutLog,
+    WorkoutSession
+)
+from wger.nutrition.models import Ingredient, Meal, MealItem, NutritionPlan
+from wger.weight.models import WeightEntry
+
+PREPARED_TYPES = ('DateField', 'DateTimeField', 'DecimalField', 'TimeField')
+'''
+Field types whose values are converted for the database, the values of all
+other fields are passed on as they are
+'''
+
+
+def poisson(rng, mean):
+    '''
+    Returns a random number with a Poisson distribution around the mean
+    '''
+    limit = math.exp(-mean)
+    number = 0
+    product = rng.random()
+    while product > limit:
+        number += 1
+        product *= rng.random()
+    return number
+
+
+class WeightedChoice(object):
+    '''
+    Chooses items with a long-tailed popularity, a few items are chosen much
+    more often than the rest (e.g. large gyms or common exercises)
+    '''
+
+    def __init__(self, rng, items, alpha=1.2):
+        self.rng = rng
+        self.items = items
+        self.totals = []
+        total = 0
+        for item in items:
+            total += rng.paretovariate(alpha)
+            self.totals.append(total)
+
+    def choice(self):
+        '''
+        Returns a random item
+        '''
+        return self.items[bisect.bisect(self.totals, self.rng.random() * self.totals[-1])]
+
+    def sample(self, number):
+        '''
+        Returns up to the given number of different random items
+        '''
+        result = []
+        for i in range(number * 5):
+            item = self.choice()
+            if item not in result:
+                result.append(item)
+                if len(result) == number:
+                    break
+        return result
+
+
+class Table(object):
+    '''
+    The insert statement of a model and the collected rows
+    '''
+
+    def __init__(self, model, with_id):
+        self.model = model
+        self.rows = []
+        self.count = 0
+
+        # Fields that are not passed get their default value
+        self.columns = []
+        for field in model._meta.concrete_fields:
+            if field.primary_key and not with_id:
+                continue
+            prepare = field.get_db_prep_save \
+                if field.get_internal_type() in PREPARED_TYPES else None
+            default = field.get_db_prep_save(field.get_default(), connection)
+            self.columns.append((field.attname, prepare, default))
+
+        quote = connection.ops.quote_name
+        self.sql = 'INSERT INTO {0} ({1}) VALUES ({2})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(model._meta.get_field(name).column)
+                      for name, prepare, default in self.columns),
+            ', '.join(['%s'] * len(self.columns)))
+
+    def add(self, values):
+        '''
+        Adds a row from a dictionary with the attribute names of the fields
+        '''
+        row = []
+        for name, prepare, default in self.columns:
+            if name in values:
+                value = values[name]
+                row.append(prepare(value, connection) if prepare and value is not None else value)
+            else:
+                row.append(default)
+        self.rows.append(row)
+
+    def flush(self, cursor):
+        '''
+        Inserts the collected rows
+        '''
+        if self.rows:
+            cursor.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+class BulkWriter(object):
+    '''
+    Collects new rows and inserts them in batches
+
+    The rows are inserted in the order their models were first added, so the
+    referenced rows are always written first.
+    '''
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.tables = OrderedDict()
+        self.next_ids = OrderedDict()
+        self.pending = 0
+
+    def next_id(self, model):
+        '''
+        Returns the next free primary key of the model
+        '''
+        if model not in self.next_ids:
+            self.next_ids[model] = (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+        pk = self.next_ids[model]
+        self.next_ids[model] += 1
+        return pk
+
+    def add(self, model, assign_id=True, **values):
+        '''
+        Adds a row of the model
+
+        :param assign_id: whether to assign the primary key, otherwise the
+                          database does it and it is not returned
+        :param values: the values, by the attribute names of the fields
+        :return: the primary key of the new row
+        '''
+        if assign_id and 'id' not in values:
+            values['id'] = self.next_id(model)
+        if model not in self.tables:
+            self.tables[model] = Table(model, 'id' in values)
+        self.tables[model].add(values)
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+        return values.get('id')
+
+    def flush(self):
+        '''
+        Inserts all collected rows
+        '''
+        with connection.cursor() as cursor:
+            for table in self.tables.values():
+                table.flush(cursor)
+        self.pending = 0
+
+    def reset_sequences(self):
+        '''
+        Lets the database continue the sequences after the assigned keys
+        '''
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), list(self.next_ids)):
+                cursor.execute(sql)
+
+    def get_counts(self):
+        '''
+        Returns the number of inserted rows per model
+        '''
+        return [(table.model, table.count) for table in self.tables.values()]
+
+
+class BulkGenerator(object):
+    '''
+    Generates users with their gyms, workouts, schedules, logs, sessions,
+    weight entries and nutrition plans
+    '''
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.writer = BulkWriter(args.batch_size)
+        self.end_date = args.end_date or datetime.date.today()
+        self.start_date = self.end_date - datetime.timedelta(weeks=args.weeks)
+
+        # A fixed salt, so that the same seed also creates the same hash
+        self.password = make_password(args.password, salt='bulk{0}'.format(args.seed))
+
+        self.first_names = []
+        self.last_names = []
+        for country in ('germany', 'spain', 'ukraine'):
+            with open(os.path.join('csv', 'first_names_{0}.csv'.format(country))) as name_file:
+                self.first_names.extend(row for row in csv.reader(name_file) if row)
+            with open(os.path.join('csv', 'last_names_{0}.csv'.format(country))) as name_file:
+                self.last_names.extend(row[0] for row in csv.reader(name_file) if row)
+
+        exercises = list(Exercise.objects.filter(language_id=2).order_by('pk')
+                         .values_list('pk', flat=True)) \
+            or list(Exercise.objects.order_by('pk').values_list('pk', flat=True))
+        self.exercises = WeightedChoice(self.rng, exercises)
+        self.ingredients = list(Ingredient.objects.order_by('pk').values_list('pk', flat=True)
+                                [:1000])
+
+    def random_date(self, start=None):
+        '''
+        Returns a random date between the start (or the start of the history)
+        and the end date
+        '''
+        start = start or self.start_date
+        return start + datetime.timedelta(days=self.rng.randint(0, (self.end_date - start).days))
+
+    def run(self):
+        '''
+        Generates all data in one transaction and prints the number of rows
+        '''
+        # The debug mode would keep the SQL of all inserts in memory
+        settings.DEBUG = False
+        start = time.time()
+        with transaction.atomic():
+            gyms = self.generate_gyms()
+            for i in range(self.args.bulk_users):
+                self.generate_user(gyms.choice() if gyms else None)
+                if self.args.verbose and (i + 1) % 10000 == 0:
+                    print('   - {0} users, {1:.0f} s'.format(i + 1, time.time() - start))
+            self.writer.flush()
+            self.writer.reset_sequences()
+
+        counts = self.writer.get_counts()
+        for model, count in counts:
+            print('   - {0:<40} {1:>10}'.format(model._meta.label, count))
+        print('** Generated {0} rows in {1:.0f} s'.format(sum(i[1] for i in counts),
+                                                          time.time() - start))
+
+    def generate_gyms(self):
+        '''
+        Generates the gyms, their sizes follow a long-tailed distribution
+        '''
+        if not self.args.users_per_gym:
+            return None
+
+        gyms = []
+        for i in range(max(self.args.bulk_users // self.args.users_per_gym, 1)):
+            gym_id = self.writer.add(Gym, name='Load test gym {0}'.format(i + 1))
+            self.writer.add(GymConfig, gym_id=gym_id)
+            gyms.append(gym_id)
+        return WeightedChoice(self.rng, gyms)
+
+    def generate_user(self, gym_id):
+        '''
+        Generates a user with all the entries
+        '''
+        rng = self.rng
+        args = self.args
+        first_name, gender = rng.choice(self.first_names)[:2]
+        last_name = rng.choice(self.last_names)
+        user_id = self.writer.next_id(User)
+        username = slugify(u'{0} {1} {2}'.format(first_name, last_name[0], user_id))
+        joined = self.random_date()
+
+        self.writer.add(User,
+                        id=user_id,
+                        username=username,
+                        email='{0}@example.com'.format(username),
+                        password=self.password,
+                        first_name=first_name,
+                        last_name=last_name,
+                        date_joined=timezone.make_aware(
+                            datetime.datetime.combine(joined, datetime.time(12))))
+        self.writer.add(UserProfile,
+                        user_id=user_id,
+                        gym_id=gym_id,
+                        gender=UserProfile.GENDER_MALE if gender == 'm'
+                        else UserProfile.GENDER_FEMALE,
+                        age=rng.randint(18, 65),
+                        height=rng.randint(160, 195) if gender == 'm' else rng.randint(150, 180),
+                        num_days_weight_reminder=rng.choice((0, 0, 0, 3, 7)))
+        if gym_id:
+            self.writer.add(GymUserConfig, gym_id=gym_id, user_id=user_id)
+
+        active = rng.random() < args.active_share
+        workouts = self.generate_workouts(user_id, joined, active)
+        last_activity = self.generate_logs(user_id, workouts) if active else None
+        self.writer.add(UserCache, user_id=user_id, last_activity=last_activity)
+
+        if active or rng.random() < args.active_share:
+            self.generate_weight_entries(user_id, joined, 60 if gender == 'f' else 75)
+        if rng.random() < args.nutrition_share:
+            self.generate_nutrition_plan(user_id, joined)
+
+    def generate_workouts(self, user_id, joined, active):
+        '''
+        Generates the workouts with their days, sets and settings, and
+        sometimes a schedule
+
+        :return: list of (workout ID, creation date, list of days) tuples,
+                 ordered by date. Each day is a list of (exercise ID, sets,
+                 reps) tuples
+        '''
+        rng = self.rng
+        add = self.writer.add
+        number = poisson(rng, self.args.workouts_per_user)
+        if active:
+            number = max(number, 1)
+
+        dates = sorted(self.random_date(joined) for i in range(number))
+        if active:
+            dates[0] = joined
+
+        workouts = []
+        for workout_number, date in enumerate(dates, 1):
+            workout_id = add(Workout,
+                             user_id=user_id,
+                             comment='Workout {0}'.format(workout_number),
+                             creation_date=date)
+            days = []
+            for day_number, weekday in enumerate(sorted(rng.sample(range(1, 8),
+                                                                   rng.randint(2, 4))), 1):
+                day_id = add(Day, training_id=workout_id, description='Day {0}'.format(day_number))
+                add(Day.day.through, assign_id=False, day_id=day_id, daysofweek_id=weekday)
+
+                exercises = []
+                for order, exercise_id in enumerate(self.exercises.sample(rng.randint(3, 6)), 1):
+                    sets = rng.randint(2, 4)
+                    reps = rng.choice((5, 8, 8, 10, 10, 12, 15))
+                    set_id = add(Set, exerciseday_id=day_id, sets=sets, order=order)
+                    add(Set.exercises.through,
+                        assign_id=False,
+                        set_id=set_id,
+                        exercise_id=exercise_id,
+                        sort_value=1)
+                    add(Setting,
+                        assign_id=False,
+                        set_id=set_id,
+                        exercise_id=exercise_id,
+                        reps=reps,
+                        order=1)
+                    exercises.append((exercise_id, sets, reps))
+                days.append(exercises)
+            workouts.append((workout_id, date, days))
+
+        if len(workouts) > 1 and rng.random() < 0.3:
+            schedule_id = add(Schedule,
+                              user_id=user_id,
+                              name='Schedule',
+                              start_date=workouts[0][1],
+                              is_active=True,
+                              is_loop=rng.random() < 0.5)
+            for order, (workout_id, date, days) in enumerate(workouts, 1):
+                add(ScheduleStep,
+                    assign_id=False,
+                    schedule_id=schedule_id,
+                    workout_id=workout_id,
+                    duration=rng.randint(2, 6),
+                    order=order)
+        return workouts
+
+    def generate_logs(self, user_id, workouts):
+        '''
+        Generates the sessions and logs of the current workout of each week,
+        with the derived monthly activity index and exercise volume
+
+        :return: the date of the last session
+        '''
+        rng = self.rng
+        add = self.writer.add
+        start = workouts[0][1]
+        weights = {}
+        volume_logs = []
+        months = {}
+        last_session = None
+
+        for week in range((self.end_date - start).days // 7 + 1):
+            sessions = min(poisson(rng, self.args.sessions_per_week), 7)
+            for session_number, weekday in enumerate(sorted(rng.sample(range(7), sessions))):
+                date = start + datetime.timedelta(weeks=week, days=weekday)
+                if date > self.end_date:
+                    break
+                workout_id, creation_date, days = [i for i in workouts if i[1] <= date][-1]
+                impression = rng.choice((WorkoutSession.IMPRESSION_GOOD,
+                                         WorkoutSession.IMPRESSION_NEUTRAL,
+                                         WorkoutSession.IMPRESSION_NEUTRAL,
+                                         WorkoutSession.IMPRESSION_BAD))
+                hour = rng.randint(7, 20)
+                add(WorkoutSession,
+                    assign_id=False,
+                    user_id=user_id,
+                    workout_id=workout_id,
+                    date=date,
+                    impression=impression,
+                    time_start=datetime.time(hour, 0),
+                    time_end=datetime.time(hour + 1, 15))
+                month = months.setdefault(date.replace(day=1), {'logs': 0,
+                                                                'sessions': 0,
+                                                                'impression': ''})
+                month['sessions'] += 1
+                month['impression'] = max(month['impression'], impression)
+                last_session = date
+
+                # The weights slowly increase over the weeks
+                for exercise_id, sets, reps in days[(week * 7 + session_number) % len(days)]:
+                    base = weights.setdefault(exercise_id, rng.randint(8, 40) * 2.5)
+                    weight = Decimal(int(base * (1 + 0.01 * week) * 2) / 2.0)
+                    for i in range(sets):
+                        log_reps = max(reps - rng.randint(0, 2) * i, 1)
+                        add(WorkoutLog,
+                            assign_id=False,
+                            user_id=user_id,
+                            exercise_id=exercise_id,
+                            workout_id=workout_id,
+                            reps=log_reps,
+                            weight=weight,
+                            date=date)
+                        volume_logs.append((exercise_id, date, log_reps, weight, 1))
+                    month['logs'] += sets
+
+        for month, values in sorted(months.items()):
+            add(WorkoutActivityMonth, assign_id=False, user_id=user_id, month=month, **values)
+
+        days = summarize_logs(volume_logs)
+        for period, summaries in ((ExerciseVolume.PERIOD_DAY, days),
+                                  (ExerciseVolume.PERIOD_WEEK, summarize_weeks(days))):
+            for (exercise_id, date), summary in sorted(summaries.items()):
+                add(ExerciseVolume,
+                    assign_id=False,
+                    user_id=user_id,
+                    exercise_id=exercise_id,
+                    period=period,
+                    date=date,
+                    **summary)
+        for exercise_id, record in sorted(find_records(days).items()):
+            add(ExerciseRecord,
+                assign_id=False,
+                user_id=user_id,
+                exercise_id=exercise_id,
+                **record)
+        return last_session
+
+    def generate_weight_entries(self, user_id, joined, base_weight):
+        '''
+        Generates body weight entries, a random walk around a slow trend
+        '''
+        rng = self.rng
+        weight = base_weight + rng.gauss(0, 10)
+        trend = rng.gauss(0, 0.03)
+        probability = self.args.weigh_ins_per_week / 7.0
+        for day in range((self.end_date - joined).days + 1):
+            weight += trend + rng.gauss(0, 0.3)
+            if rng.random() < probability:
+                self.writer.add(WeightEntry,
+                                assign_id=False,
+                                user_id=user_id,
+                                date=joined + datetime.timedelta(days=day),
+                                weight=Decimal('{0:.2f}'.format(min(max(weight, 40), 250))))
+
+    def generate_nutrition_plan(self, user_id, joined):
+        '''
+        Generates a nutrition plan with a few meals
+        '''
+        if not self.ingredients:
+            return
+
+        rng = self.rng
+        add = self.writer.add
+        plan_id = add(NutritionPlan,
+                      user_id=user_id,
+                      language_id=2,
+                      description='Nutrition plan',
+                      creation_date=self.random_date(joined))
+        for order in range(1, rng.randint(3, 5) + 1):
+            meal_id = add(Meal, plan_id=plan_id, order=order, time=datetime.time(5 + order * 3, 0))
+            for item_order in range(1, rng.randint(1, 5) + 1):
+                add(MealItem,
+                    assign_id=False,
+                    meal_id=meal_id,
+                    ingredient_id=rng.choice(self.ingredients),
+                    order=item_order,
+                    amount=Decimal(rng.randint(2, 50) * 5))
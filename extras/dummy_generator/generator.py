@@ -126,8 +126,7 @@ weight_parser.add_argument('number_weight',
                            type=int)
 weight_parser.add_argument('--add-to-user',
                            action='store',
-                           help='Add to the specified user - ID,
-                           not all existing users')
+                           help='Add to the specified user - ID, not all existing users')
 weight_parser.add_argument('--base-weight',
                            action='store',
                            help='Default weight for the entry generation, default = 80',
@@ -145,6 +144,72 @@ nutrition_parser.add_argument('--add-to-user',
                               action='store',
                               help='Add to the specified user-ID, not all existing users')
 
+# Bulk options
+bulk_parser = subparsers.add_parser(
+    'bulk', help='Creates users with all entries at once, for large load testing datasets')
+bulk_parser.add_argument('bulk_users',
+                         action='store',
+                         help='Number of users to create',
+                         type=int)
+bulk_parser.add_argument('--seed',
+                         action='store',
+                         help='Seed of the random numbers, the same seed creates the same '
+                              'data, default = 1',
+                         type=int,
+                         default=1)
+bulk_parser.add_argument('--end-date',
+                         action='store',
+                         help='Date of the last entries, YYYY-MM-DD, default = today',
+                         type=lambda value: datetime.datetime.strptime(value, '%Y-%m-%d').date())
+bulk_parser.add_argument('--weeks',
+                         action='store',
+                         help='Weeks of history before the end date, default = 8',
+                         type=int,
+                         default=8)
+bulk_parser.add_argument('--users-per-gym',
+                         action='store',
+                         help='Average number of users per gym, 0 for no gyms, default = 200',
+                         type=int,
+                         default=200)
+bulk_parser.add_argument('--workouts-per-user',
+                         action='store',
+                         help='Average number of workouts per user, default = 1.5',
+                         type=float,
+                         default=1.5)
+bulk_parser.add_argument('--active-share',
+                         action='store',
+                         help='Share of the users that log their workouts, default = 0.3',
+                         type=float,
+                         default=0.3)
+bulk_parser.add_argument('--sessions-per-week',
+                         action='store',
+                         help='Average number of workout sessions per week of the active '
+                              'users, default = 2',
+                         type=float,
+                         default=2)
+bulk_parser.add_argument('--weigh-ins-per-week',
+                         action='store',
+                         help='Average number of weight entries per week, default = 2',
+                         type=float,
+                         default=2)
+bulk_parser.add_argument('--nutrition-share',
+                         action='store',
+                         help='Share of the users with a nutrition plan, default = 0.3',
+                         type=float,
+                         default=0.3)
+bulk_parser.add_argument('--password',
+                         action='store',
+                         help='Password of all created users, default = wger',
+                         default='wger')
+bulk_parser.add_argument('--batch-size',
+                         action='store',
+                         help='Number of rows inserted at once, default = 10000',
+                         type=int,
+                         default=10000)
+bulk_parser.add_argument('--verbose',
+                         action='store_true',
+                         help='Print the progress')
+
 args = parser.parse_args()
 # print(args)
 
@@ -495,3 +560,12 @@ if hasattr(args, 'number_nutrition_plans'):
                                              10, 250))
                     meal_item.save()
                 order = order + 1
+
+#
+# Bulk generator
+#
+if hasattr(args, 'bulk_users'):
+    print("** Generating {0} users with all entries".format(args.bulk_users))
+
+    from bulk_generator import BulkGenerator
+    BulkGenerator(args).run()
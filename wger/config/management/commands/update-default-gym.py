@@ -0,0 +1,39 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.core.management.base import BaseCommand
+
+from wger.config.models import GymConfig
+
+
+class Command(BaseCommand):
+    '''
+    Assigns the default gym to users without one and creates the missing
+    member configurations
+    '''
+
+    help = 'Assigns the default gym to all users without a gym and creates the ' \
+           'missing gym configurations for its members'
+
+    def handle(self, **options):
+
+        config = GymConfig.objects.get(pk=1)
+        if not config.default_gym:
+            self.stdout.write('No default gym configured, nothing to do')
+            return
+
+        counter = config.update_default_gym_members()
+        self.stdout.write('Created {0} gym member configurations'.format(counter))
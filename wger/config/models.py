@@ -17,16 +17,16 @@
 
 import logging
 
+from django.contrib.auth.models import User
 from django.db import models
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
-from django.core.cache import cache
 from wger.core.models import Language, UserProfile
-from wger.gym.helpers import is_any_gym_admin
+from wger.gym.helpers import get_gym_admins
 from wger.gym.models import Gym, GymUserConfig
 
 from wger.utils.cache import delete_template_fragment_cache
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import cache_mapper, reference_cache
 
 
 logger = logging.getLogger(__name__)
@@ -77,8 +77,7 @@ class LanguageConfig(models.Model):
         super(LanguageConfig, self).save(*args, **kwargs)
 
         # Cached objects
-        cache.delete(cache_mapper.get_language_config_key(
-            self.language, self.item))
+        reference_cache.invalidate(cache_mapper.LANGUAGE_CONFIG_VERSION)
 
         # Cached template fragments
         delete_template_fragment_cache('muscle-overview', self.language_id)
@@ -90,8 +89,7 @@ class LanguageConfig(models.Model):
         '''
 
         # Cached objects
-        cache.delete(cache_mapper.get_language_config_key(
-            self.language, self.item))
+        reference_cache.invalidate(cache_mapper.LANGUAGE_CONFIG_VERSION)
 
         # Cached template fragments
         delete_template_fragment_cache('muscle-overview', self.language_id)
@@ -132,22 +130,31 @@ class GymConfig(models.Model):
         Perform additional tasks
         '''
         if self.default_gym:
-
-            # All users that have no gym set in the profile are edited
-            UserProfile.objects.filter(gym=None).update(gym=self.default_gym)
-
-            # All users in the gym must have a gym config
-            for profile in UserProfile.objects.filter(gym=self.default_gym):
-                user = profile.user
-                if not is_any_gym_admin(user):
-                    try:
-                        user.gymuserconfig
-                    except GymUserConfig.DoesNotExist:
-                        config = GymUserConfig()
-                        config.gym = self.default_gym
-                        config.user = user
-                        config.save()
-                        logger.debug(
-                            'Creating GymUserConfig for user {0}'.format(user.username))
+            self.update_default_gym_members()
 
         return super(GymConfig, self).save(*args, **kwargs)
+
+    def update_default_gym_members(self):
+        '''
+        Assigns the default gym to all users without a gym and creates the
+        missing configurations for the gym's members (non-admins)
+
+        This is done with a fixed number of queries, independently of the
+        number of users.
+
+        :return: the number of created GymUserConfig objects
+        '''
+
+        # All users that have no gym set in the profile are edited
+        UserProfile.objects.filter(gym=None).update(gym=self.default_gym)
+
+        # All users in the gym must have a gym config
+        user_ids = User.objects.filter(userprofile__gym=self.default_gym,
+                                       gymuserconfig__isnull=True) \
+            .exclude(pk__in=get_gym_admins().values('pk')) \
+            .values_list('pk', flat=True)
+        configs = [GymUserConfig(gym=self.default_gym, user_id=user_id) for user_id in user_ids]
+        GymUserConfig.objects.bulk_create(configs)
+        logger.debug('Created {0} GymUserConfig objects'.format(len(configs)))
+
+        return len(configs)
@@ -20,6 +20,11 @@ from django.dispatch import receiver
 
 from wger.config.models import LanguageConfig
 from wger.core.models import Language
+from wger.utils.cache import (
+    cache_mapper,
+    delete_template_fragment_cache,
+    reference_cache
+)
 
 
 @receiver(post_save, sender=Language)
@@ -27,20 +32,30 @@ def init_language_config(sender, instance, created, **kwargs):
     '''
     Creates language config entries when new languages are created
     (all combinations of all languages)
+
+    The missing entries are calculated in memory and inserted with a single
+    query, the cached configurations are then invalidated all at once.
     '''
-    for language_source in Language.objects.all():
-        for language_target in Language.objects.all():
-            if not LanguageConfig.objects.filter(language=language_source)\
-                                         .filter(language_target=language_target)\
-                                         .exists():
-
-                for item in LanguageConfig.SHOW_ITEM_LIST:
-                    config = LanguageConfig()
-                    config.language = language_source
-                    config.language_target = language_target
-                    config.item = item[0]
-                    if language_source == language_target:
-                        config.show = True
-                    else:
-                        config.show = False
-                    config.save()
+    language_ids = list(Language.objects.order_by().values_list('pk', flat=True))
+    existing = set(LanguageConfig.objects.order_by().values_list('language_id',
+                                                                 'language_target_id',
+                                                                 'item'))
+
+    config_list = []
+    for language_source in language_ids:
+        for language_target in language_ids:
+            for item in LanguageConfig.SHOW_ITEM_LIST:
+                if (language_source, language_target, item[0]) in existing:
+                    continue
+                config_list.append(LanguageConfig(language_id=language_source,
+                                                  language_target_id=language_target,
+                                                  item=item[0],
+                                                  show=language_source == language_target))
+
+    if config_list:
+        LanguageConfig.objects.bulk_create(config_list)
+        reference_cache.invalidate(cache_mapper.LANGUAGE_CONFIG_VERSION)
+
+        for language_id in set(config.language_id for config in config_list):
+            delete_template_fragment_cache('muscle-overview', language_id)
+            delete_template_fragment_cache('exercise-overview', language_id)
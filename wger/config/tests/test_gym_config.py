@@ -15,12 +15,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
+import six
+
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 
 from wger.config.models import GymConfig
 from wger.core.models import UserProfile
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.gym.helpers import is_any_gym_admin
 from wger.gym.models import Gym, GymUserConfig
 
 
@@ -92,3 +96,44 @@ class GymConfigTestCase(WorkoutManagerTestCase):
 
         # 13 non-managers
         self.assertEqual(GymUserConfig.objects.filter(gym=gym).count(), 13)
+
+    def test_update_userprofile_queries(self):
+        '''
+        Test that setting a default gym needs the same number of queries,
+        regardless of the number of users
+        '''
+        UserProfile.objects.update(gym=None)
+        GymUserConfig.objects.all().delete()
+
+        gym = Gym.objects.get(pk=2)
+        gym_config = GymConfig.objects.get(pk=1)
+        gym_config.default_gym = gym
+
+        # Update profiles, search members, bulk insert and save the config
+        with self.assertNumQueries(4):
+            gym_config.save()
+        self.assertEqual(GymUserConfig.objects.filter(gym=gym).count(), 13)
+
+        # Nothing left to do, the bulk insert is skipped
+        with self.assertNumQueries(3):
+            gym_config.save()
+        self.assertEqual(GymUserConfig.objects.filter(gym=gym).count(), 13)
+
+    def test_update_command(self):
+        '''
+        Test the management command that propagates the default gym
+        '''
+        gym = Gym.objects.get(pk=2)
+        GymConfig.objects.filter(pk=1).update(default_gym=gym)
+        UserProfile.objects.update(gym=None)
+        GymUserConfig.objects.all().delete()
+
+        out = six.StringIO()
+        call_command('update-default-gym', stdout=out)
+        self.assertEqual(UserProfile.objects.filter(gym=gym).count(), 24)
+        self.assertEqual(GymUserConfig.objects.filter(gym=gym).count(), 13)
+        self.assertIn('13', out.getvalue())
+
+        # Admins don't get a member configuration
+        for user in User.objects.filter(gymuserconfig__isnull=False):
+            self.assertFalse(is_any_gym_admin(user))
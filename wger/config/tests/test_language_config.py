@@ -16,8 +16,10 @@
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
 from wger.config.models import LanguageConfig
-
+from wger.core.models import Language
 from wger.core.tests.base_testcase import WorkoutManagerEditTestCase
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.language import load_item_languages
 
 
 class EditLanguageConfigTestCase(WorkoutManagerEditTestCase):
@@ -29,3 +31,49 @@ class EditLanguageConfigTestCase(WorkoutManagerEditTestCase):
     url = 'config:language_config:edit'
     pk = 1
     data = {'show': False}
+
+
+class InitLanguageConfigTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the creation of the language configs for new languages
+    '''
+
+    def test_new_language(self):
+        '''
+        Test that all combinations are created when adding a language
+        '''
+        count_languages = Language.objects.count()
+        LanguageConfig.objects.all().delete()
+
+        # Insert the language, load languages and configs, bulk insert
+        with self.assertNumQueries(4):
+            language = Language.objects.create(short_name='xx', full_name='Language xx')
+
+        count_items = len(LanguageConfig.SHOW_ITEM_LIST)
+        self.assertEqual(LanguageConfig.objects.count(),
+                         (count_languages + 1) ** 2 * count_items)
+        self.assertEqual(LanguageConfig.objects.filter(show=True).count(),
+                         (count_languages + 1) * count_items)
+        config = LanguageConfig.objects.get(language=language,
+                                            language_target=language,
+                                            item=LanguageConfig.SHOW_ITEM_EXERCISES)
+        self.assertTrue(config.show)
+
+        # Nothing new is created when saving again
+        with self.assertNumQueries(3):
+            language.save()
+        self.assertEqual(LanguageConfig.objects.count(),
+                         (count_languages + 1) ** 2 * count_items)
+
+    def test_cache_invalidation(self):
+        '''
+        Test that the cached language configurations are invalidated
+        '''
+        languages = load_item_languages(LanguageConfig.SHOW_ITEM_EXERCISES, 'de')
+        LanguageConfig.objects.filter(language__short_name='de').update(show=True)
+        self.assertEqual(load_item_languages(LanguageConfig.SHOW_ITEM_EXERCISES, 'de'),
+                         languages)
+
+        Language.objects.create(short_name='xx', full_name='Language xx')
+        self.assertEqual(len(load_item_languages(LanguageConfig.SHOW_ITEM_EXERCISES, 'de')),
+                         Language.objects.count() - 1)
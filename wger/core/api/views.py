@@ -16,12 +16,18 @@
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
 from django.contrib.auth.models import User  # as Django_User, User
-from django.utils import translation
+from django.utils import timezone, translation
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from rest_framework.decorators import detail_route
+from rest_framework.decorators import api_view, detail_route
 
 from wger.config.models import GymConfig
+from wger.exercises.api.serializers import (
+    ExerciseCommentSerializer,
+    ExerciseImageSerializer,
+    ExerciseSerializer
+)
+from wger.exercises.models import Exercise, ExerciseComment, ExerciseImage
 from wger.gym.models import (
     AdminUserNote,
     GymUserConfig,
@@ -29,6 +35,8 @@ from wger.gym.models import (
 )
 
 from wger.core.models import (
+    CATALOG_CHANGES_SETTLE,
+    CatalogChange,
     UserProfile,
     Language,
     DaysOfWeek,
@@ -45,7 +53,18 @@ from wger.core.api.serializers import (
     WeightUnitSerializer
 )
 from wger.core.api.serializers import UserprofileSerializer
+from wger.nutrition.api.serializers import (
+    IngredientSerializer,
+    IngredientWeightUnitSerializer,
+    WeightUnitSerializer as NutritionWeightUnitSerializer
+)
+from wger.nutrition.models import (
+    Ingredient,
+    IngredientWeightUnit,
+    WeightUnit as NutritionWeightUnit
+)
 from wger.utils.permissions import UpdateOnlyPermission, WgerPermission
+from wger.utils.viewsets import CatalogViewSetMixin
 
 
 class UserProfileViewSet(viewsets.ModelViewSet):
@@ -139,7 +158,7 @@ class UserRegistrationViewSet(viewsets.ModelViewSet):
                             status.HTTP_400_BAD_REQUEST)
 
 
-class LanguageViewSet(viewsets.ReadOnlyModelViewSet):
+class LanguageViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for workout objects
     '''
@@ -150,7 +169,7 @@ class LanguageViewSet(viewsets.ReadOnlyModelViewSet):
                      'short_name')
 
 
-class DaysOfWeekViewSet(viewsets.ReadOnlyModelViewSet):
+class DaysOfWeekViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for workout objects
     '''
@@ -160,7 +179,7 @@ class DaysOfWeekViewSet(viewsets.ReadOnlyModelViewSet):
     filter_fields = ('day_of_week', )
 
 
-class LicenseViewSet(viewsets.ReadOnlyModelViewSet):
+class LicenseViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for workout objects
     '''
@@ -172,7 +191,7 @@ class LicenseViewSet(viewsets.ReadOnlyModelViewSet):
                      'url')
 
 
-class RepetitionUnitViewSet(viewsets.ReadOnlyModelViewSet):
+class RepetitionUnitViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for repetition units objects
     '''
@@ -182,7 +201,7 @@ class RepetitionUnitViewSet(viewsets.ReadOnlyModelViewSet):
     filter_fields = ('name', )
 
 
-class WeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
+class WeightUnitViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for weight units objects
     '''
@@ -190,3 +209,85 @@ class WeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = WeightUnitSerializer
     ordering_fields = '__all__'
     filter_fields = ('name', )
+
+
+CATALOG_RESOURCES = {
+    'exercise': (Exercise.objects.prefetch_related('muscles',
+                                                   'muscles_secondary',
+                                                   'equipment'),
+                 ExerciseSerializer),
+    'exerciseimage': (ExerciseImage.objects.all(), ExerciseImageSerializer),
+    'exercisecomment': (ExerciseComment.objects.all(), ExerciseCommentSerializer),
+    'ingredient': (Ingredient.objects.all(), IngredientSerializer),
+    'weightunit': (NutritionWeightUnit.objects.all(), NutritionWeightUnitSerializer),
+    'ingredientweightunit': (IngredientWeightUnit.objects.all(), IngredientWeightUnitSerializer),
+}
+'''
+The resources returned by the catalog change feed, with their serializers
+'''
+
+CATALOG_CHANGES_LIMIT = 500
+'''
+Maximum number of changes returned at once
+'''
+
+
+@api_view(['GET'])
+def catalog_changes(request):
+    '''
+    Returns the catalog objects that changed after the given cursor
+
+    Only the current version of each changed object is returned, grouped by
+    resource, deleted objects are listed with their ID. Clients start with
+    ?since=0, which returns the complete catalog, and then pass the returned
+    cursor to get the next page or, later, the following changes. Changes
+    are only returned once they are older than CATALOG_CHANGES_SETTLE, so
+    the cursor never skips changes that are still being committed.
+    '''
+    try:
+        since = int(request.query_params.get('since', 0))
+        limit = int(request.query_params.get('limit', CATALOG_CHANGES_LIMIT))
+    except ValueError:
+        return Response({'detail': 'since and limit must be integers'},
+                        status.HTTP_400_BAD_REQUEST)
+    limit = min(max(limit, 1), CATALOG_CHANGES_LIMIT)
+
+    entries = CatalogChange.objects.filter(id__gt=since)
+    entries = list(entries.values_list('id', 'resource', 'object_id', 'deleted', 'date')
+                   [:limit + 1])
+    more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Stop before the first change that could still be overtaken by one with
+    # a lower ID, the client gets it (and the rest) with its next request
+    settled = timezone.now() - CATALOG_CHANGES_SETTLE
+    for i, entry in enumerate(entries):
+        if entry[4] > settled:
+            entries = entries[:i]
+            more = False
+            break
+
+    changed = {}
+    deleted = {}
+    for pk, resource, object_id, is_deleted, date in entries:
+        if resource in CATALOG_RESOURCES:
+            target = deleted if is_deleted else changed
+            target.setdefault(resource, []).append(object_id)
+
+    changes = {}
+    for resource, object_ids in changed.items():
+        queryset, serializer_class = CATALOG_RESOURCES[resource]
+        objects = queryset.filter(pk__in=object_ids)
+        changes[resource] = serializer_class(objects,
+                                             many=True,
+                                             context={'request': request}).data
+
+        # Objects deleted while the page was being prepared
+        missing = set(object_ids) - set(i['id'] for i in changes[resource])
+        if missing:
+            deleted.setdefault(resource, []).extend(sorted(missing))
+
+    return Response({'cursor': entries[-1][0] if entries else since,
+                     'more': more,
+                     'changes': changes,
+                     'deleted': deleted})
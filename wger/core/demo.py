@@ -14,23 +14,26 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import collections
 import logging
 import random
 import datetime
 import uuid
+from decimal import Decimal
 
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
+from django.db import transaction
 from django.utils.translation import ugettext as _
 
 from wger.weight.models import WeightEntry
 from wger.exercises.models import Exercise
-from wger.core.models import DaysOfWeek
 from wger.manager.models import (
+    ExerciseVolume,
     Workout,
     Day,
     Set,
     Setting,
+    WorkoutActivityMonth,
     WorkoutLog,
     Schedule,
     ScheduleStep
@@ -42,387 +45,385 @@ from wger.nutrition.models import (
     Ingredient,
     IngredientWeightUnit
 )
-
+from wger.gym.helpers import get_user_last_activity
+from wger.utils.cache import reset_weight_trend, reset_workout_log
 from wger.utils.language import load_language
+from wger.utils.reference import get_days_of_week
 
 logger = logging.getLogger(__name__)
 
 
+DEMO_SETS = (
+    # Biceps curls with dumbbell
+    {'order': 2, 'exercises': ((26, 81),), 'reps': ((8,),), 'logs': ((8, 10, 12), 18, 4)},
+
+    # French press
+    {'order': 2, 'exercises': ((25, 84),), 'reps': ((8,),), 'logs': ((7, 10), 30, 4)},
+
+    # Squats
+    {'order': 3, 'exercises': ((6, 111),), 'reps': ((10,),), 'logs': ((5, 10, 12), 110, 10)},
+
+    # Crunches and leg raises, as a superset
+    {'order': 4, 'exercises': ((4, 91), (35, 126)), 'reps': ((30, 99, 35), (30, 40, 99)),
+     'logs': None},
+)
+'''
+The sets of the demo workout's first day. Exercises are pairs of PKs, the
+first one for German, the second one for all other languages. Logs are
+(repetitions, base weight, random spread) for the first exercise of the set.
+'''
+
+DEMO_MEALS = (
+    # Breakfast: oatmeal, milk and protein powder
+    (datetime.time(7, 30), (((8197, None, 100), (2126, None, 100)),
+                            ((8198, None, 100), (154, None, 100)),
+                            ((8244, None, 30), (196, None, 30)))),
+
+    # 11 o'clock meal: bread (in slices), turkey, cottage cheese and a tomato
+    (datetime.time(11, 0), (((8225, None, 80), (5370, 9874, 2)),
+                            ((8201, None, 100), (1643, None, 100)),
+                            ((8222, None, 50), (17, None, 50)),  # TODO: check this!
+                            ((8217, None, 120), (3208, 5950, 1)))),
+
+    # Lunch (leave empty so users can add their own ingredients)
+    (datetime.time(13, 0), ()),
+)
+'''
+The meals of the demo nutrition plan. Each item is a pair of (ingredient,
+weight unit, amount) tuples, the first one for German, the second one for
+all other languages.
+'''
+
+DEMO_TEMPLATES = {}
+'''
+Process wide storage for the demo data templates, by language
+'''
+
+GUEST_DEMO_DATA = {}
+'''
+Process wide storage for the read-only demo data shown to guests, by
+language and day
+'''
+
+
 def create_temporary_user():
     '''
     Creates a temporary user
+
+    Temporary users can't log in with a password, so none is set (and hashed)
     '''
     username = uuid.uuid4().hex[:-2]
-    password = uuid.uuid4().hex[:-2]
     email = ''
 
-    user = User.objects.create_user(username, email, password)
-    user.save()
+    user = User.objects.create_user(username, email)
     user_profile = user.userprofile
     user_profile.is_temporary = True
     user_profile.age = 25
     user_profile.height = 175
     user_profile.save()
-    user = authenticate(username=username, password=password)
+
+    # Mark the user as authenticated, so it can be logged in directly
+    user.backend = 'django.contrib.auth.backends.ModelBackend'
     return user
 
 
+def get_demo_template(language):
+    '''
+    Returns the template used to create the demo entries for a language
+
+    The template is built only once per language and process. It contains
+    the translated names as well as the resolved exercises and ingredients,
+    exercises or ingredients not present in the database are skipped.
+
+    :param language: the language of the demo data
+    :return: a dictionary with the template
+    '''
+    if language.short_name in DEMO_TEMPLATES:
+        return DEMO_TEMPLATES[language.short_name]
+
+    index = 0 if language.short_name == 'de' else 1
+
+    # Exercises
+    exercises = Exercise.objects.in_bulk([exercise[index]
+                                          for demo_set in DEMO_SETS
+                                          for exercise in demo_set['exercises']])
+    sets = []
+    for demo_set in DEMO_SETS:
+        set_exercises = []
+        for exercise, reps in zip(demo_set['exercises'], demo_set['reps']):
+            if exercise[index] not in exercises:
+                logger.warning('Exercise {0} for demo data not found, '
+                               'skipping'.format(exercise[index]))
+                continue
+            set_exercises.append((exercise[index], reps))
+        if set_exercises:
+            sets.append({'order': demo_set['order'],
+                         'exercises': set_exercises,
+                         'logs': demo_set['logs']})
+
+    # Ingredients
+    meal_items = [[item[index] for item in items] for meal_time, items in DEMO_MEALS]
+    ingredients = Ingredient.objects.in_bulk(
+        [pk for items in meal_items for pk, unit, amount in items])
+    units = IngredientWeightUnit.objects.in_bulk(
+        [unit for items in meal_items for pk, unit, amount in items if unit])
+
+    meals = []
+    for (meal_time, dummy), items in zip(DEMO_MEALS, meal_items):
+        meal = []
+        for pk, unit, amount in items:
+            if pk not in ingredients:
+                logger.warning('Ingredient {0} for demo data not found, skipping'.format(pk))
+                continue
+            meal.append((ingredients[pk], units.get(unit), amount))
+        meals.append((meal_time, meal))
+
+    placeholder = _('Placeholder workout nr {0} for schedule')
+    template = {'language': language,
+                'workouts': [_('Sample workout')] + [placeholder.format(i) for i in (1, 2, 3)],
+                'days': [(_('Sample day'), 1), (_('Another sample day'), 3)],
+                'sets': sets,
+                'plan': _('Sample nutrional plan'),
+                'meals': meals,
+
+                # Name, start (weeks ago), active, loop, steps (workout, duration)
+                'schedules': [(_('My cool workout schedule'), 4, True, True,
+                               ((1, 2), (0, 4), (2, 1), (3, 6))),
+                              (_('Empty placeholder schedule'), 15, False, False, ((1, 2),)),
+                              (_('Empty placeholder schedule'), 30, False, False, ((3, 2),))]}
+    DEMO_TEMPLATES[language.short_name] = template
+    return template
+
+
+def get_guest_demo_data(language=None):
+    '''
+    Returns the demo data used to render the dashboard for guests
+
+    The data is only computed once per language (and day) and process, nothing
+    is written to the database. A real temporary user with its own copy of the
+    demo entries is only created when the guest wants to change something.
+    '''
+    if language is None:
+        language = load_language()
+
+    today = datetime.date.today()
+    key = (language.short_name, today)
+    if key not in GUEST_DEMO_DATA:
+
+        # Forget the data from previous days, the dates would be stale
+        for old_key in [i for i in GUEST_DEMO_DATA if i[1] != today]:
+            del GUEST_DEMO_DATA[old_key]
+        GUEST_DEMO_DATA[key] = build_guest_demo_data(language, today)
+
+    return GUEST_DEMO_DATA[key]
+
+
+def build_guest_demo_data(language, today):
+    '''
+    Builds the read-only demo data for guests with unsaved model instances
+
+    :param language: the language of the demo data
+    :param today: the date the weight entries are relative to
+    :return: a dictionary that can be used as template context for the dashboard
+    '''
+    template = get_demo_template(language)
+    workout = Workout(comment=template['workouts'][0], creation_date=today)
+    schedule = Schedule(name=template['schedules'][0][0],
+                        start_date=today - datetime.timedelta(weeks=4))
+    used_days = dict((day_of_week, description)
+                     for description, day_of_week in template['days'])
+
+    week_day_result = []
+    for week in get_days_of_week():
+        if week.id in used_days:
+            week_day_result.append((_(week.day_of_week), used_days[week.id], True))
+        else:
+            week_day_result.append((_(week.day_of_week), _('Rest day'), False))
+
+    # Nutrition plan, only the totals are shown on the dashboard
+    plan = NutritionPlan(description=template['plan'],
+                         language=language,
+                         creation_date=today)
+    total = {'energy': 0, 'protein': 0, 'carbohydrates': 0, 'fat': 0}
+    for meal_time, items in template['meals']:
+        for ingredient, unit, amount in items:
+            item = MealItem(ingredient=ingredient, weight_unit=unit, amount=Decimal(amount))
+            values = item.get_nutritional_values()
+            for key in total.keys():
+                total[key] += values[key]
+
+    # Body weight, use fixed values since the data is shared by all guests
+    weight_entries = [WeightEntry(weight=Decimal(80 + 0.5 * i + i % 3),
+                                  date=today - datetime.timedelta(days=i))
+                      for i in range(1, 6)]
+    last_entries = []
+    for entry, prev_entry in zip(weight_entries, weight_entries[1:] + [None]):
+        if prev_entry:
+            last_entries.append((entry,
+                                 entry.weight - prev_entry.weight,
+                                 (entry.date - prev_entry.date).days))
+        else:
+            last_entries.append((entry, None, None))
+
+    return {'current_workout': workout,
+            'schedule': schedule,
+            'weekdays': week_day_result,
+            'plan': plan,
+            'nutritional_info': {'total': total},
+            'weight': weight_entries[0],
+            'last_weight_entries': last_entries}
+
+
+def bulk_create_with_pks(queryset, objects):
+    '''
+    Inserts the objects with one query and sets their primary keys
+
+    Not every database returns the keys of bulk inserted rows, so they are read
+    back from the queryset, which must contain the new rows and only rows of
+    this user. Since the demo entries are created in one transaction, the new
+    rows are the last ones.
+    '''
+    queryset.model.objects.bulk_create(objects)
+    pks = list(queryset.order_by('-pk').values_list('pk', flat=True)[:len(objects)])
+    if len(pks) != len(objects):
+        raise RuntimeError('Could not read back the IDs of the inserted {0} objects'
+                           .format(queryset.model.__name__))
+    for obj, pk in zip(objects, reversed(pks)):
+        obj.pk = pk
+    return objects
+
+
+@transaction.atomic
 def create_demo_entries(user):
     '''
     Creates some demo data for temporary users
-    '''
 
-    # (this is a bit ugly and long...)
+    The entries are instantiated from the language's demo template with one
+    bulk insert per table, everything in one transaction. Since this doesn't
+    call save() or send any signals, the caches are reset once at the end.
+    '''
     language = load_language()
+    template = get_demo_template(language)
+    today = datetime.date.today()
 
     #
-    # Workout and exercises
+    # Workouts, days and exercises
     #
+    workouts = bulk_create_with_pks(Workout.objects.filter(user=user),
+                                    [Workout(user=user, comment=comment, creation_date=today)
+                                     for comment in template['workouts']])
+    workout = workouts[0]
+
+    days = bulk_create_with_pks(Day.objects.filter(training__user=user),
+                                [Day(training=workout, description=description)
+                                 for description, day_of_week in template['days']])
+    Day.day.through.objects.bulk_create(
+        [Day.day.through(day_id=day.pk, daysofweek_id=day_of_week)
+         for day, (description, day_of_week) in zip(days, template['days'])])
+
+    sets = bulk_create_with_pks(Set.objects.filter(exerciseday__training__user=user),
+                                [Set(exerciseday=days[0], sets=4, order=demo_set['order'])
+                                 for demo_set in template['sets']])
+
+    set_exercises = []
     setting_list = []
     weight_log = []
-    workout = Workout(user=user, comment=_('Sample workout'))
-    workout.save()
-    monday = DaysOfWeek.objects.get(pk=1)
-    wednesday = DaysOfWeek.objects.get(pk=3)
-    day = Day(training=workout, description=_('Sample day'))
-    day.save()
-    day.day.add(monday)
-
-    day2 = Day(training=workout, description=_('Another sample day'))
-    day2.save()
-    day2.day.add(wednesday)
-
-    # Biceps curls with dumbbell
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=26)
-    else:
-        exercise = Exercise.objects.get(pk=81)
-    day_set = Set(exerciseday=day, sets=4, order=2)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting = Setting(set=day_set, exercise=exercise, reps=8, order=1)
-    setting.save()
-
-    # Weight log entries
-    for reps in (8, 10, 12):
-        for i in range(1, 8):
-            log = WorkoutLog(user=user,
-                             exercise=exercise,
-                             workout=workout,
-                             reps=reps,
-                             weight=18 - reps + random.randint(1, 4),
-                             date=datetime.date.today() - datetime.timedelta(weeks=i))
-            weight_log.append(log)
-
-    # French press
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=25)
-    else:
-        exercise = Exercise.objects.get(pk=84)
-    day_set = Set(exerciseday=day, sets=4, order=2)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=8, order=1))
-
-    # Weight log entries
-    for reps in (7, 10):
-        for i in range(1, 8):
-            log = WorkoutLog(user=user,
-                             exercise=exercise,
-                             workout=workout,
-                             reps=reps,
-                             weight=30 - reps + random.randint(1, 4),
-                             date=datetime.date.today() - datetime.timedelta(weeks=i))
-            weight_log.append(log)
-
-    # Squats
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=6)
-    else:
-        exercise = Exercise.objects.get(pk=111)
-    day_set = Set(exerciseday=day, sets=4, order=3)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=10, order=1))
-
-    # Weight log entries
-    for reps in (5, 10, 12):
-        for i in range(1, 8):
-            log = WorkoutLog(user=user,
-                             exercise=exercise,
-                             workout=workout,
-                             reps=reps,
-                             weight=110 - reps + random.randint(1, 10),
-                             date=datetime.date.today() - datetime.timedelta(weeks=i))
-            weight_log.append(log)
-
-    # Crunches
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=4)
-    else:
-        exercise = Exercise.objects.get(pk=91)
-    day_set = Set(exerciseday=day, sets=4, order=4)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=30, order=1))
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=99, order=2))
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=35, order=3))
-
-    # Leg raises, supersets with crunches
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=35)
-    else:
-        exercise = Exercise.objects.get(pk=126)
-    day_set.exercises.add(exercise)
-
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=30, order=1))
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=40, order=2))
-    setting_list.append(
-        Setting(set=day_set, exercise=exercise, reps=99, order=3))
-
+    for day_set, demo_set in zip(sets, template['sets']):
+        for sort_value, (exercise, reps_list) in enumerate(demo_set['exercises'], 1):
+            set_exercises.append(Set.exercises.through(set_id=day_set.pk,
+                                                       exercise_id=exercise,
+                                                       sort_value=sort_value))
+            for order, reps in enumerate(reps_list, 1):
+                setting_list.append(Setting(set=day_set,
+                                            exercise_id=exercise,
+                                            reps=reps,
+                                            order=order))
+
+        # Weight log entries
+        if demo_set['logs']:
+            exercise = demo_set['exercises'][0][0]
+            reps_list, base_weight, spread = demo_set['logs']
+            for reps in reps_list:
+                for i in range(1, 8):
+                    log = WorkoutLog(user=user,
+                                     exercise_id=exercise,
+                                     workout=workout,
+                                     reps=reps,
+                                     weight=base_weight - reps + random.randint(1, spread),
+                                     date=today - datetime.timedelta(weeks=i))
+                    weight_log.append(log)
+
+    Set.exercises.through.objects.bulk_create(set_exercises)
     Setting.objects.bulk_create(setting_list)
-
-    # Save all the log entries
     WorkoutLog.objects.bulk_create(weight_log)
 
     #
     # (Body) weight entries
     #
     temp = []
-    existing_entries = [i.date for i in WeightEntry.objects.filter(user=user)]
+    existing_entries = set(WeightEntry.objects.filter(user=user).values_list('date', flat=True))
     for i in range(1, 20):
-        creation_date = datetime.date.today() - datetime.timedelta(days=i)
+        creation_date = today - datetime.timedelta(days=i)
         if creation_date not in existing_entries:
             entry = WeightEntry(user=user,
                                 weight=80 + 0.5 * i + random.randint(1, 3),
                                 date=creation_date)
             temp.append(entry)
     WeightEntry.objects.bulk_create(temp)
+    reset_weight_trend(user.pk)
 
     #
     # Nutritional plan
     #
-    plan = NutritionPlan()
-    plan.user = user
-    plan.language = language
-    plan.description = _('Sample nutrional plan')
-    plan.save()
-
-    # Breakfast
-    meal = Meal()
-    meal.plan = plan
-    meal.order = 1
-    meal.time = datetime.time(7, 30)
-    meal.save()
-
-    # Oatmeal
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8197)
-    else:
-        ingredient = Ingredient.objects.get(pk=2126)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 1
-    mealitem.amount = 100
-    mealitem.save()
-
-    # Milk
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8198)
-    else:
-        ingredient = Ingredient.objects.get(pk=154)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 2
-    mealitem.amount = 100
-    mealitem.save()
-
-    # Protein powder
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8244)
-    else:
-        ingredient = Ingredient.objects.get(pk=196)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 3
-    mealitem.amount = 30
-    mealitem.save()
+    plan = NutritionPlan.objects.create(user=user,
+                                        language=language,
+                                        description=template['plan'])
+    meals = bulk_create_with_pks(Meal.objects.filter(plan=plan),
+                                 [Meal(plan=plan, order=order, time=meal_time)
+                                  for order, (meal_time, items)
+                                  in enumerate(template['meals'], 1)])
+    MealItem.objects.bulk_create([MealItem(meal=meal,
+                                           ingredient=ingredient,
+                                           weight_unit=unit,
+                                           order=order,
+                                           amount=amount)
+                                  for meal, (meal_time, items) in zip(meals, template['meals'])
+                                  for order, (ingredient, unit, amount) in enumerate(items, 1)])
 
     #
-    # 11 o'clock meal
-    meal = Meal()
-    meal.plan = plan
-    meal.order = 2
-    meal.time = datetime.time(11, 0)
-    meal.save()
-
-    # Bread, in slices
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8225)
-        unit = None
-        amount = 80
-    else:
-        ingredient = Ingredient.objects.get(pk=5370)
-        unit = IngredientWeightUnit.objects.get(pk=9874)
-        amount = 2
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.weight_unit = unit
-    mealitem.order = 1
-    mealitem.amount = amount
-    mealitem.save()
-
-    # Turkey
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8201)
-    else:
-        ingredient = Ingredient.objects.get(pk=1643)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.order = 2
-    mealitem.ingredient = ingredient
-    mealitem.amount = 100
-    mealitem.save()
-
-    # Cottage cheese
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8222)  # TODO: check this!
-    else:
-        ingredient = Ingredient.objects.get(pk=17)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 3
-    mealitem.amount = 50
-    mealitem.save()
-
-    # Tomato, one
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8217)
-        unit = None
-        amount = 120
-    else:
-        ingredient = Ingredient.objects.get(pk=3208)
-        unit = IngredientWeightUnit.objects.get(pk=5950)
-        amount = 1
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.weight_unit = unit
-    mealitem.ingredient = ingredient
-    mealitem.order = 4
-    mealitem.amount = amount
-    mealitem.save()
-
+    # Workout schedules, only one of them can be active
     #
-    # Lunch (leave empty so users can add their own ingredients)
-    meal = Meal()
-    meal.plan = plan
-    meal.order = 3
-    meal.time = datetime.time(13, 0)
-    meal.save()
+    Schedule.objects.filter(user=user).update(is_active=False)
+    schedules = bulk_create_with_pks(Schedule.objects.filter(user=user),
+                                     [Schedule(user=user,
+                                               name=name,
+                                               start_date=today - datetime.timedelta(weeks=weeks),
+                                               is_active=is_active,
+                                               is_loop=is_loop)
+                                      for name, weeks, is_active, is_loop, steps
+                                      in template['schedules']])
+    ScheduleStep.objects.bulk_create([ScheduleStep(schedule=schedule,
+                                                   workout=workouts[workout_index],
+                                                   duration=duration,
+                                                   order=order)
+                                      for schedule, (name, weeks, is_active, is_loop, steps)
+                                      in zip(schedules, template['schedules'])
+                                      for order, (workout_index, duration)
+                                      in enumerate(steps, 1)])
 
     #
-    # Workout schedules
-    #
-
-    # create some empty workouts to fill the list
-    workout2 = Workout(user=user, comment=_(
-        'Placeholder workout nr {0} for schedule').format(1))
-    workout2.save()
-    workout3 = Workout(user=user, comment=_(
-        'Placeholder workout nr {0} for schedule').format(2))
-    workout3.save()
-    workout4 = Workout(user=user, comment=_(
-        'Placeholder workout nr {0} for schedule').format(3))
-    workout4.save()
-
-    schedule = Schedule()
-    schedule.user = user
-    schedule.name = _('My cool workout schedule')
-    schedule.start_date = datetime.date.today() - datetime.timedelta(weeks=4)
-    schedule.is_active = True
-    schedule.is_loop = True
-    schedule.save()
-
-    # Add the workouts
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout2
-    step.duration = 2
-    step.order = 1
-    step.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout
-    step.duration = 4
-    step.order = 2
-    step.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout3
-    step.duration = 1
-    step.order = 3
-    step.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout4
-    step.duration = 6
-    step.order = 4
-    step.save()
-
+    # Reset the caches once, instead of once per saved object
     #
-    # Add two more schedules, to make the overview more interesting
-    schedule = Schedule()
-    schedule.user = user
-    schedule.name = _('Empty placeholder schedule')
-    schedule.start_date = datetime.date.today() - datetime.timedelta(weeks=15)
-    schedule.is_active = False
-    schedule.is_loop = False
-    schedule.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout2
-    step.duration = 2
-    step.order = 1
-    step.save()
-
-    schedule = Schedule()
-    schedule.user = user
-    schedule.name = _('Empty placeholder schedule')
-    schedule.start_date = datetime.date.today() - datetime.timedelta(weeks=30)
-    schedule.is_active = False
-    schedule.is_loop = False
-    schedule.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout4
-    step.duration = 2
-    step.order = 1
-    step.save()
+    for log_date in set((log.date.year, log.date.month, log.date.day) for log in weight_log):
+        reset_workout_log(user.pk, *log_date)
+
+    # The user is new, so the logs are all there is in the activity index
+    months = collections.Counter(log.date.replace(day=1) for log in weight_log)
+    WorkoutActivityMonth.objects.bulk_create([WorkoutActivityMonth(user=user,
+                                                                   month=month,
+                                                                   logs=logs)
+                                              for month, logs in months.items()])
+    ExerciseVolume.objects.rebuild(user)
+
+    user.usercache.last_activity = get_user_last_activity(user)
+    user.usercache.save()
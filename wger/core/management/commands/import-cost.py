@@ -0,0 +1,99 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import os
+import sys
+import json
+import subprocess
+
+import six
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from wger.utils.import_cost import TARGETS
+
+
+class Command(BaseCommand):
+    '''
+    Reports how long importing each module takes when starting a worker
+    '''
+    help = 'Reports the import time of the modules loaded when starting the application'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target',
+                            choices=TARGETS,
+                            default='wsgi',
+                            help='What to load: django.setup() only, additionally the URL '
+                                 'configuration or the complete WSGI application (default)')
+        parser.add_argument('--runs',
+                            type=int,
+                            default=1,
+                            help='Load the application this many times and report the fastest '
+                                 'run, default: 1')
+        parser.add_argument('--limit',
+                            type=int,
+                            default=30,
+                            help='Number of modules to show, default: 30')
+        parser.add_argument('--sort',
+                            choices=('self', 'cumulative'),
+                            default='cumulative',
+                            help='Sort by the time needed for the module itself or including '
+                                 'the modules it imports (default)')
+        parser.add_argument('--prefix',
+                            default='',
+                            help='Only show modules whose name starts with this, e.g. "wger."')
+
+    def handle(self, **options):
+        '''
+        Load the application in new processes and print the slowest modules
+        '''
+        if six.PY2:
+            raise CommandError('Measuring the import times needs Python 3')
+
+        runs = [self.measure(options['target']) for i in range(max(options['runs'], 1))]
+        result = min(runs, key=lambda run: run['total'])
+
+        self.stdout.write(u'Loading {0}: {1:.0f} ms (fastest of {2} runs), {3} modules'.format(
+            options['target'],
+            result['total'] * 1000,
+            len(runs),
+            len(result['modules'])))
+        self.stdout.write(u'{0:>12} {1:>10}  {2}'.format('cumulative', 'self', 'module'))
+
+        column = 1 if options['sort'] == 'cumulative' else 2
+        modules = [i for i in result['modules'] if i[0].startswith(options['prefix'])]
+        modules.sort(key=lambda module: module[column], reverse=True)
+        for name, cumulative, own in modules[:options['limit']]:
+            self.stdout.write(u'{0:>9.1f} ms {1:>7.1f} ms  {2}'.format(
+                cumulative * 1000, own * 1000, name))
+
+    def measure(self, target):
+        '''
+        Loads the application in a new interpreter and returns the times
+        '''
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join(i for i in sys.path if i)
+        env['DJANGO_SETTINGS_MODULE'] = settings.SETTINGS_MODULE
+
+        process = subprocess.Popen([sys.executable, '-m', 'wger.utils.import_cost', target],
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   env=env)
+        stdout, stderr = process.communicate()
+        if process.returncode:
+            raise CommandError(u'Could not load the application:\n{0}'.format(
+                stderr.decode('utf-8', 'replace')))
+        return json.loads(stdout.decode('utf-8'))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.13 on 2026-10-19 01:03
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+CATALOG_MODELS = (('exercises', 'Exercise'),
+                  ('exercises', 'ExerciseImage'),
+                  ('exercises', 'ExerciseComment'),
+                  ('nutrition', 'Ingredient'),
+                  ('nutrition', 'WeightUnit'),
+                  ('nutrition', 'IngredientWeightUnit'))
+
+
+def add_existing_objects(apps, schema_editor):
+    '''
+    Adds an entry for all existing catalog objects, so that a sync from the
+    beginning returns the complete catalog
+    '''
+    CatalogChange = apps.get_model('core', 'CatalogChange')
+    for app_label, model_name in CATALOG_MODELS:
+        model = apps.get_model(app_label, model_name)
+        resource = model._meta.model_name
+        CatalogChange.objects.bulk_create(
+            (CatalogChange(resource=resource, object_id=pk)
+             for pk in model.objects.order_by('pk').values_list('pk', flat=True).iterator()),
+            batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_merge'),
+        ('exercises', '0005_merge'),
+        ('nutrition', '0003_merge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(editable=False, max_length=30)),
+                ('object_id', models.IntegerField(editable=False)),
+                ('deleted', models.BooleanField(default=False, editable=False)),
+                ('date', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='catalogchange',
+            unique_together=set([('resource', 'object_id')]),
+        ),
+        migrations.RunPython(add_existing_objects, migrations.RunPython.noop),
+    ]
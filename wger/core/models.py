@@ -31,6 +31,7 @@ from wger.utils.constants import TWOPLACES
 from wger.utils.units import AbstractWeight
 
 from wger.weight.models import WeightEntry
+from wger.weight.trend import get_weight_trend
 
 
 @python_2_unicode_compatible
@@ -328,12 +329,11 @@ by the US Department of Agriculture. It is extremely complete, with around
         '''
         Returns the last weight entry, done here to make the behaviour
         more consistent with the other settings (age, height, etc.)
+
+        The weight is read from the cached weight timeline of the user.
         '''
-        try:
-            weight = WeightEntry.objects.filter(user=self.user).latest().weight
-        except WeightEntry.DoesNotExist:
-            weight = 0
-        return weight
+        timeline = get_weight_trend(self.user)
+        return timeline.get_weight(len(timeline) - 1) if len(timeline) else 0
 
     @property
     def address(self):
@@ -461,9 +461,9 @@ by the US Department of Agriculture. It is extremely complete, with around
         '''
         Create a new weight entry as needed
         '''
-        if (not WeightEntry.objects.filter(user=self.user).exists()
-            or (datetime.date.today()
-                - WeightEntry.objects.filter(user=self.user).latest().date
+        timeline = get_weight_trend(self.user)
+        if (not len(timeline)
+            or (datetime.date.today() - timeline.get_date(len(timeline) - 1)
                 > datetime.timedelta(days=3))):
             entry = WeightEntry()
             entry.weight = weight
@@ -473,11 +473,17 @@ by the US Department of Agriculture. It is extremely complete, with around
 
         # Update the last entry
         else:
-            entry = WeightEntry.objects.filter(user=self.user).latest()
+            entry = WeightEntry.objects.get(user=self.user,
+                                            date=timeline.get_date(len(timeline) - 1))
             entry.weight = weight
             entry.save()
         return entry
 
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -660,3 +666,69 @@ class WeightUnit(models.Model):
         This is done basically to not litter the code with magic IDs
         '''
         return self.id in (1, 2)
+
+
+CATALOG_CHANGES_SETTLE = datetime.timedelta(seconds=60)
+'''
+Age a change needs before it is returned
+
+The IDs are assigned when a change is written, but transactions can commit in
+a different order, so an entry with a lower ID can still appear after a client
+moved its cursor past it. Younger entries (and everything after them) are held
+back until all transactions that started before them are surely finished.
+'''
+
+
+@python_2_unicode_compatible
+class CatalogChange(models.Model):
+    '''
+    The last change of an object of the catalog, used for the incremental sync
+
+    Only the last change of each object is kept, when an object is changed
+    again its entry is replaced by a new one (or updated, if it is younger
+    than CATALOG_CHANGES_SETTLE). The IDs are therefore ordered by the time of
+    the change and are used as cursor by the clients. Deleted objects are kept
+    as tombstones.
+    '''
+
+    class Meta:
+        '''
+        Set Meta options
+        '''
+        ordering = ["id", ]
+        unique_together = ('resource', 'object_id')
+
+    resource = models.CharField(max_length=30,
+                                editable=False)
+    '''
+    The name of the resource in the REST API, e.g. 'exercise'
+    '''
+
+    object_id = models.IntegerField(editable=False)
+    '''
+    The ID of the changed object
+    '''
+
+    deleted = models.BooleanField(default=False,
+                                  editable=False)
+    '''
+    Flag indicating whether the object was deleted
+    '''
+
+    date = models.DateTimeField(auto_now=True,
+                                editable=False)
+    '''
+    Time of the change
+    '''
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"Change of {0} {1}".format(self.resource, self.object_id)
+
+    def get_owner_object(self):
+        '''
+        Changes have no owner information
+        '''
+        return None
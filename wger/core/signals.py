@@ -16,9 +16,23 @@
 
 
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.sites.models import Site
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
 
-from wger.core.models import UserProfile, UserCache
+from wger.core.models import (
+    CATALOG_CHANGES_SETTLE,
+    CatalogChange,
+    DaysOfWeek,
+    Language,
+    License,
+    RepetitionUnit,
+    UserProfile,
+    UserCache,
+    WeightUnit
+)
+from wger.utils.cache import cache_mapper, reference_cache, reset_catalog_version
 from wger.utils.helpers import disable_for_loaddata
 
 
@@ -42,3 +56,92 @@ def create_user_cache(sender, instance, created, **kwargs):
 
 post_save.connect(create_user_profile, sender=User)
 post_save.connect(create_user_cache, sender=User)
+
+
+def reset_language_cache(sender, **kwargs):
+    '''
+    Resets the cached languages and the language configurations, which
+    contain the language objects as well
+    '''
+    reference_cache.invalidate(cache_mapper.LANGUAGE_VERSION)
+    reference_cache.invalidate(cache_mapper.LANGUAGE_CONFIG_VERSION)
+
+
+def reset_reference_cache(sender, **kwargs):
+    '''
+    Resets the cached reference data of the sender
+    '''
+    reference_cache.invalidate(REFERENCE_CACHE_GROUPS[sender])
+
+
+REFERENCE_CACHE_GROUPS = {DaysOfWeek: cache_mapper.DAYS_OF_WEEK_VERSION,
+                          License: cache_mapper.LICENSE_VERSION,
+                          RepetitionUnit: cache_mapper.REPETITION_UNIT_VERSION,
+                          WeightUnit: cache_mapper.WEIGHT_UNIT_VERSION,
+                          Site: cache_mapper.SITE_VERSION}
+
+post_save.connect(reset_language_cache, sender=Language)
+post_delete.connect(reset_language_cache, sender=Language)
+for model in REFERENCE_CACHE_GROUPS:
+    post_save.connect(reset_reference_cache, sender=model)
+    post_delete.connect(reset_reference_cache, sender=model)
+
+# Invalidate the cached API responses
+for model in (DaysOfWeek, Language, License, RepetitionUnit, WeightUnit):
+    post_save.connect(reset_catalog_version, sender=model)
+    post_delete.connect(reset_catalog_version, sender=model)
+
+
+def record_catalog_change(sender, instance, signal, **kwargs):
+    '''
+    Records the change of a catalog object for the incremental sync, replacing
+    the entry of the object's last change
+    '''
+    save_catalog_changes(sender, [instance.pk], deleted=signal is post_delete)
+
+
+def record_catalog_relation_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    '''
+    Records the change of the many-to-many relationships of a catalog object
+
+    Only the side that is part of the catalog is recorded, e.g. the exercise
+    when its muscles change. When the relationship is cleared from the other
+    side, e.g. a muscle's exercises, there is no pk_set and the objects are
+    recorded before they are removed.
+    '''
+    if reverse and action == 'pre_clear':
+        field = [i for i in model._meta.many_to_many if i.remote_field.through is sender][0]
+        save_catalog_changes(model, model.objects.filter(**{field.name: instance})
+                                                 .values_list('pk', flat=True))
+    if not action.startswith('post'):
+        return
+
+    if not reverse:
+        save_catalog_changes(type(instance), [instance.pk])
+    elif pk_set:
+        save_catalog_changes(model, pk_set)
+
+
+def save_catalog_changes(model, pks, deleted=False):
+    '''
+    Replaces the catalog change entries of the given objects
+
+    Entries that are not settled yet were not returned to any client, so they
+    are simply updated. The others are replaced by new entries, whose higher
+    IDs move them behind the clients' cursors.
+    '''
+    resource = model._meta.model_name
+    for pk in pks:
+        entries = CatalogChange.objects.filter(resource=resource, object_id=pk)
+        now = timezone.now()
+        if entries.filter(date__gt=now - CATALOG_CHANGES_SETTLE).update(deleted=deleted,
+                                                                        date=now):
+            continue
+
+        try:
+            with transaction.atomic():
+                entries.delete()
+                CatalogChange.objects.create(resource=resource, object_id=pk, deleted=deleted)
+        except IntegrityError:
+            # A concurrent change just inserted its entry
+            entries.update(deleted=deleted, date=now)
@@ -103,6 +103,16 @@ def render_weight_log(log, div_uuid, user=None):
             'user': user}
 
 
+@register.inclusion_tag('tags/render_exercise_records.html')
+def render_exercise_records(record, weekly_volume=None):
+    '''
+    Renders the personal records of an exercise and optionally its weekly volume
+    '''
+
+    return {'record': record,
+            'weekly_volume': weekly_volume}
+
+
 @register.inclusion_tag('tags/license-sidebar.html')
 def license_sidebar(license, author=None):
     '''
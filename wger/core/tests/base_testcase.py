@@ -24,6 +24,7 @@ from django.core.urlresolvers import NoReverseMatch
 from django.core.cache import cache
 from django.conf import settings
 from django.test import TestCase
+from wger.utils.cache import reference_cache
 from wger.utils.constants import TWOPLACES
 
 
@@ -136,12 +137,16 @@ class BaseTestCase(object):
         self.media_root = tempfile.mkdtemp()
         settings.MEDIA_ROOT = self.media_root
 
+        # Use a new PDF cache, it is removed with MEDIA_ROOT
+        settings.WGER_SETTINGS['PDF_CACHE_DIR'] = os.path.join(self.media_root, 'pdf-cache')
+
     def tearDown(self):
         '''
         Reset settings
         '''
         del os.environ['RECAPTCHA_TESTING']
         cache.clear()
+        reference_cache.clear()
 
         # Clear MEDIA_ROOT folder
         shutil.rmtree(self.media_root)
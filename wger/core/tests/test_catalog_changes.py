@@ -0,0 +1,173 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+from django.core.urlresolvers import reverse
+from django.utils import timezone
+
+from wger.core.models import CATALOG_CHANGES_SETTLE, CatalogChange
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise, ExerciseComment, Muscle
+from wger.nutrition.models import Ingredient
+
+
+class CatalogChangesTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the change feed for the incremental sync of the catalog
+    '''
+
+    def settle(self, **kwargs):
+        '''
+        Helper function that makes the changes old enough to be returned
+        '''
+        date = timezone.now() - CATALOG_CHANGES_SETTLE
+        CatalogChange.objects.filter(**kwargs).update(date=date)
+
+    def get_changes(self, since, limit=None, settle=True):
+        '''
+        Helper function that returns the changes after the cursor
+        '''
+        if settle:
+            self.settle()
+        params = {'since': since}
+        if limit:
+            params['limit'] = limit
+        response = self.client.get(reverse('catalog-changes'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_complete_sync(self):
+        '''
+        Test that syncing from the beginning returns the complete catalog
+        '''
+        since = 0
+        exercises = set()
+        ingredients = set()
+        pages = 0
+        more = True
+        while more:
+            data = self.get_changes(since, limit=10)
+            exercises.update(i['id'] for i in data['changes'].get('exercise', []))
+            ingredients.update(i['id'] for i in data['changes'].get('ingredient', []))
+            more = data['more']
+            since = data['cursor']
+            pages += 1
+
+        self.assertGreater(pages, 1)
+        self.assertEqual(exercises, set(Exercise.objects.values_list('id', flat=True)))
+        self.assertEqual(ingredients, set(Ingredient.objects.values_list('id', flat=True)))
+
+        # Nothing changed since
+        data = self.get_changes(since)
+        self.assertEqual(data, {'cursor': since, 'more': False, 'changes': {}, 'deleted': {}})
+
+    def test_incremental_sync(self):
+        '''
+        Test that only the objects changed after the cursor are returned
+        '''
+        self.settle()
+        cursor = CatalogChange.objects.last().id
+
+        exercise = Exercise.objects.get(pk=2)
+        exercise.name_original = 'Changed Exercise'
+        exercise.save()
+        Exercise.objects.get(pk=1).muscles.add(Muscle.objects.get(pk=2))
+        ExerciseComment.objects.get(pk=1).delete()
+
+        # The exercise is only returned once, even after saving it twice
+        exercise.save()
+
+        data = self.get_changes(cursor)
+        self.assertFalse(data['more'])
+        self.assertEqual(sorted(i['id'] for i in data['changes']['exercise']), [1, 2])
+        self.assertIn('Changed Exercise', [i['name'] for i in data['changes']['exercise']])
+        self.assertEqual(data['deleted'], {'exercisecomment': [1]})
+        self.assertEqual(data['cursor'], CatalogChange.objects.last().id)
+        self.assertEqual(CatalogChange.objects.filter(resource='exercise',
+                                                      object_id=2).count(), 1)
+
+    def test_out_of_order_commit(self):
+        '''
+        Test that the cursor does not skip changes committed out of ID order
+        '''
+        CatalogChange.objects.filter(resource='exercise', object_id__in=(1, 2)).delete()
+        cursor = CatalogChange.objects.last().id
+
+        # The change with the higher ID is committed first
+        second = CatalogChange.objects.create(id=cursor + 2, resource='exercise', object_id=2)
+        data = self.get_changes(cursor, settle=False)
+        self.assertEqual(data, {'cursor': cursor, 'more': False, 'changes': {}, 'deleted': {}})
+
+        # The older changes are returned, but not the recent ones after them
+        self.settle(pk=second.pk)
+        first = CatalogChange.objects.create(id=cursor + 1, resource='exercise', object_id=1)
+        data = self.get_changes(cursor, settle=False)
+        self.assertEqual(data['cursor'], cursor)
+        self.assertEqual(data['changes'], {})
+
+        data = self.get_changes(cursor)
+        self.assertEqual(data['cursor'], second.pk)
+        self.assertEqual(sorted(i['id'] for i in data['changes']['exercise']), [1, 2])
+        self.assertGreater(second.pk, first.pk)
+
+    def test_repeated_change(self):
+        '''
+        Test that unsettled entries are updated, settled ones replaced
+        '''
+        self.settle()
+        exercise = Exercise.objects.get(pk=2)
+        exercise.save()
+        entry = CatalogChange.objects.get(resource='exercise', object_id=2)
+
+        # Not returned yet, the entry is kept
+        exercise.delete()
+        self.assertEqual(CatalogChange.objects.get(resource='exercise', object_id=2).pk,
+                         entry.pk)
+        self.assertTrue(CatalogChange.objects.get(pk=entry.pk).deleted)
+
+        # Returned to a client, the new entry is after its cursor
+        data = self.get_changes(entry.pk - 1)
+        self.assertEqual(data['deleted']['exercise'], [2])
+        Exercise.objects.get(pk=1).save()
+        self.settle()
+        Exercise.objects.get(pk=1).save()
+        new_entry = CatalogChange.objects.get(resource='exercise', object_id=1)
+        self.assertGreater(new_entry.pk, data['cursor'])
+        self.assertEqual(CatalogChange.objects.filter(resource='exercise',
+                                                      object_id=1).count(), 1)
+
+    def test_reverse_clear(self):
+        '''
+        Test that clearing the exercises of a muscle records the exercises
+        '''
+        muscle = Muscle.objects.get(pk=1)
+        pks = set(muscle.exercise_set.values_list('pk', flat=True))
+        secondary_pks = set(muscle.secondary_muscles.values_list('pk', flat=True))
+        self.assertTrue(pks)
+        self.assertTrue(secondary_pks)
+        self.settle()
+        cursor = CatalogChange.objects.last().id
+
+        muscle.exercise_set.clear()
+        muscle.secondary_muscles.clear()
+        self.assertEqual(set(CatalogChange.objects.filter(id__gt=cursor, resource='exercise')
+                                                  .values_list('object_id', flat=True)),
+                         pks | secondary_pks)
+
+    def test_invalid_cursor(self):
+        '''
+        Test that the cursor must be a number
+        '''
+        response = self.client.get(reverse('catalog-changes'), {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,56 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import unittest
+
+import six
+from django.core.management import call_command
+from django.utils.six import StringIO
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+
+
+@unittest.skipIf(six.PY2, 'Measuring the import times needs Python 3')
+class ImportCostTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the import-cost command
+    '''
+
+    def test_startup_modules(self):
+        '''
+        Test the report and that the optional subsystems are not loaded at startup
+        '''
+        out = StringIO()
+        call_command('import-cost', limit=5000, stdout=out)
+        lines = out.getvalue().splitlines()
+
+        self.assertTrue(lines[0].startswith('Loading wsgi:'))
+        modules = [line.split()[-1] for line in lines[2:]]
+        self.assertIn('wger.urls', modules)
+        self.assertIn('wger.manager.models', modules)
+        for name in modules:
+            self.assertFalse(name.startswith(('reportlab', 'icalendar', 'fitbit')), name)
+            self.assertNotIn(name, ('wger.manager.pdf', 'wger.nutrition.pdf', 'wger.utils.pdf'))
+
+    def test_prefix(self):
+        '''
+        Test filtering and limiting the modules
+        '''
+        out = StringIO()
+        call_command('import-cost', target='setup', prefix='wger.core.', limit=3, stdout=out)
+        lines = out.getvalue().splitlines()
+
+        self.assertEqual(len(lines), 5)
+        for line in lines[2:]:
+            self.assertTrue(line.split()[-1].startswith('wger.core.'))
@@ -222,6 +222,16 @@ class PreferencesCalculationsTestCase(WorkoutManagerTestCase):
         WeightEntry.objects.filter(user=user).delete()
         self.assertEqual(user.userprofile.weight, 0)
 
+    def test_last_weight_entry_queries(self):
+        '''
+        Tests that the weight entries are only read once for the calculations
+        '''
+        user = User.objects.select_related('userprofile').get(pk=2)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.userprofile.weight, decimal.Decimal('83.00'))
+            user.userprofile.calculate_bmi()
+            user.userprofile.calculate_basal_metabolic_rate()
+
     def test_bmi(self):
         '''
         Tests the BMI calculator
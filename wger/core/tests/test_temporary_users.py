@@ -18,15 +18,21 @@ import random
 from django.contrib.auth.models import User
 from django.core.management import call_command
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from wger.core.demo import create_demo_entries, create_temporary_user
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
 from wger.manager.models import (Day,
+                                 ExerciseVolume,
                                  Schedule,
                                  ScheduleStep,
+                                 Set,
+                                 Setting,
                                  Workout,
+                                 WorkoutActivityMonth,
                                  WorkoutLog)
-from wger.nutrition.models import Meal
+from wger.nutrition.models import Meal, MealItem
 from wger.nutrition.models import NutritionPlan
 from wger.weight.models import WeightEntry
 
@@ -65,12 +71,13 @@ class DemoUserTestCase(WorkoutManagerTestCase):
         for the demo users
         '''
         self.client.get(reverse('core:dashboard'))
+        self.assertEqual(self.count_temp_users(), 1)
+
+        self.client.get(reverse('core:user:demo-entries'))
         self.assertEqual(self.count_temp_users(), 2)
         user = User.objects.get(pk=User.objects.latest('id').id)
         self.assertEqual(user.userprofile.is_temporary, True)
-        self.assertEqual(Workout.objects.filter(user=user).count(), 0)
 
-        self.client.get(reverse('core:user:demo-entries'))
         # Workout
         self.assertEqual(Workout.objects.filter(user=user).count(), 4)
         self.assertEqual(Day.objects.filter(training__user=user).count(), 2)
@@ -93,9 +100,8 @@ class DemoUserTestCase(WorkoutManagerTestCase):
         Tests that the helper function that creates demo data filters out
         existing dates for the weight entries
         '''
-        self.client.get(reverse('core:dashboard'))
+        user = create_temporary_user()
         self.assertEqual(self.count_temp_users(), 2)
-        user = User.objects.get(pk=4)
 
         temp = []
         for i in range(1, 5):
@@ -110,6 +116,47 @@ class DemoUserTestCase(WorkoutManagerTestCase):
         # Body weight
         self.assertEqual(WeightEntry.objects.filter(user=user).count(), 19)
 
+    def test_demo_data_query_budget(self):
+        '''
+        Tests that the demo entries are created with a fixed number of queries
+        '''
+        create_demo_entries(create_temporary_user())
+
+        # The template is already loaded, this needs one query per table
+        # (plus one to read back the IDs of the workouts, days, sets, meals and
+        # schedules and the savepoint of the transaction)
+        user = create_temporary_user()
+        with self.assertNumQueries(33):
+            create_demo_entries(user)
+
+        self.assertEqual(Workout.objects.filter(user=user).count(), 4)
+        self.assertEqual(Day.objects.filter(training__user=user).count(), 2)
+        self.assertEqual(Set.objects.filter(exerciseday__training__user=user).count(), 4)
+        self.assertEqual(Setting.objects.filter(set__exerciseday__training__user=user).count(), 9)
+        self.assertEqual(WorkoutLog.objects.filter(user=user).count(), 56)
+        self.assertEqual(sum(WorkoutActivityMonth.objects.filter(user=user)
+                             .values_list('logs', flat=True)), 56)
+        self.assertEqual(sum(ExerciseVolume.objects.filter(user=user, period='d')
+                             .values_list('sets', flat=True)), 56)
+        self.assertEqual(MealItem.objects.filter(meal__plan__user=user).count(), 7)
+        self.assertEqual(Schedule.objects.filter(user=user, is_active=True).count(), 1)
+        self.assertEqual(user.usercache.last_activity,
+                         WorkoutLog.objects.filter(user=user).latest('date').date)
+
+        # The workout is usable as normal
+        workout = Workout.objects.filter(user=user).earliest('id')
+        day = Day.objects.filter(training__user=user).first()
+        self.assertEqual(day.training, workout)
+        self.assertEqual(set(WorkoutLog.objects.filter(user=user)
+                                               .values_list('workout_id', flat=True)),
+                         {workout.pk})
+        self.assertEqual(len(day.canonical_representation['set_list']), 4)
+        self.assertEqual([i.pk for i in day.day.all()], [1])
+        superset = day.set_set.get(order=4)
+        self.assertEqual([i.pk for i in superset.exercises.all()], [91, 126])
+        self.assertFalse(ScheduleStep.objects.filter(schedule__user=user)
+                                             .exclude(workout__user=user).exists())
+
     def test_demo_user(self):
         '''
         Tests that temporary users are automatically created when visiting
@@ -143,15 +190,56 @@ class DemoUserTestCase(WorkoutManagerTestCase):
         self.client.get(reverse('nutrition:plan:overview'))
         self.assertEqual(self.count_temp_users(), 1)
 
-        # This page will create one
+        # The dashboard is shown to guests without creating a user
         self.client.get(reverse('core:dashboard'))
+        self.assertEqual(self.count_temp_users(), 1)
+
+        # Creating the demo entries (first write action) will create one
+        self.client.get(reverse('core:user:demo-entries'))
         self.assertEqual(self.count_temp_users(), 2)
 
         # The new user is automatically logged in, so no new user is created
         # after the first visit
         self.client.get(reverse('core:dashboard'))
+        self.client.get(reverse('core:user:demo-entries'))
         self.assertEqual(self.count_temp_users(), 2)
 
+    def test_guest_dashboard(self):
+        '''
+        Tests that guests see the shared, read-only demo data on the dashboard
+        '''
+        response = self.client.get(reverse('core:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['guest_mode'])
+        self.assertTrue(response.context['current_workout'])
+        self.assertTrue(response.context['plan'])
+        self.assertTrue(response.context['nutritional_info']['total']['energy'])
+        self.assertEqual(len(response.context['last_weight_entries']), 5)
+        self.assertEqual(len(response.context['weekdays']), 7)
+
+        # The data is kept in memory, nothing is written to the database
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('core:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        for query in context.captured_queries:
+            self.assertTrue(query['sql'].startswith('SELECT'))
+        self.assertEqual(self.count_temp_users(), 1)
+        self.assertFalse(self.client.session.get('has_demo_data'))
+
+    def test_guest_dashboard_not_allowed(self):
+        '''
+        Tests that guests are redirected to the login page if guest users
+        are not allowed
+        '''
+        with self.settings(WGER_SETTINGS={'USE_RECAPTCHA': True,
+                                          'REMOVE_WHITESPACE': False,
+                                          'ALLOW_REGISTRATION': True,
+                                          'ALLOW_GUEST_USERS': False,
+                                          'TWITTER': False}):
+            response = self.client.get(reverse('core:dashboard'))
+            self.assertEqual(response.status_code, 302)
+            self.assertIn('login', response['Location'])
+
     def test_demo_user_notice(self):
         '''
         Tests that demo users see a notice on every page
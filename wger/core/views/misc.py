@@ -26,18 +26,23 @@ from django.utils.translation import ugettext as _
 from django.views.generic.edit import FormView
 from django.views.generic import TemplateView
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login as django_login
+from django.contrib.auth.views import redirect_to_login
 from django.template.loader import render_to_string
 
 
 from wger.core.forms import FeedbackRegisteredForm, FeedbackAnonymousForm
-from wger.core.demo import create_demo_entries, create_temporary_user
-from wger.core.models import DaysOfWeek
+from wger.core.demo import (
+    create_demo_entries,
+    create_temporary_user,
+    get_guest_demo_data
+)
 from wger.manager.models import Schedule
 from wger.nutrition.models import NutritionPlan
 from wger.weight.models import WeightEntry
 from wger.weight.helpers import get_last_entries
+from wger.weight.trend import get_weight_trend
+from wger.utils.reference import get_days_of_week
 
 
 logger = logging.getLogger(__name__)
@@ -59,12 +64,15 @@ def index(request):
 def demo_entries(request):
     '''
     Creates a set of sample entries for guest users
+
+    This is the guest's first write action, so the temporary user is created
+    here if necessary
     '''
     if not settings.WGER_SETTINGS['ALLOW_GUEST_USERS']:
         return HttpResponseRedirect(reverse('software:features'))
 
     if (((not request.user.is_authenticated() or request.user.userprofile.is_temporary)
-         and not request.session['has_demo_data'])):
+         and not request.session.get('has_demo_data'))):
         # If we reach this from a page that has no user created by the
         # middleware, do that now
         if not request.user.is_authenticated():
@@ -81,12 +89,20 @@ def demo_entries(request):
     return HttpResponseRedirect(reverse('core:dashboard'))
 
 
-@login_required
 def dashboard(request):
     '''
     Show the index page, in our case, the last workout and nutritional plan
     and the current weight
+
+    Guests (if allowed) see a read-only version with shared demo data
     '''
+    if not request.user.is_authenticated():
+        if not settings.WGER_SETTINGS['ALLOW_GUEST_USERS']:
+            return redirect_to_login(request.get_full_path())
+
+        template_data = {'guest_mode': True}
+        template_data.update(get_guest_demo_data())
+        return render(request, 'index_guest.html', template_data)
 
     template_data = {}
 
@@ -110,6 +126,7 @@ def dashboard(request):
     except ObjectDoesNotExist:
         weight = False
     template_data['weight'] = weight
+    template_data['weight_trend'] = get_weight_trend(request.user).get_current() if weight else None
     template_data['last_weight_entries'] = get_last_entries(request.user)
 
     # Format a bit the days so it doesn't have to be done in the template
@@ -120,7 +137,7 @@ def dashboard(request):
                 used_days[day_of_week.id] = day.description
 
     week_day_result = []
-    for week in DaysOfWeek.objects.all():
+    for week in get_days_of_week():
         day_has_workout = False
 
         if week.id in used_days:
@@ -40,7 +40,6 @@ from django.views.generic import (
 from django.conf import settings
 from rest_framework.authtoken.models import Token
 import datetime
-from fitbit import FitbitOauth2Client, Fitbit
 from django.db import IntegrityError
 
 from wger.utils.constants import USER_TAB
@@ -77,6 +76,8 @@ from wger.exercises.models import (
 from wger.core.models import License
 from wger.nutrition.models import Ingredient
 from wger.utils.helpers import smart_capitalize
+from wger.utils.language import load_language
+from wger.utils.reference import get_license
 
 logger = logging.getLogger(__name__)
 
@@ -523,6 +524,9 @@ class UserDetailView(LoginRequiredMixin, WgerMultiplePermissionRequiredMixin, De
 
 
 def fitbit_authorize(callback):
+    # The fitbit client is only imported when it is used
+    from fitbit import FitbitOauth2Client
+
     client_id = settings.WGER_SETTINGS['FITBIT_CLIENT_ID']
     client_secret = settings.WGER_SETTINGS['FITBIT_CLIENT_SECRET']
     call_back = callback
@@ -534,6 +538,8 @@ def fitbit_authorize(callback):
 
 
 def fitbit_get_info(code, callback, action=None):
+    from fitbit import FitbitOauth2Client, Fitbit
+
     try:
         client_id = settings.WGER_SETTINGS['FITBIT_CLIENT_ID']
         client_secret = settings.WGER_SETTINGS['FITBIT_CLIENT_SECRET']
@@ -623,13 +629,14 @@ def sync_fitbit_activity(request):
                 if not Exercise.objects.filter(name=name_original).exists():
                     exercise.name_original = name
                     exercise.description = name_original
-                    exercise.language = Language.objects.get(short_name='en')
-                    if not License.objects.filter(short_name='Apache').exists():
+                    exercise.language = load_language('en')
+                    licence = get_license('Apache')
+                    if licence is None:
                         licence = License(short_name="Apache", full_name='Apache License Version'
                                                                          '2.0,January 2004',
                                           url='http://www.apache.org/licenses/LICENSE-2.0')
                         licence.save()
-                    exercise.license = License.objects.get(short_name='Apache')
+                    exercise.license = licence
                     exercise.category = ExerciseCategory.objects.get(
                         name='Fitbit')
                     exercise.set_author(request)
@@ -17,8 +17,6 @@
 from tastypie import fields
 from tastypie.resources import ModelResource
 from tastypie.constants import ALL, ALL_WITH_RELATIONS
-from easy_thumbnails.alias import aliases
-from easy_thumbnails.files import get_thumbnailer
 
 from wger.core.api.resources import LanguageResource, LicenseResource
 
@@ -99,6 +97,10 @@ class ExerciseImageResource(ModelResource):
         '''
         Also send the URLs for the thumbnailed pictures
         '''
+        # Only imported when needed, this module is loaded with the URL configuration
+        from easy_thumbnails.alias import aliases
+        from easy_thumbnails.files import get_thumbnailer
+
         thumbnails = {}
         for alias in aliases.all():
             t = get_thumbnailer(bundle.obj.image)
@@ -20,9 +20,6 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.decorators import detail_route, api_view
 
-from easy_thumbnails.alias import aliases
-from easy_thumbnails.files import get_thumbnailer
-
 from django.utils.translation import ugettext as _
 
 from wger.config.models import LanguageConfig
@@ -44,9 +41,10 @@ from wger.exercises.models import (
 )
 from wger.utils.language import load_item_languages, load_language
 from wger.utils.permissions import CreateOnlyPermission
+from wger.utils.viewsets import CatalogViewSetMixin
 
 
-class ExerciseViewSet(viewsets.ModelViewSet):
+class ExerciseViewSet(CatalogViewSetMixin, viewsets.ModelViewSet):
     '''
     API endpoint for exercise objects
     '''
@@ -84,6 +82,10 @@ def search(request):
 
     This format is currently used by the exercise search autocompleter
     '''
+    # Only imported when needed, this module is loaded with the URL configuration
+    from easy_thumbnails.alias import aliases
+    from easy_thumbnails.files import get_thumbnailer
+
     q = request.GET.get('term', None)
     results = []
     json_response = {}
@@ -123,7 +125,7 @@ def search(request):
     return Response(json_response)
 
 
-class EquipmentViewSet(viewsets.ReadOnlyModelViewSet):
+class EquipmentViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for equipment objects
     '''
@@ -133,7 +135,7 @@ class EquipmentViewSet(viewsets.ReadOnlyModelViewSet):
     filter_fields = ('name',)
 
 
-class ExerciseCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ExerciseCategoryViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for exercise categories objects
     '''
@@ -143,7 +145,7 @@ class ExerciseCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     filter_fields = ('name',)
 
 
-class ExerciseImageViewSet(viewsets.ModelViewSet):
+class ExerciseImageViewSet(CatalogViewSetMixin, viewsets.ModelViewSet):
     '''
     API endpoint for exercise image objects
     '''
@@ -162,6 +164,9 @@ class ExerciseImageViewSet(viewsets.ModelViewSet):
         '''
         Return a list of the image's thumbnails
         '''
+        from easy_thumbnails.alias import aliases
+        from easy_thumbnails.files import get_thumbnailer
+
         try:
             image = ExerciseImage.objects.get(pk=pk)
         except ExerciseImage.DoesNotExist:
@@ -187,7 +192,7 @@ class ExerciseImageViewSet(viewsets.ModelViewSet):
         obj.save()
 
 
-class ExerciseCommentViewSet(viewsets.ReadOnlyModelViewSet):
+class ExerciseCommentViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for exercise comment objects
     '''
@@ -198,7 +203,7 @@ class ExerciseCommentViewSet(viewsets.ReadOnlyModelViewSet):
                      'exercise')
 
 
-class MuscleViewSet(viewsets.ReadOnlyModelViewSet):
+class MuscleViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for muscle objects
     '''
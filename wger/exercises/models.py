@@ -20,12 +20,11 @@ import uuid
 import logging
 import bleach
 
-from django.db import models
+from django.db import models, transaction
 from django.template.loader import render_to_string
 # django.utils.text.slugify in django 1.5!
 from django.template.defaultfilters import slugify
 from django.contrib.auth.models import User
-from django.contrib.sites.models import Site
 from django.utils.translation import ugettext_lazy as _
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils import translation
@@ -39,6 +38,7 @@ from wger.core.models import Language
 from wger.utils.helpers import smart_capitalize
 from wger.utils.managers import SubmissionManager
 from wger.utils.models import AbstractLicenseModel, AbstractSubmissionModel
+from wger.utils.reference import get_current_site
 from wger.utils.cache import (
     delete_template_fragment_cache,
     reset_workout_canonical_form,
@@ -253,8 +253,10 @@ class Exercise(AbstractSubmissionModel, AbstractLicenseModel, models.Model):
 
     def delete(self, *args, **kwargs):
         '''
-        Reset all cached infos
+        Reset all cached infos and update the activity index of the users
+        whose logs are deleted
         '''
+        from wger.manager.models import update_summaries
 
         # Cached objects
         cache.delete(cache_mapper.get_exercise_muscle_bg_key(self))
@@ -268,10 +270,14 @@ class Exercise(AbstractSubmissionModel, AbstractLicenseModel, models.Model):
             delete_template_fragment_cache('equipment-overview', language.id)
 
         # Cached workouts
-        for set in self.set_set.all():
-            reset_workout_canonical_form(set.exerciseday.training.pk)
+        for exercise_set in self.set_set.all():
+            reset_workout_canonical_form(exercise_set.exerciseday.training.pk)
 
-        super(Exercise, self).delete(*args, **kwargs)
+        # The volume and records of the exercise are deleted with it
+        months = set(self.workoutlog_set.order_by().values_list('user_id', 'date').distinct())
+        with transaction.atomic():
+            super(Exercise, self).delete(*args, **kwargs)
+            update_summaries(months=months)
 
     def __str__(self):
         '''
@@ -321,7 +327,7 @@ class Exercise(AbstractSubmissionModel, AbstractLicenseModel, models.Model):
             context = {
                 'exercise': self.name,
                 'url': url,
-                'site': Site.objects.get_current().domain
+                'site': get_current_site().domain
             }
             message = render_to_string('exercise/email_new.tpl', context)
             mail.send_mail(subject,
@@ -16,13 +16,24 @@
 
 
 from django.db.models.signals import pre_save
+from django.db.models.signals import post_save
 from django.db.models.signals import post_delete
+from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
 from easy_thumbnails.files import get_thumbnailer
 from easy_thumbnails.signal_handlers import generate_aliases
 from easy_thumbnails.signals import saved_file
 
-from wger.exercises.models import ExerciseImage
+from wger.core.signals import record_catalog_change, record_catalog_relation_change
+from wger.exercises.models import (
+    Equipment,
+    Exercise,
+    ExerciseCategory,
+    ExerciseComment,
+    ExerciseImage,
+    Muscle
+)
+from wger.utils.cache import cache_mapper, reference_cache, reset_catalog_version
 
 
 @receiver(post_delete, sender=ExerciseImage)
@@ -57,5 +68,28 @@ def delete_exercise_image_on_update(sender, instance, **kwargs):
         instance.image.delete(save=False)
 
 
+@receiver(post_save, sender=ExerciseImage)
+@receiver(post_delete, sender=ExerciseImage)
+def reset_pdf_image_cache(sender, instance, **kwargs):
+    '''
+    Reset the cached thumbnails used in the PDFs
+    '''
+    reference_cache.invalidate(cache_mapper.PDF_IMAGE_VERSION)
+
+
 # Generate thumbnails when uploading a new image
 saved_file.connect(generate_aliases)
+
+# Invalidate the cached API responses
+for model in (Equipment, Exercise, ExerciseCategory, ExerciseComment, ExerciseImage, Muscle):
+    post_save.connect(reset_catalog_version, sender=model)
+    post_delete.connect(reset_catalog_version, sender=model)
+for relation in (Exercise.muscles, Exercise.muscles_secondary, Exercise.equipment):
+    m2m_changed.connect(reset_catalog_version, sender=relation.through)
+
+# Record the changes for the incremental sync
+for model in (Exercise, ExerciseComment, ExerciseImage):
+    post_save.connect(record_catalog_change, sender=model)
+    post_delete.connect(record_catalog_change, sender=model)
+for relation in (Exercise.muscles, Exercise.muscles_secondary, Exercise.equipment):
+    m2m_changed.connect(record_catalog_relation_change, sender=relation.through)
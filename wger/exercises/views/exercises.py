@@ -40,7 +40,7 @@ from django.views.generic import (
     UpdateView
 )
 
-from wger.manager.models import WorkoutLog
+from wger.manager.models import ExerciseRecord, ExerciseVolume, WorkoutLog
 from wger.exercises.models import (
     Exercise,
     Muscle,
@@ -143,11 +143,22 @@ def view(request, id, slug=None):
     # rendering in the D3 chart
     entry_log = []
     chart_data = []
+    record = None
+    weekly_volume = []
     if request.user.is_authenticated():
         logs = WorkoutLog.objects.filter(user=request.user, exercise=exercise)
         entry_log, chart_data = process_log_entries(logs)
 
+        # The records and volume are read from the summaries, not from the logs
+        record = ExerciseRecord.objects.filter(user=request.user, exercise=exercise).first()
+        weekly_volume = ExerciseVolume.objects.filter(user=request.user,
+                                                      exercise=exercise,
+                                                      period=ExerciseVolume.PERIOD_WEEK)\
+            .order_by('-date')[:8]
+
     template_data['logs'] = entry_log
+    template_data['record'] = record
+    template_data['weekly_volume'] = weekly_volume
     template_data['json'] = chart_data
     template_data['svg_uuid'] = str(uuid.uuid4())
 
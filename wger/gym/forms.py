@@ -19,6 +19,7 @@ from django import forms
 from django.utils.translation import ugettext as _
 
 from wger.core.forms import UserPersonalInformationForm
+from wger.gym.models import PdfBatch
 from wger.utils.widgets import BootstrapSelectMultiple
 
 
@@ -91,3 +92,24 @@ class GymUserAddForm(GymUserPermisssionForm, UserPersonalInformationForm):
             return username
         raise forms.ValidationError(
             _("A user with that username already exists."))
+
+
+class PdfBatchForm(forms.ModelForm):
+    '''
+    Form used to select the members and options of a PDF batch
+    '''
+
+    class Meta:
+        model = PdfBatch
+        widgets = {'members': BootstrapSelectMultiple()}
+        fields = ('members', 'pdf_type', 'images', 'comments', 'output_format')
+
+    def __init__(self, members, *args, **kwargs):
+        '''
+        Only the members of the gym can be selected, all of them by default
+        '''
+        super(PdfBatchForm, self).__init__(*args, **kwargs)
+        self.fields['members'].queryset = members
+        self.fields['members'].label_from_instance = lambda user: user.get_full_name() \
+            or user.username
+        self.initial.setdefault('members', [user.pk for user in members])
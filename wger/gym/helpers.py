@@ -14,9 +14,18 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+from django.contrib.auth.models import User
+from django.db.models import Q
+
 from wger.manager.models import WorkoutLog, WorkoutSession
 
 
+GYM_ADMIN_PERMISSIONS = ('manage_gym', 'manage_gyms', 'gym_trainer')
+'''
+Permissions (of the gym app) that make a user a gym administrator
+'''
+
+
 def get_user_last_activity(user):
     '''
     Find out when the user was last active. "Active" means in this context logging
@@ -60,6 +69,25 @@ def is_any_gym_admin(user):
         or user.has_perm('gym.gym_trainer')
 
 
+def get_gym_admins():
+    '''
+    Returns a queryset with all users that have any gym administrator permission
+
+    This is the set based version of is_any_gym_admin(), the permissions are
+    checked with a join on the user's groups and own permissions instead of
+    loading them for each user.
+    '''
+    group_permission = Q(groups__permissions__content_type__app_label='gym',
+                         groups__permissions__codename__in=GYM_ADMIN_PERMISSIONS)
+    user_permission = Q(user_permissions__content_type__app_label='gym',
+                        user_permissions__codename__in=GYM_ADMIN_PERMISSIONS)
+
+    # Inactive users don't have any permissions, see ModelBackend
+    return User.objects.filter(is_active=True) \
+        .filter(Q(is_superuser=True) | group_permission | user_permission) \
+        .distinct()
+
+
 def get_permission_list(user):
     '''
     Calculate available user permissions
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+
+from wger.gym.models import PdfBatch
+from wger.gym.pdf_batch import process_pdf_batch
+
+
+class Command(BaseCommand):
+    '''
+    Renders the pending PDF batches
+    '''
+    help = 'Renders the workout PDFs requested by the gyms for their members'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes',
+                            action='store',
+                            type=int,
+                            dest='processes',
+                            default=multiprocessing.cpu_count(),
+                            help='Number of processes used to render the PDFs, '
+                                 'default: number of CPUs')
+
+    def handle(self, **options):
+        '''
+        Process all pending batches, oldest first
+        '''
+        pending = PdfBatch.objects.filter(status=PdfBatch.STATUS_PENDING) \
+                                  .order_by('timestamp_created')
+        for batch in pending:
+            # Claim the batch, so that other running instances skip it
+            if not PdfBatch.objects.filter(pk=batch.pk, status=PdfBatch.STATUS_PENDING) \
+                                   .update(status=PdfBatch.STATUS_RUNNING):
+                continue
+            batch.status = PdfBatch.STATUS_RUNNING
+
+            try:
+                process_pdf_batch(batch, processes=options['processes'])
+            except Exception as e:
+                self.stderr.write(u'Batch {0} failed: {1}'.format(batch.pk, e))
+                continue
+
+            if int(options['verbosity']) >= 2:
+                self.stdout.write(u'Batch {0}:'.format(batch.pk))
+                self.stdout.write(batch.report)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.13 on 2026-10-19 00:18
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import wger.gym.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('gym', '0008_merge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PdfBatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp_created', models.DateTimeField(auto_now_add=True)),
+                ('pdf_type', models.CharField(choices=[('log', 'Log'), ('table', 'Table')], default='log', max_length=5, verbose_name='Type')),
+                ('images', models.BooleanField(default=False, verbose_name='with images')),
+                ('comments', models.BooleanField(default=False, verbose_name='with comments')),
+                ('output_format', models.CharField(choices=[('zip', 'ZIP file with one PDF per member'), ('pdf', 'One PDF with all members')], default='zip', max_length=3, verbose_name='Format')),
+                ('status', models.CharField(choices=[('1', 'Pending'), ('2', 'Done'), ('3', 'Failed')], default='1', editable=False, max_length=1)),
+                ('document', models.FileField(blank=True, editable=False, upload_to=wger.gym.models.gym_pdf_batch_upload_dir)),
+                ('report', models.TextField(blank=True, editable=False)),
+                ('gym', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='pdf_batches', to='gym.Gym')),
+                ('members', models.ManyToManyField(related_name='pdfbatch_member', to=settings.AUTH_USER_MODEL, verbose_name='Members')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='pdfbatch_user', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-timestamp_created'],
+            },
+        ),
+    ]
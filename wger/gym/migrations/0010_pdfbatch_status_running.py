@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.13 on 2026-10-19 05:23
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0009_pdfbatch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pdfbatch',
+            name='status',
+            field=models.CharField(choices=[('1', 'Pending'), ('4', 'Running'), ('2', 'Done'), ('3', 'Failed')], default='1', editable=False, max_length=1),
+        ),
+    ]
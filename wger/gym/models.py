@@ -14,6 +14,7 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import os
 import uuid
 import datetime
 
@@ -190,6 +191,11 @@ class GymAdminConfig(AbstractGymUserConfigModel, m.Model):
     Reminder of inactive members
     '''
 
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -624,3 +630,141 @@ class Contract(m.Model):
         managers in the gym.
         '''
         return None
+
+
+def gym_pdf_batch_upload_dir(instance, filename):
+    '''
+    Returns the upload target for the rendered PDF batches
+    '''
+    return "gym/pdf-batch/{0}/{1}{2}".format(instance.gym_id,
+                                             uuid.uuid4(),
+                                             os.path.splitext(filename)[1])
+
+
+@python_2_unicode_compatible
+class PdfBatch(m.Model):
+    '''
+    The workout PDFs of several gym members, for printing
+
+    Rendering the PDFs takes a long time, the batches are only saved here and
+    processed later by the render-pdf-batches command.
+    '''
+
+    TYPE_LOG = 'log'
+    TYPE_TABLE = 'table'
+    TYPE = (
+        (TYPE_LOG, _('Log')),
+        (TYPE_TABLE, _('Table')),
+    )
+
+    FORMAT_ZIP = 'zip'
+    FORMAT_PDF = 'pdf'
+    FORMAT = (
+        (FORMAT_ZIP, _('ZIP file with one PDF per member')),
+        (FORMAT_PDF, _('One PDF with all members')),
+    )
+
+    STATUS_PENDING = '1'
+    STATUS_DONE = '2'
+    STATUS_FAILED = '3'
+    STATUS_RUNNING = '4'
+    STATUS = (
+        (STATUS_PENDING, _('Pending')),
+        (STATUS_RUNNING, _('Running')),
+        (STATUS_DONE, _('Done')),
+        (STATUS_FAILED, _('Failed')),
+    )
+
+    class Meta:
+        '''
+        Order by time
+        '''
+        ordering = ["-timestamp_created", ]
+
+    user = m.ForeignKey(User,
+                        editable=False,
+                        related_name='pdfbatch_user')
+    '''
+    User that created the batch
+    '''
+
+    gym = m.ForeignKey(Gym,
+                       editable=False,
+                       related_name='pdf_batches')
+    '''
+    Gym this batch belongs to
+    '''
+
+    members = m.ManyToManyField(User,
+                                verbose_name=_('Members'),
+                                related_name='pdfbatch_member')
+    '''
+    The members whose current workouts are rendered
+    '''
+
+    timestamp_created = m.DateTimeField(auto_now_add=True)
+    '''
+    Time when this batch was created
+    '''
+
+    pdf_type = m.CharField(max_length=5,
+                           choices=TYPE,
+                           default=TYPE_LOG,
+                           verbose_name=_('Type'))
+    '''
+    Type of the PDFs, as when downloading a single workout
+    '''
+
+    images = m.BooleanField(default=False,
+                            verbose_name=_('with images'))
+    '''
+    Flag indicating whether to include the exercise images
+    '''
+
+    comments = m.BooleanField(default=False,
+                              verbose_name=_('with comments'))
+    '''
+    Flag indicating whether to include the exercise comments
+    '''
+
+    output_format = m.CharField(max_length=3,
+                                choices=FORMAT,
+                                default=FORMAT_ZIP,
+                                verbose_name=_('Format'))
+    '''
+    Output format, a ZIP file or a single PDF
+    '''
+
+    status = m.CharField(max_length=1,
+                         choices=STATUS,
+                         default=STATUS_PENDING,
+                         editable=False)
+    '''
+    Processing status
+    '''
+
+    document = m.FileField(upload_to=gym_pdf_batch_upload_dir,
+                           editable=False,
+                           blank=True)
+    '''
+    The rendered ZIP or PDF file
+    '''
+
+    report = m.TextField(editable=False,
+                         blank=True)
+    '''
+    Render time of the individual documents
+    '''
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"PDF batch {0} for {1}".format(self.pk, self.gym)
+
+    def get_owner_object(self):
+        '''
+        While the model has a user foreign key, this is editable by all
+        trainers in the gym.
+        '''
+        return None
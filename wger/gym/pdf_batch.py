@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import time
+import logging
+import zipfile
+import multiprocessing
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.utils import translation
+from django.utils.translation import ugettext as _
+
+from reportlab.platypus import PageBreak
+
+from wger.gym.models import PdfBatch
+from wger.manager.pdf import (
+    build_workout_pdf,
+    render_schedule_pdf,
+    render_workout_pdf
+)
+from wger.manager.models import Schedule, Workout
+from wger.utils.pdf import register_fonts
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_member_document(member):
+    '''
+    Returns the document that is printed for a member
+
+    This is the active schedule or, if there is none, the current workout.
+
+    :return: a tuple ('schedule' or 'workout', pk) or None if the member has
+             no workouts
+    '''
+    workout, schedule = Schedule.objects.get_current_workout(member)
+    if schedule:
+        return 'schedule', schedule.pk
+    if workout:
+        return 'workout', workout.pk
+    return None
+
+
+def render_member_elements(job):
+    '''
+    Returns the flowables for the document of a member
+
+    :param job: a tuple (username, language, document type, pk, images,
+                comments, only table), see get_jobs
+    :return: a tuple (file name, flowables)
+    '''
+    username, language, kind, pk, images, comments, only_table = job
+    translation.activate(language)
+    suffix = 'table' if only_table else 'log'
+    site_url = getattr(settings, 'SITE_URL', None) or ''
+
+    if kind == 'schedule':
+        schedule = Schedule.objects.get(pk=pk)
+        step_list = [(step, step.workout.canonical_representation['day_list'])
+                     for step in schedule.schedulestep_set.select_related('workout')]
+        elements = render_schedule_pdf(schedule, step_list,
+                                       site_url + schedule.get_absolute_url(),
+                                       images=images, comments=comments, only_table=only_table)
+        filename = u'{0}-Schedule-{1}-{2}.pdf'.format(username, pk, suffix)
+    else:
+        workout = Workout.objects.get(pk=pk)
+        elements = render_workout_pdf(workout,
+                                      workout.canonical_representation['day_list'],
+                                      site_url + workout.get_absolute_url(),
+                                      images=images, comments=comments, only_table=only_table)
+        filename = u'{0}-Workout-{1}-{2}.pdf'.format(username, pk, suffix)
+
+    return filename, elements
+
+
+def render_member_pdf(job):
+    '''
+    Renders the PDF for a member, this is run in the worker processes
+
+    :param job: see render_member_elements
+    :return: a tuple (file name, PDF content, render time in seconds)
+    '''
+    start = time.time()
+    filename, elements = render_member_elements(job)
+    output = BytesIO()
+    build_workout_pdf(output, elements, _('Workout for %s') % job[0])
+    return filename, output.getvalue(), time.time() - start
+
+
+def get_jobs(batch):
+    '''
+    Returns the render jobs for the members of a batch
+
+    Members without workouts are skipped.
+    '''
+    jobs = []
+    for member in batch.members.select_related('userprofile__notification_language'):
+        document = get_member_document(member)
+        if not document:
+            continue
+        jobs.append((member.username,
+                     member.userprofile.notification_language.short_name,
+                     document[0],
+                     document[1],
+                     batch.images,
+                     batch.comments,
+                     batch.pdf_type == PdfBatch.TYPE_TABLE))
+    return jobs
+
+
+def render_zip(jobs, processes):
+    '''
+    Renders one PDF per member, in parallel, and puts them in a ZIP file
+
+    :return: a tuple (ZIP file content, list of (file name, render time))
+    '''
+    if processes > 1 and len(jobs) > 1:
+
+        # The forked workers must not share the database connections, but
+        # they can share the parsed fonts
+        connections.close_all()
+        register_fonts()
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(render_member_pdf, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [render_member_pdf(job) for job in jobs]
+
+    output = BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for filename, content, seconds in results:
+            zip_file.writestr(filename, content)
+    return output.getvalue(), [(filename, seconds) for filename, content, seconds in results]
+
+
+def render_merged_pdf(jobs):
+    '''
+    Renders the documents of all members into a single PDF, with page breaks
+    between them
+
+    This is done in one process, since ReportLab can only lay out a document
+    as a whole. The times are the ones needed to prepare each member's part.
+
+    :return: a tuple (PDF content, list of (file name, render time))
+    '''
+    elements = []
+    timings = []
+    for job in jobs:
+        start = time.time()
+        filename, member_elements = render_member_elements(job)
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(member_elements)
+        timings.append((filename, time.time() - start))
+
+    output = BytesIO()
+    build_workout_pdf(output, elements, _('Workout'))
+    return output.getvalue(), timings
+
+
+def process_pdf_batch(batch, processes=1):
+    '''
+    Renders the PDFs of a batch and saves the result in its document field
+
+    :param batch: a PdfBatch object
+    :param processes: number of processes used for ZIP files
+    :return: list of (file name, render time) tuples
+    '''
+    jobs = get_jobs(batch)
+    current_language = translation.get_language()
+    start = time.time()
+
+    try:
+        if batch.output_format == PdfBatch.FORMAT_PDF:
+            content, timings = render_merged_pdf(jobs)
+            extension = 'pdf'
+        else:
+            content, timings = render_zip(jobs, processes)
+            extension = 'zip'
+    except Exception:
+        logger.exception('Could not render PDF batch %s', batch.pk)
+        batch.status = PdfBatch.STATUS_FAILED
+        batch.save()
+        raise
+    finally:
+        translation.activate(current_language)
+
+    report = [u'{0}: {1:.2f}s'.format(filename, seconds) for filename, seconds in timings]
+    report.append(u'Total: {0} documents, {1:.2f}s'.format(len(timings), time.time() - start))
+
+    batch.report = u'\n'.join(report)
+    batch.status = PdfBatch.STATUS_DONE
+    batch.document.save('pdf-batch-{0}.{1}'.format(batch.pk, extension),
+                        ContentFile(content),
+                        save=False)
+    batch.save()
+    return timings
@@ -0,0 +1,168 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import importlib
+import zipfile
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from mock import patch
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.gym.models import PdfBatch
+from wger.manager.models import Workout
+
+
+class PdfBatchAccessTestCase(WorkoutManagerTestCase):
+    '''
+    Test the access to the PDF batch pages
+    '''
+
+    def test_access(self):
+        '''
+        Only managers and trainers of the gym can print the workouts
+        '''
+        for username in ('manager1', 'manager2', 'general_manager1', 'trainer1'):
+            self.user_login(username)
+            response = self.client.get(reverse('gym:pdf_batch:list', kwargs={'gym_pk': 1}))
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(reverse('gym:pdf_batch:add', kwargs={'gym_pk': 1}))
+            self.assertEqual(response.status_code, 200)
+
+        for username in ('manager3', 'trainer4', 'test', 'member1'):
+            self.user_login(username)
+            response = self.client.get(reverse('gym:pdf_batch:list', kwargs={'gym_pk': 1}))
+            self.assertEqual(response.status_code, 403)
+            response = self.client.get(reverse('gym:pdf_batch:add', kwargs={'gym_pk': 1}))
+            self.assertEqual(response.status_code, 403)
+
+    def test_access_logged_out(self):
+        '''
+        Test the access by a logged out user
+        '''
+        self.user_logout()
+        response = self.client.get(reverse('gym:pdf_batch:list', kwargs={'gym_pk': 1}))
+        self.assertIn(response.status_code, (403, 302))
+
+
+class PdfBatchTestCase(WorkoutManagerTestCase):
+    '''
+    Test enqueueing and rendering PDF batches
+    '''
+
+    def add_batch(self, output_format):
+        '''
+        Helper function that adds a batch for 'test', 'member1' and 'member2'
+        '''
+        Workout.objects.create(user=User.objects.get(username='member1'), comment='Printed')
+
+        self.user_login('manager1')
+        response = self.client.get(reverse('gym:pdf_batch:add', kwargs={'gym_pk': 1}))
+        self.assertEqual(len(response.context['form'].initial['members']), 10)
+
+        members = User.objects.filter(username__in=('test', 'member1', 'member2'))
+        response = self.client.post(reverse('gym:pdf_batch:add', kwargs={'gym_pk': 1}),
+                                    {'members': [i.pk for i in members],
+                                     'pdf_type': PdfBatch.TYPE_TABLE,
+                                     'output_format': output_format})
+        self.assertEqual(response.status_code, 302)
+
+        batch = PdfBatch.objects.get()
+        self.assertEqual(batch.status, PdfBatch.STATUS_PENDING)
+        self.assertEqual(batch.user.username, 'manager1')
+        self.assertEqual(batch.gym_id, 1)
+        self.assertEqual(batch.members.count(), 3)
+        return batch
+
+    def test_members_other_gym(self):
+        '''
+        Only members of the own gym can be selected
+        '''
+        self.user_login('manager1')
+        response = self.client.post(reverse('gym:pdf_batch:add', kwargs={'gym_pk': 1}),
+                                    {'members': [User.objects.get(username='member6').pk],
+                                     'pdf_type': PdfBatch.TYPE_LOG,
+                                     'output_format': PdfBatch.FORMAT_ZIP})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(PdfBatch.objects.exists())
+
+    def test_render_zip(self):
+        '''
+        Test rendering one PDF per member into a ZIP file
+        '''
+        batch = self.add_batch(PdfBatch.FORMAT_ZIP)
+
+        # Not rendered yet
+        response = self.client.get(reverse('gym:pdf_batch:download', kwargs={'pk': batch.pk}))
+        self.assertEqual(response.status_code, 404)
+
+        call_command('render-pdf-batches', processes=1)
+        batch = PdfBatch.objects.get()
+        self.assertEqual(batch.status, PdfBatch.STATUS_DONE)
+        self.assertIn('Total: 2 documents', batch.report)
+
+        response = self.client.get(reverse('gym:pdf_batch:download', kwargs={'pk': batch.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+
+        zip_file = zipfile.ZipFile(BytesIO(response.content))
+        names = sorted(zip_file.namelist())
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[0].startswith('member1-Workout-'))
+        self.assertEqual(names[1], 'test-Workout-3-table.pdf')
+        self.assertTrue(zip_file.read(names[1]).startswith(b'%PDF'))
+
+        # Processed batches are not rendered again
+        call_command('render-pdf-batches', processes=1)
+        self.assertEqual(PdfBatch.objects.get().document, batch.document)
+
+    def test_render_merged_pdf(self):
+        '''
+        Test rendering all members into one PDF
+        '''
+        batch = self.add_batch(PdfBatch.FORMAT_PDF)
+        call_command('render-pdf-batches', processes=1)
+
+        self.user_login('trainer1')
+        response = self.client.get(reverse('gym:pdf_batch:download', kwargs={'pk': batch.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+        self.user_login('manager3')
+        response = self.client.get(reverse('gym:pdf_batch:download', kwargs={'pk': batch.pk}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_claimed_batch(self):
+        '''
+        Test that batches claimed by another instance of the command are skipped
+        '''
+        first = self.add_batch(PdfBatch.FORMAT_PDF)
+        second = PdfBatch.objects.create(user=first.user,
+                                         gym=first.gym,
+                                         output_format=PdfBatch.FORMAT_PDF)
+
+        # Another instance claims the second batch while the first is rendered
+        def render(batch, processes):
+            self.assertEqual(PdfBatch.objects.get(pk=batch.pk).status, PdfBatch.STATUS_RUNNING)
+            PdfBatch.objects.exclude(pk=batch.pk).update(status=PdfBatch.STATUS_RUNNING)
+
+        command = importlib.import_module('wger.gym.management.commands.render-pdf-batches')
+        with patch.object(command, 'process_pdf_batch', side_effect=render) as mock_render:
+            call_command('render-pdf-batches', processes=1)
+        self.assertEqual(mock_render.call_count, 1)
+        self.assertEqual(mock_render.call_args[0][0].pk, first.pk)
+        self.assertFalse(PdfBatch.objects.get(pk=second.pk).document)
@@ -30,7 +30,8 @@ from wger.gym.views import (
     contract,
     contract_type,
     contract_option,
-    export
+    export,
+    pdf_batch
 )
 
 
@@ -177,6 +178,19 @@ patterns_export = [
         name='users'),
 ]
 
+# sub patterns for PDF batches
+patterns_pdf_batch = [
+    url(r'^list/(?P<gym_pk>\d+)$',
+        pdf_batch.ListView.as_view(),
+        name='list'),
+    url(r'^add/(?P<gym_pk>\d+)$',
+        pdf_batch.AddView.as_view(),
+        name='add'),
+    url(r'^(?P<pk>\d+)/download$',
+        pdf_batch.download,
+        name='download'),
+]
+
 #
 # All patterns for this app
 #
@@ -191,4 +205,5 @@ urlpatterns = [
     url(r'^contract-type/', include(patterns_contract_types, namespace="contract_type")),
     url(r'^contract-option/', include(patterns_contract_options, namespace="contract-option")),
     url(r'^export/', include(patterns_export, namespace="export")),
+    url(r'^pdf-batch/', include(patterns_pdf_batch, namespace="pdf_batch")),
 ]
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+import os
+import logging
+
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.urlresolvers import reverse
+from django.http.response import (
+    HttpResponse,
+    HttpResponseForbidden,
+    Http404
+)
+from django.shortcuts import get_object_or_404
+from django.utils.translation import ugettext_lazy
+from django.views.generic import (
+    ListView,
+    CreateView
+)
+
+from wger.gym.forms import PdfBatchForm
+from wger.gym.models import Gym, PdfBatch
+from wger.utils.generic_views import WgerFormMixin
+
+
+logger = logging.getLogger(__name__)
+
+
+def can_manage_pdf_batches(user, gym_id):
+    '''
+    Only managers and trainers for the gym can print the workouts of its members
+    '''
+    return user.has_perm('gym.manage_gyms') \
+        or ((user.has_perm('gym.manage_gym') or user.has_perm('gym.gym_trainer'))
+            and user.userprofile.gym_id == gym_id)
+
+
+class ListView(LoginRequiredMixin, ListView):
+    '''
+    Overview of the PDF batches of a gym
+    '''
+    model = PdfBatch
+    template_name = 'pdf_batch/list.html'
+    gym = None
+
+    def get_queryset(self):
+        '''
+        Only batches for the current gym
+        '''
+        return PdfBatch.objects.filter(gym=self.gym).select_related('user')
+
+    def dispatch(self, request, *args, **kwargs):
+        '''
+        Can only list the batches of the own gym
+        '''
+        if not request.user.is_authenticated():
+            return HttpResponseForbidden()
+
+        self.gym = get_object_or_404(Gym, id=self.kwargs['gym_pk'])
+        if not can_manage_pdf_batches(request.user, self.gym.id):
+            return HttpResponseForbidden()
+
+        return super(ListView, self).dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        '''
+        Send some additional data to the template
+        '''
+        context = super(ListView, self).get_context_data(**kwargs)
+        context['gym'] = self.gym
+        return context
+
+
+class AddView(WgerFormMixin, LoginRequiredMixin, CreateView):
+    '''
+    View to add a new PDF batch
+
+    The PDFs are not rendered here, see the render-pdf-batches command
+    '''
+
+    model = PdfBatch
+    form_class = PdfBatchForm
+    title = ugettext_lazy('Print workouts')
+    submit_text = ugettext_lazy('Print')
+    gym = None
+
+    def dispatch(self, request, *args, **kwargs):
+        '''
+        Can only print the workouts of members of the own gym
+        '''
+        if not request.user.is_authenticated():
+            return HttpResponseForbidden()
+
+        self.gym = get_object_or_404(Gym, id=self.kwargs['gym_pk'])
+        if not can_manage_pdf_batches(request.user, self.gym.id):
+            return HttpResponseForbidden()
+
+        return super(AddView, self).dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        '''
+        Pass the members of the gym to the form
+        '''
+        kwargs = super(AddView, self).get_form_kwargs()
+        kwargs['members'] = Gym.objects.get_members(self.gym.pk).order_by('username')
+        return kwargs
+
+    def form_valid(self, form):
+        '''
+        Set the user and gym
+        '''
+        form.instance.user = self.request.user
+        form.instance.gym = self.gym
+        return super(AddView, self).form_valid(form)
+
+    def get_success_url(self):
+        '''
+        Redirect back to the overview page
+        '''
+        return reverse('gym:pdf_batch:list', kwargs={'gym_pk': self.gym.pk})
+
+    def get_context_data(self, **kwargs):
+        '''
+        Send some additional data to the template
+        '''
+        context = super(AddView, self).get_context_data(**kwargs)
+        context['form_action'] = reverse('gym:pdf_batch:add', kwargs={'gym_pk': self.gym.pk})
+        return context
+
+
+@login_required
+def download(request, pk):
+    '''
+    Downloads the rendered ZIP or PDF file of a batch
+    '''
+    batch = get_object_or_404(PdfBatch, pk=pk)
+    if not can_manage_pdf_batches(request.user, batch.gym_id):
+        return HttpResponseForbidden()
+
+    if batch.status != PdfBatch.STATUS_DONE or not batch.document:
+        raise Http404
+
+    extension = os.path.splitext(batch.document.name)[1]
+    content_type = 'application/pdf' if extension == '.pdf' else 'application/zip'
+
+    batch.document.open('rb')
+    try:
+        response = HttpResponse(batch.document.read(), content_type=content_type)
+    finally:
+        batch.document.close()
+    filename = 'Workouts-{0}{1}'.format(batch.pk, extension)
+    response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
+    return response
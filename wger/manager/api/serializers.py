@@ -25,6 +25,8 @@ from wger.core.api.serializers import (
 from wger.exercises.api.serializers import ExerciseSerializer
 
 from wger.manager.models import (
+    ExerciseRecord,
+    ExerciseVolume,
     Workout,
     ScheduleStep,
     Day,
@@ -64,6 +66,24 @@ class WorkoutLogSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
+class ExerciseVolumeSerializer(serializers.ModelSerializer):
+    '''
+    Exercise volume serializer
+    '''
+    class Meta:
+        model = ExerciseVolume
+        exclude = ('user',)
+
+
+class ExerciseRecordSerializer(serializers.ModelSerializer):
+    '''
+    Personal record serializer
+    '''
+    class Meta:
+        model = ExerciseRecord
+        exclude = ('user',)
+
+
 class ScheduleStepSerializer(serializers.ModelSerializer):
     '''
     ScheduleStep serializer
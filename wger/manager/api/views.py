@@ -17,14 +17,17 @@
 
 import datetime
 
-from rest_framework import viewsets
+import six
+from rest_framework import status, viewsets
 from rest_framework.response import Response
-from rest_framework.decorators import detail_route
+from rest_framework.decorators import detail_route, list_route
 
 from wger.manager.api.serializers import (
     WorkoutSerializer,
     ScheduleStepSerializer,
     WorkoutCanonicalFormSerializer,
+    ExerciseRecordSerializer,
+    ExerciseVolumeSerializer,
     DaySerializer,
     SettingSerializer,
     SetSerializer,
@@ -33,7 +36,10 @@ from wger.manager.api.serializers import (
     WorkoutSessionSerializer
 )
 from wger.manager.models import (
+    ExerciseRecord,
+    ExerciseVolume,
     Workout,
+    WorkoutActivityMonth,
     Set,
     ScheduleStep,
     Schedule,
@@ -42,7 +48,10 @@ from wger.manager.models import (
     WorkoutLog,
     WorkoutSession
 )
-from wger.utils.viewsets import WgerOwnerObjectModelViewSet
+from wger.manager.signals import update_activity_cache
+from wger.utils.cache import reset_workout_log
+from wger.utils.pagination import KeysetPagination
+from wger.utils.viewsets import BulkWriteMixin, WgerOwnerObjectModelViewSet
 
 
 class WorkoutViewSet(viewsets.ModelViewSet):
@@ -79,6 +88,29 @@ class WorkoutViewSet(viewsets.ModelViewSet):
             self.get_object().canonical_representation).data
         return Response(out)
 
+    @detail_route()
+    def compact_representation(self, request, pk):
+        '''
+        Output a compact version of the canonical representation
+
+        Exercises, muscles and units are only referenced by ID and listed once
+        in their own tables. The parts of the response can be selected with a
+        comma separated list, e.g. ?fields=days,exercises
+        '''
+        out = self.get_object().compact_representation
+
+        fields = request.query_params.get('fields')
+        if fields:
+            fields = set(i.strip() for i in fields.split(','))
+            unknown = fields.difference(out)
+            if unknown:
+                return Response({'detail': u'Unknown fields: {0}'.format(
+                                 u', '.join(sorted(unknown)))},
+                                status.HTTP_400_BAD_REQUEST)
+            fields.add('version')
+            out = {key: value for key, value in out.items() if key in fields}
+        return Response(out)
+
 
 class WorkoutSessionViewSet(WgerOwnerObjectModelViewSet):
     '''
@@ -86,7 +118,8 @@ class WorkoutSessionViewSet(WgerOwnerObjectModelViewSet):
     '''
     serializer_class = WorkoutSessionSerializer
     is_private = True
-    ordering_fields = '__all__'
+    pagination_class = KeysetPagination
+    ordering_fields = ('date', )
     filter_fields = ('date',
                      'workout',
                      'notes',
@@ -247,13 +280,14 @@ class SettingViewSet(WgerOwnerObjectModelViewSet):
         return [(Set, 'set')]
 
 
-class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
+class WorkoutLogViewSet(BulkWriteMixin, WgerOwnerObjectModelViewSet):
     '''
     API endpoint for workout log objects
     '''
     serializer_class = WorkoutLogSerializer
     is_private = True
-    ordering_fields = '__all__'
+    pagination_class = KeysetPagination
+    ordering_fields = ('date', )
     filter_fields = ('date',
                      'exercise',
                      'reps',
@@ -278,3 +312,74 @@ class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
         Return objects to check for ownership permission
         '''
         return [(Workout, 'workout')]
+
+    @list_route()
+    def last_weights(self, request):
+        '''
+        Return the weight last logged for exercise and repetition pairs
+
+        The pairs are passed as a comma separated list, e.g. ?pairs=1:10,2:8
+        '''
+        try:
+            pairs = set(tuple(int(i) for i in pair.split(':'))
+                        for pair in request.query_params.get('pairs', '').split(',') if pair)
+        except ValueError:
+            pairs = None
+        if not pairs or any(len(pair) != 2 for pair in pairs) or len(pairs) > 200:
+            return Response({'detail': 'pairs must be a list of up to 200 exercise:reps pairs'},
+                            status.HTTP_400_BAD_REQUEST)
+
+        last_weights = WorkoutLog.objects.get_last_weights(request.user, pairs)
+        return Response([{'exercise': exercise,
+                          'reps': reps,
+                          'weight': None if weight is None else six.text_type(weight)}
+                         for (exercise, reps), weight in sorted(last_weights.items())])
+
+    def bulk_write_done(self, objects, previous):
+        '''
+        Reset the cached logs of all affected days, update the activity index,
+        the exercise volume and the last activity
+        '''
+        dates = set(i.date for i in objects + previous)
+        for date in dates:
+            reset_workout_log(self.request.user.pk, date.year, date.month, date.day)
+        for date in set(i.replace(day=1) for i in dates):
+            WorkoutActivityMonth.objects.update_month(self.request.user.pk, date)
+        ExerciseVolume.objects.update_days(self.request.user.pk,
+                                           ((i.exercise_id, i.date) for i in objects + previous))
+        update_activity_cache(WorkoutLog, objects[0])
+
+
+class ExerciseVolumeViewSet(viewsets.ReadOnlyModelViewSet):
+    '''
+    API endpoint for the daily and weekly training volume of the exercises
+    '''
+    serializer_class = ExerciseVolumeSerializer
+    is_private = True
+    pagination_class = KeysetPagination
+    ordering_fields = ('date', )
+    filter_fields = ('exercise',
+                     'period',
+                     'date')
+
+    def get_queryset(self):
+        '''
+        Only allow access to appropriate objects
+        '''
+        return ExerciseVolume.objects.filter(user=self.request.user)
+
+
+class ExerciseRecordViewSet(viewsets.ReadOnlyModelViewSet):
+    '''
+    API endpoint for the personal records of the exercises
+    '''
+    serializer_class = ExerciseRecordSerializer
+    is_private = True
+    ordering_fields = '__all__'
+    filter_fields = ('exercise', )
+
+    def get_queryset(self):
+        '''
+        Only allow access to appropriate objects
+        '''
+        return ExerciseRecord.objects.filter(user=self.request.user)
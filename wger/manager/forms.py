@@ -52,7 +52,8 @@ from wger.manager.models import (
 from wger.utils.widgets import (
     TranslatedSelectMultiple,
     TranslatedSelect,
-    ExerciseAjaxSelect
+    ExerciseAjaxSelect,
+    ObjectChoiceField
 )
 from wger.utils.constants import DATE_FORMATS
 from wger.utils.widgets import Html5DateInput
@@ -163,6 +164,66 @@ class WorkoutLogForm(ModelForm):
         exclude = ('workout', )
 
 
+class WorkoutLogDayForm(Form):
+    '''
+    Form for one set on the log page of a workout day
+
+    The exercises and units are passed in and the logs are created from the
+    cleaned data, so validating the forms of all sets needs no queries. The
+    checks of the model's fields are repeated here.
+    '''
+    reps = IntegerField(label=_('Repetitions'),
+                        min_value=0,
+                        required=False)
+    weight = DecimalField(label=_('Weight'),
+                          initial=0,
+                          min_value=0,
+                          max_digits=5,
+                          decimal_places=2,
+                          required=False)
+
+    def __init__(self, *args, **kwargs):
+        exercises = kwargs.pop('exercises')
+        repetition_units = kwargs.pop('repetition_units')
+        weight_units = kwargs.pop('weight_units')
+        super(WorkoutLogDayForm, self).__init__(*args, **kwargs)
+
+        self.fields['exercise'] = ObjectChoiceField(exercises,
+                                                    label=_('Exercise'),
+                                                    required=False)
+        self.fields['repetition_unit'] = ObjectChoiceField(repetition_units,
+                                                           label=_('Unit'),
+                                                           required=False)
+        self.fields['weight_unit'] = ObjectChoiceField(weight_units,
+                                                       label=_('Unit'),
+                                                       required=False)
+
+    def clean(self):
+        '''
+        Logged repetitions need an exercise
+        '''
+        cleaned_data = super(WorkoutLogDayForm, self).clean()
+        if cleaned_data.get('reps') and not cleaned_data.get('exercise'):
+            self.add_error('exercise', self.fields['exercise'].error_messages['required'])
+        return cleaned_data
+
+    def get_log(self):
+        '''
+        Returns an unsaved log with the values of the form, None if no
+        repetitions were entered
+        '''
+        if not self.is_valid() or not self.cleaned_data.get('reps'):
+            return None
+
+        log = WorkoutLog(exercise=self.cleaned_data['exercise'],
+                         reps=self.cleaned_data['reps'],
+                         weight=self.cleaned_data['weight'] or 0)
+        for unit in ('repetition_unit', 'weight_unit'):
+            if self.cleaned_data[unit]:
+                setattr(log, unit, self.cleaned_data[unit])
+        return log
+
+
 class HelperWorkoutSessionForm(ModelForm):
     '''
     A helper form used in the workout log view
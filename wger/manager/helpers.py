@@ -17,182 +17,54 @@
 
 import datetime
 from calendar import HTMLCalendar
-
-from reportlab.lib import colors
-from reportlab.lib.units import cm
-from reportlab.platypus import (
-    Paragraph,
-    Table,
-    KeepTogether,
-    ListFlowable,
-    ListItem,
-    Image
-)
+from decimal import Decimal
 
 from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext as _
+from wger.exercises.models import ExerciseImage
+from wger.utils.constants import TWOPLACES
 from wger.utils.helpers import normalize_decimal
-
-from wger.utils.pdf import styleSheet
+from wger.utils.units import AbstractWeight
 
 
-def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_table=False):
+def get_workout_day_digest(day):
     '''
-    Render a table with reportlab with the contents of the training day
+    Returns the parts of a canonical workout day that are rendered in the PDFs
+
+    This is used to build the key of the PDF cache, the exercise images are
+    added with get_main_images() if they are rendered.
 
     :param day: a workout day object
-    :param nr_of_weeks: the numbrer of weeks to render, default is 7
-    :param images: boolean indicating whether to also draw exercise images
-           in the PDF (actually only the main image)
-    :param comments: boolean indicathing whether the exercise comments will
-           be rendered as well
-    :param only_table: boolean indicating whether to draw a table with space
-           for weight logs or just a list of the exercises
     '''
+    return [day['obj'].description,
+            day['days_of_week']['text'],
+            [[[exercise['obj'].id,
+               exercise['obj'].name,
+               exercise['has_weight'],
+               exercise['setting_text'],
+               exercise['comment_list']]
+              for exercise in set['exercise_list']]
+             for set in day['set_list']]]
+
+
+def get_main_images(day_list):
+    '''
+    Returns the main images of the exercises of canonical workout days
 
-    # If rendering only the table, reset the nr of weeks, since these columns
-    # will not be rendered anyway.
-    if only_table:
-        nr_of_weeks = 0
-
-    data = []
-
-    # Init some counters and markers, this will be used after the iteration to
-    # set different borders and colours
-    day_markers = []
-    group_exercise_marker = {}
-
-    # Background colour for days
-    # Reportlab doesn't use the HTML hexadecimal format, but has a range of
-    # 0 till 1, so we have to convert here.
-    header_colour = colors.Color(int('73', 16) / 255.0,
-                                 int('8a', 16) / 255.0,
-                                 int('5f', 16) / 255.0)
-
-    set_count = 1
-    day_markers.append(len(data))
-
-    p = Paragraph(u'<para align="center">%(days)s: %(description)s</para>' %
-                  {'days': day['days_of_week']['text'],
-                   'description': day['obj'].description},
-                  styleSheet["Bold"])
-
-    data.append([p])
-
-    # Note: the _('Date') will be on the 3rd cell, but since we make a span
-    #       over 3 cells, the value has to be on the 1st one
-    data.append([_('Date') + ' ', '', ''] + [''] * nr_of_weeks)
-    data.append([_('Nr.'), _('Exercise'), _('Reps')] +
-                [_('Weight')] * nr_of_weeks)
-
-    # Sets
-    exercise_start = len(data)
-    for set in day['set_list']:
-        group_exercise_marker[set['obj'].id] = {
-            'start': len(data), 'end': len(data)}
-
-        # Exercises
-        for exercise in set['exercise_list']:
-            group_exercise_marker[set['obj'].id]['end'] = len(data)
-
-            # Process the settings
-            if exercise['has_weight']:
-                setting_out = []
-                for i in exercise['setting_text'].split(u'–'):
-                    setting_out.append(
-                        Paragraph(i, styleSheet["Small"], bulletText=''))
-            else:
-                setting_out = Paragraph(
-                    exercise['setting_text'], styleSheet["Small"])
-
-            # Collect a list of the exercise comments
-            item_list = [Paragraph('', styleSheet["Small"])]
-            if comments:
-                item_list = [ListItem(Paragraph(i, style=styleSheet["ExerciseComments"]))
-                             for i in exercise['comment_list']]
-
-            # Add the exercise's main image
-            image = Paragraph('', styleSheet["Small"])
-            if images:
-                if exercise['obj'].main_image:
-
-                    # Make the images somewhat larger when printing only the workout and not
-                    # also the columns for weight logs
-                    if only_table:
-                        image_size = 2
-                    else:
-                        image_size = 1.5
-
-                    image = Image(exercise['obj'].main_image.image)
-                    image.drawHeight = image_size * cm * image.drawHeight / image.drawWidth
-                    image.drawWidth = image_size * cm
-
-            # Put the name and images and comments together
-            exercise_content = [Paragraph(exercise['obj'].name, styleSheet["Small"]),
-                                image,
-                                ListFlowable(item_list,
-                                             bulletType='bullet',
-                                             leftIndent=5,
-                                             spaceBefore=7,
-                                             bulletOffsetY=-3,
-                                             bulletFontSize=3,
-                                             start='square')]
-
-            data.append([set_count,
-                         exercise_content,
-                         setting_out]
-                        + [''] * nr_of_weeks)
-        set_count += 1
-
-    table_style = [('FONT', (0, 0), (-1, -1), 'OpenSans'),
-                   ('FONTSIZE', (0, 0), (-1, -1), 8),
-                   ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                   ('LEFTPADDING', (0, 0), (-1, -1), 2),
-                   ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-                   ('TOPPADDING', (0, 0), (-1, -1), 3),
-                   ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                   ('INNERGRID', (0, 0), (-1, -1), 0.25, colors.black),
-
-                   # Header
-                   ('BACKGROUND', (0, 0), (-1, 0), header_colour),
-                   ('BOX', (0, 0), (-1, -1), 1.25, colors.black),
-                   ('BOX', (0, 1), (-1, -1), 1.25, colors.black),
-                   ('SPAN', (0, 0), (-1, 0)),
-
-                   # Cell with 'date'
-                   ('SPAN', (0, 1), (2, 1)),
-                   ('ALIGN', (0, 1), (2, 1), 'RIGHT')]
-
-    # Combine the cells for exercises on the same superset
-    for marker in group_exercise_marker:
-        start_marker = group_exercise_marker[marker]['start']
-        end_marker = group_exercise_marker[marker]['end']
-
-        table_style.append(
-            ('VALIGN', (0, start_marker), (0, end_marker), 'MIDDLE'))
-        table_style.append(('SPAN', (0, start_marker), (0, end_marker)))
-
-    # Set an alternating background colour for rows with exercises.
-    # The rows with exercises range from exercise_start till the end of the data
-    # list
-    for i in range(exercise_start, len(data) + 1):
-        if not i % 2:
-            table_style.append(
-                ('BACKGROUND', (1, i - 1), (-1, i - 1), colors.lavender))
-
-    # Put everything together and manually set some of the widths
-    t = Table(data, style=table_style)
-    if len(t._argW) > 1:
-        if only_table:
-            t._argW[0] = 0.6 * cm  # Numbering
-            t._argW[1] = 8 * cm  # Exercise
-            t._argW[2] = 3.5 * cm  # Repetitions
-        else:
-            t._argW[0] = 0.6 * cm  # Numbering
-            t._argW[1] = 4 * cm  # Exercise
-            t._argW[2] = 3 * cm  # Repetitions
+    This is used to build the key of the PDF cache, all images are read
+    with one query.
 
-    return KeepTogether(t)
+    :param day_list: list of canonical workout days
+    :return: list of (exercise ID, image name) tuples
+    '''
+    exercise_ids = set(exercise['obj'].id
+                       for day in day_list
+                       for set in day['set_list']
+                       for exercise in set['exercise_list'])
+    return list(ExerciseImage.objects.accepted()
+                .filter(exercise_id__in=exercise_ids, is_main=True)
+                .order_by('exercise_id', 'id')
+                .values_list('exercise_id', 'image'))
 
 
 def reps_smart_text(settings, set_obj):
@@ -308,6 +180,130 @@ def reps_smart_text(settings, set_obj):
     return setting_text, setting_list, weight_list, reps_list, repetition_units, weight_units
 
 
+ONE_REP_MAX_MAX_REPS = 12
+'''
+Maximum number of repetitions used to estimate the one repetition maximum,
+the estimates for longer sets are too inaccurate
+'''
+
+RECORD_FIELDS = (('one_rep_max', 'one_rep_max'),
+                 ('max_weight', 'max_weight'),
+                 ('max_tonnage', 'tonnage'))
+'''
+Fields of the personal records and the values of the daily summaries they are
+taken from
+'''
+
+
+def estimate_one_rep_max(weight, reps):
+    '''
+    Estimates the one repetition maximum with the Epley formula
+
+    :param weight: the weight in kg, as a decimal
+    :param reps: the number of repetitions
+    :return: the estimate in kg, 0 if there are no or too many repetitions
+    '''
+    if not 0 < reps <= ONE_REP_MAX_MAX_REPS:
+        return Decimal(0)
+    if reps == 1:
+        return weight.quantize(TWOPLACES)
+    return (weight * (1 + Decimal(reps) / 30)).quantize(TWOPLACES)
+
+
+def get_week_start(date):
+    '''
+    Returns the monday of the week of the date
+    '''
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def summarize_logs(logs):
+    '''
+    Sums up the workout logs per exercise and day
+
+    The weights are converted to kg, so that the values of logs in kg and lb
+    can be added up. Only logs with repetitions and a weight in kg or lb
+    should be passed.
+
+    :param logs: iterable of (exercise ID, date, reps, weight, weight unit ID)
+                 tuples, the IDs of the weight units are 1 for kg and 2 for lb
+    :return: a dictionary {(exercise ID, date): summary}, each summary has the
+             keys 'sets', 'reps', 'tonnage', 'max_weight' and 'one_rep_max'
+    '''
+    days = {}
+    for exercise_id, date, reps, weight, weight_unit_id in logs:
+        weight = AbstractWeight(weight, 'kg' if weight_unit_id == 1 else 'lb').kg
+        day = days.setdefault((exercise_id, date), {'sets': 0,
+                                                    'reps': 0,
+                                                    'tonnage': Decimal(0),
+                                                    'max_weight': Decimal(0),
+                                                    'one_rep_max': Decimal(0)})
+        day['sets'] += 1
+        day['reps'] += reps
+        day['tonnage'] += reps * weight
+        day['max_weight'] = max(day['max_weight'], weight)
+        day['one_rep_max'] = max(day['one_rep_max'], estimate_one_rep_max(weight, reps))
+
+    for day in days.values():
+        day['tonnage'] = day['tonnage'].quantize(TWOPLACES)
+        day['max_weight'] = day['max_weight'].quantize(TWOPLACES)
+    return days
+
+
+def summarize_weeks(days):
+    '''
+    Sums up daily summaries per exercise and week, weeks start on monday
+
+    :param days: a dictionary as returned by summarize_logs()
+    :return: a dictionary {(exercise ID, monday): summary}
+    '''
+    weeks = {}
+    for (exercise_id, date), day in days.items():
+        key = (exercise_id, get_week_start(date))
+        if key not in weeks:
+            weeks[key] = dict(day)
+            continue
+
+        week = weeks[key]
+        for value in ('sets', 'reps', 'tonnage'):
+            week[value] += day[value]
+        for value in ('max_weight', 'one_rep_max'):
+            week[value] = max(week[value], day[value])
+    return weeks
+
+
+def find_records(days, records=None):
+    '''
+    Finds the personal records in daily summaries
+
+    If two days have the same value, the record belongs to the earlier one.
+
+    :param days: a dictionary as returned by summarize_logs()
+    :param records: optional dictionary {exercise ID: record} with the current
+                    records, it is updated and returned
+    :return: a dictionary {exercise ID: record}, each record has the keys of
+             RECORD_FIELDS and their dates, e.g. 'max_weight_date'
+    '''
+    if records is None:
+        records = {}
+
+    for (exercise_id, date), day in sorted(days.items()):
+        if exercise_id not in records:
+            records[exercise_id] = {}
+            for field, value in RECORD_FIELDS:
+                records[exercise_id][field] = Decimal(0)
+                records[exercise_id][field + '_date'] = None
+
+        record = records[exercise_id]
+        for field, value in RECORD_FIELDS:
+            if day[value] > record[field] or (day[value] == record[field]
+                                              and record[field + '_date'] is not None
+                                              and date < record[field + '_date']):
+                record[field] = day[value]
+                record[field + '_date'] = date
+    return records
+
+
 class WorkoutCalendar(HTMLCalendar):
     '''
     A calendar renderer, see this blog entry for details:
@@ -16,112 +16,84 @@
 
 import datetime
 
-from django.template import loader
-from django.core.management.base import BaseCommand
-from django.core import mail
+from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
-from django.utils import translation
-from django.conf import settings
 
-from django.contrib.sites.models import Site
 from wger.core.models import UserProfile
 from wger.manager.models import Schedule
+from wger.utils.reference import get_current_site
+from wger.utils.reminders import ReminderCommand
 
 
-class Command(BaseCommand):
+class Command(ReminderCommand):
     '''
     Helper admin command to send out email reminders
     '''
 
     help = 'Send out automatic email reminders for workouts'
+    subject = _('Workout will expire soon')
+    template_name = 'workout/email_reminder.tpl'
 
-    def handle(self, **options):
+    def get_reminders(self, options):
         '''
         Find if the currently active workout is overdue
+
+        The current workouts of all users are read at once, see
+        ScheduleManager.get_current_workouts()
         '''
-        profile_list = UserProfile.objects.filter(workout_reminder_active=True)
-        counter = 0
+        today = datetime.date.today()
+        site = get_current_site()
+
+        # Only users with an email address that were not notified in the last week
+        profiles = (UserProfile.objects.filter(workout_reminder_active=True)
+                    .exclude(user__email='')
+                    .exclude(user__email__isnull=True)
+                    .filter(Q(last_workout_notification__isnull=True) |
+                            Q(last_workout_notification__lte=today - datetime.timedelta(weeks=1))))
+        profile_list = profiles.select_related('user', 'notification_language')
+        current_workouts = Schedule.objects.get_current_workouts(profiles.values('user_id'))
+
+        reminders = []
         for profile in profile_list:
-
-            # Only continue if the user has provided an email address.
-            # Checking it here so we check for NULL values and emtpy strings
-            if not profile.user.email:
-                continue
-
-            # Check if we already notified the user and update the profile otherwise
-            if profile.last_workout_notification and \
-               (datetime.date.today()
-                    - profile.last_workout_notification
-                    < datetime.timedelta(weeks=1)):
-                continue
-
-            (current_workout, schedule) = Schedule.objects.get_current_workout(
-                profile.user)
+            (current_workout, schedule) = current_workouts.get(profile.user_id, (False, False))
 
             # No schedules, use the default workout length in user profile
             if not schedule and current_workout:
                 delta = (current_workout.creation_date
                          + datetime.timedelta(weeks=profile.workout_duration)
-                         - datetime.date.today())
-
-                if datetime.timedelta(days=profile.workout_reminder) > delta:
-                    if int(options['verbosity']) >= 3:
-                        self.stdout.write(
-                            "* Workout '{0}' overdue".format(current_workout))
-                    counter += 1
-
-                    self.send_email(profile.user,
-                                    current_workout,
-                                    delta)
+                         - today)
+                message = "* Workout '{0}' overdue"
 
             # non-loop schedule, take the step's duration
             elif schedule and not schedule.is_loop:
-
-                schedule_step = schedule.get_current_scheduled_workout()
+                steps = schedule.schedulestep_set.all()
 
                 # Only notify if the step is the last one in the schedule
-                if schedule_step == schedule.schedulestep_set.last():
+                if schedule.get_current_scheduled_workout() != steps[len(steps) - 1]:
+                    continue
+                delta = schedule.get_end_date() - today
+                message = "* Workout '{0}' overdue - schedule"
 
-                    delta = schedule.get_end_date() - datetime.date.today()
-                    if datetime.timedelta(days=profile.workout_reminder) > delta:
-                        if int(options['verbosity']) >= 3:
-                            self.stdout.write("* Workout '{0}' overdue - schedule".
-                                              format(schedule_step.workout))
-
-                        counter += 1
-                        self.send_email(profile.user,
-                                        current_workout,
-                                        delta)
+            else:
+                continue
 
-        if counter and int(options['verbosity']) >= 2:
-            self.stdout.write("Sent {0} email reminders".format(counter))
+            if datetime.timedelta(days=profile.workout_reminder) > delta:
+                if int(options['verbosity']) >= 3:
+                    self.stdout.write(message.format(current_workout))
+                reminders.append((profile, {'site': site,
+                                            'workout': current_workout,
+                                            'expired': True if delta.days < 0 else False,
+                                            'days': abs(delta.days)}))
+        return reminders
 
-    @staticmethod
-    def send_email(user, workout, delta):
+    def reminders_sent(self, reminders):
         '''
-        Notify a user that a workout is about to expire
+        Update the last notification date of the reminded users
 
-        :type user User
-        :type workout Workout
-        :type delta datetime.timedelta
+        The profiles are updated in slices, to stay below the limit of query
+        parameters of some databases
         '''
-
-        # Update the last notification date field
-        user.userprofile.last_workout_notification = datetime.date.today()
-        user.userprofile.save()
-
-        # Compose and send the email
-        translation.activate(user.userprofile.notification_language.short_name)
-        context = {'site': Site.objects.get_current(),
-                   'workout': workout,
-                   'expired': True if delta.days < 0 else False,
-                   'days': abs(delta.days)}
-
-        subject = _('Workout will expire soon')
-        message = loader.render_to_string(
-            'workout/email_reminder.tpl', context)
-        mail.send_mail(subject,
-                       message,
-                       settings.WGER_SETTINGS['EMAIL_FROM'],
-                       [user.email],
-                       fail_silently=True)
+        profile_ids = [profile.pk for profile, context in reminders]
+        for i in range(0, len(profile_ids), 500):
+            UserProfile.objects.filter(pk__in=profile_ids[i:i + 500]) \
+                .update(last_workout_notification=datetime.date.today())
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.13 on 2026-10-19 01:12
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0009_merge'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='workoutlog',
+            index_together=set([('user', 'date')]),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.13 on 2026-10-19 02:22
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def add_existing_months(apps, schema_editor):
+    '''
+    Adds the months of the existing workout logs and sessions
+    '''
+    WorkoutLog = apps.get_model('manager', 'WorkoutLog')
+    WorkoutSession = apps.get_model('manager', 'WorkoutSession')
+    WorkoutActivityMonth = apps.get_model('manager', 'WorkoutActivityMonth')
+
+    months = {}
+    for user_id, date in WorkoutLog.objects.values_list('user_id', 'date').iterator():
+        key = (user_id, date.replace(day=1))
+        months.setdefault(key, {'logs': 0, 'sessions': 0, 'impression': ''})
+        months[key]['logs'] += 1
+
+    for user_id, date, impression in WorkoutSession.objects\
+            .values_list('user_id', 'date', 'impression').iterator():
+        key = (user_id, date.replace(day=1))
+        months.setdefault(key, {'logs': 0, 'sessions': 0, 'impression': ''})
+        months[key]['sessions'] += 1
+        months[key]['impression'] = max(months[key]['impression'], impression)
+
+    WorkoutActivityMonth.objects.bulk_create(
+        (WorkoutActivityMonth(user_id=user_id, month=month, **values)
+         for (user_id, month), values in months.items()),
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0010_workoutlog_user_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutActivityMonth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Month')),
+                ('logs', models.IntegerField(default=0, verbose_name='Workout logs')),
+                ('sessions', models.IntegerField(default=0, verbose_name='Workout sessions')),
+                ('impression', models.CharField(blank=True, choices=[('1', 'Bad'), ('2', 'Neutral'), ('3', 'Good')], max_length=2, verbose_name='General impression')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'ordering': ['month'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='workoutactivitymonth',
+            unique_together=set([('user', 'month')]),
+        ),
+        migrations.RunPython(add_existing_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.9.13 on 2026-10-19 02:40
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from wger.manager.helpers import find_records, summarize_logs, summarize_weeks
+
+
+def add_existing_volume(apps, schema_editor):
+    '''
+    Sums up the existing workout logs
+    '''
+    WorkoutLog = apps.get_model('manager', 'WorkoutLog')
+    ExerciseVolume = apps.get_model('manager', 'ExerciseVolume')
+    ExerciseRecord = apps.get_model('manager', 'ExerciseRecord')
+
+    logs = {}
+    for log in WorkoutLog.objects.filter(repetition_unit_id=1, weight_unit_id__in=(1, 2))\
+            .values_list('user_id', 'exercise_id', 'date', 'reps', 'weight', 'weight_unit_id')\
+            .iterator():
+        logs.setdefault(log[0], []).append(log[1:])
+
+    fields = ('sets', 'reps', 'tonnage', 'max_weight', 'one_rep_max')
+    for user_id, user_logs in logs.items():
+        days = summarize_logs(user_logs)
+        ExerciseVolume.objects.bulk_create(
+            (ExerciseVolume(user_id=user_id,
+                            exercise_id=exercise_id,
+                            period=period,
+                            date=date,
+                            **dict((field, summary[field]) for field in fields))
+             for period, summaries in (('d', days), ('w', summarize_weeks(days)))
+             for (exercise_id, date), summary in summaries.items()),
+            batch_size=500)
+        ExerciseRecord.objects.bulk_create(
+            (ExerciseRecord(user_id=user_id, exercise_id=exercise_id, **record)
+             for exercise_id, record in find_records(days).items()),
+            batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0005_merge'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0011_workoutactivitymonth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseRecord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('one_rep_max', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Estimated one repetition maximum')),
+                ('one_rep_max_date', models.DateField(null=True, verbose_name='Date')),
+                ('max_weight', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Maximum weight')),
+                ('max_weight_date', models.DateField(null=True, verbose_name='Date')),
+                ('max_tonnage', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Maximum tonnage of a day')),
+                ('max_tonnage_date', models.DateField(null=True, verbose_name='Date')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exercises.Exercise', verbose_name='Exercise')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExerciseVolume',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('d', 'Day'), ('w', 'Week')], max_length=1, verbose_name='Period')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('sets', models.IntegerField(default=0, verbose_name='Sets')),
+                ('reps', models.IntegerField(default=0, verbose_name='Repetitions')),
+                ('tonnage', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Tonnage')),
+                ('max_weight', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Maximum weight')),
+                ('one_rep_max', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Estimated one repetition maximum')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exercises.Exercise', verbose_name='Exercise')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='exercisevolume',
+            unique_together=set([('user', 'exercise', 'period', 'date')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='exerciserecord',
+            unique_together=set([('user', 'exercise')]),
+        ),
+        migrations.RunPython(add_existing_volume, migrations.RunPython.noop),
+    ]
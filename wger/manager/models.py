@@ -17,10 +17,12 @@
 
 import datetime
 import logging
+from collections import OrderedDict
 from django.utils.encoding import python_2_unicode_compatible
 
 import six
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Max
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator
@@ -32,8 +34,15 @@ from django.core.validators import MinValueValidator
 from sortedm2m.fields import SortedManyToManyField
 
 from wger.core.models import DaysOfWeek, RepetitionUnit, WeightUnit
-from wger.exercises.models import Exercise
-from wger.manager.helpers import reps_smart_text
+from wger.exercises.models import Exercise, Muscle
+from wger.manager.helpers import (
+    RECORD_FIELDS,
+    find_records,
+    get_week_start,
+    reps_smart_text,
+    summarize_logs,
+    summarize_weeks
+)
 from wger.utils.cache import (
     cache_mapper,
     reset_workout_canonical_form,
@@ -48,12 +57,40 @@ logger = logging.getLogger(__name__)
 #
 # Classes
 #
+class WorkoutQuerySet(models.QuerySet):
+    '''
+    Queryset of workouts
+    '''
+
+    def delete(self):
+        '''
+        Deletes the workouts and updates the summaries of their logs and
+        sessions once, see Workout.delete()
+        '''
+        for workout_id in self.order_by().values_list('id', flat=True):
+            reset_workout_canonical_form(workout_id)
+        workouts = self.order_by().values('id')
+        log_days = set(WorkoutLog.objects.filter(workout__in=workouts)
+                       .order_by()
+                       .values_list('user_id', 'exercise_id', 'date')
+                       .distinct())
+        session_dates = set(WorkoutSession.objects.filter(workout__in=workouts)
+                            .order_by()
+                            .values_list('user_id', 'date'))
+        with transaction.atomic():
+            result = super(WorkoutQuerySet, self).delete()
+            update_summaries(log_days, session_dates)
+        return result
+
+
 @python_2_unicode_compatible
 class Workout(models.Model):
     '''
     Model for a training schedule
     '''
 
+    objects = WorkoutQuerySet.as_manager()
+
     class Meta:
         '''
         Meta class to set some other properties
@@ -92,10 +129,25 @@ class Workout(models.Model):
 
     def delete(self, *args, **kwargs):
         '''
-        Reset all cached infos
+        Reset all cached infos and update the summaries of the deleted logs
+        and sessions
         '''
         reset_workout_canonical_form(self.id)
-        super(Workout, self).delete(*args, **kwargs)
+        log_days = set(WorkoutLog.objects.filter(workout=self)
+                       .order_by()
+                       .values_list('user_id', 'exercise_id', 'date')
+                       .distinct())
+        session_dates = set(WorkoutSession.objects.filter(workout=self)
+                            .order_by()
+                            .values_list('user_id', 'date'))
+        with transaction.atomic():
+            super(Workout, self).delete(*args, **kwargs)
+            update_summaries(log_days, session_dates)
+
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
 
     def get_owner_object(self):
         '''
@@ -156,6 +208,112 @@ class Workout(models.Model):
 
         return workout_canonical_form
 
+    COMPACT_REPRESENTATION_VERSION = 1
+    '''
+    Version of the compact representation, increase when its format changes
+    '''
+
+    @property
+    def compact_representation(self):
+        '''
+        Returns a compact, JSON ready version of the canonical representation
+
+        The workout tree only references exercises, muscles and units by ID,
+        each of them is listed once in a separate table. It is built from the
+        (cached) canonical form and cached itself until the workout changes.
+        '''
+        cache_key = cache_mapper.get_workout_compact(self.pk)
+        compact_form = cache.get(cache_key)
+
+        # Entries cached before the format changed are built again
+        if not compact_form or compact_form['version'] != self.COMPACT_REPRESENTATION_VERSION:
+            canonical_form = self.canonical_representation
+            exercises = {}
+            repetition_units = {}
+            weight_units = {}
+
+            days = []
+            for day in canonical_form['day_list']:
+                sets = []
+                for set_dict in day['set_list']:
+                    set_exercises = []
+                    for exercise_dict in set_dict['exercise_list']:
+                        exercise = exercise_dict['obj']
+                        exercises[exercise.id] = exercise
+
+                        settings = []
+                        for setting in exercise_dict['setting_obj_list']:
+                            repetition_units[setting.repetition_unit_id] = None
+                            weight_units[setting.weight_unit_id] = None
+                            settings.append({'id': setting.id,
+                                             'reps': setting.reps,
+                                             'weight': six.text_type(setting.weight)
+                                             if setting.weight is not None else None,
+                                             'repetition_unit': setting.repetition_unit_id,
+                                             'weight_unit': setting.weight_unit_id,
+                                             'order': setting.order,
+                                             'comment': setting.comment})
+
+                        set_exercises.append({'exercise': exercise.id,
+                                              'text': exercise_dict['setting_text'],
+                                              'settings': settings})
+
+                    set_obj = set_dict['obj']
+                    sets.append({'id': set_obj.id,
+                                 'sets': set_obj.sets,
+                                 'order': set_obj.order,
+                                 'is_superset': set_dict['is_superset'],
+                                 'exercises': set_exercises})
+
+                days.append({'id': day['obj'].id,
+                             'description': day['obj'].description,
+                             'days_of_week': [i.id for i in day['days_of_week']['day_list']],
+                             'sets': sets})
+
+            # The muscles and equipment of all exercises, with one query per relation
+            relations = {}
+            muscle_ids = set()
+            for field, target in (('muscles', 'muscle_id'),
+                                  ('muscles_secondary', 'muscle_id'),
+                                  ('equipment', 'equipment_id')):
+                relations[field] = {}
+                through = getattr(Exercise, field).through.objects
+                for exercise_id, target_id in through.filter(exercise_id__in=exercises)\
+                        .order_by('id').values_list('exercise_id', target):
+                    relations[field].setdefault(exercise_id, []).append(target_id)
+                    if target == 'muscle_id':
+                        muscle_ids.add(target_id)
+
+            compact_form = {
+                'version': self.COMPACT_REPRESENTATION_VERSION,
+                'workout': {'id': self.id,
+                            'comment': self.comment,
+                            'creation_date': self.creation_date.isoformat(),
+                            'muscles': canonical_form['muscles']},
+                'days': days,
+                'exercises': [{'id': exercise.id,
+                               'uuid': six.text_type(exercise.uuid),
+                               'name': exercise.name,
+                               'category': exercise.category_id,
+                               'muscles': relations['muscles'].get(exercise.id, []),
+                               'muscles_secondary':
+                                   relations['muscles_secondary'].get(exercise.id, []),
+                               'equipment': relations['equipment'].get(exercise.id, [])}
+                              for exercise in sorted(exercises.values(), key=lambda i: i.id)],
+                'muscles': [{'id': muscle.id,
+                             'name': muscle.name,
+                             'is_front': muscle.is_front}
+                            for muscle in Muscle.objects.filter(id__in=muscle_ids).order_by('id')],
+                'repetition_units': [{'id': unit.id, 'name': unit.name}
+                                     for unit in RepetitionUnit.objects
+                                     .filter(id__in=repetition_units).order_by('id')],
+                'weight_units': [{'id': unit.id, 'name': unit.name}
+                                 for unit in WeightUnit.objects
+                                 .filter(id__in=weight_units).order_by('id')]}
+            cache.set(cache_key, compact_form)
+
+        return compact_form
+
 
 class ScheduleManager(models.Manager):
     '''
@@ -198,6 +356,43 @@ class ScheduleManager(models.Manager):
 
         return (active_workout, schedule)
 
+    def get_current_workouts(self, users):
+        '''
+        Finds the currently active workouts of several users at once, in the
+        same way as get_current_workout()
+
+        The users are passed as a queryset and used as subquery. The active
+        schedules with their steps and the latest workouts of the users are
+        read with three queries in total.
+
+        :param users: queryset of the users or of their IDs
+        :return: dictionary with a (workout, schedule) tuple for every user
+                 that has a workout, the others are missing
+        '''
+        schedules = {}
+        steps = ScheduleStep.objects.select_related('workout')
+        for schedule in (Schedule.objects.filter(user__in=users, is_active=True)
+                         .order_by('id')
+                         .prefetch_related(models.Prefetch('schedulestep_set', queryset=steps))):
+            schedules.setdefault(schedule.user_id, schedule)
+
+        # Only the workouts from the last creation date of each user
+        latest_workouts = {}
+        for workout in (Workout.objects.filter(user__in=users)
+                        .annotate(latest=models.Max('user__workout__creation_date'))
+                        .filter(creation_date=models.F('latest'))
+                        .order_by('id')):
+            latest_workouts[workout.user_id] = workout
+
+        result = {}
+        for user_id, workout in latest_workouts.items():
+            result[user_id] = (workout, False)
+        for user_id, schedule in schedules.items():
+            step = schedule.get_current_scheduled_workout()
+            if step:
+                result[user_id] = (step.workout, schedule)
+        return result
+
 
 @python_2_unicode_compatible
 class Schedule(models.Model):
@@ -253,6 +448,11 @@ class Schedule(models.Model):
     def get_absolute_url(self):
         return reverse('manager:schedule:view', kwargs={'pk': self.id})
 
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -336,6 +536,11 @@ class ScheduleStep(models.Model):
     order = models.IntegerField(verbose_name=_('Order'),
                                 default=1)
 
+    owner_field = 'workout__user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -391,6 +596,11 @@ class Day(models.Model):
         '''
         return self.description
 
+    owner_field = 'training__user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -575,6 +785,11 @@ class Set(models.Model):
         '''
         return u"Set-ID {0}".format(self.id)
 
+    owner_field = 'exerciseday__training__user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -674,6 +889,11 @@ class Setting(models.Model):
         reset_workout_canonical_form(self.set.exerciseday.training_id)
         super(Setting, self).delete(*args, **kwargs)
 
+    owner_field = 'set__exerciseday__training__user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -681,6 +901,149 @@ class Setting(models.Model):
         return self.set.exerciseday.training
 
 
+def update_summaries(log_days=(), session_dates=(), months=()):
+    '''
+    Updates the activity index and the exercise volume after deleting logs or
+    sessions
+
+    Deleting doesn't use signals, so that deleting a user, workout or exercise
+    with all its logs stays one query per table. Instead, the deleting code
+    calls this once for all deleted rows, see e.g. Workout.delete(). Entries
+    that are not needed anymore are removed, none are created.
+
+    :param log_days: set of (user ID, exercise ID, date) tuples of the logs
+    :param session_dates: set of (user ID, date) tuples of the sessions
+    :param months: set of (user ID, date) tuples of other months to count
+                   again, e.g. of the logs of a deleted exercise, whose
+                   volume is deleted with it
+    '''
+    months = set((user_id, date.replace(day=1)) for user_id, date in months)
+    months.update((i[0], i[-1].replace(day=1)) for i in log_days)
+    months.update((user_id, date.replace(day=1)) for user_id, date in session_dates)
+    for user_id, month in sorted(months):
+        WorkoutActivityMonth.objects.update_month(user_id, month, create=False)
+
+    days = {}
+    for user_id, exercise_id, date in log_days:
+        days.setdefault(user_id, set()).add((exercise_id, date))
+    for user_id, user_days in sorted(days.items()):
+        ExerciseVolume.objects.update_days(user_id, user_days, create=False)
+
+
+class WorkoutLogQuerySet(models.QuerySet):
+    '''
+    Queryset of workout logs
+    '''
+
+    def delete(self):
+        '''
+        Deletes the logs and updates the summaries of their days once
+        '''
+        log_days = set(self.order_by()
+                       .values_list('user_id', 'exercise_id', 'date')
+                       .distinct())
+        with transaction.atomic():
+            result = super(WorkoutLogQuerySet, self).delete()
+            update_summaries(log_days=log_days)
+        return result
+
+
+class WorkoutLogManager(models.Manager):
+    '''
+    Custom manager for workout logs
+    '''
+
+    def get_queryset(self):
+        '''
+        Use the queryset that updates the summaries when deleting
+        '''
+        return WorkoutLogQuerySet(self.model, using=self._db)
+
+    last_weights_cache_size = 500
+    '''
+    Maximum number of (exercise, repetitions) pairs cached per user
+    '''
+
+    def get_last_weights(self, user, pairs):
+        '''
+        Returns the weight of the last log for each (exercise ID, repetitions) pair
+
+        All pairs are read with two queries, the last date of each pair and the
+        logs on these dates. The results are cached per user until one of the
+        user's logs changes, pairs without logs are mapped to None.
+
+        :param user: the user whose logs are used
+        :param pairs: iterable of (exercise ID, repetitions) tuples
+        :rtype: dict
+        '''
+        pairs = set((int(exercise), int(reps)) for exercise, reps in pairs)
+        cache_key = cache_mapper.get_workout_log_last_weights(user)
+        last_weights = cache.get(cache_key) or OrderedDict()
+
+        missing = pairs.difference(last_weights)
+        if missing:
+            logs = self.filter(user=user,
+                               exercise_id__in=set(i[0] for i in missing),
+                               reps__in=set(i[1] for i in missing))
+            last_dates = {}
+            for log in logs.order_by().values('exercise_id', 'reps')\
+                    .annotate(last_date=Max('date')):
+                if (log['exercise_id'], log['reps']) in missing:
+                    last_dates[(log['exercise_id'], log['reps'])] = log['last_date']
+
+            weights = {}
+            for exercise, reps, date, weight in logs.filter(date__in=set(last_dates.values()))\
+                    .order_by('date', 'id').values_list('exercise_id', 'reps', 'date', 'weight'):
+                if last_dates.get((exercise, reps)) == date:
+                    weights[(exercise, reps)] = weight
+
+            for pair in missing:
+                last_weights[pair] = weights.get(pair)
+
+        result = {pair: last_weights[pair] for pair in pairs}
+        if missing:
+            while len(last_weights) > self.last_weights_cache_size:
+                last_weights.popitem(last=False)
+            cache.set(cache_key, last_weights)
+        return result
+
+    def add_session_logs(self, user, workout, date, logs, session_data):
+        '''
+        Saves the logs of a workout day and creates or updates the session of the date
+
+        All logs are inserted with one query and the cached logs are reset once,
+        the volume is summed up once. The session is saved last,
+        which updates the user's last activity for the new logs as well.
+
+        :param user: the user logging the workout
+        :param workout: the workout the logs belong to
+        :param date: the date of the logs and the session
+        :param logs: list of unsaved WorkoutLog objects
+        :param session_data: dictionary with the values of the session's fields
+        :return: the saved workout session
+        '''
+        for log in logs:
+            if not log.weight:
+                log.weight = 0
+            log.user = user
+            log.workout = workout
+            log.date = date
+
+        session = WorkoutSession.objects.filter(user=user, date=date).first()
+        if not session:
+            session = WorkoutSession(user=user, workout=workout, date=date)
+        for key, value in session_data.items():
+            setattr(session, key, value)
+
+        with transaction.atomic():
+            self.bulk_create(logs)
+            reset_workout_log(user.pk, date.year, date.month, date.day)
+            ExerciseVolume.objects.update_days(user.pk, set((log.exercise_id, date)
+                                                            for log in logs))
+            session.save()
+        return session
+
+
 @python_2_unicode_compatible
 class WorkoutLog(models.Model):
     '''
@@ -725,9 +1088,12 @@ class WorkoutLog(models.Model):
 
     date = Html5DateField(verbose_name=_('Date'))
 
+    objects = WorkoutLogManager()
+
     # Metaclass to set some other properties
     class Meta:
         ordering = ["date", "reps"]
+        index_together = ("user", "date")
 
     def __str__(self):
         '''
@@ -737,6 +1103,11 @@ class WorkoutLog(models.Model):
                                                         self.weight,
                                                         self.date)
 
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -776,7 +1147,25 @@ class WorkoutLog(models.Model):
         '''
         reset_workout_log(self.user_id, self.date.year,
                           self.date.month, self.date.day)
-        super(WorkoutLog, self).delete(*args, **kwargs)
+        with transaction.atomic():
+            super(WorkoutLog, self).delete(*args, **kwargs)
+            update_summaries(log_days=set([(self.user_id, self.exercise_id, self.date)]))
+
+
+class WorkoutSessionQuerySet(models.QuerySet):
+    '''
+    Queryset of workout sessions
+    '''
+
+    def delete(self):
+        '''
+        Deletes the sessions and updates the activity index of their months once
+        '''
+        session_dates = set(self.order_by().values_list('user_id', 'date').distinct())
+        with transaction.atomic():
+            result = super(WorkoutSessionQuerySet, self).delete()
+            update_summaries(session_dates=session_dates)
+        return result
 
 
 @python_2_unicode_compatible
@@ -848,6 +1237,8 @@ class WorkoutSession(models.Model):
     Time the workout session ended
     '''
 
+    objects = WorkoutSessionQuerySet.as_manager()
+
     def __str__(self):
         '''
         Return a more human-readable representation
@@ -874,6 +1265,11 @@ class WorkoutSession(models.Model):
             raise ValidationError(
                 _("The start time cannot be after the end time."))
 
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -892,4 +1288,525 @@ class WorkoutSession(models.Model):
         Reset cache
         '''
         reset_workout_log(self.user_id, self.date.year, self.date.month)
-        super(WorkoutSession, self).delete(*args, **kwargs)
+        with transaction.atomic():
+            super(WorkoutSession, self).delete(*args, **kwargs)
+            update_summaries(session_dates=set([(self.user_id, self.date)]))
+
+
+class WorkoutActivityMonthManager(models.Manager):
+    '''
+    Custom manager for the monthly activity index
+    '''
+
+    def update_month(self, user_id, date, create=True):
+        '''
+        Counts the logs and sessions of the month of the date again
+
+        Only the month is read, so this doesn't depend on the length of the
+        user's history.
+
+        :param user_id: the ID of the user
+        :param date: any date of the month
+        :param create: whether to create the entry if there is none yet. This
+                       is not done when deleting, e.g. when the user is deleted
+        '''
+        month = date.replace(day=1)
+        next_month = (month + datetime.timedelta(days=31)).replace(day=1)
+
+        logs = WorkoutLog.objects.filter(user_id=user_id,
+                                         date__gte=month,
+                                         date__lt=next_month).count()
+        sessions = WorkoutSession.objects.filter(user_id=user_id,
+                                                 date__gte=month,
+                                                 date__lt=next_month)\
+            .aggregate(count=models.Count('id'), impression=Max('impression'))
+        values = {'logs': logs,
+                  'sessions': sessions['count'],
+                  'impression': sessions['impression'] or ''}
+
+        if not logs and not sessions['count']:
+            self.filter(user_id=user_id, month=month).delete()
+        elif create:
+            self.update_or_create(user_id=user_id, month=month, defaults=values)
+        else:
+            self.filter(user_id=user_id, month=month).update(**values)
+
+    def add_log(self, user_id, date):
+        '''
+        Counts a new log in the month of the date
+
+        The count is increased in the database, if there is no entry for the
+        month yet it is counted with update_month().
+        '''
+        if not self.filter(user_id=user_id, month=date.replace(day=1))\
+                .update(logs=models.F('logs') + 1):
+            self.update_month(user_id, date)
+
+
+@python_2_unicode_compatible
+class WorkoutActivityMonth(models.Model):
+    '''
+    Index of the months with workout logs or sessions of a user
+
+    Used e.g. for the list of months of the calendar, so that the complete
+    history of the user doesn't need to be read. The entries are updated
+    whenever logs or sessions change, see WorkoutActivityMonthManager.update_month()
+    '''
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    month = models.DateField(verbose_name=_('Month'))
+    '''
+    The first day of the month
+    '''
+
+    logs = models.IntegerField(verbose_name=_('Workout logs'), default=0)
+    sessions = models.IntegerField(verbose_name=_('Workout sessions'), default=0)
+    impression = models.CharField(verbose_name=_('General impression'),
+                                  max_length=2,
+                                  choices=WorkoutSession.IMPRESSION,
+                                  blank=True)
+    '''
+    The best impression of the month's sessions, empty if there are none
+    '''
+
+    objects = WorkoutActivityMonthManager()
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        ordering = ["month", ]
+        unique_together = ("user", "month")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} - {1}".format(self.user, self.month)
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
+
+
+class ExerciseVolumeManager(models.Manager):
+    '''
+    Custom manager for the training volume of the exercises
+    '''
+
+    summary_fields = ('sets', 'reps', 'tonnage', 'max_weight', 'one_rep_max')
+    '''
+    Fields with the values of the summaries, see helpers.summarize_logs()
+    '''
+
+    @staticmethod
+    def get_summed_logs(logs):
+        '''
+        Returns the values of the logs that are summed up
+
+        Only logs with repetitions and a weight in kg or lb count, other
+        combinations such as time or until failure are ignored.
+
+        :param logs: a queryset of workout logs
+        :return: a queryset of tuples as expected by helpers.summarize_logs()
+        '''
+        return logs.filter(repetition_unit_id=1, weight_unit_id__in=(1, 2))\
+            .order_by()\
+            .values_list('exercise_id', 'date', 'reps', 'weight', 'weight_unit_id')
+
+    def update_day(self, user_id, exercise_id, date, create=True):
+        '''
+        Sums up the logs of an exercise on a date again, see update_days()
+        '''
+        self.update_days(user_id, [(exercise_id, date)], create)
+
+    def add_log(self, log):
+        '''
+        Adds the values of a new log to the entries of its day and week
+
+        The values are added in the database with one update of both entries,
+        so that logs saved at the same time are all counted. If the entries
+        don't exist yet, the day is summed up with update_day(). The personal
+        records are then compared with the new values of the day.
+
+        :param log: the new workout log
+        '''
+        if log.repetition_unit_id != 1 or log.weight_unit_id not in (1, 2):
+            return
+
+        key = (log.exercise_id, log.date)
+        summary = summarize_logs([key + (log.reps, log.weight, log.weight_unit_id)])[key]
+        values = {'sets': models.F('sets') + 1,
+                  'reps': models.F('reps') + summary['reps'],
+                  'tonnage': models.F('tonnage') + summary['tonnage']}
+        for field in ('max_weight', 'one_rep_max'):
+            values[field] = models.Case(models.When(**{field + '__lt': summary[field],
+                                                       'then': models.Value(summary[field])}),
+                                        default=models.F(field),
+                                        output_field=models.DecimalField())
+
+        updated = self.filter(user_id=log.user_id, exercise_id=log.exercise_id)\
+            .filter(models.Q(period=ExerciseVolume.PERIOD_DAY, date=log.date) |
+                    models.Q(period=ExerciseVolume.PERIOD_WEEK, date=get_week_start(log.date)))\
+            .update(**values)
+        if updated < 2:
+            self.update_day(log.user_id, log.exercise_id, log.date)
+        else:
+            ExerciseRecord.objects.add_day(log.user_id, log.exercise_id, log.date)
+
+    def update_days(self, user_id, days, create=True):
+        '''
+        Sums up the logs of exercises on some dates again
+
+        The entries of the weeks and the personal records of the exercises are
+        updated as well. Only the logs of the days and the entries of the weeks
+        are read, so this doesn't depend on the length of the user's history.
+
+        :param user_id: the ID of the user
+        :param days: iterable of (exercise ID, date) tuples
+        :param create: whether to create the entries if there are none yet. This
+                       is not done when deleting, e.g. when the user is deleted
+        '''
+        days = set(days)
+        if not days:
+            return
+
+        exercise_ids = set(i[0] for i in days)
+        logs = WorkoutLog.objects.filter(user_id=user_id,
+                                         exercise_id__in=exercise_ids,
+                                         date__in=set(i[1] for i in days))
+        summaries = summarize_logs(log for log in self.get_summed_logs(logs)
+                                   if (log[0], log[1]) in days)
+        day_summaries = dict((key, summaries.get(key)) for key in days)
+        self._store(user_id, ExerciseVolume.PERIOD_DAY, day_summaries, create)
+
+        weeks = set((exercise_id, get_week_start(date)) for exercise_id, date in days)
+        first_week = min(i[1] for i in weeks)
+        last_week = max(i[1] for i in weeks)
+        entries = self.filter(user_id=user_id,
+                              exercise_id__in=exercise_ids,
+                              period=ExerciseVolume.PERIOD_DAY,
+                              date__gte=first_week,
+                              date__lt=last_week + datetime.timedelta(days=7))\
+            .values('exercise_id', 'date', *self.summary_fields)
+        summaries = summarize_weeks(dict(((i['exercise_id'], i['date']), i) for i in entries
+                                         if (i['exercise_id'], get_week_start(i['date']))
+                                         in weeks))
+        self._store(user_id,
+                    ExerciseVolume.PERIOD_WEEK,
+                    dict((key, summaries.get(key)) for key in weeks),
+                    create)
+
+        ExerciseRecord.objects.update_days(user_id, day_summaries, create)
+
+    def _store(self, user_id, period, summaries, create):
+        '''
+        Saves the summaries, the entries of summaries that are None are deleted
+
+        :param summaries: dictionary {(exercise ID, date): summary or None}
+        '''
+        entries = self.filter(user_id=user_id,
+                              period=period,
+                              exercise_id__in=set(i[0] for i in summaries),
+                              date__in=set(i[1] for i in summaries))
+        entries = dict(((i.exercise_id, i.date), i) for i in entries
+                       if (i.exercise_id, i.date) in summaries)
+
+        new_entries = []
+        for key, summary in summaries.items():
+            entry = entries.get(key)
+            if not summary:
+                continue
+            values = dict((field, summary[field]) for field in self.summary_fields)
+            if entry is None:
+                if create:
+                    new_entries.append(ExerciseVolume(user_id=user_id,
+                                                      exercise_id=key[0],
+                                                      period=period,
+                                                      date=key[1],
+                                                      **values))
+            elif any(getattr(entry, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(entry, field, value)
+                entry.save()
+
+        deleted = [entry.pk for key, entry in entries.items() if not summaries[key]]
+        if deleted:
+            self.filter(pk__in=deleted).delete()
+        if new_entries:
+            self.bulk_create(new_entries)
+
+    def rebuild(self, user):
+        '''
+        Sums up all logs of a user again, e.g. after adding logs in bulk
+
+        :param user: the user whose entries and personal records are replaced
+        '''
+        days = summarize_logs(self.get_summed_logs(WorkoutLog.objects.filter(user=user)))
+        weeks = summarize_weeks(days)
+
+        with transaction.atomic():
+            self.filter(user=user).delete()
+            ExerciseRecord.objects.filter(user=user).delete()
+            self.bulk_create([ExerciseVolume(user=user,
+                                             exercise_id=exercise_id,
+                                             period=period,
+                                             date=date,
+                                             **dict((field, summary[field])
+                                                    for field in self.summary_fields))
+                              for period, summaries in ((ExerciseVolume.PERIOD_DAY, days),
+                                                        (ExerciseVolume.PERIOD_WEEK, weeks))
+                              for (exercise_id, date), summary in summaries.items()])
+            ExerciseRecord.objects.bulk_create([ExerciseRecord(user=user,
+                                                               exercise_id=exercise_id,
+                                                               **record)
+                                                for exercise_id, record
+                                                in find_records(days).items()])
+
+
+@python_2_unicode_compatible
+class ExerciseVolume(models.Model):
+    '''
+    Training volume of an exercise per day or week
+
+    The values are summed up from the user's workout logs, so that e.g. charts
+    don't need to read the complete history. The entries are updated whenever
+    logs change, see ExerciseVolumeManager.update_days(). All weights are in kg.
+    '''
+
+    PERIOD_DAY = 'd'
+    PERIOD_WEEK = 'w'
+    PERIOD = (
+        (PERIOD_DAY, _('Day')),
+        (PERIOD_WEEK, _('Week')),
+    )
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    exercise = models.ForeignKey(Exercise,
+                                 verbose_name=_('Exercise'))
+    period = models.CharField(verbose_name=_('Period'),
+                              max_length=1,
+                              choices=PERIOD)
+    date = models.DateField(verbose_name=_('Date'))
+    '''
+    The day, or the monday of the week
+    '''
+
+    sets = models.IntegerField(verbose_name=_('Sets'), default=0)
+    '''
+    Number of logs
+    '''
+
+    reps = models.IntegerField(verbose_name=_('Repetitions'), default=0)
+    tonnage = models.DecimalField(verbose_name=_('Tonnage'),
+                                  max_digits=12,
+                                  decimal_places=2,
+                                  default=0)
+    '''
+    Sum of repetitions times weight
+    '''
+
+    max_weight = models.DecimalField(verbose_name=_('Maximum weight'),
+                                     max_digits=10,
+                                     decimal_places=2,
+                                     default=0)
+    one_rep_max = models.DecimalField(verbose_name=_('Estimated one repetition maximum'),
+                                      max_digits=10,
+                                      decimal_places=2,
+                                      default=0)
+    '''
+    The best estimate of the logs, see helpers.estimate_one_rep_max()
+    '''
+
+    objects = ExerciseVolumeManager()
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        ordering = ["date", ]
+        unique_together = ("user", "exercise", "period", "date")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} - {1} - {2}: {3} kg".format(self.user_id,
+                                                 self.exercise_id,
+                                                 self.date,
+                                                 self.tonnage)
+
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
+
+
+class ExerciseRecordManager(models.Manager):
+    '''
+    Custom manager for the personal records
+    '''
+
+    def update_days(self, user_id, days, create=True):
+        '''
+        Updates the personal records of exercises after their logs of some days changed
+
+        New records are found by comparing the days with the current records.
+        Only if a day held a record, which could be lower now, the daily
+        entries of the exercise are searched again.
+
+        :param user_id: the ID of the user
+        :param days: dictionary {(exercise ID, date): summary}, the summaries
+                     are None for days without logs
+        :param create: whether to create the records if there are none yet
+        '''
+        exercise_ids = set(i[0] for i in days)
+        records = self.filter(user_id=user_id, exercise_id__in=exercise_ids)
+        records = dict((record.exercise_id, record) for record in records)
+        search = set(exercise_id for exercise_id, date in days
+                     if exercise_id not in records or date in records[exercise_id].get_dates())
+
+        values = dict((exercise_id, record.get_values())
+                      for exercise_id, record in records.items() if exercise_id not in search)
+        find_records(dict((key, day) for key, day in days.items() if day and key[0] in values),
+                     values)
+        if search:
+            entries = ExerciseVolume.objects.filter(user_id=user_id,
+                                                    exercise_id__in=search,
+                                                    period=ExerciseVolume.PERIOD_DAY)\
+                .values('exercise_id', 'date', *(value for field, value in RECORD_FIELDS))
+            values.update(find_records(dict(((i['exercise_id'], i['date']), i)
+                                            for i in entries)))
+
+        new_records = []
+        for exercise_id in exercise_ids:
+            record = records.get(exercise_id)
+            if exercise_id not in values or record is None:
+                if exercise_id in values and create:
+                    new_records.append(ExerciseRecord(user_id=user_id,
+                                                      exercise_id=exercise_id,
+                                                      **values[exercise_id]))
+            elif values[exercise_id] != record.get_values():
+                for field, value in values[exercise_id].items():
+                    setattr(record, field, value)
+                record.save()
+
+        deleted = [record.pk for exercise_id, record in records.items()
+                   if exercise_id not in values]
+        if deleted:
+            self.filter(pk__in=deleted).delete()
+        if new_records:
+            self.bulk_create(new_records)
+
+    def add_day(self, user_id, exercise_id, date):
+        '''
+        Updates the personal records of an exercise after a log was added to a day
+
+        The values of the day only grew, so they are compared with the current
+        records without searching the other days.
+        '''
+        day = ExerciseVolume.objects.filter(user_id=user_id,
+                                            exercise_id=exercise_id,
+                                            period=ExerciseVolume.PERIOD_DAY,
+                                            date=date)\
+            .values(*ExerciseVolume.objects.summary_fields).first()
+        record = self.filter(user_id=user_id, exercise_id=exercise_id).first()
+        if day is None or record is None:
+            self.update_days(user_id, {(exercise_id, date): day})
+            return
+
+        values = find_records({(exercise_id, date): day},
+                              {exercise_id: record.get_values()})[exercise_id]
+        if values != record.get_values():
+            for field, value in values.items():
+                setattr(record, field, value)
+            record.save()
+
+
+@python_2_unicode_compatible
+class ExerciseRecord(models.Model):
+    '''
+    Personal records of a user for an exercise
+
+    The records are kept up to date with the daily entries of ExerciseVolume,
+    see ExerciseRecordManager.update_days(). All weights are in kg.
+    '''
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    exercise = models.ForeignKey(Exercise,
+                                 verbose_name=_('Exercise'))
+
+    one_rep_max = models.DecimalField(verbose_name=_('Estimated one repetition maximum'),
+                                      max_digits=10,
+                                      decimal_places=2,
+                                      default=0)
+    one_rep_max_date = models.DateField(verbose_name=_('Date'), null=True)
+    max_weight = models.DecimalField(verbose_name=_('Maximum weight'),
+                                     max_digits=10,
+                                     decimal_places=2,
+                                     default=0)
+    max_weight_date = models.DateField(verbose_name=_('Date'), null=True)
+    max_tonnage = models.DecimalField(verbose_name=_('Maximum tonnage of a day'),
+                                      max_digits=12,
+                                      decimal_places=2,
+                                      default=0)
+    max_tonnage_date = models.DateField(verbose_name=_('Date'), null=True)
+    '''
+    The dates are empty as long as the value is 0, e.g. for exercises that are
+    only logged without weight
+    '''
+
+    objects = ExerciseRecordManager()
+
+    class Meta:
+        '''
+        Set other properties
+        '''
+        unique_together = ("user", "exercise")
+
+    def __str__(self):
+        '''
+        Return a more human-readable representation
+        '''
+        return u"{0} - {1}: {2} kg".format(self.user_id, self.exercise_id, self.one_rep_max)
+
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
+    def get_owner_object(self):
+        '''
+        Returns the object that has owner information
+        '''
+        return self
+
+    def get_values(self):
+        '''
+        Returns the records and their dates as a dictionary, see helpers.find_records()
+        '''
+        values = {}
+        for field, value in RECORD_FIELDS:
+            values[field] = getattr(self, field)
+            values[field + '_date'] = getattr(self, field + '_date')
+        return values
+
+    def get_dates(self):
+        '''
+        Returns the dates of the records
+        '''
+        return set(getattr(self, field + '_date') for field, value in RECORD_FIELDS)
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.platypus import (
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    KeepTogether,
+    ListFlowable,
+    ListItem
+)
+
+from django.utils.translation import ugettext as _
+
+from wger.utils.pdf import (
+    get_pdf_image,
+    register_fonts,
+    render_footer,
+    styleSheet
+)
+
+
+def build_workout_pdf(output, elements, subject):
+    '''
+    Writes the PDF for workouts and schedules
+
+    :param output: file-like object the PDF is written to
+    :param elements: list of flowables, see render_workout_pdf
+    :param subject: subject of the document
+    '''
+    doc = SimpleDocTemplate(output,
+                            pagesize=A4,
+                            leftMargin=cm,
+                            rightMargin=cm,
+                            topMargin=0.5 * cm,
+                            bottomMargin=0.5 * cm,
+                            title=_('Workout'),
+                            author='wger Workout Manager',
+                            subject=subject)
+    doc.build(elements)
+
+
+def render_workout_pdf(workout, day_list, url, images=False, comments=False, only_table=False):
+    '''
+    Returns the flowables for the PDF of a workout
+
+    :param workout: the workout
+    :param day_list: the days of the workout's canonical representation
+    :param url: absolute URL of the workout, used in the footer
+    :param images: see render_workout_day
+    :param comments: see render_workout_day
+    :param only_table: see render_workout_day
+    '''
+    register_fonts()
+    elements = []
+
+    # Set the title
+    p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
+                  {'description': workout},
+                  styleSheet["HeaderBold"])
+    elements.append(p)
+    elements.append(Spacer(10 * cm, 0.5 * cm))
+
+    # Iterate through the Workout and render the training days
+    for day in day_list:
+        elements.append(render_workout_day(day, images=images,
+                                           comments=comments, only_table=only_table))
+        elements.append(Spacer(10 * cm, 0.5 * cm))
+
+    # Footer, date and info
+    elements.append(Spacer(10 * cm, 0.5 * cm))
+    elements.append(render_footer(url))
+    return elements
+
+
+def render_schedule_pdf(schedule, step_list, url, images=False, comments=False,
+                        only_table=False):
+    '''
+    Returns the flowables for the PDF of a schedule
+
+    :param schedule: the schedule
+    :param step_list: list of (step, days of the workout's canonical representation)
+    :param url: absolute URL of the schedule, used in the footer
+    :param images: see render_workout_day
+    :param comments: see render_workout_day
+    :param only_table: see render_workout_day
+    '''
+    register_fonts()
+    elements = []
+
+    # Set the title
+    p = Paragraph(
+        u'<para align="center">{0}</para>'.format(schedule), styleSheet["HeaderBold"])
+    elements.append(p)
+    elements.append(Spacer(10 * cm, 0.5 * cm))
+
+    # Iterate through the Workout and render the training days
+    for step, day_list in step_list:
+        p = Paragraph(u'<para>{0} {1}</para>'.format(step.duration, _('Weeks')),
+                      styleSheet["HeaderBold"])
+        elements.append(p)
+        elements.append(Spacer(10 * cm, 0.5 * cm))
+
+        for day in day_list:
+            elements.append(render_workout_day(day, images=images, comments=comments,
+                                               nr_of_weeks=7, only_table=only_table))
+            elements.append(Spacer(10 * cm, 0.5 * cm))
+
+    # Footer, date and info
+    elements.append(Spacer(10 * cm, 0.5 * cm))
+    elements.append(render_footer(url))
+    return elements
+
+
+def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_table=False):
+    '''
+    Render a table with reportlab with the contents of the training day
+
+    :param day: a workout day object
+    :param nr_of_weeks: the numbrer of weeks to render, default is 7
+    :param images: boolean indicating whether to also draw exercise images
+           in the PDF (actually only the main image)
+    :param comments: boolean indicathing whether the exercise comments will
+           be rendered as well
+    :param only_table: boolean indicating whether to draw a table with space
+           for weight logs or just a list of the exercises
+    '''
+
+    # If rendering only the table, reset the nr of weeks, since these columns
+    # will not be rendered anyway.
+    if only_table:
+        nr_of_weeks = 0
+
+    data = []
+
+    # Init some counters and markers, this will be used after the iteration to
+    # set different borders and colours
+    day_markers = []
+    group_exercise_marker = {}
+
+    # Background colour for days
+    # Reportlab doesn't use the HTML hexadecimal format, but has a range of
+    # 0 till 1, so we have to convert here.
+    header_colour = colors.Color(int('73', 16) / 255.0,
+                                 int('8a', 16) / 255.0,
+                                 int('5f', 16) / 255.0)
+
+    set_count = 1
+    day_markers.append(len(data))
+
+    p = Paragraph(u'<para align="center">%(days)s: %(description)s</para>' %
+                  {'days': day['days_of_week']['text'],
+                   'description': day['obj'].description},
+                  styleSheet["Bold"])
+
+    data.append([p])
+
+    # Note: the _('Date') will be on the 3rd cell, but since we make a span
+    #       over 3 cells, the value has to be on the 1st one
+    data.append([_('Date') + ' ', '', ''] + [''] * nr_of_weeks)
+    data.append([_('Nr.'), _('Exercise'), _('Reps')] +
+                [_('Weight')] * nr_of_weeks)
+
+    # Sets
+    exercise_start = len(data)
+    for set in day['set_list']:
+        group_exercise_marker[set['obj'].id] = {
+            'start': len(data), 'end': len(data)}
+
+        # Exercises
+        for exercise in set['exercise_list']:
+            group_exercise_marker[set['obj'].id]['end'] = len(data)
+
+            # Process the settings
+            if exercise['has_weight']:
+                setting_out = []
+                for i in exercise['setting_text'].split(u'–'):
+                    setting_out.append(
+                        Paragraph(i, styleSheet["Small"], bulletText=''))
+            else:
+                setting_out = Paragraph(
+                    exercise['setting_text'], styleSheet["Small"])
+
+            # Collect a list of the exercise comments
+            item_list = [Paragraph('', styleSheet["Small"])]
+            if comments:
+                item_list = [ListItem(Paragraph(i, style=styleSheet["ExerciseComments"]))
+                             for i in exercise['comment_list']]
+
+            # Add the exercise's main image
+            image = Paragraph('', styleSheet["Small"])
+            if images:
+                if exercise['obj'].main_image:
+
+                    # Make the images somewhat larger when printing only the workout and not
+                    # also the columns for weight logs
+                    if only_table:
+                        image_size = 2
+                    else:
+                        image_size = 1.5
+
+                    image = get_pdf_image(exercise['obj'].main_image.image, image_size * cm)
+
+            # Put the name and images and comments together
+            exercise_content = [Paragraph(exercise['obj'].name, styleSheet["Small"]),
+                                image,
+                                ListFlowable(item_list,
+                                             bulletType='bullet',
+                                             leftIndent=5,
+                                             spaceBefore=7,
+                                             bulletOffsetY=-3,
+                                             bulletFontSize=3,
+                                             start='square')]
+
+            data.append([set_count,
+                         exercise_content,
+                         setting_out]
+                        + [''] * nr_of_weeks)
+        set_count += 1
+
+    table_style = [('FONT', (0, 0), (-1, -1), 'OpenSans'),
+                   ('FONTSIZE', (0, 0), (-1, -1), 8),
+                   ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                   ('LEFTPADDING', (0, 0), (-1, -1), 2),
+                   ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+                   ('TOPPADDING', (0, 0), (-1, -1), 3),
+                   ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+                   ('INNERGRID', (0, 0), (-1, -1), 0.25, colors.black),
+
+                   # Header
+                   ('BACKGROUND', (0, 0), (-1, 0), header_colour),
+                   ('BOX', (0, 0), (-1, -1), 1.25, colors.black),
+                   ('BOX', (0, 1), (-1, -1), 1.25, colors.black),
+                   ('SPAN', (0, 0), (-1, 0)),
+
+                   # Cell with 'date'
+                   ('SPAN', (0, 1), (2, 1)),
+                   ('ALIGN', (0, 1), (2, 1), 'RIGHT')]
+
+    # Combine the cells for exercises on the same superset
+    for marker in group_exercise_marker:
+        start_marker = group_exercise_marker[marker]['start']
+        end_marker = group_exercise_marker[marker]['end']
+
+        table_style.append(
+            ('VALIGN', (0, start_marker), (0, end_marker), 'MIDDLE'))
+        table_style.append(('SPAN', (0, start_marker), (0, end_marker)))
+
+    # Set an alternating background colour for rows with exercises.
+    # The rows with exercises range from exercise_start till the end of the data
+    # list
+    for i in range(exercise_start, len(data) + 1):
+        if not i % 2:
+            table_style.append(
+                ('BACKGROUND', (1, i - 1), (-1, i - 1), colors.lavender))
+
+    # Put everything together and manually set some of the widths
+    t = Table(data, style=table_style)
+    if len(t._argW) > 1:
+        if only_table:
+            t._argW[0] = 0.6 * cm  # Numbering
+            t._argW[1] = 8 * cm  # Exercise
+            t._argW[2] = 3.5 * cm  # Repetitions
+        else:
+            t._argW[0] = 0.6 * cm  # Numbering
+            t._argW[1] = 4 * cm  # Exercise
+            t._argW[2] = 3 * cm  # Repetitions
+
+    return KeepTogether(t)
@@ -15,10 +15,15 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 
 from wger.gym.helpers import get_user_last_activity
-from wger.manager.models import WorkoutLog, WorkoutSession
+from wger.manager.models import (
+    ExerciseVolume,
+    WorkoutActivityMonth,
+    WorkoutLog,
+    WorkoutSession
+)
 from wger.core.models import UserCache
 
 
@@ -32,9 +37,63 @@ def update_activity_cache(sender, instance, **kwargs):
     user.usercache.save()
 
 
+def store_previous_values(sender, instance, **kwargs):
+    '''
+    Remember the date and exercise of an edited log, the old month and the old
+    exercise volume need to be updated as well
+    '''
+    if instance.pk:
+        instance.previous_date, instance.previous_exercise_id = \
+            sender.objects.filter(pk=instance.pk).values_list('date', 'exercise_id').first() \
+            or (None, None)
+
+
+def update_activity_month(sender, instance, created=False, **kwargs):
+    '''
+    Update the user's activity index for the month of the log or session
+
+    New logs are simply counted, the months of other changes are counted
+    again. Deleted logs and sessions are handled by their models, see
+    models.update_summaries()
+    '''
+    if created and sender is WorkoutLog:
+        WorkoutActivityMonth.objects.add_log(instance.user_id, instance.date)
+        return
+
+    WorkoutActivityMonth.objects.update_month(instance.user_id, instance.date)
+
+    previous_date = getattr(instance, 'previous_date', None)
+    if previous_date and (previous_date.year, previous_date.month) != \
+            (instance.date.year, instance.date.month):
+        WorkoutActivityMonth.objects.update_month(instance.user_id, previous_date, create=False)
+
+
+def update_exercise_volume(sender, instance, created=False, **kwargs):
+    '''
+    Update the user's volume and personal records of the exercise of the log
+
+    The values of new logs are added, the days of edited ones are summed up again
+    '''
+    if created:
+        ExerciseVolume.objects.add_log(instance)
+        return
+
+    ExerciseVolume.objects.update_day(instance.user_id, instance.exercise_id, instance.date)
+
+    previous = (getattr(instance, 'previous_exercise_id', None),
+                getattr(instance, 'previous_date', None))
+    if previous[1] and previous != (instance.exercise_id, instance.date):
+        ExerciseVolume.objects.update_day(instance.user_id, *previous, create=False)
+
+
 post_save.connect(update_activity_cache, sender=WorkoutSession)
 post_save.connect(update_activity_cache, sender=WorkoutLog)
 
+pre_save.connect(store_previous_values, sender=WorkoutLog)
+post_save.connect(update_activity_month, sender=WorkoutSession)
+post_save.connect(update_activity_month, sender=WorkoutLog)
+post_save.connect(update_exercise_volume, sender=WorkoutLog)
+
 # TODO: this seems to cause problems when users are deleted
 #       perhaps because of the cascading, needs to be checked
 # post_delete.connect(update_activity_cache, sender=WorkoutSession)
@@ -0,0 +1,116 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import (
+    WorkoutActivityMonth,
+    WorkoutLog,
+    WorkoutSession
+)
+
+
+class WorkoutActivityMonthTestCase(WorkoutManagerTestCase):
+    '''
+    Test the index of the months with workout logs or sessions
+    '''
+
+    def get_months(self, username='admin'):
+        '''
+        Helper function that returns the index of a user as a list of tuples
+        '''
+        return [(i.month, i.logs, i.sessions, i.impression)
+                for i in WorkoutActivityMonth.objects.filter(user__username=username)]
+
+    def add_log(self, date):
+        '''
+        Helper function that adds a log for user 'admin'
+        '''
+        return WorkoutLog.objects.create(user=User.objects.get(username='admin'),
+                                         workout_id=1,
+                                         exercise_id=1,
+                                         reps=10,
+                                         weight=20,
+                                         date=date)
+
+    def test_fixtures(self):
+        '''
+        Test the index of the logs and sessions of the fixtures
+        '''
+        self.assertEqual(self.get_months(), [(datetime.date(2012, 10, 1), 2, 1, '2'),
+                                             (datetime.date(2012, 11, 1), 1, 0, ''),
+                                             (datetime.date(2013, 10, 1), 1, 0, ''),
+                                             (datetime.date(2014, 1, 1), 0, 2, '3')])
+
+    def test_logs(self):
+        '''
+        Test that adding, moving and deleting logs updates the index
+        '''
+        log = self.add_log(datetime.date(2016, 3, 10))
+        self.add_log(datetime.date(2016, 3, 11))
+        self.assertEqual(self.get_months()[-1], (datetime.date(2016, 3, 1), 2, 0, ''))
+
+        log.date = datetime.date(2016, 4, 1)
+        log.save()
+        self.assertEqual(self.get_months()[-2:], [(datetime.date(2016, 3, 1), 1, 0, ''),
+                                                  (datetime.date(2016, 4, 1), 1, 0, '')])
+
+        log.delete()
+        self.assertEqual(self.get_months()[-1], (datetime.date(2016, 3, 1), 1, 0, ''))
+
+    def test_sessions(self):
+        '''
+        Test that the best impression of the sessions is used
+        '''
+        user = User.objects.get(username='admin')
+        for day, impression in ((1, WorkoutSession.IMPRESSION_BAD),
+                                (2, WorkoutSession.IMPRESSION_GOOD)):
+            WorkoutSession.objects.create(user=user,
+                                          workout_id=1,
+                                          date=datetime.date(2016, 5, day),
+                                          impression=impression)
+        self.assertEqual(self.get_months()[-1], (datetime.date(2016, 5, 1), 0, 2, '3'))
+
+        WorkoutSession.objects.filter(user=user, date__month=5).delete()
+        self.assertEqual(self.get_months()[-1], (datetime.date(2014, 1, 1), 0, 2, '3'))
+
+    def test_delete_user(self):
+        '''
+        Test that deleting a user also deletes the index
+        '''
+        self.add_log(datetime.date(2016, 3, 10))
+        User.objects.get(username='admin').delete()
+        self.assertFalse(WorkoutActivityMonth.objects.filter(user_id=1).exists())
+
+    def test_calendar(self):
+        '''
+        Test that the calendar's list of months uses the index
+        '''
+        self.add_log(datetime.date(2016, 3, 10))
+        self.user_login('admin')
+        response = self.client.get(reverse('manager:workout:calendar'))
+        self.assertEqual([i.month for i in response.context['month_list']],
+                         [datetime.date(2012, 10, 1),
+                          datetime.date(2012, 11, 1),
+                          datetime.date(2013, 10, 1),
+                          datetime.date(2014, 1, 1),
+                          datetime.date(2016, 3, 1)])
+        self.assertContains(response, reverse('manager:workout:calendar',
+                                              kwargs={'username': 'admin',
+                                                      'year': 2016,
+                                                      'month': 3}))
@@ -13,10 +13,15 @@
 # You should have received a copy of the GNU Affero General Public License
 
 import datetime
+import smtplib
 
 from django.contrib.auth.models import User
 from django.core import mail
+from django.core.mail.backends import locmem
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+from django.utils.six import StringIO
 
 from wger.core.models import UserProfile
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
@@ -24,6 +29,18 @@ from wger.manager.models import Schedule
 from wger.manager.models import Workout
 
 
+class RefusingEmailBackend(locmem.EmailBackend):
+    '''
+    Email backend that refuses the emails to the admin
+    '''
+
+    def send_messages(self, messages):
+        for message in messages:
+            if 'admin@example.com' in message.to:
+                raise smtplib.SMTPRecipientsRefused({'admin@example.com': (550, 'Refused')})
+        return super(RefusingEmailBackend, self).send_messages(messages)
+
+
 class EmailReminderTestCase(WorkoutManagerTestCase):
     '''
     Tests the email reminder command.
@@ -234,3 +251,58 @@ class EmailReminderTestCase(WorkoutManagerTestCase):
 
         call_command('email-reminders')
         self.assertEqual(len(mail.outbox), 0)
+
+    def test_reminder_dry_run(self):
+        '''
+        Test that --dry-run neither sends the email nor saves the notification
+        '''
+        Schedule.objects.all().delete()
+        Workout.objects.exclude(user=User.objects.get(pk=2)).delete()
+
+        out = StringIO()
+        call_command('email-reminders', dry_run=True, stdout=out)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIn('Would send 1 email reminders', out.getvalue())
+        self.assertIsNone(UserProfile.objects.get(user=2).last_workout_notification)
+
+        call_command('email-reminders')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(UserProfile.objects.get(user=2).last_workout_notification,
+                         datetime.date.today())
+
+    def test_reminder_queries(self):
+        '''
+        Test that the number of queries does not depend on the number of users
+        '''
+        Schedule.objects.all().delete()
+        for user in User.objects.exclude(pk=2):
+            if user.userprofile.workout_reminder_active:
+                continue
+            user.userprofile.workout_reminder_active = True
+            user.userprofile.save()
+            Workout.objects.create(user=user,
+                                   creation_date=datetime.date.today())
+
+        # The site, the profiles, the schedules, the workouts and updating the profiles
+        with self.assertNumQueries(5):
+            call_command('email-reminders')
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='wger.manager.tests.test_email_reminder.RefusingEmailBackend')
+    def test_reminder_failed_email(self):
+        '''
+        Test that only the users that got the email are saved as notified
+        '''
+        Schedule.objects.all().delete()
+        user = User.objects.get(pk=1)
+        user.userprofile.workout_reminder_active = True
+        user.userprofile.save()
+
+        err = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('email-reminders', stderr=err)
+        self.assertEqual([i.to for i in mail.outbox], [['test@example.com']])
+        self.assertIn('admin@example.com', err.getvalue())
+        self.assertIsNone(UserProfile.objects.get(user=1).last_workout_notification)
+        self.assertEqual(UserProfile.objects.get(user=2).last_workout_notification,
+                         datetime.date.today())
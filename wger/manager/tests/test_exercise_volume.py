@@ -0,0 +1,473 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from rest_framework.test import APIClient
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise
+from wger.manager.helpers import (
+    estimate_one_rep_max,
+    find_records,
+    summarize_logs,
+    summarize_weeks
+)
+from wger.manager.models import (
+    ExerciseRecord,
+    ExerciseVolume,
+    Workout,
+    WorkoutActivityMonth,
+    WorkoutLog,
+    WorkoutSession
+)
+
+
+class ExerciseVolumeHelperTestCase(WorkoutManagerTestCase):
+    '''
+    Test the helper functions that sum up the logs
+    '''
+
+    def test_estimate_one_rep_max(self):
+        '''
+        Test the estimate of the one repetition maximum
+        '''
+        self.assertEqual(estimate_one_rep_max(Decimal(100), 1), Decimal('100.00'))
+        self.assertEqual(estimate_one_rep_max(Decimal(100), 10), Decimal('133.33'))
+        self.assertEqual(estimate_one_rep_max(Decimal(100), 12), Decimal('140.00'))
+        self.assertEqual(estimate_one_rep_max(Decimal(100), 13), 0)
+        self.assertEqual(estimate_one_rep_max(Decimal(100), 0), 0)
+
+    def test_summarize_logs(self):
+        '''
+        Test summing up logs in kg and lb
+        '''
+        day = datetime.date(2016, 4, 6)
+        days = summarize_logs([(1, day, 10, Decimal(50), 1),
+                               (1, day, 5, Decimal(100), 2),
+                               (2, day, 20, Decimal(10), 1)])
+
+        self.assertEqual(sorted(days), [(1, day), (2, day)])
+        self.assertEqual(days[(1, day)], {'sets': 2,
+                                          'reps': 15,
+                                          'tonnage': Decimal('726.80'),
+                                          'max_weight': Decimal('50.00'),
+                                          'one_rep_max': Decimal('66.67')})
+
+        # Too many repetitions to estimate the maximum
+        self.assertEqual(days[(2, day)]['tonnage'], Decimal('200.00'))
+        self.assertEqual(days[(2, day)]['one_rep_max'], 0)
+
+    def test_summarize_weeks(self):
+        '''
+        Test summing up the days per week
+        '''
+        days = summarize_logs([(1, datetime.date(2016, 4, 4), 10, Decimal(50), 1),
+                               (1, datetime.date(2016, 4, 10), 5, Decimal(60), 1),
+                               (1, datetime.date(2016, 4, 11), 5, Decimal(70), 1)])
+        weeks = summarize_weeks(days)
+
+        self.assertEqual(sorted(weeks), [(1, datetime.date(2016, 4, 4)),
+                                         (1, datetime.date(2016, 4, 11))])
+        week = weeks[(1, datetime.date(2016, 4, 4))]
+        self.assertEqual(week['sets'], 2)
+        self.assertEqual(week['reps'], 15)
+        self.assertEqual(week['tonnage'], Decimal('800.00'))
+        self.assertEqual(week['max_weight'], Decimal('60.00'))
+        self.assertEqual(week['one_rep_max'], Decimal('70.00'))
+
+        # The daily summaries are not changed
+        self.assertEqual(days[(1, datetime.date(2016, 4, 4))]['sets'], 1)
+
+    def test_find_records(self):
+        '''
+        Test finding the personal records, ties belong to the earlier day
+        '''
+        days = summarize_logs([(1, datetime.date(2016, 4, 10), 1, Decimal(80), 1),
+                               (1, datetime.date(2016, 4, 4), 10, Decimal(60), 1),
+                               (1, datetime.date(2016, 4, 2), 1, Decimal(80), 1)])
+        record = find_records(days)[1]
+
+        self.assertEqual(record['one_rep_max'], Decimal('80.00'))
+        self.assertEqual(record['one_rep_max_date'], datetime.date(2016, 4, 2))
+        self.assertEqual(record['max_weight_date'], datetime.date(2016, 4, 2))
+        self.assertEqual(record['max_tonnage'], Decimal('600.00'))
+        self.assertEqual(record['max_tonnage_date'], datetime.date(2016, 4, 4))
+
+        # Without weight there are no dates
+        record = find_records(summarize_logs([(2, datetime.date(2016, 4, 4), 10, 0, 1)]))[2]
+        self.assertEqual(record['max_weight'], 0)
+        self.assertIsNone(record['max_weight_date'])
+
+
+class ExerciseVolumeTestCase(WorkoutManagerTestCase):
+    '''
+    Test that the volume and the records are updated when the logs change
+    '''
+
+    def add_log(self, weight, reps=5, date=datetime.date(2016, 4, 6), exercise_id=2, **kwargs):
+        '''
+        Helper function that adds a log for user 'test'
+        '''
+        kwargs.setdefault('workout_id', 3)
+        return WorkoutLog.objects.create(user=User.objects.get(username='test'),
+                                         exercise_id=exercise_id,
+                                         reps=reps,
+                                         weight=weight,
+                                         date=date,
+                                         **kwargs)
+
+    def get_volume(self, period, date, exercise_id=2):
+        '''
+        Helper function that returns an entry of user 'test', None if there is none
+        '''
+        return ExerciseVolume.objects.filter(user__username='test',
+                                             exercise_id=exercise_id,
+                                             period=period,
+                                             date=date).first()
+
+    def get_record(self, exercise_id=2):
+        '''
+        Helper function that returns a record of user 'test'
+        '''
+        return ExerciseRecord.objects.filter(user__username='test',
+                                             exercise_id=exercise_id).first()
+
+    def test_fixture_log(self):
+        '''
+        Test that the log of the fixture is summed up
+        '''
+        day = self.get_volume(ExerciseVolume.PERIOD_DAY, datetime.date(2012, 11, 1))
+        self.assertEqual(day.sets, 1)
+        self.assertEqual(day.tonnage, Decimal('240.00'))
+        self.assertEqual(day.one_rep_max, Decimal('38.00'))
+        self.assertTrue(self.get_volume(ExerciseVolume.PERIOD_WEEK, datetime.date(2012, 10, 29)))
+
+        record = self.get_record()
+        self.assertEqual(record.max_weight, Decimal('30.00'))
+        self.assertEqual(record.max_weight_date, datetime.date(2012, 11, 1))
+
+    def test_add_logs(self):
+        '''
+        Test that new logs update the day, the week and the records
+        '''
+        self.add_log(40)
+        self.add_log(Decimal('44.1'), weight_unit_id=2)
+        self.add_log(50, date=datetime.date(2016, 4, 8))
+
+        day = self.get_volume(ExerciseVolume.PERIOD_DAY, datetime.date(2016, 4, 6))
+        self.assertEqual(day.sets, 2)
+        self.assertEqual(day.reps, 10)
+        self.assertEqual(day.tonnage, Decimal('300.02'))
+        self.assertEqual(day.max_weight, Decimal('40.00'))
+
+        week = self.get_volume(ExerciseVolume.PERIOD_WEEK, datetime.date(2016, 4, 4))
+        self.assertEqual(week.sets, 3)
+        self.assertEqual(week.tonnage, Decimal('550.02'))
+        self.assertEqual(week.one_rep_max, Decimal('58.33'))
+
+        record = self.get_record()
+        self.assertEqual(record.one_rep_max, Decimal('58.33'))
+        self.assertEqual(record.one_rep_max_date, datetime.date(2016, 4, 8))
+        self.assertEqual(record.max_tonnage, Decimal('300.02'))
+        self.assertEqual(record.max_tonnage_date, datetime.date(2016, 4, 6))
+
+    def test_add_log_queries(self):
+        '''
+        Test that a new log is added to the existing entries without summing
+        up the day again
+        '''
+        self.add_log(40)
+
+        # Inserting the log, the last activity, the month, the day and week,
+        # reading the day and the record and saving the new record
+        with self.assertNumQueries(12):
+            self.add_log(45, reps=3)
+
+        # The same values as when summing up everything
+        user = User.objects.get(username='test')
+        fields = ('exercise_id', 'period', 'date') + ExerciseVolume.objects.summary_fields
+        entries = list(ExerciseVolume.objects.filter(user=user)
+                       .order_by('exercise_id', 'period', 'date').values_list(*fields))
+        records = list(ExerciseRecord.objects.filter(user=user)
+                       .order_by('exercise_id').values_list())
+        ExerciseVolume.objects.rebuild(user)
+        self.assertEqual(entries, list(ExerciseVolume.objects.filter(user=user)
+                                       .order_by('exercise_id', 'period', 'date')
+                                       .values_list(*fields)))
+        self.assertEqual([i[1:] for i in records],
+                         [i[1:] for i in ExerciseRecord.objects.filter(user=user)
+                          .order_by('exercise_id').values_list()])
+        self.assertEqual(self.get_volume(ExerciseVolume.PERIOD_DAY,
+                                         datetime.date(2016, 4, 6)).max_weight, Decimal('45'))
+        self.assertEqual(WorkoutActivityMonth.objects.get(user=user,
+                                                          month=datetime.date(2016, 4, 1)).logs, 2)
+
+    def test_other_units(self):
+        '''
+        Test that logs without repetitions or weight are not counted
+        '''
+        self.add_log(40, repetition_unit_id=3)
+        self.add_log(40, weight_unit_id=3)
+        self.assertIsNone(self.get_volume(ExerciseVolume.PERIOD_DAY, datetime.date(2016, 4, 6)))
+        self.assertEqual(self.get_record().max_weight, Decimal('30.00'))
+
+    def test_edit_log(self):
+        '''
+        Test that the old day and exercise are updated when editing a log
+        '''
+        log = self.add_log(40)
+        log.date = datetime.date(2016, 5, 2)
+        log.exercise_id = 1
+        log.save()
+
+        self.assertIsNone(self.get_volume(ExerciseVolume.PERIOD_DAY, datetime.date(2016, 4, 6)))
+        self.assertIsNone(self.get_volume(ExerciseVolume.PERIOD_WEEK, datetime.date(2016, 4, 4)))
+        self.assertEqual(self.get_record().max_weight, Decimal('30.00'))
+        self.assertEqual(self.get_volume(ExerciseVolume.PERIOD_DAY,
+                                         datetime.date(2016, 5, 2),
+                                         exercise_id=1).sets, 1)
+        self.assertEqual(self.get_record(exercise_id=1).max_weight_date, datetime.date(2016, 5, 2))
+
+    def test_delete_record(self):
+        '''
+        Test that deleting the log of a record searches the other days again
+        '''
+        self.add_log(35, date=datetime.date(2016, 4, 1))
+        log = self.add_log(40)
+        self.assertEqual(self.get_record().max_weight, Decimal('40.00'))
+
+        log.delete()
+        record = self.get_record()
+        self.assertEqual(record.max_weight, Decimal('35.00'))
+        self.assertEqual(record.max_weight_date, datetime.date(2016, 4, 1))
+
+        WorkoutLog.objects.filter(user__username='test').delete()
+        self.assertFalse(ExerciseVolume.objects.filter(user__username='test').exists())
+        self.assertIsNone(self.get_record())
+
+    def test_update_days_queries(self):
+        '''
+        Test that the number of queries doesn't depend on the number of days
+        '''
+        user = User.objects.get(username='test')
+        dates = [datetime.date(2016, 4, 1) + datetime.timedelta(days=i) for i in range(20)]
+        WorkoutLog.objects.bulk_create([WorkoutLog(user=user,
+                                                   workout_id=3,
+                                                   exercise_id=exercise_id,
+                                                   reps=5,
+                                                   weight=40,
+                                                   date=date)
+                                        for date in dates for exercise_id in (1, 2)])
+
+        # Reading the logs, the days and the weeks, saving the new days and
+        # weeks, reading the records and the days of the new one, saving the
+        # changed record and the new one
+        with self.assertNumQueries(10):
+            ExerciseVolume.objects.update_days(user.pk, [(exercise_id, date)
+                                                         for date in dates
+                                                         for exercise_id in (1, 2)])
+
+        self.assertEqual(ExerciseVolume.objects.filter(user=user,
+                                                       period=ExerciseVolume.PERIOD_DAY,
+                                                       date__gte=dates[0]).count(), 40)
+        self.assertEqual(ExerciseVolume.objects.filter(user=user,
+                                                       period=ExerciseVolume.PERIOD_WEEK,
+                                                       date__gte=datetime.date(2016, 3, 28))
+                         .count(), 8)
+        self.assertEqual(self.get_record().max_weight_date, dates[0])
+
+    def test_delete_workout(self):
+        '''
+        Test that deleting a workout updates the summaries once for all logs
+        '''
+        user = User.objects.get(username='test')
+        workout = Workout.objects.create(user=user)
+        dates = [datetime.date(2016, 4, 1) + datetime.timedelta(days=i) for i in range(10)]
+        WorkoutLog.objects.bulk_create([WorkoutLog(user=user,
+                                                   workout=workout,
+                                                   exercise_id=exercise_id,
+                                                   reps=5,
+                                                   weight=50,
+                                                   date=date)
+                                        for date in dates
+                                        for exercise_id in (1, 2)
+                                        for i in range(3)])
+        WorkoutSession.objects.create(user=user, workout=workout, date=dates[0])
+        ExerciseVolume.objects.rebuild(user)
+        WorkoutActivityMonth.objects.update_month(user.pk, dates[0])
+        self.assertEqual(self.get_record().max_weight, Decimal('50.00'))
+
+        # Reading the days and sessions, deleting the workout with its days,
+        # logs, sessions and schedule steps, updating the month and the
+        # volume. The logs are not loaded one by one.
+        with self.assertNumQueries(22):
+            workout.delete()
+
+        self.assertFalse(ExerciseVolume.objects.filter(user=user, date__gte=dates[0]).exists())
+        self.assertFalse(WorkoutActivityMonth.objects.filter(user=user,
+                                                             month=dates[0]).exists())
+        self.assertEqual(self.get_record().max_weight_date, datetime.date(2012, 11, 1))
+
+    def test_delete_workout_queryset(self):
+        '''
+        Test that deleting workouts with a queryset updates the summaries
+        '''
+        workout = Workout.objects.create(user=User.objects.get(username='test'))
+        self.add_log(50, workout_id=workout.pk)
+        self.assertEqual(self.get_record().max_weight, Decimal('50.00'))
+
+        Workout.objects.filter(pk=workout.pk).delete()
+        self.assertIsNone(self.get_volume(ExerciseVolume.PERIOD_DAY, datetime.date(2016, 4, 6)))
+        self.assertFalse(WorkoutActivityMonth.objects.filter(user__username='test',
+                                                             month=datetime.date(2016, 4, 1))
+                         .exists())
+        self.assertEqual(self.get_record().max_weight, Decimal('30.00'))
+
+    def test_delete_exercise(self):
+        '''
+        Test that deleting an exercise updates the activity index of its logs
+        '''
+        Exercise.objects.get(pk=1).delete()
+        user = User.objects.get(username='admin')
+        for entry in WorkoutActivityMonth.objects.filter(user=user):
+            next_month = (entry.month + datetime.timedelta(days=31)).replace(day=1)
+            logs = WorkoutLog.objects.filter(user=user,
+                                             date__gte=entry.month,
+                                             date__lt=next_month).count()
+            self.assertEqual(entry.logs, logs)
+            self.assertTrue(entry.logs or entry.sessions)
+        self.assertEqual(sum(WorkoutActivityMonth.objects.filter(user=user)
+                             .values_list('logs', flat=True)),
+                         WorkoutLog.objects.filter(user=user).count())
+
+    def test_rebuild(self):
+        '''
+        Test that summing up everything again gives the same entries
+        '''
+        self.add_log(40)
+        self.add_log(50, reps=3, date=datetime.date(2016, 4, 20))
+        self.add_log(20, exercise_id=1)
+        user = User.objects.get(username='test')
+
+        fields = ('exercise_id', 'period', 'date', 'sets', 'reps', 'tonnage', 'max_weight',
+                  'one_rep_max')
+        volume = list(ExerciseVolume.objects.filter(user=user).values_list(*fields))
+        records = list(ExerciseRecord.objects.filter(user=user).order_by('exercise')
+                       .values_list('exercise_id', 'one_rep_max_date', 'max_tonnage'))
+
+        ExerciseVolume.objects.rebuild(user)
+        self.assertEqual(sorted(ExerciseVolume.objects.filter(user=user).values_list(*fields)),
+                         sorted(volume))
+        self.assertEqual(list(ExerciseRecord.objects.filter(user=user).order_by('exercise')
+                              .values_list('exercise_id', 'one_rep_max_date', 'max_tonnage')),
+                         records)
+
+    def test_delete_user(self):
+        '''
+        Test that users with logs can be deleted
+        '''
+        self.add_log(40)
+        User.objects.get(username='test').delete()
+        self.assertFalse(ExerciseVolume.objects.filter(user__username='test').exists())
+
+
+class ExerciseVolumeApiTestCase(WorkoutManagerTestCase):
+    '''
+    Test the read only API endpoints of the volume and the records
+    '''
+    client_class = APIClient
+
+    def test_volume(self):
+        '''
+        Test listing the volume of the own logs
+        '''
+        self.user_login('admin')
+        response = self.client.get(reverse('exercisevolume-list'),
+                                   {'exercise': 1, 'period': 'w', 'ordering': '-date'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([i['date'] for i in response.data['results']],
+                         ['2013-10-28', '2012-10-29', '2012-10-08', '2012-10-01'])
+        self.assertEqual(response.data['results'][0]['tonnage'], '304.00')
+        self.assertNotIn('user', response.data['results'][0])
+
+        self.user_login('test')
+        response = self.client.get(reverse('exercisevolume-list'), {'exercise': 1})
+        self.assertEqual(response.data['results'], [])
+
+    def test_records(self):
+        '''
+        Test listing the own personal records
+        '''
+        self.user_login('test')
+        response = self.client.get(reverse('exerciserecord-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['exercise'], 2)
+        self.assertEqual(response.data['results'][0]['one_rep_max'], '38.00')
+
+        record = ExerciseRecord.objects.get(user__username='admin')
+        response = self.client.get(reverse('exerciserecord-detail', kwargs={'pk': record.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_only(self):
+        '''
+        Test that the entries can't be changed
+        '''
+        self.user_login('test')
+        response = self.client.post(reverse('exerciserecord-list'), {'exercise': 1})
+        self.assertEqual(response.status_code, 405)
+
+    def test_logged_out(self):
+        '''
+        Test that the entries are private
+        '''
+        response = self.client.get(reverse('exercisevolume-list'))
+        self.assertEqual(response.status_code, 403)
+
+
+class ExerciseVolumePageTestCase(WorkoutManagerTestCase):
+    '''
+    Test the records and volume shown on the exercise and workout log pages
+    '''
+
+    def test_exercise_page(self):
+        '''
+        Test the records and the weekly volume on the exercise page
+        '''
+        self.user_login('admin')
+        response = self.client.get(reverse('exercise:exercise:view', kwargs={'id': 1}))
+        self.assertEqual(response.context['record'].max_weight, Decimal('38.00'))
+        self.assertEqual([i.date for i in response.context['weekly_volume']][:2],
+                         [datetime.date(2013, 10, 28), datetime.date(2012, 10, 29)])
+        self.assertContains(response, 'Personal records')
+
+        self.user_login('test')
+        response = self.client.get(reverse('exercise:exercise:view', kwargs={'id': 1}))
+        self.assertIsNone(response.context['record'])
+        self.assertNotContains(response, 'Personal records')
+
+    def test_workout_log_page(self):
+        '''
+        Test the records on the workout log page
+        '''
+        self.user_login('admin')
+        response = self.client.get(reverse('manager:log:log', kwargs={'pk': 1}))
+        record = response.context['workout_log'][1][1]['record']
+        self.assertEqual(record.one_rep_max, Decimal('48.13'))
+        self.assertIsNone(response.context['workout_log'][2][2]['record'])
+        self.assertContains(response, '48.13')
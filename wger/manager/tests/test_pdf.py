@@ -13,9 +13,14 @@
 # You should have received a copy of the GNU Affero General Public License
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from mock import patch
 
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import ExerciseImage
+from wger.manager.helpers import get_main_images
+from wger.manager.models import Day, Workout
 from wger.utils.helpers import make_token
+from wger.utils.pdf_cache import pdf_cache
 
 
 class WorkoutPdfLogExportTestCase(WorkoutManagerTestCase):
@@ -254,3 +259,71 @@ class WorkoutPdfTableExportTestCase(WorkoutManagerTestCase):
         self.export_pdf(fail=True)
         self.export_pdf_token()
         self.export_pdf_token_wrong()
+
+
+class WorkoutPdfCacheTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the cache for the generated PDFs
+    '''
+
+    def get_cached_files(self):
+        '''
+        Helper function returning the names of the cached files
+        '''
+        return sorted(i for i, path in pdf_cache._list_files())
+
+    def test_cache(self):
+        '''
+        Test that the PDFs are only generated once
+        '''
+        self.user_login('test')
+        url = reverse('manager:workout:pdf-log', kwargs={'id': 3})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.get_cached_files()), 1)
+
+        with patch('wger.manager.pdf.build_workout_pdf') as mock_build:
+            response2 = self.client.get(url)
+            self.assertFalse(mock_build.called)
+        self.assertEqual(response.content, response2.content)
+        self.assertEqual(response2['Content-Disposition'],
+                         'attachment; filename=Workout-3-log.pdf')
+
+        # Different options are cached separately
+        self.client.get(reverse('manager:workout:pdf-log', kwargs={'id': 3,
+                                                                   'images': 1,
+                                                                   'comments': 1}))
+        self.client.get(reverse('manager:workout:pdf-table', kwargs={'id': 3}))
+        self.assertEqual(len(self.get_cached_files()), 3)
+
+    def test_changed_workout(self):
+        '''
+        Test that the PDFs are built again when the workout changes
+        '''
+        self.user_login('test')
+        url = reverse('manager:workout:pdf-log', kwargs={'id': 3})
+        response = self.client.get(url)
+        self.assertEqual(len(self.get_cached_files()), 1)
+
+        day = Day.objects.get(pk=5)
+        day.description = 'A new description'
+        day.save()
+        response2 = self.client.get(url)
+        self.assertNotEqual(response.content, response2.content)
+        self.assertEqual(len(self.get_cached_files()), 2)
+
+        with patch('wger.manager.pdf.build_workout_pdf') as mock_build:
+            self.assertEqual(self.client.get(url).content, response2.content)
+            self.assertFalse(mock_build.called)
+
+    def test_main_images(self):
+        '''
+        Test that the main images of the exercises are part of the key
+        '''
+        day_list = Workout.objects.get(pk=3).canonical_representation['day_list']
+        self.assertEqual(get_main_images(day_list), [])
+
+        ExerciseImage.objects.filter(pk=3).update(is_main=True,
+                                                  status=ExerciseImage.STATUS_ACCEPTED)
+        image = ExerciseImage.objects.get(pk=3)
+        self.assertEqual(get_main_images(day_list), [(2, image.image.name)])
@@ -481,6 +481,37 @@ class ScheduleModelTestCase(WorkoutManagerTestCase):
         self.assertTrue(
             schedule.get_current_scheduled_workout().workout, workout)
 
+    def test_get_current_workouts(self):
+        '''
+        Test that the current workouts of several users are the same as the
+        ones of get_current_workout()
+        '''
+        user = User.objects.get(pk=2)
+        self.delete_objects(user)
+        schedule = self.create_schedule(user)
+        workout = self.create_workout(user)
+        ScheduleStep.objects.create(schedule=schedule, workout=workout, duration=3)
+
+        # User 1 has a schedule with steps, user 3 has nothing
+        schedule = Schedule.objects.get(pk=2)
+        schedule.is_active = True
+        schedule.save()
+
+        # User 4 has an older workout and one from today
+        Workout.objects.create(user_id=4)
+        Workout.objects.filter(user_id=4).update(creation_date=datetime.date(2015, 1, 1))
+        latest = Workout.objects.create(user_id=4)
+
+        with self.assertNumQueries(3):
+            current_workouts = Schedule.objects.get_current_workouts(User.objects.all())
+
+        self.assertEqual(current_workouts[2], (workout, Schedule.objects.get(user=user)))
+        self.assertEqual(current_workouts[4], (latest, False))
+        self.assertNotIn(3, current_workouts)
+        for user in User.objects.all():
+            self.assertEqual(current_workouts.get(user.pk, (False, False)),
+                             Schedule.objects.get_current_workout(user))
+
 
 class SchedulePdfExportTestCase(WorkoutManagerTestCase):
     '''
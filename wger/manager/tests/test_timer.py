@@ -23,6 +23,7 @@ from django.core.urlresolvers import reverse
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
 from wger.exercises.models import Exercise
 from wger.manager.models import Workout
+from wger.manager.models import WorkoutLog
 from wger.manager.models import WorkoutSession
 
 logger = logging.getLogger(__name__)
@@ -51,6 +52,33 @@ class WorkoutTimerTestCase(WorkoutManagerTestCase):
         current_step = step_list.pop()
         self.assertEqual(current_step['weight'], '')
 
+    def test_timer_last_weight(self):
+        '''
+        Test that the weight of the user's last log is used and updated
+        '''
+        user = User.objects.get(username='test')
+        for username, weight, day in (('test', 40, 1), ('test', 42, 2), ('admin', 80, 3)):
+            WorkoutLog.objects.create(user=User.objects.get(username=username),
+                                      workout=Workout.objects.get(pk=3),
+                                      exercise=Exercise.objects.get(pk=2),
+                                      reps=10,
+                                      weight=weight,
+                                      date=datetime.date(2016, 5, day))
+
+        self.user_login('test')
+        url = reverse('manager:workout:timer', kwargs={'day_pk': 5})
+        response = self.client.get(url)
+        self.assertEqual(response.context['step_list'][0]['weight'], Decimal(42))
+
+        WorkoutLog.objects.create(user=user,
+                                  workout=Workout.objects.get(pk=3),
+                                  exercise=Exercise.objects.get(pk=2),
+                                  reps=10,
+                                  weight=45,
+                                  date=datetime.date(2016, 5, 4))
+        response = self.client.get(url)
+        self.assertEqual(response.context['step_list'][0]['weight'], Decimal(45))
+
     def timer(self, fail=True, pause_active=True, pause_seconds=90):
         '''
         Helper function
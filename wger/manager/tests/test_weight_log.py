@@ -13,20 +13,28 @@
 # You should have received a copy of the GNU Affero General Public License
 
 import datetime
+import json
 import logging
 
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.core.urlresolvers import reverse, reverse_lazy
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
 from wger.core.tests import api_base_test
 from wger.core.tests.base_testcase import WorkoutManagerDeleteTestCase
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
 from wger.exercises.models import Exercise
+from wger.manager.models import Set
 from wger.manager.models import Workout
 from wger.manager.models import WorkoutLog
 from wger.manager.models import WorkoutSession
+from wger.manager.views.log import WorkoutLogDetailView
 from wger.utils.cache import cache_mapper
+from wger.weight.helpers import LogEntry, process_log_entries
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +101,117 @@ class WeightLogAccessTestCase(WorkoutManagerTestCase):
         self.assertEqual(response.status_code, 403)
 
 
+class WeightLogOverviewTestCase(WorkoutManagerTestCase):
+    '''
+    Test the logs prepared for the overview of a workout's log
+    '''
+
+    def setUp(self):
+        super(WeightLogOverviewTestCase, self).setUp()
+        user = User.objects.get(username='admin')
+        workout = Workout.objects.get(pk=1)
+        for exercise, reps, weight, repetition_unit in ((1, 10, 20, 1),
+                                                        (1, 10, 25, 1),
+                                                        (1, 8, 30, 1),
+                                                        (2, 12, 15, 1),
+                                                        (2, 1, 60, 2)):
+            WorkoutLog.objects.create(user=user,
+                                      workout=workout,
+                                      exercise_id=exercise,
+                                      reps=reps,
+                                      weight=weight,
+                                      repetition_unit_id=repetition_unit,
+                                      date=datetime.date(2016, 5, 1))
+
+    def get_view(self):
+        '''
+        Helper function that returns the view of the log overview of workout 1
+        '''
+        request = RequestFactory().get(reverse('manager:log:log', kwargs={'pk': 1}))
+        request.user = User.objects.get(username='admin')
+        view = WorkoutLogDetailView(request=request, kwargs={'pk': 1})
+        view.owner_user = request.user
+        view.object = Workout.objects.get(pk=1)
+        return view
+
+    def test_logs(self):
+        '''
+        Test that the logs are the same as processing each exercise on its own
+        '''
+        workout_log = self.get_view().get_context_data()['workout_log']
+        self.assertEqual(sorted(workout_log), [1, 2, 4])
+        self.assertEqual(workout_log[4], {})
+
+        for day_id, exercise_id in ((1, 1), (2, 2)):
+            logs = WorkoutLog.objects.filter(user__username='admin',
+                                             weight_unit__in=(1, 2),
+                                             workout_id=1,
+                                             exercise_id=exercise_id) \
+                .exclude(repetition_unit_id__in=(2, 3, 4, 5, 6, 7, 8))
+            entry_log, chart_data = process_log_entries(logs)
+            self.assertTrue(entry_log)
+            self.assertEqual(workout_log[day_id][exercise_id]['log_by_date'], entry_log)
+            self.assertEqual(workout_log[day_id][exercise_id]['chart_data'], chart_data)
+
+    def test_exercise_without_logs(self):
+        '''
+        Test that exercises without logs get an empty entry
+        '''
+        WorkoutLog.objects.filter(exercise_id=2).delete()
+        exercise_log = self.get_view().get_context_data()['workout_log'][2][2]
+        self.assertFalse(exercise_log['log_by_date'])
+        self.assertEqual(exercise_log['chart_data'], '[]')
+
+    def test_queries(self):
+        '''
+        Test that the logs and the records of all exercises are read with one query each
+        '''
+        view = self.get_view()
+        view.object.canonical_representation
+        with self.assertNumQueries(2):
+            view.get_context_data()
+
+
+class ProcessLogEntriesTestCase(WorkoutManagerTestCase):
+    '''
+    Test preparing the logs for the tables and charts
+    '''
+
+    def test_chart_data(self):
+        '''
+        Test that only the highest weight per day and repetitions is charted
+        '''
+        WorkoutLog.objects.create(user_id=1, workout_id=1, exercise_id=1, reps=8, weight=20,
+                                  date=datetime.date(2012, 10, 1))
+        WorkoutLog.objects.create(user_id=1, workout_id=1, exercise_id=1, reps=5, weight=40,
+                                  date=datetime.date(2012, 10, 1))
+        logs = WorkoutLog.objects.filter(user_id=1, exercise_id=1)
+
+        entry_log, chart_data = process_log_entries(logs)
+        self.assertEqual(len(entry_log[datetime.date(2012, 10, 1)]), 3)
+        self.assertEqual(entry_log[datetime.date(2012, 10, 1)][0],
+                         LogEntry(1, datetime.date(2012, 10, 1), 5, 40))
+        self.assertEqual(json.loads(chart_data),
+                         [[{'date': '2012-10-01', 'weight': 40.0, 'reps': 5}],
+                          [{'date': '2012-10-01', 'weight': 30.0, 'reps': 8},
+                           {'date': '2012-10-10', 'weight': 32.0, 'reps': 8},
+                           {'date': '2012-11-01', 'weight': 30.0, 'reps': 8},
+                           {'date': '2013-10-30', 'weight': 38.0, 'reps': 8}]])
+
+        # Lists of logs are processed the same way
+        self.assertEqual(process_log_entries(list(logs))[1], chart_data)
+
+    def test_downsampling(self):
+        '''
+        Test downsampling the chart of each repetition
+        '''
+        entry_log, chart_data = process_log_entries(WorkoutLog.objects.filter(user_id=1),
+                                                    points=3)
+        self.assertEqual(len(entry_log), 4)
+        self.assertEqual([i['date'] for i in json.loads(chart_data)[0]],
+                         ['2012-10-01', '2012-10-10', '2013-10-30'])
+
+
 class CalendarShareButtonTestCase(WorkoutManagerTestCase):
     '''
     Test that the share button is correctly displayed and hidden
@@ -237,6 +356,100 @@ class WeightLogOverviewAddTestCase(WorkoutManagerTestCase):
         self.add_weight_log(fail=True)
 
 
+class WorkoutLogAddSessionLogsTestCase(WorkoutManagerTestCase):
+    '''
+    Test saving the logs of a workout day together with the session
+    '''
+
+    def add_logs(self, amount, date=datetime.date(2016, 6, 1)):
+        '''
+        Helper function that logs the given number of sets for user 'admin'
+        '''
+        logs = [WorkoutLog(exercise_id=1, repetition_unit_id=1, weight_unit_id=1, reps=10,
+                           weight=i) for i in range(amount)]
+        return WorkoutLog.objects.add_session_logs(User.objects.get(username='admin'),
+                                                   Workout.objects.get(pk=1),
+                                                   date,
+                                                   logs,
+                                                   {'notes': 'Good day', 'impression': '3'})
+
+    def test_add_logs(self):
+        '''
+        Test that the logs and a new session are saved
+        '''
+        log_hash = hash((1, 2016, 6, 1))
+        cache.set(cache_mapper.get_workout_log_list(log_hash), 'foo')
+
+        session = self.add_logs(3)
+        self.assertEqual(session.workout_id, 1)
+        self.assertEqual(session.notes, 'Good day')
+
+        logs = WorkoutLog.objects.filter(date=datetime.date(2016, 6, 1)).order_by('weight')
+        self.assertEqual([(i.user_id, i.workout_id, i.weight) for i in logs],
+                         [(1, 1, 0), (1, 1, 1), (1, 1, 2)])
+        self.assertFalse(cache.get(cache_mapper.get_workout_log_list(log_hash)))
+        self.assertEqual(User.objects.get(username='admin').usercache.last_activity,
+                         datetime.date(2016, 6, 1))
+
+    def test_update_session(self):
+        '''
+        Test that an existing session of the date is updated
+        '''
+        self.add_logs(1)
+        session = self.add_logs(2)
+        self.assertEqual(WorkoutSession.objects.filter(user__username='admin',
+                                                       date=datetime.date(2016, 6, 1)).count(), 1)
+        self.assertEqual(WorkoutSession.objects.get(pk=session.pk).impression, '3')
+        self.assertEqual(WorkoutLog.objects.filter(date=datetime.date(2016, 6, 1)).count(), 3)
+
+    def test_queries(self):
+        '''
+        Test that the number of queries doesn't depend on the number of logs
+        '''
+        with CaptureQueriesContext(connection) as queries:
+            self.add_logs(2)
+
+        # The tonnage of the 20 sets is a new personal record, which is saved
+        with self.assertNumQueries(len(queries) + 1):
+            self.add_logs(20, date=datetime.date(2016, 7, 1))
+
+    def post_logs(self, amount, date):
+        '''
+        Helper function that logs the given number of sets on the log page of day 1
+        '''
+        data = {'date': date,
+                'impression': '3',
+                'form-TOTAL_FORMS': 20,
+                'form-INITIAL_FORMS': 0,
+                'form-MAX-NUM_FORMS': 20}
+        for i in range(amount):
+            data.update({'form-{0}-reps'.format(i): 10,
+                         'form-{0}-repetition_unit'.format(i): 1,
+                         'form-{0}-weight'.format(i): 0,
+                         'form-{0}-weight_unit'.format(i): 1})
+        response = self.client.post(reverse('manager:day:log', kwargs={'pk': 1}), data)
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_queries(self):
+        '''
+        Test that the number of queries of the log page doesn't depend on the
+        number of logged sets
+        '''
+        Set.objects.filter(pk=1).update(sets=20)
+        self.user_login('admin')
+        self.post_logs(1, datetime.date(2016, 5, 1))
+
+        # Without weight there are no personal records, which would be saved
+        # in a different number of queries
+        with CaptureQueriesContext(connection) as queries:
+            self.post_logs(2, datetime.date(2016, 6, 1))
+        with self.assertNumQueries(len(queries)):
+            self.post_logs(20, datetime.date(2016, 7, 1))
+
+        self.assertEqual(WorkoutLog.objects.filter(date=datetime.date(2016, 7, 1),
+                                                   exercise_id=1).count(), 20)
+
+
 class WeightlogTestCase(WorkoutManagerTestCase):
     '''
     Tests other model methods
@@ -528,3 +741,184 @@ class WorkoutLogApiTestCase(api_base_test.ApiBaseResourceTestCase):
             "weight_unit": 2,
             "weight": 2,
             "date": datetime.date.today()}
+
+
+class WorkoutLogBulkApiTestCase(WorkoutManagerTestCase):
+    '''
+    Tests creating and updating several workout logs at once
+    '''
+
+    client_class = APIClient
+    url = '/api/v2/workoutlog/bulk/'
+
+    def get_logs(self, workout=3):
+        '''
+        Helper function that returns the logs of a whole session
+        '''
+        return [{'workout': workout,
+                 'exercise': (81, 84, 91)[i % 3],
+                 'reps': 10 - i,
+                 'weight': '{0}.5'.format(50 + i),
+                 'date': '2016-04-01'} for i in range(6)]
+
+    def test_create(self):
+        '''
+        Test creating the logs of a session with a constant number of queries
+        '''
+        self.user_login('test')
+        user = User.objects.get(username='test')
+        log_hash = hash((user.pk, 2016, 4))
+        cache.set(cache_mapper.get_workout_log_list(log_hash), 'cached')
+        count_before = WorkoutLog.objects.count()
+
+        with self.assertNumQueries(29):
+            response = self.client.post(self.url, self.get_logs(), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(WorkoutLog.objects.count(), count_before + 6)
+
+        # The returned objects have the IDs of the new logs
+        self.assertEqual([i['reps'] for i in response.data], [10, 9, 8, 7, 6, 5])
+        for entry in response.data:
+            log = WorkoutLog.objects.get(pk=entry['id'])
+            self.assertEqual(log.user, user)
+            self.assertEqual(log.reps, entry['reps'])
+
+        self.assertFalse(cache.get(cache_mapper.get_workout_log_list(log_hash)))
+        self.assertEqual(User.objects.get(pk=user.pk).usercache.last_activity,
+                         datetime.date(2016, 4, 1))
+
+    def test_create_other_workout(self):
+        '''
+        Test that logs can't be added to the workouts of other users
+        '''
+        self.user_login('test')
+        count_before = WorkoutLog.objects.count()
+        data = self.get_logs()
+        data[2]['workout'] = 1
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('workout', response.data[2])
+        self.assertEqual(WorkoutLog.objects.count(), count_before)
+
+    def test_update(self):
+        '''
+        Test updating several logs
+        '''
+        self.user_login('test')
+        response = self.client.post(self.url, self.get_logs(), format='json')
+        data = [{'id': i['id'], 'reps': 20, 'date': '2016-04-02'} for i in response.data[:3]]
+
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        for entry in data:
+            log = WorkoutLog.objects.get(pk=entry['id'])
+            self.assertEqual(log.reps, 20)
+            self.assertEqual(log.date, datetime.date(2016, 4, 2))
+            self.assertEqual(log.workout_id, 3)
+
+        # Other users' logs can't be changed
+        data = [{'id': WorkoutLog.objects.filter(user__username='admin').first().pk,
+                 'reps': 1}]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid(self):
+        '''
+        Test that the data must be a list of valid objects
+        '''
+        self.user_login('test')
+        response = self.client.post(self.url, {'workout': 3}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        data = self.get_logs()
+        data[0]['exercise'] = 'abc'
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        self.user_logout()
+        response = self.client.post(self.url, self.get_logs(), format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class WorkoutLogLastWeightsTestCase(WorkoutManagerTestCase):
+    '''
+    Test reading the weights last logged per exercise and repetitions
+    '''
+    client_class = APIClient
+
+    def setUp(self):
+        super(WorkoutLogLastWeightsTestCase, self).setUp()
+        self.user = User.objects.get(username='test')
+        for exercise, reps, weight, day in ((1, 10, 20, 1),
+                                            (1, 10, 25, 2),
+                                            (1, 8, 30, 1),
+                                            (2, 10, 15, 3)):
+            WorkoutLog.objects.create(user=self.user,
+                                      workout_id=3,
+                                      exercise_id=exercise,
+                                      reps=reps,
+                                      weight=weight,
+                                      date=datetime.date(2016, 5, day))
+
+    def test_last_weights(self):
+        '''
+        Test that the last weights are read with two queries and cached
+        '''
+        pairs = ((1, 10), (1, 8), (2, 10), (2, 8), (2, 12), (3, 10))
+        expected = {(1, 10): 25, (1, 8): 30, (2, 10): 15, (2, 8): 30, (2, 12): None, (3, 10): None}
+
+        with self.assertNumQueries(2):
+            self.assertEqual(WorkoutLog.objects.get_last_weights(self.user, pairs), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(WorkoutLog.objects.get_last_weights(self.user, pairs), expected)
+
+        # Other users have their own values
+        self.assertEqual(WorkoutLog.objects.get_last_weights(User.objects.get(username='admin'),
+                                                             ((1, 10), )),
+                         {(1, 10): None})
+
+    def test_cache_reset(self):
+        '''
+        Test that the cached weights are reset when the user's logs change
+        '''
+        WorkoutLog.objects.get_last_weights(self.user, ((1, 10), ))
+        self.assertTrue(cache.get(cache_mapper.get_workout_log_last_weights(self.user)))
+
+        log = WorkoutLog.objects.filter(user=self.user, reps=10, exercise_id=1).last()
+        log.delete()
+        self.assertFalse(cache.get(cache_mapper.get_workout_log_last_weights(self.user)))
+        self.assertEqual(WorkoutLog.objects.get_last_weights(self.user, ((1, 10), )),
+                         {(1, 10): 20})
+
+    def test_cache_size(self):
+        '''
+        Test that only a limited number of pairs is cached
+        '''
+        pairs = [(1, i) for i in range(WorkoutLog.objects.last_weights_cache_size + 10)]
+        last_weights = WorkoutLog.objects.get_last_weights(self.user, pairs)
+        self.assertEqual(len(last_weights), len(pairs))
+        self.assertEqual(last_weights[(1, 8)], 30)
+
+        cached = cache.get(cache_mapper.get_workout_log_last_weights(self.user))
+        self.assertEqual(len(cached), WorkoutLog.objects.last_weights_cache_size)
+
+    def test_api(self):
+        '''
+        Test the API endpoint
+        '''
+        url = reverse('workoutlog-last-weights')
+        self.user_login('test')
+        response = self.client.get(url, {'pairs': '1:10,2:10,2:12'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{'exercise': 1, 'reps': 10, 'weight': '25.00'},
+                                         {'exercise': 2, 'reps': 10, 'weight': '15.00'},
+                                         {'exercise': 2, 'reps': 12, 'weight': None}])
+
+        for pairs in ('', '1', '1:a', '1:2:3'):
+            response = self.client.get(url, {'pairs': pairs})
+            self.assertEqual(response.status_code, 400)
+
+        self.user_logout()
+        response = self.client.get(url, {'pairs': '1:10'})
+        self.assertEqual(response.status_code, 403)
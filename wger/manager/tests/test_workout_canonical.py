@@ -15,6 +15,8 @@
 from decimal import Decimal
 
 from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from rest_framework.test import APIClient
 
 from wger.core.models import (
     DaysOfWeek,
@@ -201,3 +203,103 @@ class WorkoutCacheTestCase(WorkoutManagerTestCase):
 
         workout.delete()
         self.assertFalse(cache.get(cache_mapper.get_workout_canonical(1)))
+
+
+class WorkoutCompactFormTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the compact form of a workout and its API endpoint
+    '''
+    client_class = APIClient
+
+    def get_url(self, pk=3):
+        return reverse('workout-compact-representation', kwargs={'pk': pk})
+
+    def test_compact_form(self):
+        '''
+        Test the workout tree and the deduplicated tables
+        '''
+        compact = Workout.objects.get(pk=1).compact_representation
+
+        self.assertEqual(compact['version'], Workout.COMPACT_REPRESENTATION_VERSION)
+        self.assertEqual(compact['workout'], {'id': 1,
+                                              'comment': 'A test workout',
+                                              'creation_date': '2012-11-01',
+                                              'muscles': {'front': [1],
+                                                          'back': [2],
+                                                          'frontsecondary': [1],
+                                                          'backsecondary': [1]}})
+        self.assertEqual([day['id'] for day in compact['days']], [1, 2, 4])
+        self.assertEqual(compact['days'][1],
+                         {'id': 2,
+                          'description': 'Another day',
+                          'days_of_week': [4],
+                          'sets': [{'id': 2,
+                                    'sets': 4,
+                                    'order': 1,
+                                    'is_superset': False,
+                                    'exercises': [{'exercise': 2,
+                                                   'text': u'4 \xd7 10 (15 kg)',
+                                                   'settings': [{'id': 2,
+                                                                 'reps': 10,
+                                                                 'weight': '15.00',
+                                                                 'repetition_unit': 1,
+                                                                 'weight_unit': 1,
+                                                                 'order': 1,
+                                                                 'comment': ''}]}]}]})
+
+        self.assertEqual([(i['id'], i['muscles'], i['muscles_secondary'])
+                          for i in compact['exercises']],
+                         [(1, [1, 2], [3]), (2, [2], [1, 3])])
+        self.assertEqual([i['id'] for i in compact['muscles']], [1, 2, 3])
+        self.assertEqual(compact['repetition_units'], [{'id': 1, 'name': 'Repetitions'}])
+        self.assertEqual(compact['weight_units'], [{'id': 1, 'name': 'kg'}])
+
+    def test_compact_form_cache(self):
+        '''
+        Test that the compact form is cached and reset with the canonical form
+        '''
+        workout = Workout.objects.get(pk=1)
+        workout.compact_representation
+        self.assertTrue(cache.get(cache_mapper.get_workout_compact(1)))
+
+        with self.assertNumQueries(0):
+            workout.compact_representation
+
+        Setting.objects.get(pk=2).save()
+        self.assertFalse(cache.get(cache_mapper.get_workout_compact(1)))
+
+        # Entries in an older format are not used
+        compact = workout.compact_representation
+        compact['version'] = 0
+        cache.set(cache_mapper.get_workout_compact(1), compact)
+        self.assertEqual(workout.compact_representation['version'],
+                         Workout.COMPACT_REPRESENTATION_VERSION)
+
+    def test_api(self):
+        '''
+        Test the API endpoint
+        '''
+        self.user_login('test')
+        response = self.client.get(self.get_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, Workout.objects.get(pk=3).compact_representation)
+
+        # Only the owner has access
+        response = self.client.get(self.get_url(pk=1))
+        self.assertEqual(response.status_code, 404)
+
+        self.user_logout()
+        response = self.client.get(self.get_url())
+        self.assertEqual(response.status_code, 403)
+
+    def test_api_fields(self):
+        '''
+        Test selecting the parts of the response
+        '''
+        self.user_login('test')
+        response = self.client.get(self.get_url(), {'fields': 'days, exercises'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data), ['days', 'exercises', 'version'])
+
+        response = self.client.get(self.get_url(), {'fields': 'days,foo'})
+        self.assertEqual(response.status_code, 400)
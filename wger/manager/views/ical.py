@@ -18,17 +18,13 @@ import six
 import logging
 import datetime
 
-from icalendar import Calendar
-from icalendar import Event
-from icalendar.tools import UIDGenerator
-
 from django.shortcuts import get_object_or_404
 from django.http import HttpResponse, HttpResponseForbidden
-from django.contrib.sites.models import Site
 
 from wger import get_version
 from wger.manager.models import Workout, Schedule
 from wger.utils.helpers import next_weekday, check_token
+from wger.utils.reference import get_current_site
 
 
 logger = logging.getLogger(__name__)
@@ -54,6 +50,9 @@ def get_calendar():
 
     :return: Calendar
     '''
+    # Only imported when needed, this module is loaded with the URL configuration
+    from icalendar import Calendar
+
     calendar = Calendar()
     calendar.add('prodid', '-//wger Workout Manager//wger.de//')
     calendar.add('version', get_version())
@@ -72,11 +71,13 @@ def get_events_workout(calendar, workout, duration, start_date=None):
     :param start_date: start date, default: profile default
     :return: None
     '''
+    from icalendar import Event
+    from icalendar.tools import UIDGenerator
 
     start_date = start_date if start_date else workout.creation_date
     end_date = start_date + datetime.timedelta(weeks=duration)
     generator = UIDGenerator()
-    site = Site.objects.get_current()
+    site = get_current_site()
 
     for day in workout.canonical_representation['day_list']:
 
@@ -25,7 +25,7 @@ from django.http import HttpResponseRedirect, HttpResponseForbidden
 from django.template.context_processors import csrf
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.utils.translation import ugettext_lazy, ugettext as _
-from django.forms.models import modelformset_factory
+from django.forms import formset_factory
 from django.views.generic import (
     UpdateView,
     DetailView,
@@ -34,7 +34,9 @@ from django.views.generic import (
 
 from wger.manager.helpers import WorkoutCalendar
 from wger.manager.models import (
+    ExerciseRecord,
     Workout,
+    WorkoutActivityMonth,
     WorkoutSession,
     Day,
     WorkoutLog,
@@ -43,6 +45,7 @@ from wger.manager.models import (
 from wger.manager.forms import (
     HelperDateForm,
     HelperWorkoutSessionForm,
+    WorkoutLogDayForm,
     WorkoutLogForm
 )
 from wger.utils.generic_views import (
@@ -50,7 +53,12 @@ from wger.utils.generic_views import (
     WgerDeleteMixin
 )
 from wger.utils.helpers import check_access
-from wger.weight.helpers import process_log_entries, group_log_entries
+from wger.utils.reference import get_repetition_units, get_weight_units
+from wger.weight.helpers import (
+    group_log_entries,
+    process_log_entries,
+    process_log_entries_by_exercise
+)
 
 
 logger = logging.getLogger(__name__)
@@ -134,11 +142,13 @@ def add(request, pk):
             for id in form_id_range:
                 form_to_exercise[id] = exercise
 
-    # Define the formset here because now we know the value to pass to 'extra'
-    WorkoutLogFormSet = modelformset_factory(WorkoutLog,
-                                             form=WorkoutLogForm,
-                                             exclude=('date', 'workout'),
-                                             extra=total_sets)
+    # Define the formset here because now we know the value to pass to 'extra'.
+    # The exercises and units are passed to all forms, so that validating them
+    # doesn't need a query per set
+    WorkoutLogFormSet = formset_factory(WorkoutLogDayForm, extra=total_sets)
+    form_kwargs = {'exercises': [i['obj'] for i in exercise_list.values()],
+                   'repetition_units': get_repetition_units(),
+                   'weight_units': get_weight_units()}
     # Process the request
     if request.method == 'POST':
 
@@ -153,61 +163,35 @@ def add(request, pk):
                           form_id] = form_to_exercise[form_id].id
 
         # Pass the new data to the forms
-        formset = WorkoutLogFormSet(data=post_copy)
+        formset = WorkoutLogFormSet(data=post_copy, form_kwargs=form_kwargs)
         dateform = HelperDateForm(data=post_copy)
         session_form = HelperWorkoutSessionForm(data=post_copy)
 
         # If all the data is valid, save and redirect to log overview page
         if dateform.is_valid() and session_form.is_valid() and formset.is_valid():
-            log_date = dateform.cleaned_data['date']
-
-            if WorkoutSession.objects.filter(user=request.user, date=log_date).exists():
-                session = WorkoutSession.objects.get(
-                    user=request.user, date=log_date)
-                session_form = HelperWorkoutSessionForm(
-                    data=post_copy, instance=session)
-
-            # Save the Workout Session only if there is not already one for this date
-            instance = session_form.save(commit=False)
-            if not WorkoutSession.objects.filter(user=request.user, date=log_date).exists():
-                instance.date = log_date
-                instance.user = request.user
-                instance.workout = day.training
-            else:
-                session = WorkoutSession.objects.get(
-                    user=request.user, date=log_date)
-                instance.instance = session
-            instance.save()
-
-            # Log entries (only the ones with actual content)
-            instances = [i for i in formset.save(commit=False) if i.reps]
-            for instance in instances:
-                if not instance.weight:
-                    instance.weight = 0
-                instance.user = request.user
-                instance.workout = day.training
-                instance.date = log_date
-                instance.save()
+
+            # Save the log entries (only the ones with actual content) and the session
+            WorkoutLog.objects.add_session_logs(request.user,
+                                                day.training,
+                                                dateform.cleaned_data['date'],
+                                                [log for log in (form.get_log()
+                                                                 for form in formset) if log],
+                                                session_form.cleaned_data)
 
             return HttpResponseRedirect(reverse('manager:log:log', kwargs={'pk': day.training_id}))
     else:
-        # Initialise the formset with a queryset that won't return any objects
-        # (we only add new logs here and that seems to be the fastest way)
+        # All forms are for new logs, the units are preselected
         user_weight_unit = 1 if request.user.userprofile.use_metric else 2
-        formset = WorkoutLogFormSet(queryset=WorkoutLog.objects.none(),
-                                    initial=[{'weight_unit': user_weight_unit,
-                                              'repetition_unit': 1} for x in range(0, total_sets)])
+        form_kwargs['initial'] = {'weight_unit': user_weight_unit, 'repetition_unit': 1}
+        formset = WorkoutLogFormSet(form_kwargs=form_kwargs)
 
         dateform = HelperDateForm(initial={'date': datetime.date.today()})
 
         # Depending on whether there is already a workout session for today, update
         # the current one or create a new one (this will be the most usual case)
-        if WorkoutSession.objects.filter(user=request.user, date=datetime.date.today()).exists():
-            session = WorkoutSession.objects.get(
-                user=request.user, date=datetime.date.today())
-            session_form = HelperWorkoutSessionForm(instance=session)
-        else:
-            session_form = HelperWorkoutSessionForm()
+        session = WorkoutSession.objects.filter(user=request.user,
+                                                date=datetime.date.today()).first()
+        session_form = HelperWorkoutSessionForm(instance=session)
 
     # Pass the correct forms to the exercise list
     for exercise in exercise_list:
@@ -246,39 +230,47 @@ class WorkoutLogDetailView(DetailView, LoginRequiredMixin):
 
         # Prepare the entries for rendering and the D3 chart
         workout_log = {}
-
-        for day_list in self.object.canonical_representation['day_list']:
-            day_id = day_list['obj'].id
+        day_list = self.object.canonical_representation['day_list']
+        exercise_ids = set(exercise_list['obj'].id
+                           for day in day_list
+                           for set_list in day['set_list']
+                           for exercise_list in set_list['exercise_list'])
+
+        # Fetch the logs of all exercises at once, for user and exclude all units
+        # that are not weight
+        #
+        # TODO: add the repetition_unit to the filter. For some reason (bug
+        #       in django? DB problems?) when adding the filter there, the
+        #       execution time explodes. The weight unit filter works as
+        #       expected. Also, adding the unit IDs to the exclude list
+        #       also has the disadvantage that if new ones are added in a
+        #       local instance, they could "slip" through.
+        logs = WorkoutLog.objects.filter(user=self.owner_user,
+                                         weight_unit__in=(1, 2),
+                                         workout=self.object,
+                                         exercise_id__in=exercise_ids) \
+            .exclude(repetition_unit_id__in=(2, 3, 4, 5, 6, 7, 8))
+        exercise_logs = process_log_entries_by_exercise(logs)
+        records = dict((record.exercise_id, record) for record in
+                       ExerciseRecord.objects.filter(user=self.owner_user,
+                                                     exercise_id__in=exercise_ids))
+
+        for day in day_list:
+            day_id = day['obj'].id
             workout_log[day_id] = {}
-            for set_list in day_list['set_list']:
-                exercise_log = {}
+            for set_list in day['set_list']:
                 for exercise_list in set_list['exercise_list']:
                     exercise_id = exercise_list['obj'].id
-                    exercise_log[exercise_id] = []
-
-                    # Filter the logs for user and exclude all units that are not weight
-                    #
-                    # TODO: add the repetition_unit to the filter. For some reason (bug
-                    #       in django? DB problems?) when adding the filter there, the
-                    #       execution time explodes. The weight unit filter works as
-                    #       expected. Also, adding the unit IDs to the exclude list
-                    #       also has the disadvantage that if new ones are added in a
-                    #       local instance, they could "slip" through.
-                    logs = exercise_list['obj'].workoutlog_set.filter(user=self.owner_user,
-                                                                      weight_unit__in=(
-                                                                          1, 2),
-                                                                      workout=self.object) \
-                        .exclude(repetition_unit_id__in=(2, 3, 4, 5, 6, 7, 8))
-                    entry_log, chart_data = process_log_entries(logs)
-                    if entry_log:
-                        exercise_log[exercise_list['obj'].id].append(entry_log)
-
-                    if exercise_log:
-                        workout_log[day_id][exercise_id] = {}
-                        workout_log[day_id][exercise_id]['log_by_date'] = entry_log
-                        workout_log[day_id][exercise_id]['div_uuid'] = 'div-' + \
-                            str(uuid.uuid4())
-                        workout_log[day_id][exercise_id]['chart_data'] = chart_data
+                    if exercise_id in exercise_logs:
+                        entry_log, chart_data = exercise_logs[exercise_id]
+                    else:
+                        entry_log, chart_data = process_log_entries([])
+
+                    workout_log[day_id][exercise_id] = {}
+                    workout_log[day_id][exercise_id]['log_by_date'] = entry_log
+                    workout_log[day_id][exercise_id]['div_uuid'] = 'div-' + str(uuid.uuid4())
+                    workout_log[day_id][exercise_id]['chart_data'] = chart_data
+                    workout_log[day_id][exercise_id]['record'] = records.get(exercise_id)
 
         context['workout_log'] = workout_log
         context['owner_user'] = self.owner_user
@@ -324,8 +316,7 @@ def calendar(request, username=None, year=None, month=None):
     context['owner_user'] = user
     context['is_owner'] = is_owner
     context['impressions'] = WorkoutSession.IMPRESSION
-    context['month_list'] = WorkoutLog.objects.filter(
-        user=user).dates('date', 'month')
+    context['month_list'] = WorkoutActivityMonth.objects.filter(user=user)
     context['show_shariff'] = is_owner and user.userprofile.ro_access
     return render(request, 'calendar/month.html', context)
 
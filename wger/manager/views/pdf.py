@@ -17,28 +17,15 @@
 import logging
 import datetime
 
-from django.http import HttpResponse
+import six
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404
 from django.utils.translation import ugettext as _
 
 from wger.manager.models import Workout
-from wger.manager.helpers import render_workout_day
+from wger.manager.helpers import get_main_images, get_workout_day_digest
 from wger.utils.helpers import check_token
-from wger.utils.pdf import styleSheet
-from wger.utils.pdf import render_footer
-
-from reportlab.lib.pagesizes import A4, cm
-from reportlab.platypus import (
-    Paragraph,
-    SimpleDocTemplate,
-    Table,
-    Spacer
-)
-
-from reportlab.lib import colors
-
-from wger import get_version
+from wger.utils.pdf_cache import get_cached_pdf_response
 
 logger = logging.getLogger(__name__)
 
@@ -65,50 +52,23 @@ def workout_log(request, id, images=False, comments=False, uidb64=None, token=No
             return HttpResponseForbidden()
         workout = get_object_or_404(Workout, pk=id, user=request.user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            # pagesize = landscape(A4),
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject=_('Workout for %s') % request.user.username)
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
-                  {'description': workout},
-                  styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for day in workout.canonical_representation['day_list']:
-        elements.append(render_workout_day(
-            day, images=images, comments=comments))
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    elements.append(render_footer(
-        request.build_absolute_uri(workout.get_absolute_url())))
-
-    # write the document and send the response to the browser
-    doc.build(elements)
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response['Content-Disposition'] = 'attachment; filename=Workout-{0}-log.pdf'.format(
-        id)
-    response['Content-Length'] = len(response.content)
-    return response
+    url = request.build_absolute_uri(workout.get_absolute_url())
+    day_list = workout.canonical_representation['day_list']
+
+    def build(output):
+        # ReportLab is only loaded when a PDF is actually rendered
+        from wger.manager.pdf import build_workout_pdf, render_workout_pdf
+
+        elements = render_workout_pdf(workout, day_list, url,
+                                      images=images, comments=comments)
+        build_workout_pdf(output, elements, _('Workout for %s') % request.user.username)
+
+    return get_cached_pdf_response('Workout-{0}-log.pdf'.format(id),
+                                   build,
+                                   ['workout-log', images, comments, six.text_type(workout),
+                                    request.user.username, url, datetime.date.today(),
+                                    [get_workout_day_digest(day) for day in day_list],
+                                    get_main_images(day_list) if images else None])
 
 
 def workout_view(request, id, images=False, comments=False, uidb64=None, token=None):
@@ -136,46 +96,20 @@ def workout_view(request, id, images=False, comments=False, uidb64=None, token=N
             return HttpResponseForbidden()
         workout = get_object_or_404(Workout, pk=id, user=request.user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject=_('Workout for %s') % request.user.username)
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
-                  {'description': workout},
-                  styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for day in workout.canonical_representation['day_list']:
-        elements.append(render_workout_day(day, images=images,
-                                           comments=comments, only_table=True))
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    elements.append(render_footer(
-        request.build_absolute_uri(workout.get_absolute_url())))
-
-    # write the document and send the response to the browser
-    doc.build(elements)
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response['Content-Disposition'] = 'attachment; filename=Workout-{0}-table.pdf'.format(
-        id)
-    response['Content-Length'] = len(response.content)
-    return response
+    url = request.build_absolute_uri(workout.get_absolute_url())
+    day_list = workout.canonical_representation['day_list']
+
+    def build(output):
+        # ReportLab is only loaded when a PDF is actually rendered
+        from wger.manager.pdf import build_workout_pdf, render_workout_pdf
+
+        elements = render_workout_pdf(workout, day_list, url,
+                                      images=images, comments=comments, only_table=True)
+        build_workout_pdf(output, elements, _('Workout for %s') % request.user.username)
+
+    return get_cached_pdf_response('Workout-{0}-table.pdf'.format(id),
+                                   build,
+                                   ['workout-table', images, comments, six.text_type(workout),
+                                    request.user.username, url, datetime.date.today(),
+                                    [get_workout_day_digest(day) for day in day_list],
+                                    get_main_images(day_list) if images else None])
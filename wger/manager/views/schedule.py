@@ -17,11 +17,11 @@
 import logging
 import datetime
 
+import six
 from django.shortcuts import render, get_object_or_404
 from django.http import (
     HttpResponseRedirect,
-    HttpResponseForbidden,
-    HttpResponse
+    HttpResponseForbidden
 )
 from django.core.urlresolvers import reverse_lazy, reverse
 from django.utils.translation import ugettext_lazy, ugettext as _
@@ -33,22 +33,14 @@ from django.views.generic import (
     UpdateView
 )
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer
-)
-
 from wger.manager.models import Schedule
-from wger.manager.helpers import render_workout_day
+from wger.manager.helpers import get_main_images, get_workout_day_digest
 from wger.utils.generic_views import (
     WgerFormMixin,
     WgerDeleteMixin
 )
 from wger.utils.helpers import make_token, check_token
-from wger.utils.pdf import styleSheet, render_footer
+from wger.utils.pdf_cache import get_cached_pdf_response
 
 
 logger = logging.getLogger(__name__)
@@ -118,51 +110,28 @@ def export_pdf_log(request, pk, images=False, comments=False, uidb64=None, token
             return HttpResponseForbidden()
         schedule = get_object_or_404(Schedule, pk=pk, user=user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    # and use it to the create the PDF using it as a file like object
-    response = HttpResponse(content_type='application/pdf')
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject='Schedule for {0}'.format(request.user.username))
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph(
-        u'<para align="center">{0}</para>'.format(schedule), styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for step in schedule.schedulestep_set.all():
-        p = Paragraph(u'<para>{0} {1}</para>'.format(step.duration, _('Weeks')),
-                      styleSheet["HeaderBold"])
-        elements.append(p)
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-        for day in step.workout.canonical_representation['day_list']:
-            elements.append(
-                render_workout_day(day, images=images, comments=comments, nr_of_weeks=7))
-            elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    url = reverse('manager:schedule:view', kwargs={'pk': schedule.id})
-    elements.append(render_footer(request.build_absolute_uri(url)))
-
-    # write the document and send the response to the browser
-    doc.build(elements)
-    response['Content-Disposition'] = 'attachment; filename=Schedule-{0}-log.pdf'.format(
-        pk)
-    response['Content-Length'] = len(response.content)
-    return response
+    url = request.build_absolute_uri(reverse('manager:schedule:view',
+                                             kwargs={'pk': schedule.id}))
+    step_list = [(step, step.workout.canonical_representation['day_list'])
+                 for step in schedule.schedulestep_set.select_related('workout')]
+
+    def build(output):
+        # ReportLab is only loaded when a PDF is actually rendered
+        from wger.manager.pdf import build_workout_pdf, render_schedule_pdf
+
+        elements = render_schedule_pdf(schedule, step_list, url,
+                                       images=images, comments=comments)
+        build_workout_pdf(output, elements, 'Schedule for {0}'.format(request.user.username))
+
+    return get_cached_pdf_response(
+        'Schedule-{0}-log.pdf'.format(pk),
+        build,
+        ['schedule-log', images, comments, six.text_type(schedule),
+         request.user.username, url, datetime.date.today(),
+         [[step.duration, [get_workout_day_digest(day) for day in day_list]]
+          for step, day_list in step_list],
+         get_main_images([day for step, day_list in step_list for day in day_list])
+         if images else None])
 
 
 def export_pdf_table(request, pk, images=False, comments=False, uidb64=None, token=None):
@@ -185,52 +154,29 @@ def export_pdf_table(request, pk, images=False, comments=False, uidb64=None, tok
             return HttpResponseForbidden()
         schedule = get_object_or_404(Schedule, pk=pk, user=user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    # and use it to the create the PDF using it as a file like object
-    response = HttpResponse(content_type='application/pdf')
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject='Schedule for {0}'.format(request.user.username))
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph(
-        u'<para align="center">{0}</para>'.format(schedule), styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Iterate through the Workout and render the training days
-    for step in schedule.schedulestep_set.all():
-        p = Paragraph(u'<para>{0} {1}</para>'.format(step.duration, _('Weeks')),
-                      styleSheet["HeaderBold"])
-        elements.append(p)
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-        for day in step.workout.canonical_representation['day_list']:
-            elements.append(
-                render_workout_day(day, images=images, comments=comments, nr_of_weeks=7,
-                                   only_table=True))
-            elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    url = reverse('manager:schedule:view', kwargs={'pk': schedule.id})
-    elements.append(render_footer(request.build_absolute_uri(url)))
-
-    # write the document and send the response to the browser
-    doc.build(elements)
-    response['Content-Disposition'] = 'attachment; filename=Schedule-{0}-table.pdf'.format(
-        pk)
-    response['Content-Length'] = len(response.content)
-    return response
+    url = request.build_absolute_uri(reverse('manager:schedule:view',
+                                             kwargs={'pk': schedule.id}))
+    step_list = [(step, step.workout.canonical_representation['day_list'])
+                 for step in schedule.schedulestep_set.select_related('workout')]
+
+    def build(output):
+        # ReportLab is only loaded when a PDF is actually rendered
+        from wger.manager.pdf import build_workout_pdf, render_schedule_pdf
+
+        elements = render_schedule_pdf(schedule, step_list, url,
+                                       images=images, comments=comments,
+                                       only_table=True)
+        build_workout_pdf(output, elements, 'Schedule for {0}'.format(request.user.username))
+
+    return get_cached_pdf_response(
+        'Schedule-{0}-table.pdf'.format(pk),
+        build,
+        ['schedule-table', images, comments, six.text_type(schedule),
+         request.user.username, url, datetime.date.today(),
+         [[step.duration, [get_workout_day_digest(day) for day in day_list]]
+          for step, day_list in step_list],
+         get_main_images([day for step, day_list in step_list for day in day_list])
+         if images else None])
 
 
 @login_required
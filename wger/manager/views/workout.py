@@ -27,10 +27,6 @@ from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMix
 from django.contrib.auth.decorators import login_required
 from django.views.generic import DeleteView, UpdateView
 
-from wger.core.models import (
-    RepetitionUnit,
-    WeightUnit
-)
 from wger.manager.models import (
     Workout,
     WorkoutSession,
@@ -48,6 +44,7 @@ from wger.utils.generic_views import (
     WgerDeleteMixin
 )
 from wger.utils.helpers import make_token
+from wger.utils.reference import get_repetition_units, get_weight_units
 
 
 logger = logging.getLogger(__name__)
@@ -260,12 +257,17 @@ class LastWeightHelper:
     '''
     Small helper class to retrieve the last workout log for a certain
     user, exercise and repetition combination.
+
+    The weights of all exercises and repetitions of the canonical day are
+    loaded at once, see WorkoutLogManager.get_last_weights()
     '''
-    user = None
-    last_weight_list = {}
 
-    def __init__(self, user):
-        self.user = user
+    def __init__(self, user, canonical_day):
+        pairs = [(exercise_dict['obj'].id, reps)
+                 for set_dict in canonical_day['set_list']
+                 for exercise_dict in set_dict['exercise_list']
+                 for reps in exercise_dict['reps_list']]
+        self.last_weight_list = WorkoutLog.objects.get_last_weights(user, pairs)
 
     def get_last_weight(self, exercise, reps, default_weight):
         '''
@@ -274,19 +276,12 @@ class LastWeightHelper:
         :param exercise:
         :param reps:
         :param default_weight:
-        :return: WorkoutLog or '' if none is found
+        :return: the weight of the last log, the default weight or ''
         '''
-        key = (self.user.pk, exercise.pk, reps, default_weight)
-        if self.last_weight_list.get(key) is None:
-            last_log = WorkoutLog.objects.filter(user=self.user,
-                                                 exercise=exercise,
-                                                 reps=reps).order_by('-date')
-            default_weight = '' if default_weight is None else default_weight
-            weight = last_log[0].weight if last_log.exists(
-            ) else default_weight
-            self.last_weight_list[key] = weight
-
-        return self.last_weight_list.get(key)
+        weight = self.last_weight_list.get((exercise.pk, reps))
+        if weight is None:
+            weight = '' if default_weight is None else default_weight
+        return weight
 
 
 @login_required
@@ -299,7 +294,7 @@ def timer(request, day_pk):
     canonical_day = day.canonical_representation
     context = {}
     step_list = []
-    last_log = LastWeightHelper(request.user)
+    last_log = LastWeightHelper(request.user, canonical_day)
 
     # Go through the workout day and create the individual 'pages'
     for set_dict in canonical_day['set_list']:
@@ -394,6 +389,6 @@ def timer(request, day_pk):
     context['workout'] = day.training
     context['session_form'] = session_form
     context['form_action'] = url
-    context['weight_units'] = WeightUnit.objects.all()
-    context['repetition_units'] = RepetitionUnit.objects.all()
+    context['weight_units'] = get_weight_units()
+    context['repetition_units'] = get_repetition_units()
     return render(request, 'workout/timer.html', context)
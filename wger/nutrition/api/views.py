@@ -38,10 +38,10 @@ from wger.nutrition.models import (
     NutritionPlan
 )
 from wger.utils.language import load_ingredient_languages, load_language
-from wger.utils.viewsets import WgerOwnerObjectModelViewSet
+from wger.utils.viewsets import CatalogViewSetMixin, WgerOwnerObjectModelViewSet
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for ingredient objects
     '''
@@ -144,7 +144,7 @@ def search(request):
     return Response(json_response)
 
 
-class WeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
+class WeightUnitViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for weight unit objects
     '''
@@ -155,7 +155,7 @@ class WeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
                      'name')
 
 
-class IngredientWeightUnitViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientWeightUnitViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
     '''
     API endpoint for many-to-many table ingredient-weight unit objects
     '''
@@ -28,7 +28,6 @@ from django.core.urlresolvers import reverse
 from django.core import mail
 from django.core.cache import cache
 from django.contrib.auth.models import User
-from django.contrib.sites.models import Site
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 from django.utils import translation
@@ -39,8 +38,10 @@ from wger.utils.constants import TWOPLACES
 from wger.utils.cache import cache_mapper
 from wger.utils.fields import Html5TimeField
 from wger.utils.models import AbstractLicenseModel
+from wger.utils.reference import get_current_site
 from wger.utils.units import AbstractWeight
 from wger.weight.models import WeightEntry
+from wger.weight.trend import get_weight_trend
 
 MEALITEM_WEIGHT_GRAM = '1'
 MEALITEM_WEIGHT_UNIT = '2'
@@ -161,18 +162,22 @@ class NutritionPlan(models.Model):
         '''
         Returns the closest weight entry for the nutrition plan.
         Returns None if there are no entries.
+
+        The entry is built from the cached weight timeline of the user and
+        has only its date and weight set.
         '''
-        target = self.creation_date
-        closest_entry_gte = WeightEntry.objects.filter(user=self.user) \
-            .filter(date__gte=target).order_by('date').first()
-        closest_entry_lte = WeightEntry.objects.filter(user=self.user) \
-            .filter(date__lte=target).order_by('-date').first()
-        if closest_entry_gte is None or closest_entry_lte is None:
-            return closest_entry_gte or closest_entry_lte
-        if abs(closest_entry_gte.date - target) < abs(closest_entry_lte.date - target):
-            return closest_entry_gte
-        else:
-            return closest_entry_lte
+        timeline = get_weight_trend(self.user)
+        index = timeline.get_closest_index(self.creation_date)
+        if index < 0:
+            return None
+        return WeightEntry(user=self.user,
+                           date=timeline.get_date(index),
+                           weight=timeline.get_weight(index))
+
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
 
     def get_owner_object(self):
         '''
@@ -443,7 +448,7 @@ class Ingredient(AbstractLicenseModel, models.Model):
             context = {
                 'ingredient': self.name,
                 'url': url,
-                'site': Site.objects.get_current().domain
+                'site': get_current_site().domain
             }
             message = render_to_string('ingredient/email_new.tpl', context)
             mail.send_mail(subject,
@@ -548,6 +553,11 @@ class Meal(models.Model):
         '''
         return u"{0} Meal".format(self.order)
 
+    owner_field = 'plan__user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -619,6 +629,11 @@ class MealItem(models.Model):
         '''
         return u"{0}g ingredient {1}".format(self.amount, self.ingredient_id)
 
+    owner_field = 'meal__plan__user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
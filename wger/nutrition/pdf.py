@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import six
+from django.utils.translation import ugettext as _
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, cm
+from reportlab.platypus import (
+    Paragraph,
+    SimpleDocTemplate,
+    Table,
+    Spacer
+)
+
+from wger import get_version
+from wger.nutrition.models import MEALITEM_WEIGHT_GRAM
+from wger.utils.pdf import register_fonts, styleSheet
+
+
+def build_plan_pdf(output, plan, meal_list, plan_data, url, username, date):
+    '''
+    Writes the PDF of a nutrition plan
+
+    :param output: file-like object the PDF is written to
+    :param plan: the nutrition plan
+    :param meal_list: the meals, with their items prefetched
+    :param plan_data: the plan's nutritional values
+    :param url: absolute URL of the plan, used in the footer
+    :param username: name of the user, used in the subject
+    :param date: creation date shown in the footer
+    '''
+    register_fonts()
+
+    # Create the PDF object, using the output as its "file."
+    doc = SimpleDocTemplate(output,
+                            pagesize=A4,
+                            title=_('Nutrition plan'),
+                            author='wger Workout Manager',
+                            subject=_('Nutritional plan %s') % username)
+
+    # Background colour for header
+    # Reportlab doesn't use the HTML hexadecimal format, but has a range of
+    # 0 till 1, so we have to convert here.
+    header_colour = colors.Color(int('73', 16) / 255.0,
+                                 int('8a', 16) / 255.0,
+                                 int('5f', 16) / 255.0)
+
+    # container for the 'Flowable' objects
+    elements = []
+    data = []
+
+    # Iterate through the Plan
+    meal_markers = []
+    ingredient_markers = []
+
+    # Meals
+    i = 0
+    for meal in meal_list:
+        i += 1
+
+        meal_markers.append(len(data))
+
+        if not meal.time:
+            p = Paragraph(u'<para align="center"><strong>{nr} {meal_nr}</strong></para>'
+                          .format(nr=_('Nr.'), meal_nr=i),
+                          styleSheet["Normal"])
+        else:
+            p = Paragraph(u'<para align="center"><strong>'
+                          u'{nr} {meal_nr} - {meal_time}'
+                          u'</strong></para>'
+                          .format(nr=_('Nr.'),
+                                  meal_nr=i,
+                                  meal_time=meal.time.strftime("%H:%M")),
+                          styleSheet["Normal"])
+        data.append([p])
+
+        # Ingredients
+        for item in meal.mealitem_set.all():
+            ingredient_markers.append(len(data))
+
+            p = Paragraph(
+                u'<para>{0}</para>'.format(item.ingredient.name), styleSheet["Normal"])
+            if item.get_unit_type() == MEALITEM_WEIGHT_GRAM:
+                unit_name = 'g'
+            else:
+                unit_name = ' ' + item.weight_unit.unit.name
+
+            data.append([Paragraph(u"{0}{1}".format(item.amount, unit_name),
+                                   styleSheet["Normal"]),
+                         p])
+
+    # Set general table styles
+    table_style = []
+
+    # Set specific styles, e.g. background for title cells
+    for marker in meal_markers:
+        # Set background colour for headings
+        table_style.append(
+            ('BACKGROUND', (0, marker), (-1, marker), header_colour))
+        table_style.append(
+            ('BOX', (0, marker), (-1, marker), 1.25, colors.black))
+
+        # Make the headings span the whole width
+        table_style.append(('SPAN', (0, marker), (-1, marker)))
+
+    # has the plan any data?
+    if data:
+        t = Table(data, style=table_style)
+
+        # Manually set the width of the columns
+        t._argW[0] = 2.5 * cm
+
+    # There is nothing to output
+    else:
+        t = Paragraph(_('<i>This is an empty plan, what did you expect on the PDF?</i>'),
+                      styleSheet["Normal"])
+
+    # Set the title (if available)
+    if plan.description:
+        p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
+                      {'description': plan.description},
+                      styleSheet["Bold"])
+        elements.append(p)
+
+        # Filler
+        elements.append(Spacer(10 * cm, 0.5 * cm))
+
+    # append the table to the document
+    elements.append(t)
+    elements.append(Paragraph('<para>&nbsp;</para>', styleSheet["Normal"]))
+
+    # Create table with nutritional calculations
+    data = []
+    data.append([Paragraph(u'<para align="center">{0}</para>'.format(_('Nutritional data')),
+                           styleSheet["Bold"])])
+    data.append([Paragraph(_('Macronutrients'), styleSheet["Normal"]),
+                 Paragraph(_('Total'), styleSheet["Normal"]),
+                 Paragraph(_('Percent of energy'), styleSheet["Normal"]),
+                 Paragraph(_('g per body kg'), styleSheet["Normal"])])
+    data.append([Paragraph(_('Energy'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['total']['energy']), styleSheet["Normal"])])
+    data.append([Paragraph(_('Protein'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(
+                     plan_data['total']['protein']), styleSheet["Normal"]),
+                 Paragraph(six.text_type(
+                     plan_data['percent']['protein']), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['per_kg']['protein']),
+                           styleSheet["Normal"])])
+    data.append([Paragraph(_('Carbohydrates'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['total']['carbohydrates']),
+                           styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['percent']['carbohydrates']),
+                           styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['per_kg']['carbohydrates']),
+                           styleSheet["Normal"])])
+    data.append([Paragraph(_('Sugar content in carbohydrates'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['total']['carbohydrates_sugar']),
+                           styleSheet["Normal"])])
+    data.append([Paragraph(_('Fat'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(
+                     plan_data['total']['fat']), styleSheet["Normal"]),
+                 Paragraph(six.text_type(
+                     plan_data['percent']['fat']), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['per_kg']['fat']), styleSheet["Normal"])])
+    data.append([Paragraph(_('Saturated fat content in fats'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['total']['fat_saturated']),
+                           styleSheet["Normal"])])
+    data.append([Paragraph(_('Fibres'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['total']['fibres']), styleSheet["Normal"])])
+    data.append([Paragraph(_('Sodium'), styleSheet["Normal"]),
+                 Paragraph(six.text_type(plan_data['total']['sodium']), styleSheet["Normal"])])
+
+    table_style = []
+    table_style.append(('BOX', (0, 0), (-1, -1), 1.25, colors.black))
+    table_style.append(('GRID', (0, 0), (-1, -1), 0.40, colors.black))
+    table_style.append(('SPAN', (0, 0), (-1, 0)))  # Title
+    table_style.append(('SPAN', (1, 2), (-1, 2)))  # Energy
+    table_style.append(('SPAN', (1, 5), (-1, 5)))  # Sugar
+    table_style.append(('SPAN', (1, 7), (-1, 7)))  # Saturated fats
+    table_style.append(('SPAN', (1, 8), (-1, 8)))  # Fibres
+    table_style.append(('SPAN', (1, 9), (-1, 9)))  # Sodium
+    t = Table(data, style=table_style)
+    t._argW[0] = 5 * cm
+    elements.append(t)
+
+    # Footer, date and info
+    elements.append(Spacer(10 * cm, 0.5 * cm))
+    created = date.strftime("%d.%m.%Y")
+    p = Paragraph('''<para align="left">
+                        %(date)s -
+                        <a href="%(url)s">%(url)s</a> -
+                        %(created)s
+                        %(version)s
+                    </para>''' %
+                  {'date': _("Created on the <b>%s</b>") % created,
+                   'created': "wger Workout Manager",
+                   'version': get_version(),
+                   'url': url, },
+                  styleSheet["Normal"])
+    elements.append(p)
+    doc.build(elements)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+from django.db.models.signals import post_save, post_delete
+
+from wger.core.signals import record_catalog_change
+from wger.nutrition.models import Ingredient, IngredientWeightUnit, WeightUnit
+from wger.utils.cache import reset_catalog_version
+
+
+# Invalidate the cached API responses
+for model in (Ingredient, IngredientWeightUnit, WeightUnit):
+    post_save.connect(reset_catalog_version, sender=model)
+    post_delete.connect(reset_catalog_version, sender=model)
+
+# Record the changes for the incremental sync
+for model in (Ingredient, IngredientWeightUnit, WeightUnit):
+    post_save.connect(record_catalog_change, sender=model)
+    post_delete.connect(record_catalog_change, sender=model)
@@ -12,6 +12,8 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+import datetime
+from decimal import Decimal
 
 from django.core.urlresolvers import reverse
 
@@ -123,6 +125,50 @@ class EditPlanTestCase(WorkoutManagerEditTestCase):
     data = {'description': 'My new description'}
 
 
+class PlanClosestWeightEntryTestCase(WorkoutManagerTestCase):
+    '''
+    Tests finding the weight entry closest to the creation of a plan
+    '''
+
+    def test_closest_entry(self):
+        '''
+        Test the closest entry before, after and between two entries
+        '''
+        plan = NutritionPlan.objects.get(pk=4)
+        entry = plan.get_closest_weight_entry()
+        self.assertEqual(entry.date, datetime.date(2012, 11, 1))
+        self.assertEqual(entry.weight, Decimal('80.60'))
+
+        plan = NutritionPlan.objects.get(pk=1)
+        self.assertEqual(plan.get_closest_weight_entry().date, datetime.date(2012, 10, 1))
+
+        # The earlier entry is used if both are 11 days away
+        plan.creation_date = datetime.date(2012, 10, 21)
+        self.assertEqual(plan.get_closest_weight_entry().date, datetime.date(2012, 10, 10))
+
+        plan.creation_date = datetime.date(2016, 1, 1)
+        self.assertEqual(plan.get_closest_weight_entry().date, datetime.date(2013, 1, 30))
+
+    def test_no_entries(self):
+        '''
+        Test a user without weight entries
+        '''
+        plan = NutritionPlan.objects.get(pk=4)
+        plan.user.weightentry_set.all().delete()
+        self.assertIsNone(plan.get_closest_weight_entry())
+        self.assertEqual(plan.get_nutritional_values()['per_kg']['protein'], 0)
+
+    def test_queries(self):
+        '''
+        Test that the entries are only read once
+        '''
+        plan = NutritionPlan.objects.select_related('user').get(pk=4)
+        with self.assertNumQueries(1):
+            plan.get_closest_weight_entry()
+        with self.assertNumQueries(0):
+            plan.get_closest_weight_entry()
+
+
 class PlanDailyCaloriesTestCase(WorkoutManagerTestCase):
     '''
     Tests the handling of the daily calories in the plan page
@@ -14,13 +14,11 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
-import six
 import logging
 import datetime
 
 from django.shortcuts import render, get_object_or_404
 from django.http import (
-    HttpResponse,
     HttpResponseForbidden,
     HttpResponseRedirect
 )
@@ -30,24 +28,14 @@ from django.contrib.auth.decorators import login_required
 from django.utils.translation import ugettext_lazy, ugettext as _
 from django.views.generic import DeleteView, UpdateView
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, cm
-from reportlab.platypus import (
-    Paragraph,
-    SimpleDocTemplate,
-    Table,
-    Spacer
-)
-
 from wger.nutrition.models import (
     NutritionPlan,
     MEALITEM_WEIGHT_GRAM,
     MEALITEM_WEIGHT_UNIT
 )
-from wger import get_version
 from wger.utils.generic_views import WgerFormMixin, WgerDeleteMixin
 from wger.utils.helpers import check_token, make_token
-from wger.utils.pdf import styleSheet
+from wger.utils.pdf_cache import get_cached_pdf_response
 from wger.utils.language import load_language
 
 
@@ -217,176 +205,26 @@ def export_pdf(request, id, uidb64=None, token=None):
         plan = get_object_or_404(NutritionPlan, pk=id, user=request.user)
 
     plan_data = plan.get_nutritional_values()
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            title=_('Nutrition plan'),
-                            author='wger Workout Manager',
-                            subject=_('Nutritional plan %s') % request.user.username)
-
-    # Background colour for header
-    # Reportlab doesn't use the HTML hexadecimal format, but has a range of
-    # 0 till 1, so we have to convert here.
-    header_colour = colors.Color(int('73', 16) / 255.0,
-                                 int('8a', 16) / 255.0,
-                                 int('5f', 16) / 255.0)
-
-    # container for the 'Flowable' objects
-    elements = []
-    data = []
-
-    # Iterate through the Plan
-    meal_markers = []
-    ingredient_markers = []
-
-    # Meals
-    i = 0
-    for meal in plan.meal_set.select_related():
-        i += 1
-
-        meal_markers.append(len(data))
-
-        if not meal.time:
-            p = Paragraph(u'<para align="center"><strong>{nr} {meal_nr}</strong></para>'
-                          .format(nr=_('Nr.'), meal_nr=i),
-                          styleSheet["Normal"])
-        else:
-            p = Paragraph(u'<para align="center"><strong>'
-                          u'{nr} {meal_nr} - {meal_time}'
-                          u'</strong></para>'
-                          .format(nr=_('Nr.'), meal_nr=i, meal_time=meal.time.strftime("%H:%M")),
-                          styleSheet["Normal"])
-        data.append([p])
-
-        # Ingredients
-        for item in meal.mealitem_set.select_related():
-            ingredient_markers.append(len(data))
-
-            p = Paragraph(
-                u'<para>{0}</para>'.format(item.ingredient.name), styleSheet["Normal"])
-            if item.get_unit_type() == MEALITEM_WEIGHT_GRAM:
-                unit_name = 'g'
-            else:
-                unit_name = ' ' + item.weight_unit.unit.name
-
-            data.append([Paragraph(u"{0}{1}".format(item.amount, unit_name), styleSheet["Normal"]),
-                         p])
-
-    # Set general table styles
-    table_style = []
-
-    # Set specific styles, e.g. background for title cells
-    for marker in meal_markers:
-        # Set background colour for headings
-        table_style.append(
-            ('BACKGROUND', (0, marker), (-1, marker), header_colour))
-        table_style.append(
-            ('BOX', (0, marker), (-1, marker), 1.25, colors.black))
-
-        # Make the headings span the whole width
-        table_style.append(('SPAN', (0, marker), (-1, marker)))
-
-    # has the plan any data?
-    if data:
-        t = Table(data, style=table_style)
-
-        # Manually set the width of the columns
-        t._argW[0] = 2.5 * cm
-
-    # There is nothing to output
-    else:
-        t = Paragraph(_('<i>This is an empty plan, what did you expect on the PDF?</i>'),
-                      styleSheet["Normal"])
-
-    # Set the title (if available)
-    if plan.description:
-        p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
-                      {'description': plan.description},
-                      styleSheet["Bold"])
-        elements.append(p)
-
-        # Filler
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # append the table to the document
-    elements.append(t)
-    elements.append(Paragraph('<para>&nbsp;</para>', styleSheet["Normal"]))
-
-    # Create table with nutritional calculations
-    data = []
-    data.append([Paragraph(u'<para align="center">{0}</para>'.format(_('Nutritional data')),
-                           styleSheet["Bold"])])
-    data.append([Paragraph(_('Macronutrients'), styleSheet["Normal"]),
-                 Paragraph(_('Total'), styleSheet["Normal"]),
-                 Paragraph(_('Percent of energy'), styleSheet["Normal"]),
-                 Paragraph(_('g per body kg'), styleSheet["Normal"])])
-    data.append([Paragraph(_('Energy'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['total']['energy']), styleSheet["Normal"])])
-    data.append([Paragraph(_('Protein'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(
-                     plan_data['total']['protein']), styleSheet["Normal"]),
-                 Paragraph(six.text_type(
-                     plan_data['percent']['protein']), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['per_kg']['protein']), styleSheet["Normal"])])
-    data.append([Paragraph(_('Carbohydrates'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['total']['carbohydrates']),
-                           styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['percent']['carbohydrates']),
-                           styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['per_kg']['carbohydrates']),
-                           styleSheet["Normal"])])
-    data.append([Paragraph(_('Sugar content in carbohydrates'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['total']['carbohydrates_sugar']),
-                           styleSheet["Normal"])])
-    data.append([Paragraph(_('Fat'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(
-                     plan_data['total']['fat']), styleSheet["Normal"]),
-                 Paragraph(six.text_type(
-                     plan_data['percent']['fat']), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['per_kg']['fat']), styleSheet["Normal"])])
-    data.append([Paragraph(_('Saturated fat content in fats'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['total']['fat_saturated']),
-                           styleSheet["Normal"])])
-    data.append([Paragraph(_('Fibres'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['total']['fibres']), styleSheet["Normal"])])
-    data.append([Paragraph(_('Sodium'), styleSheet["Normal"]),
-                 Paragraph(six.text_type(plan_data['total']['sodium']), styleSheet["Normal"])])
-
-    table_style = []
-    table_style.append(('BOX', (0, 0), (-1, -1), 1.25, colors.black))
-    table_style.append(('GRID', (0, 0), (-1, -1), 0.40, colors.black))
-    table_style.append(('SPAN', (0, 0), (-1, 0)))  # Title
-    table_style.append(('SPAN', (1, 2), (-1, 2)))  # Energy
-    table_style.append(('SPAN', (1, 5), (-1, 5)))  # Sugar
-    table_style.append(('SPAN', (1, 7), (-1, 7)))  # Saturated fats
-    table_style.append(('SPAN', (1, 8), (-1, 8)))  # Fibres
-    table_style.append(('SPAN', (1, 9), (-1, 9)))  # Sodium
-    t = Table(data, style=table_style)
-    t._argW[0] = 5 * cm
-    elements.append(t)
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    created = datetime.date.today().strftime("%d.%m.%Y")
-    url = reverse('nutrition:plan:view', kwargs={'id': plan.id})
-    p = Paragraph('''<para align="left">
-                        %(date)s -
-                        <a href="%(url)s">%(url)s</a> -
-                        %(created)s
-                        %(version)s
-                    </para>''' %
-                  {'date': _("Created on the <b>%s</b>") % created,
-                   'created': "wger Workout Manager",
-                   'version': get_version(),
-                   'url': request.build_absolute_uri(url), },
-                  styleSheet["Normal"])
-    elements.append(p)
-    doc.build(elements)
-
-    response['Content-Disposition'] = 'attachment; filename=nutritional-plan.pdf'
-    response['Content-Length'] = len(response.content)
-    return response
+    meal_list = plan.meal_set.prefetch_related('mealitem_set__ingredient',
+                                               'mealitem_set__weight_unit__unit')
+    url = request.build_absolute_uri(reverse('nutrition:plan:view', kwargs={'id': plan.id}))
+    today = datetime.date.today()
+
+    def build(output):
+        # ReportLab is only loaded when a PDF is actually rendered
+        from wger.nutrition.pdf import build_plan_pdf
+
+        build_plan_pdf(output, plan, meal_list, plan_data, url, request.user.username, today)
+
+    # Everything that is rendered, used as the key for the PDF cache
+    meal_digest = []
+    for meal in meal_list:
+        meal_digest.append([meal.time, [[item.ingredient.name,
+                                         item.amount,
+                                         item.weight_unit.unit.name if item.weight_unit else None]
+                                        for item in meal.mealitem_set.all()]])
+
+    return get_cached_pdf_response('nutritional-plan.pdf',
+                                   build,
+                                   ['nutrition-plan', plan.description, request.user.username,
+                                    url, today, plan_data, meal_digest])
@@ -16,6 +16,7 @@
 
 import re
 import sys
+import tempfile
 
 '''
 This file contains the global settings that don't usually need to be changed.
@@ -305,6 +306,9 @@ THUMBNAIL_ALIASES = {
 
         'large': {'size': (800, 800), 'quality': 90},
         'large_cropped': {'size': (800, 800), 'crop': 'smart', 'quality': 90},
+
+        # Exercise images in the PDFs, about 300 dpi for 2 cm
+        'pdf': {'size': (240, 0)},
     },
 }
 
@@ -374,4 +378,7 @@ WGER_SETTINGS = {
     'TWITTER': False,
     'FITBIT_CLIENT_ID': os.environ.get('FITBIT_CLIENT_ID'),
     'FITBIT_CLIENT_SECRET': os.environ.get('FITBIT_CLIENT_SECRET'),
+    'PDF_CACHE_DIR': os.path.join(tempfile.gettempdir(), 'wger-pdf-cache'),
+    'PDF_CACHE_MAX_SIZE': 100 * 1024 * 1024,
+    'CATALOG_API_CACHE_TIMEOUT': 60 * 60 * 24,
 }
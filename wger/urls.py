@@ -22,6 +22,7 @@ from django.conf import settings
 from django.conf.urls import include, url
 from django.conf.urls.i18n import i18n_patterns
 from django.conf.urls.static import static
+from django.contrib import admin
 from django.contrib.sitemaps.views import sitemap
 
 from wger.nutrition.sitemap import NutritionSitemap
@@ -93,6 +94,10 @@ router.register(r'day', manager_api_views.DayViewSet, base_name='day')
 router.register(r'set', manager_api_views.SetViewSet, base_name='Set')
 router.register(r'setting', manager_api_views.SettingViewSet, base_name='Setting')
 router.register(r'workoutlog', manager_api_views.WorkoutLogViewSet, base_name='workoutlog')
+router.register(r'exercisevolume', manager_api_views.ExerciseVolumeViewSet,
+                base_name='exercisevolume')
+router.register(r'exerciserecord', manager_api_views.ExerciseRecordViewSet,
+                base_name='exerciserecord')
 
 # Core app
 router.register(r'userprofile', core_api_views.UserProfileViewSet, base_name='userprofile')
@@ -131,10 +136,6 @@ router.register(r'weightentry', weight_api_views.WeightEntryViewSet, base_name='
 # User registration
 router.register(r'register', core_api_views.UserRegistrationViewSet, base_name='api-registration')
 
-
-from django.contrib import admin
-admin.autodiscover()
-import debug_toolbar
 #
 # Sitemaps
 #
@@ -159,9 +160,13 @@ urlpatterns = i18n_patterns(
         sitemap,
         {'sitemaps': sitemaps},
         name='sitemap'),
-    url(r'^__debug__/', include(debug_toolbar.urls)),
 )
 
+# The toolbar is only shown with DEBUG, don't load it otherwise
+if settings.DEBUG:
+    import debug_toolbar
+    urlpatterns += i18n_patterns(url(r'^__debug__/', include(debug_toolbar.urls)))
+
 #
 # URLs without language prefix
 #
@@ -181,6 +186,9 @@ urlpatterns += [
     url(r'^api/v2/ingredient/search/$',
         nutrition_api_views.search,
         name='ingredient-search'),
+    url(r'^api/v2/catalog-changes/$',
+        core_api_views.catalog_changes,
+        name='catalog-changes'),
     url(r'^api/v2/', include(router.urls)),
 ]
 
@@ -12,8 +12,11 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import collections
 import logging
 import hashlib
+import threading
+import time
 
 from django.core.cache import cache
 from django.utils.encoding import force_bytes
@@ -41,6 +44,7 @@ def delete_template_fragment_cache(fragment_name='', *args):
 
 def reset_workout_canonical_form(workout_id):
     cache.delete(cache_mapper.get_workout_canonical(workout_id))
+    cache.delete(cache_mapper.get_workout_compact(workout_id))
 
 
 def reset_workout_log(user_pk, year, month, day=None):
@@ -54,6 +58,191 @@ def reset_workout_log(user_pk, year, month, day=None):
     log_hash = hash((user_pk, year, month, day))
     cache.delete(cache_mapper.get_workout_log_list(log_hash))
 
+    cache.delete(cache_mapper.get_workout_log_last_weights(user_pk))
+
+
+def reset_weight_trend(user_pk):
+    '''
+    Resets the cached weight trend of a user
+    '''
+    cache.delete(cache_mapper.get_weight_trend(user_pk))
+
+
+def get_cache_version(name):
+    '''
+    Returns the current version of a group of cache keys
+
+    The version is part of the keys of the group, so that all of them can be
+    invalidated at once with increment_cache_version()
+
+    :param name: the name of the group, e.g. 'language-config'
+    '''
+    version_key = cache_mapper.get_cache_version_key(name)
+    version = cache.get(version_key)
+    if version is None:
+        version = 1
+        cache.add(version_key, version, None)
+    return version
+
+
+def increment_cache_version(name):
+    '''
+    Invalidates all cache keys of a group by incrementing its version
+
+    :param name: the name of the group, e.g. 'language-config'
+    '''
+    version_key = cache_mapper.get_cache_version_key(name)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 2, None)
+
+
+def get_catalog_version(model):
+    '''
+    Returns the version of the API responses of a catalog model
+
+    The version is the time of the last change in microseconds. If it is not
+    known, e.g. because the cache was cleared, a new one is started, so that
+    clients never keep data from before the change.
+
+    :param model: the model class, e.g. Exercise
+    '''
+    version_key = cache_mapper.get_catalog_version_key(model)
+    version = cache.get(version_key)
+    if version is None:
+        version = int(time.time() * 1000000)
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key, version)
+    return version
+
+
+def increment_catalog_version(model):
+    '''
+    Invalidates the ETags and cached API responses of a catalog model
+
+    :param model: the model class, e.g. Exercise
+    '''
+    version_key = cache_mapper.get_catalog_version_key(model)
+    version = max(int(time.time() * 1000000), cache.get(version_key, 0) + 1)
+    cache.set(version_key, version, None)
+
+
+def reset_catalog_version(sender, instance, **kwargs):
+    '''
+    Signal handler that invalidates the API responses of the changed model
+
+    Connected to post_save, post_delete and m2m_changed, for the latter the
+    model on the other side of the relationship is invalidated as well.
+    '''
+    if kwargs.get('action', 'post').startswith('pre'):
+        return
+
+    increment_catalog_version(instance._meta.concrete_model)
+    if kwargs.get('model'):
+        increment_catalog_version(kwargs['model'])
+
+
+class ReferenceCache(object):
+    '''
+    Process local cache in front of django's cache for reference data
+
+    Reference data such as languages, units or licenses changes a handful of
+    times a year but is needed on most requests. The entries are kept in a
+    small in-memory LRU cache; once their timeout is over, the version of their
+    group is checked in the shared cache and they are reloaded if it changed.
+    Calling invalidate() increments that version, which invalidates the group
+    in all processes.
+    '''
+
+    _missing = object()
+
+    def __init__(self, max_entries=500, timeout=60):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = collections.OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, group, key, loader):
+        '''
+        Returns the cached value, calling loader() if it is not cached anywhere
+
+        :param group: the group of the entry, used for the invalidation
+        :param key: the key of the entry within the group
+        :param loader: callable returning the value
+        '''
+        local_key = (group, key)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.pop(local_key, None)
+            if entry is not None and entry[2] > now:
+                self._entries[local_key] = entry
+                self._count(group, 'local_hits')
+                return entry[0]
+
+        version = get_cache_version(group)
+        if entry is not None and entry[1] == version:
+            value = entry[0]
+            counter = 'local_hits'
+        else:
+            shared_key = cache_mapper.get_reference_key(group, key, version)
+            value = cache.get(shared_key, self._missing)
+            counter = 'shared_hits'
+            if value is self._missing:
+                value = loader()
+                cache.set(shared_key, value)
+                counter = 'misses'
+
+        with self._lock:
+            self._entries[local_key] = (value, version, now + self.timeout)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._count(group, counter)
+        return value
+
+    def invalidate(self, group):
+        '''
+        Invalidates all entries of a group, in this and all other processes
+        '''
+        increment_cache_version(group)
+        with self._lock:
+            for local_key in [i for i in self._entries if i[0] == group]:
+                del self._entries[local_key]
+
+    def clear(self):
+        '''
+        Removes all entries and statistics of this process
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+    def stats(self):
+        '''
+        Returns the hits and misses of this process, per group
+
+        :return: a dictionary such as {'language': {'local_hits': 10,
+                 'shared_hits': 1, 'misses': 1, 'hit_rate': 0.91}}
+        '''
+        with self._lock:
+            result = {}
+            for group, counters in self._counters.items():
+                result[group] = dict(counters)
+                total = sum(counters.values())
+                hits = counters['local_hits'] + counters['shared_hits']
+                result[group]['hit_rate'] = round(hits / float(total), 2) if total else 0
+            return result
+
+    def _count(self, group, counter):
+        '''
+        Increments a counter, must be called with the lock held
+        '''
+        if group not in self._counters:
+            self._counters[group] = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+        self._counters[group][counter] += 1
+
 
 class CacheKeyMapper(object):
     '''
@@ -61,12 +250,25 @@ class CacheKeyMapper(object):
     '''
 
     # Keys used by the cache
-    LANGUAGE_CACHE_KEY = 'language-{0}'
-    LANGUAGE_CONFIG_CACHE_KEY = 'language-config-{0}-{1}'
+    LANGUAGE_VERSION = 'language'
+    LANGUAGE_CONFIG_VERSION = 'language-config'
+    DAYS_OF_WEEK_VERSION = 'days-of-week'
+    LICENSE_VERSION = 'license'
+    REPETITION_UNIT_VERSION = 'repetition-unit'
+    WEIGHT_UNIT_VERSION = 'weight-unit'
+    SITE_VERSION = 'site'
+    PDF_IMAGE_VERSION = 'pdf-image'
+    REFERENCE_CACHE_KEY = 'reference-{0}-{1}-v{2}'
+    CATALOG_VERSION = 'catalog-version-{0}'
+    CATALOG_RESPONSE = 'catalog-response-{0}-v{1}-{2}'
     EXERCISE_CACHE_KEY_MUSCLE_BG = 'exercise-muscle-bg-{0}'
     INGREDIENT_CACHE_KEY = 'ingredient-{0}'
     WORKOUT_CANONICAL_REPRESENTATION = 'workout-canonical-representation-{0}'
+    WORKOUT_COMPACT_REPRESENTATION = 'workout-compact-representation-{0}'
     WORKOUT_LOG_LIST = 'workout-log-hash-{0}'
+    WORKOUT_LOG_LAST_WEIGHTS = 'workout-log-last-weights-{0}'
+    WEIGHT_TREND = 'weight-trend-{0}'
+    CACHE_VERSION = 'cache-version-{0}'
 
     def get_pk(self, param):
         '''
@@ -85,17 +287,29 @@ class CacheKeyMapper(object):
         '''
         return self.EXERCISE_CACHE_KEY_MUSCLE_BG.format(self.get_pk(param))
 
-    def get_language_key(self, param):
+    def get_reference_key(self, group, key, version):
+        '''
+        Return the cache key of reference data, for the given version
+        '''
+        return self.REFERENCE_CACHE_KEY.format(group, key, version)
+
+    def get_cache_version_key(self, name):
+        '''
+        Return the key holding the version of a group of cache keys
+        '''
+        return self.CACHE_VERSION.format(name)
+
+    def get_catalog_version_key(self, model):
         '''
-        Return the language cache key
+        Return the key holding the version of a catalog model's API responses
         '''
-        return self.LANGUAGE_CACHE_KEY.format(self.get_pk(param))
+        return self.CATALOG_VERSION.format(model._meta.label_lower)
 
-    def get_language_config_key(self, param, item):
+    def get_catalog_response_key(self, model, version, variant):
         '''
-        Return the language cache key
+        Return the key of a cached API response of a catalog model
         '''
-        return self.LANGUAGE_CONFIG_CACHE_KEY.format(self.get_pk(param), item)
+        return self.CATALOG_RESPONSE.format(model._meta.label_lower, version, variant)
 
     def get_ingredient_key(self, param):
         '''
@@ -109,11 +323,30 @@ class CacheKeyMapper(object):
         '''
         return self.WORKOUT_CANONICAL_REPRESENTATION.format(self.get_pk(param))
 
+    def get_workout_compact(self, param):
+        '''
+        Return the workout compact representation
+        '''
+        return self.WORKOUT_COMPACT_REPRESENTATION.format(self.get_pk(param))
+
     def get_workout_log_list(self, hash_value):
         '''
         Return the workout canonical representation
         '''
         return self.WORKOUT_LOG_LIST.format(hash_value)
 
+    def get_workout_log_last_weights(self, param):
+        '''
+        Return the key of the last weights a user logged per exercise and repetitions
+        '''
+        return self.WORKOUT_LOG_LAST_WEIGHTS.format(self.get_pk(param))
+
+    def get_weight_trend(self, param):
+        '''
+        Return the key of the weight trend of a user
+        '''
+        return self.WEIGHT_TREND.format(self.get_pk(param))
+
 
 cache_mapper = CacheKeyMapper()
+reference_cache = ReferenceCache()
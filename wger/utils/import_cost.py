@@ -0,0 +1,135 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Measures how long it takes to import the modules needed at startup
+
+This must run in a fresh interpreter, since modules that are already imported
+are not measured, see the import-cost management command:
+
+    python -m wger.utils.import_cost wsgi
+'''
+
+import sys
+import json
+import timeit
+
+TARGETS = ('setup', 'urls', 'wsgi')
+'''
+What is loaded: django.setup(), additionally the URL configuration or the
+complete WSGI application (including the middleware and URL configuration)
+'''
+
+
+class ImportTimer(object):
+    '''
+    Meta path finder that records the time needed to execute each module
+
+    The cumulative time includes the modules imported by a module, the self
+    time only its own code. Only modules loaded from files are measured,
+    built-in and frozen modules are ignored.
+    '''
+
+    def __init__(self):
+        from importlib import machinery
+
+        # File loaders are created for each module, so they can be patched
+        self._loaders = (machinery.SourceFileLoader,
+                         machinery.SourcelessFileLoader,
+                         machinery.ExtensionFileLoader)
+        self.results = []
+        self._stack = []
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        '''
+        Looks up the module with the other finders and times its loader
+        '''
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if isinstance(spec.loader, self._loaders):
+                self._wrap(fullname, spec.loader)
+            return spec
+        return None
+
+    def _wrap(self, fullname, loader):
+        '''
+        Replaces the loader's exec_module with a timed version
+        '''
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            self._stack.append(0.0)
+            start = timeit.default_timer()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = timeit.default_timer() - start
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.results.append((fullname, elapsed, elapsed - children))
+
+        loader.exec_module = timed_exec_module
+
+
+def load(target):
+    '''
+    Loads the application up to the given target
+    '''
+    import django
+    django.setup()
+
+    if target == 'wsgi':
+        from django.core.wsgi import get_wsgi_application
+        get_wsgi_application()
+
+    # The URL configuration is only loaded on the first request
+    if target in ('urls', 'wsgi'):
+        from importlib import import_module
+        from django.conf import settings
+        import_module(settings.ROOT_URLCONF)
+
+
+def main(target):
+    '''
+    Loads the application and prints the import times as JSON
+    '''
+    timer = ImportTimer()
+    timer.install()
+    start = timeit.default_timer()
+    try:
+        load(target)
+    finally:
+        timer.uninstall()
+
+    json.dump({'total': timeit.default_timer() - start,
+               'modules': timer.results},
+              sys.stdout)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2 or sys.argv[1] not in TARGETS:
+        sys.exit('Usage: python -m wger.utils.import_cost {0}'.format('|'.join(TARGETS)))
+    main(sys.argv[1])
@@ -16,11 +16,10 @@ import logging
 
 from django.utils import translation
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.cache import cache
 from wger.core.models import Language
 
 from wger.config.models import LanguageConfig
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import cache_mapper, reference_cache
 
 
 logger = logging.getLogger(__name__)
@@ -44,18 +43,14 @@ def load_language(language_code=None):
     else:
         used_language = language_code
 
-    language = cache.get(cache_mapper.get_language_key(used_language))
-    if language:
-        return language
+    def loader():
+        try:
+            return Language.objects.get(short_name=used_language)
+        except ObjectDoesNotExist:
+            # No luck, load english as our fall-back language
+            return Language.objects.get(short_name="en")
 
-    try:
-        language = Language.objects.get(short_name=used_language)
-    except ObjectDoesNotExist:
-        # No luck, load english as our fall-back language
-        language = Language.objects.get(short_name="en")
-
-    cache.set(cache_mapper.get_language_key(language), language)
-    return language
+    return reference_cache.get(cache_mapper.LANGUAGE_VERSION, used_language, loader)
 
 
 def load_item_languages(item, language_code=None):
@@ -64,25 +59,17 @@ def load_item_languages(item, language_code=None):
     '''
 
     language = load_language(language_code)
-    languages = cache.get(cache_mapper.get_language_config_key(language, item))
 
     # Load the configurations we are interested in and return the languages
-    if not languages:
-        languages = []
-
-        config = LanguageConfig.objects.filter(
-            language=language, item=item, show=True)
-        if not config:
-            languages.append(Language.objects.get(short_name="en"))
-            return languages
-
-        for i in config:
-            languages.append(i.language_target)
+    def loader():
+        config = LanguageConfig.objects.filter(language=language, item=item, show=True)
+        languages = [i.language_target for i in config.select_related('language_target')]
+        return languages if languages else [load_language('en')]
 
-        cache.set(cache_mapper.get_language_config_key(
-            language, item), languages)
-
-    return languages
+    # The cached list is shared, return a copy
+    return list(reference_cache.get(cache_mapper.LANGUAGE_CONFIG_VERSION,
+                                    '{0}-{1}'.format(language.pk, item),
+                                    loader))
 
 
 def load_ingredient_languages(request):
@@ -107,6 +94,6 @@ def load_ingredient_languages(request):
 
         # If the user's language is not english and has the preference, add english to the list
         if show_english and language.short_name != 'en':
-            languages = list(set(languages + [Language.objects.get(pk=2)]))
+            languages = list(set(languages + [load_language('en')]))
 
     return languages
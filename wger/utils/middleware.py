@@ -18,12 +18,8 @@ Custom middleware
 
 import logging
 
-from django.conf import settings
 from django.contrib import auth
 from django.utils.functional import SimpleLazyObject
-from django.contrib.auth import login as django_login
-
-from wger.core.demo import create_temporary_user
 
 
 logger = logging.getLogger(__name__)
@@ -52,33 +48,22 @@ def check_current_request(request):
 
 
 def get_user(request):
-    if not hasattr(request, '_cached_user'):
-
-        create_user = check_current_request(request)
-        user = auth.get_user(request)
-
-        # Set the flag in the session
-        if not request.session.get('has_demo_data'):
-            request.session['has_demo_data'] = False
-
-        # Django didn't find a user, so create one now
-        if settings.WGER_SETTINGS['ALLOW_GUEST_USERS'] and \
-                request.method == 'GET' and \
-                create_user and not user.is_authenticated():
-
-            logger.debug('creating a new guest user now')
-            user = create_temporary_user()
-            django_login(request, user)
+    '''
+    Returns the user for the request.
 
-        request._cached_user = user
+    Note that no temporary users are created here anymore, guests get a
+    read-only dashboard with shared demo data and a real user is only created
+    on their first write action (see wger.core.views.misc.demo_entries)
+    '''
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = auth.get_user(request)
     return request._cached_user
 
 
 class WgerAuthenticationMiddleware(object):
     '''
-    Small wrapper around django's own AuthenticationMiddleware. Simply creates
-    a new user with a temporary flag if the user hits certain URLs that need
-    a logged in user
+    Small wrapper around django's own AuthenticationMiddleware. Loads the user
+    lazily and does not touch the session or the database for guests
     '''
 
     def process_request(self, request):
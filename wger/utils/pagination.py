@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.template import Context, loader
+from django.utils.six.moves.urllib import parse as urlparse
+from rest_framework.compat import OrderedDict
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    '''
+    Pagination on the (date, id) of the objects
+
+    The cursor in the next and previous links contains the date and ID of the
+    last object of the page, the following page simply filters for the objects
+    after it. Unlike with page numbers, this does not need to skip the objects
+    of the previous pages, so all pages are loaded equally fast, no matter how
+    many objects the user has.
+
+    The objects are ordered by date, the ordering parameter can only reverse
+    the order (?ordering=-date). There is no total count of the objects.
+    '''
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = api_settings.PAGINATE_BY_PARAM
+    page_size = api_settings.PAGINATE_BY
+    max_page_size = 100
+    field = 'date'
+    invalid_cursor_message = 'Invalid cursor'
+    template = 'rest_framework/pagination/previous_and_next.html'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.descending = tuple(queryset.query.order_by[:1]) == ('-' + self.field, )
+        reverse, position = self.decode_cursor(request, queryset.model)
+
+        # Going back to the previous page means reading in the other direction
+        backwards = self.descending != reverse
+        ordering = (self.field, 'id')
+        if backwards:
+            ordering = ('-' + self.field, '-id')
+        queryset = queryset.order_by(*ordering)
+
+        # The first condition alone lets the database start reading from the
+        # position in the index instead of skipping all objects before it
+        if position is not None:
+            lookup = 'lt' if backwards else 'gt'
+            queryset = queryset.filter(**{'{0}__{1}e'.format(self.field, lookup): position[0]})
+            queryset = queryset.filter(
+                Q(**{'{0}__{1}'.format(self.field, lookup): position[0]}) |
+                Q(**{'id__{0}'.format(lookup): position[1]}))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = (position is not None) if reverse else has_more
+        self.has_previous = has_more if reverse else (position is not None)
+        self.display_page_controls = bool(self.page) and (self.has_next or self.has_previous)
+        return self.page
+
+    def get_page_size(self, request):
+        '''
+        Returns the page size requested by the client, up to the maximum
+        '''
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def decode_cursor(self, request, model):
+        '''
+        Returns the direction and the (date, id) position of the cursor
+        '''
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+
+        try:
+            tokens = urlparse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'))
+            reverse = tokens.get('r', ['0'])[0] == '1'
+            position = (model._meta.get_field(self.field).to_python(tokens['p'][0]),
+                        int(tokens['i'][0]))
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, obj, reverse):
+        '''
+        Returns the URL of the page after (or before) the given object
+        '''
+        tokens = {'p': getattr(obj, self.field).isoformat(), 'i': obj.pk}
+        if reverse:
+            tokens['r'] = '1'
+        encoded = b64encode(urlparse.urlencode(tokens).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link()
+        }
+
+    def to_html(self):
+        template = loader.get_template(self.template)
+        return template.render(Context(self.get_html_context()))
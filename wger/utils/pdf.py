@@ -12,20 +12,28 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import logging
+import hashlib
 import datetime
+import threading
 from os.path import join as path_join
 
 from django.conf import settings
 from django.utils import translation
 from django.core.exceptions import ObjectDoesNotExist
 
+from easy_thumbnails.files import get_thumbnailer
 from reportlab.lib.styles import ParagraphStyle, StyleSheet1
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
-from reportlab.platypus import Paragraph
+from reportlab.platypus import Image, Paragraph
 
 from wger import get_version
 from wger.core.models import Language
+from wger.utils.cache import cache_mapper, reference_cache
+
+
+logger = logging.getLogger(__name__)
 
 
 # ************************
@@ -98,15 +106,83 @@ def render_footer(url, date=None):
     return p
 
 
-# register new truetype fonts for reportlab
-pdfmetrics.registerFont(TTFont(
-    'OpenSans', path_join(settings.SITE_ROOT, 'core/static/fonts/OpenSans-Light.ttf')))
-pdfmetrics.registerFont(TTFont(
-    'OpenSans-Bold', path_join(settings.SITE_ROOT, 'core/static/fonts/OpenSans-Bold.ttf')))
-pdfmetrics.registerFont(TTFont(
-    'OpenSans-Regular', path_join(settings.SITE_ROOT, 'core/static/fonts/OpenSans-Regular.ttf')))
-pdfmetrics.registerFont(TTFont(
-    'OpenSans-Italic', path_join(settings.SITE_ROOT, 'core/static/fonts/OpenSans-LightItalic.ttf')))
+# ************************
+# Shared resources
+# ************************
+
+FONTS = (('OpenSans', 'OpenSans-Light.ttf'),
+         ('OpenSans-Bold', 'OpenSans-Bold.ttf'),
+         ('OpenSans-Regular', 'OpenSans-Regular.ttf'),
+         ('OpenSans-Italic', 'OpenSans-LightItalic.ttf'))
+'''
+The truetype fonts used in the PDFs
+'''
+
+_fonts_lock = threading.Lock()
+_fonts_registered = False
+
+
+def register_fonts():
+    '''
+    Registers the fonts with reportlab, if this didn't already happen
+
+    Parsing the fonts is expensive, so this is only done when the first PDF is
+    rendered and not when this module is imported. The registry is global to
+    the process, so the parsed fonts are shared by all documents (and by the
+    worker processes forked afterwards).
+    '''
+    global _fonts_registered
+    if _fonts_registered:
+        return
+
+    with _fonts_lock:
+        if not _fonts_registered:
+            for name, filename in FONTS:
+                pdfmetrics.registerFont(
+                    TTFont(name, path_join(settings.SITE_ROOT, 'core/static/fonts', filename)))
+            _fonts_registered = True
+
+
+def get_pdf_image(image, width):
+    '''
+    Returns an image flowable with the given width
+
+    This uses the downscaled 'pdf' thumbnail instead of the uploaded file,
+    which is usually much larger than needed for the small table cells. The
+    path and size of the thumbnail are cached, the entries are invalidated
+    when exercise images change (see wger.exercises.signals).
+
+    :param image: an image field, e.g. ExerciseImage.image
+    :param width: the width in the document, in points
+    '''
+    thumbnail = reference_cache.get(cache_mapper.PDF_IMAGE_VERSION,
+                                    hashlib.md5(image.name.encode('utf-8')).hexdigest(),
+                                    lambda: _load_pdf_thumbnail(image))
+
+    # Fall back to the original file if the thumbnail could not be created
+    if not thumbnail:
+        flowable = Image(image)
+        flowable.drawHeight = width * flowable.drawHeight / flowable.drawWidth
+        flowable.drawWidth = width
+        return flowable
+
+    path, image_width, image_height = thumbnail
+    return Image(path, width=width, height=width * image_height / image_width)
+
+
+def _load_pdf_thumbnail(image):
+    '''
+    Creates (if necessary) the 'pdf' thumbnail of an image
+
+    :return: a tuple with the path, width and height, None on errors
+    '''
+    try:
+        thumbnail = get_thumbnailer(image)['pdf']
+        return thumbnail.path, thumbnail.width, thumbnail.height
+    except Exception:
+        logger.warning('Could not create the PDF thumbnail for %s', image.name)
+        return None
+
 
 styleSheet = StyleSheet1()
 styleSheet.add(ParagraphStyle(
@@ -0,0 +1,218 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from io import BytesIO
+
+import six
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+
+
+logger = logging.getLogger(__name__)
+
+
+class PdfCache(object):
+    '''
+    Disk cache for the generated PDFs
+
+    The files are addressed by a hash of everything that is rendered in the
+    document, so changed objects simply produce a new entry and the outdated
+    ones are never read again. When the total size is above the configured
+    maximum, the least recently used files are removed.
+    '''
+
+    EVICT_INTERVAL = 60
+    '''
+    Seconds between two checks of the cache size
+
+    Checking the size needs to read all files in the directory, so it is only
+    done once in a while and not every time a file is saved. In between, the
+    cache can grow over the maximum by the files saved in that time.
+    '''
+
+    EVICT_MARKER = '.last-evict'
+    '''
+    Name of the file whose modification time is the last check of the size
+    '''
+
+    def get_directory(self):
+        '''
+        Returns the cache directory, None if the cache is disabled
+        '''
+        return settings.WGER_SETTINGS.get('PDF_CACHE_DIR')
+
+    def get_key(self, *parts):
+        '''
+        Returns the hash of all the rendered parts of the document
+
+        :param parts: values that can be serialized to JSON, e.g. the options
+                      and the relevant contents of the canonical representation
+        '''
+        data = json.dumps([translation.get_language()] + list(parts),
+                          sort_keys=True,
+                          default=six.text_type)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def get_filename(self, key):
+        '''
+        Returns the file name for a key
+        '''
+        return '{0}.pdf'.format(key)
+
+    def get(self, key):
+        '''
+        Returns the cached file or None
+        '''
+        directory = self.get_directory()
+        if not directory:
+            return None
+
+        path = os.path.join(directory, self.get_filename(key))
+        try:
+            with open(path, 'rb') as pdf_file:
+                content = pdf_file.read()
+
+            # Mark as recently used
+            os.utime(path, None)
+        except (IOError, OSError):
+            return None
+        return content
+
+    def set(self, key, content):
+        '''
+        Saves a file to the cache and removes old entries if necessary
+        '''
+        directory = self.get_directory()
+        if not directory:
+            return
+
+        try:
+            if not os.path.exists(directory):
+                os.makedirs(directory, 0o700)
+
+            # Write to a temporary file first, so that other processes never
+            # read a file that is only partially written
+            handle, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as pdf_file:
+                pdf_file.write(content)
+            os.rename(tmp_path, os.path.join(directory, self.get_filename(key)))
+        except (IOError, OSError):
+            logger.warning('Could not write to the PDF cache in %s', directory)
+            return
+
+        if self.is_evict_due(directory):
+            self.evict()
+
+    def is_evict_due(self, directory):
+        '''
+        Returns whether the size was last checked more than EVICT_INTERVAL ago
+
+        The time is shared by all processes through the marker file, which is
+        touched if the check is due.
+        '''
+        marker = os.path.join(directory, self.EVICT_MARKER)
+        try:
+            if time.time() - os.stat(marker).st_mtime < self.EVICT_INTERVAL:
+                return False
+        except OSError:
+            pass
+
+        try:
+            with open(marker, 'a'):
+                os.utime(marker, None)
+        except (IOError, OSError):
+            pass
+        return True
+
+    def evict(self):
+        '''
+        Removes the least recently used files until the cache size is below
+        the maximum
+        '''
+        max_size = settings.WGER_SETTINGS.get('PDF_CACHE_MAX_SIZE')
+        if not max_size:
+            return
+
+        files = []
+        for filename, path in self._list_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(i[1] for i in files)
+        for mtime, size, path in sorted(files):
+            if total_size <= max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def clear(self):
+        '''
+        Removes all cached files
+        '''
+        for filename, path in self._list_files():
+            self._remove(path)
+
+    def _list_files(self):
+        '''
+        Returns the cached files as (filename, path) tuples
+        '''
+        directory = self.get_directory()
+        if not directory or not os.path.isdir(directory):
+            return []
+        return [(i, os.path.join(directory, i)) for i in os.listdir(directory)
+                if i.endswith('.pdf')]
+
+    def _remove(self, path):
+        '''
+        Removes a file, ignoring files that were already removed by others
+        '''
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+pdf_cache = PdfCache()
+
+
+def get_cached_pdf_response(filename, build, key_parts):
+    '''
+    Returns a response with the PDF, only building it if it is not cached
+
+    :param filename: the file name used in the Content-Disposition header
+    :param build: callable that writes the PDF to the file-like object it gets
+    :param key_parts: everything that is rendered in the document, see PdfCache.get_key
+    '''
+    key = pdf_cache.get_key(*key_parts)
+    content = pdf_cache.get(key)
+    if content is None:
+        buffer = BytesIO()
+        build(buffer)
+        content = buffer.getvalue()
+        pdf_cache.set(key, content)
+
+    response = HttpResponse(content, content_type='application/pdf')
+    response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
+    response['Content-Length'] = len(content)
+    return response
@@ -18,6 +18,49 @@
 from rest_framework import permissions
 
 
+def get_owner_ids(request, model, pks):
+    '''
+    Returns the IDs of the users owning the given objects
+
+    The owners are read with one query following the model's owner_field, and
+    remembered until the end of the request.
+
+    :param request: the current request
+    :param model: a model with an owner_field, e.g. Setting
+    :param pks: list of primary keys, invalid or unknown ones are ignored
+    :return: a dictionary {pk: user ID}
+    '''
+    owner_ids = request.__dict__.setdefault('_wger_owner_ids', {})
+
+    keys = set()
+    for pk in pks:
+        try:
+            keys.add((model, int(pk)))
+        except (TypeError, ValueError):
+            pass
+
+    missing = [key[1] for key in keys if key not in owner_ids]
+    if missing:
+        for key in missing:
+            owner_ids[(model, key)] = None
+        queryset = model.objects.filter(pk__in=missing)
+        for pk, user_id in queryset.values_list('pk', model.owner_field):
+            owner_ids[(model, pk)] = user_id
+
+    return dict((key[1], owner_ids[key]) for key in keys if owner_ids[key] is not None)
+
+
+def is_owner(request, obj):
+    '''
+    Checks whether the user of the request owns the object
+    '''
+    if obj.owner_field == 'user':
+        user_id = obj.user_id
+    else:
+        user_id = get_owner_ids(request, type(obj), [obj.pk]).get(obj.pk)
+    return user_id is not None and user_id == request.user.pk
+
+
 class WgerPermission(permissions.BasePermission):
     '''
     Checks that the user has access to the object
@@ -43,6 +86,10 @@ class WgerPermission(permissions.BasePermission):
         '''
         Perform the check
         '''
+        # Objects of the users, resolved with one query
+        if hasattr(obj, 'owner_field'):
+            return is_owner(request, obj)
+
         owner_object = obj.get_owner_object() if hasattr(
             obj, 'get_owner_object') else False
 
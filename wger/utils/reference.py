@@ -0,0 +1,82 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+
+from wger.core.models import (
+    DaysOfWeek,
+    License,
+    RepetitionUnit,
+    WeightUnit
+)
+from wger.utils.cache import cache_mapper, reference_cache
+
+
+# ************************
+# Cached reference data
+#
+# These tables change very rarely, the entries are invalidated by the
+# signals in wger.core.signals
+# ************************
+
+
+def get_days_of_week():
+    '''
+    Returns a list with all the days of the week
+    '''
+    return reference_cache.get(cache_mapper.DAYS_OF_WEEK_VERSION,
+                               'all',
+                               lambda: list(DaysOfWeek.objects.all()))
+
+
+def get_repetition_units():
+    '''
+    Returns a list with all the repetition units
+    '''
+    return reference_cache.get(cache_mapper.REPETITION_UNIT_VERSION,
+                               'all',
+                               lambda: list(RepetitionUnit.objects.all()))
+
+
+def get_weight_units():
+    '''
+    Returns a list with all the weight units
+    '''
+    return reference_cache.get(cache_mapper.WEIGHT_UNIT_VERSION,
+                               'all',
+                               lambda: list(WeightUnit.objects.all()))
+
+
+def get_license(short_name):
+    '''
+    Returns the license with the given short name or None if there is none
+    '''
+    licenses = reference_cache.get(cache_mapper.LICENSE_VERSION,
+                                   'all',
+                                   lambda: dict((i.short_name, i)
+                                                for i in License.objects.all()))
+    return licenses.get(short_name)
+
+
+def get_current_site():
+    '''
+    Returns the current site
+
+    Django's own cache in Site.objects.get_current() is per process and is not
+    reset when the site is edited in a different one.
+    '''
+    return reference_cache.get(cache_mapper.SITE_VERSION,
+                               settings.SITE_ID,
+                               lambda: Site.objects.get(pk=settings.SITE_ID))
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Helpers for the management commands that send reminder emails
+'''
+
+import time
+from collections import defaultdict
+
+import six
+from django.conf import settings
+from django.core import mail
+from django.core.management.base import BaseCommand, CommandError
+from django.template import loader
+from django.utils import translation
+
+
+def render_reminder_emails(reminders, subject, template_name):
+    '''
+    Renders the reminder emails, grouped by the notification language
+
+    :param reminders: list of (profile, context) tuples, the profiles need
+                      their user and notification language
+    :param subject: the (lazily translated) subject
+    :param template_name: the template of the email body
+    :return: list of EmailMessage objects, in the order of the reminders
+    '''
+    languages = defaultdict(list)
+    for index, (profile, context) in enumerate(reminders):
+        languages[profile.notification_language.short_name].append(index)
+
+    template = loader.get_template(template_name)
+    messages = [None] * len(reminders)
+    for language, indices in languages.items():
+        with translation.override(language):
+            language_subject = six.text_type(subject)
+            for index in indices:
+                profile, context = reminders[index]
+                messages[index] = mail.EmailMessage(language_subject,
+                                                    template.render(context),
+                                                    settings.WGER_SETTINGS['EMAIL_FROM'],
+                                                    [profile.user.email])
+    return messages
+
+
+class ReminderCommand(BaseCommand):
+    '''
+    Base class for commands that send reminder emails
+
+    Subclasses find the users to remind in get_reminders(). The emails are
+    rendered once per language and sent one by one through one connection,
+    only the reminders that were actually sent are passed to reminders_sent().
+    '''
+
+    subject = None
+    '''
+    Subject of the emails
+    '''
+
+    template_name = None
+    '''
+    Template of the email body
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run',
+                            action='store_true',
+                            dest='dry_run',
+                            default=False,
+                            help='Only show how many reminders would be sent, use -v 2 to list '
+                                 'the recipients')
+
+    def handle(self, **options):
+        '''
+        Find the users to remind and send the emails
+        '''
+        verbosity = int(options['verbosity'])
+        start = time.time()
+        reminders = self.get_reminders(options)
+        found = time.time()
+        messages = render_reminder_emails(reminders, self.subject, self.template_name)
+        rendered = time.time()
+
+        if options['dry_run']:
+            if verbosity >= 2:
+                for message, (profile, context) in zip(messages, reminders):
+                    self.stdout.write(u"* {0} ({1}): {2}".format(
+                        profile.user.username, message.to[0], message.subject))
+            self.stdout.write("Would send {0} email reminders".format(len(messages)))
+        elif messages:
+            sent = self.send_reminders(messages, reminders)
+            if verbosity >= 2:
+                self.stdout.write("Sent {0} email reminders".format(len(sent)))
+            if len(sent) < len(messages):
+                raise CommandError("Could not send {0} of {1} email reminders".format(
+                    len(messages) - len(sent), len(messages)))
+
+        if verbosity >= 2:
+            self.stdout.write("Found the reminders in {0:.0f} ms, rendered them in {1:.0f} ms, "
+                              "sent them in {2:.0f} ms".format(
+                                  1000 * (found - start),
+                                  1000 * (rendered - found),
+                                  1000 * (time.time() - rendered)))
+
+    def send_reminders(self, messages, reminders):
+        '''
+        Sends the emails and saves the reminders that were sent
+
+        Errors when opening the connection are raised, failed emails are
+        written to stderr and the remaining ones are still sent.
+
+        :return: list of the reminders that were sent
+        '''
+        sent = []
+        connection = mail.get_connection()
+        connection.open()
+        try:
+            for message, reminder in zip(messages, reminders):
+                try:
+                    if connection.send_messages([message]):
+                        sent.append(reminder)
+                except Exception as e:
+                    self.stderr.write(u"Could not send the reminder to {0}: {1}".format(
+                        message.to[0], e))
+        finally:
+            connection.close()
+            if sent:
+                self.reminders_sent(sent)
+        return sent
+
+    def get_reminders(self, options):
+        '''
+        Returns the reminders to send as a list of (profile, context) tuples
+        '''
+        raise NotImplementedError
+
+    def reminders_sent(self, reminders):
+        '''
+        Called after the reminders were sent, e.g. to save the date
+        '''
+        pass
@@ -0,0 +1,130 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+from django.core.cache import cache
+from django.utils.http import http_date
+from mock import patch
+
+from wger.core.models import Language
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.api.serializers import MuscleSerializer
+from wger.exercises.models import Exercise, Muscle
+from wger.utils.cache import cache_mapper, get_catalog_version
+
+
+class CatalogCacheTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the conditional GET and the response cache of the catalog API
+    '''
+
+    url = '/api/v2/muscle/'
+
+    def test_etag(self):
+        '''
+        Test that the client's current version is answered with 304
+        '''
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(response['Last-Modified'],
+                         http_date(get_catalog_version(Muscle) // 1000000))
+
+        with patch.object(MuscleSerializer, 'to_representation') as mock_serializer:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+            self.assertIn('Accept', response['Vary'])
+            self.assertEqual(response.content, b'')
+            self.assertFalse(mock_serializer.called)
+
+        # Other query parameters and formats have their own ETag
+        response = self.client.get(self.url, {'is_front': 'True'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Changes to the data result in a new ETag
+        Muscle.objects.get(pk=1).save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_last_modified(self):
+        '''
+        Test the If-Modified-Since header
+        '''
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(response.status_code, 200)
+
+    def test_response_cache(self):
+        '''
+        Test that the responses for anonymous users are cached
+        '''
+        response = self.client.get(self.url, {'ordering': 'name', 'limit': 5})
+        self.assertEqual(response.status_code, 200)
+
+        with patch.object(MuscleSerializer, 'to_representation') as mock_serializer:
+            # The order of the parameters doesn't matter
+            cached = self.client.get('{0}?limit=5&ordering=name'.format(self.url))
+            self.assertEqual(cached.status_code, 200)
+            self.assertEqual(cached.content, response.content)
+            self.assertEqual(cached['ETag'], response['ETag'])
+            self.assertEqual(cached['Content-Type'], response['Content-Type'])
+            self.assertEqual(cached['Allow'], response['Allow'])
+            self.assertEqual(cached['Vary'], response['Vary'])
+            self.assertIn('Accept', cached['Vary'])
+            self.assertFalse(mock_serializer.called)
+
+        # Logged in users are not served from the cache
+        self.user_login('test')
+        with patch.object(MuscleSerializer, 'to_representation', return_value={}) as mock:
+            self.client.get(self.url, {'ordering': 'name', 'limit': 5})
+            self.assertTrue(mock.called)
+
+    def test_detail(self):
+        '''
+        Test the detail pages
+        '''
+        response = self.client.get('/api/v2/language/1/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/v2/language/1/',
+                                         HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        language = Language.objects.get(pk=1)
+        language.full_name = 'Deutsch (neu)'
+        language.save()
+        response = self.client.get('/api/v2/language/1/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['full_name'], 'Deutsch (neu)')
+
+    def test_many_to_many(self):
+        '''
+        Test that changing the muscles of an exercise invalidates the exercises
+        '''
+        version = get_catalog_version(Exercise)
+        Exercise.objects.get(pk=1).muscles.add(Muscle.objects.get(pk=2))
+        self.assertGreater(get_catalog_version(Exercise), version)
+
+    def test_lost_version(self):
+        '''
+        Test that a new version is started if the cache was cleared
+        '''
+        version = get_catalog_version(Muscle)
+        cache.delete(cache_mapper.get_catalog_version_key(Muscle))
+        self.assertGreater(get_catalog_version(Muscle), version)
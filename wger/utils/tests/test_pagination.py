@@ -0,0 +1,118 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+import datetime
+
+from django.contrib.auth.models import User
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise
+from wger.manager.models import Workout, WorkoutLog
+
+
+class KeysetPaginationTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the keyset pagination of the workout logs
+    '''
+
+    url = '/api/v2/workoutlog/'
+
+    def setUp(self):
+        super(KeysetPaginationTestCase, self).setUp()
+        self.user = User.objects.get(username='test')
+        self.workout = Workout.objects.create(user=self.user)
+        WorkoutLog.objects.filter(user=self.user).delete()
+
+        # Several logs per day, so pages end in the middle of a day
+        for i in range(25):
+            WorkoutLog.objects.create(user=self.user,
+                                      workout=self.workout,
+                                      exercise=Exercise.objects.get(pk=1),
+                                      reps=10 - i % 3,
+                                      weight=50,
+                                      date=datetime.date(2016, 1, 1 + i // 4))
+        self.expected = list(WorkoutLog.objects.filter(user=self.user)
+                                               .order_by('date', 'id')
+                                               .values_list('id', flat=True))
+        self.user_login('test')
+
+    def get_all(self, url):
+        '''
+        Helper function that follows the next links and returns the IDs
+        '''
+        ids = []
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            ids.extend(i['id'] for i in response.data['results'])
+            url = response.data['next']
+        return ids, pages
+
+    def test_next(self):
+        '''
+        Test that paging forwards returns every log once
+        '''
+        ids, pages = self.get_all('{0}?limit=7'.format(self.url))
+        self.assertEqual(ids, self.expected)
+        self.assertEqual([len(i['results']) for i in pages], [7, 7, 7, 4])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertNotIn('count', pages[0])
+
+    def test_previous(self):
+        '''
+        Test that the previous links return the same pages
+        '''
+        ids, pages = self.get_all('{0}?limit=7'.format(self.url))
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(response.data['results'], pages[-2]['results'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(response.data['results'], pages[-3]['results'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(response.data['results'], pages[0]['results'])
+        self.assertIsNone(response.data['previous'])
+        self.assertEqual(response.data['next'], pages[0]['next'])
+
+    def test_descending(self):
+        '''
+        Test paging with the newest logs first
+        '''
+        ids, pages = self.get_all('{0}?limit=10&ordering=-date'.format(self.url))
+        self.assertEqual(ids, list(reversed(self.expected)))
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(response.data['results'], pages[-2]['results'])
+
+    def test_max_page_size(self):
+        '''
+        Test that the page size is limited
+        '''
+        WorkoutLog.objects.bulk_create([WorkoutLog(user=self.user,
+                                                   workout=self.workout,
+                                                   exercise_id=1,
+                                                   reps=1,
+                                                   weight=50,
+                                                   date=datetime.date(2017, 1, 1))
+                                        for i in range(120)])
+        response = self.client.get('{0}?limit=1000'.format(self.url))
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_invalid_cursor(self):
+        '''
+        Test that invalid cursors are rejected
+        '''
+        response = self.client.get('{0}?cursor=abc'.format(self.url))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,81 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.core.files import File
+from mock import patch
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise, ExerciseImage
+from wger.utils.pdf import get_pdf_image, register_fonts
+
+
+class PdfResourcesTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the shared fonts and images used in the PDFs
+    '''
+
+    def save_image(self, filename):
+        '''
+        Helper function to save an image to an exercise
+        '''
+        image = ExerciseImage()
+        image.exercise = Exercise.objects.get(pk=2)
+        image.status = ExerciseImage.STATUS_ACCEPTED
+        image.image.save(filename,
+                         File(open('wger/exercises/tests/{0}'.format(filename), 'rb')))
+        image.save()
+        return image
+
+    def test_register_fonts(self):
+        '''
+        Test that the fonts are only registered once
+        '''
+        register_fonts()
+        font = pdfmetrics.getFont('OpenSans-Bold')
+        register_fonts()
+        self.assertIs(pdfmetrics.getFont('OpenSans-Bold'), font)
+
+    def test_image_thumbnail(self):
+        '''
+        Test that the downscaled thumbnail is used and its size is cached
+        '''
+        image = self.save_image('protestschwein.jpg')
+
+        flowable = get_pdf_image(image.image, 2 * cm)
+        self.assertIn('.jpg.240x0', flowable.filename)
+        self.assertNotEqual(flowable.filename, image.image.path)
+        self.assertAlmostEqual(flowable.drawWidth, 2 * cm)
+        self.assertAlmostEqual(flowable.drawHeight, 2 * cm * 159 / 240, places=3)
+
+        with patch('wger.utils.pdf.get_thumbnailer', side_effect=IOError) as mock_thumbnailer:
+            self.assertEqual(get_pdf_image(image.image, cm).filename, flowable.filename)
+            self.assertFalse(mock_thumbnailer.called)
+
+            # Changing the images resets the cache
+            image.save()
+            get_pdf_image(image.image, cm)
+            self.assertTrue(mock_thumbnailer.called)
+
+    def test_image_fallback(self):
+        '''
+        Test that the original image is used if no thumbnail can be created
+        '''
+        image = self.save_image('wildschwein.jpg')
+
+        with patch('wger.utils.pdf.get_thumbnailer', side_effect=IOError):
+            flowable = get_pdf_image(image.image, 2 * cm)
+        self.assertAlmostEqual(flowable.drawWidth, 2 * cm)
+        self.assertAlmostEqual(flowable.drawHeight, 2 * cm * 320 / 482)
@@ -0,0 +1,96 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import os
+import time
+
+from django.conf import settings
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.pdf_cache import PdfCache
+
+
+class PdfCacheTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the disk cache for the generated PDFs
+    '''
+
+    def setUp(self):
+        super(PdfCacheTestCase, self).setUp()
+        self.pdf_cache = PdfCache()
+        self.max_size = settings.WGER_SETTINGS['PDF_CACHE_MAX_SIZE']
+
+    def tearDown(self):
+        settings.WGER_SETTINGS['PDF_CACHE_MAX_SIZE'] = self.max_size
+        super(PdfCacheTestCase, self).tearDown()
+
+    def test_get_set(self):
+        '''
+        Test saving and reading a file
+        '''
+        key = self.pdf_cache.get_key('workout-log', True, [1, 2, 3])
+        self.assertEqual(key, self.pdf_cache.get_key('workout-log', True, [1, 2, 3]))
+        self.assertNotEqual(key, self.pdf_cache.get_key('workout-log', False, [1, 2, 3]))
+
+        self.assertIsNone(self.pdf_cache.get(key))
+        self.pdf_cache.set(key, b'%PDF')
+        self.assertEqual(self.pdf_cache.get(key), b'%PDF')
+
+    def test_disabled(self):
+        '''
+        Test that nothing is saved if the cache is disabled
+        '''
+        settings.WGER_SETTINGS['PDF_CACHE_DIR'] = None
+        self.pdf_cache.set('abc', b'%PDF')
+        self.assertIsNone(self.pdf_cache.get('abc'))
+
+    def test_evict(self):
+        '''
+        Test that the least recently used files are removed
+        '''
+        settings.WGER_SETTINGS['PDF_CACHE_MAX_SIZE'] = 25
+        self.pdf_cache.EVICT_INTERVAL = 0
+        directory = settings.WGER_SETTINGS['PDF_CACHE_DIR']
+        for key in ('a', 'b'):
+            self.pdf_cache.set(key, b'0123456789')
+
+        # Make sure the modification times are different
+        old = time.time() - 100
+        os.utime(os.path.join(directory, self.pdf_cache.get_filename('a')), (old, old))
+        os.utime(os.path.join(directory, self.pdf_cache.get_filename('b')), (old - 10, old - 10))
+        self.pdf_cache.get('b')
+
+        self.pdf_cache.set('c', b'0123456789')
+        self.assertIsNone(self.pdf_cache.get('a'))
+        self.assertIsNotNone(self.pdf_cache.get('b'))
+        self.assertIsNotNone(self.pdf_cache.get('c'))
+
+    def test_evict_interval(self):
+        '''
+        Test that the size is only checked once per interval
+        '''
+        settings.WGER_SETTINGS['PDF_CACHE_MAX_SIZE'] = 15
+        directory = settings.WGER_SETTINGS['PDF_CACHE_DIR']
+        self.pdf_cache.set('a', b'0123456789')
+        self.pdf_cache.set('b', b'0123456789')
+        self.assertIsNotNone(self.pdf_cache.get('a'))
+
+        # The last check is longer ago
+        old = time.time() - self.pdf_cache.EVICT_INTERVAL - 1
+        os.utime(os.path.join(directory, self.pdf_cache.EVICT_MARKER), (old, old))
+        os.utime(os.path.join(directory, self.pdf_cache.get_filename('a')), (old, old))
+        self.pdf_cache.set('c', b'0123456789')
+        self.assertIsNone(self.pdf_cache.get('a'))
+        self.assertIsNone(self.pdf_cache.get('b'))
+        self.assertIsNotNone(self.pdf_cache.get('c'))
@@ -0,0 +1,104 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import RequestFactory
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import Setting, Workout
+from wger.nutrition.models import MealItem
+from wger.utils.permissions import WgerPermission, get_owner_ids
+
+
+class OwnerPermissionTestCase(WorkoutManagerTestCase):
+    '''
+    Tests resolving the owners of objects for the permission checks
+    '''
+
+    def get_request(self, user, method='get'):
+        '''
+        Helper function that returns a request of the user
+        '''
+        request = getattr(RequestFactory(), method)('/')
+        request.user = user
+        return request
+
+    def test_get_owner_ids(self):
+        '''
+        Test that the owners are resolved with one query and remembered
+        '''
+        request = self.get_request(AnonymousUser())
+        settings = Setting.objects.all()
+        expected = dict((i.pk, i.get_owner_object().user_id) for i in settings)
+        pks = [str(i.pk) for i in settings] + ['abc', 9999]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_owner_ids(request, Setting, pks), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_owner_ids(request, Setting, pks), expected)
+
+        items = MealItem.objects.all()
+        expected = dict((i.pk, i.get_owner_object().user_id) for i in items)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_owner_ids(self.get_request(AnonymousUser()),
+                                           MealItem,
+                                           [i.pk for i in items]),
+                             expected)
+
+    def test_object_permission(self):
+        '''
+        Test that checking a nested object needs one query
+        '''
+        setting = Setting.objects.get(pk=1)
+        owner = setting.get_owner_object().user
+        other = User.objects.exclude(pk=owner.pk).first()
+        permission = WgerPermission()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(permission.has_object_permission(self.get_request(owner),
+                                                             None,
+                                                             setting))
+        with self.assertNumQueries(1):
+            self.assertFalse(permission.has_object_permission(self.get_request(other, 'post'),
+                                                              None,
+                                                              setting))
+
+        # The owner is read from the object itself
+        workout = Workout.objects.get(pk=1)
+        with self.assertNumQueries(0):
+            self.assertFalse(permission.has_object_permission(self.get_request(other),
+                                                              None,
+                                                              workout))
+
+    def test_create(self):
+        '''
+        Test that objects can only be added to the user's own objects
+        '''
+        setting = Setting.objects.get(pk=1)
+        owner = setting.get_owner_object().user
+        data = {'set': setting.set_id, 'exercise': setting.exercise_id, 'reps': 8, 'order': 1}
+
+        self.user_login(User.objects.exclude(pk=owner.pk).first().username)
+        response = self.client.post('/api/v2/setting/', data)
+        self.assertEqual(response.status_code, 403)
+
+        self.user_login(owner.username)
+        response = self.client.post('/api/v2/setting/', data)
+        self.assertEqual(response.status_code, 201)
+
+        # Objects that don't exist are a validation error
+        data['set'] = 9999
+        response = self.client.post('/api/v2/setting/', data)
+        self.assertEqual(response.status_code, 400)
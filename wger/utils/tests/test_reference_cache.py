@@ -0,0 +1,125 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from wger.core.models import (
+    DaysOfWeek,
+    Language,
+    License
+)
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.cache import (
+    ReferenceCache,
+    increment_cache_version,
+    reference_cache
+)
+from wger.utils.language import load_language
+from wger.utils.reference import (
+    get_current_site,
+    get_days_of_week,
+    get_license
+)
+
+
+class ReferenceCacheTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the process local cache for reference data
+    '''
+
+    def test_local_and_shared_tier(self):
+        '''
+        Test that the loader is only called when the value is not cached
+        '''
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return 'value'
+
+        local_cache = ReferenceCache()
+        self.assertEqual(local_cache.get('test', 'key', loader), 'value')
+        self.assertEqual(local_cache.get('test', 'key', loader), 'value')
+        self.assertEqual(len(calls), 1)
+
+        # A different process only has the shared cache
+        other_cache = ReferenceCache()
+        self.assertEqual(other_cache.get('test', 'key', loader), 'value')
+        self.assertEqual(len(calls), 1)
+
+        self.assertEqual(local_cache.stats()['test'],
+                         {'local_hits': 1, 'shared_hits': 0, 'misses': 1, 'hit_rate': 0.5})
+        self.assertEqual(other_cache.stats()['test'],
+                         {'local_hits': 0, 'shared_hits': 1, 'misses': 0, 'hit_rate': 1})
+
+    def test_invalidation_other_process(self):
+        '''
+        Test that a new version invalidates the entries once their timeout is over
+        '''
+        values = ['first', 'second']
+        local_cache = ReferenceCache(timeout=0)
+        self.assertEqual(local_cache.get('test', 'key', lambda: values[0]), 'first')
+        self.assertEqual(local_cache.get('test', 'key', lambda: values[1]), 'first')
+
+        increment_cache_version('test')
+        self.assertEqual(local_cache.get('test', 'key', lambda: values[1]), 'second')
+
+    def test_max_entries(self):
+        '''
+        Test that the least recently used entries are removed
+        '''
+        local_cache = ReferenceCache(max_entries=2)
+        local_cache.get('test', 1, lambda: 1)
+        local_cache.get('test', 2, lambda: 2)
+        local_cache.get('test', 1, lambda: 1)
+        local_cache.get('test', 3, lambda: 3)
+        self.assertEqual(list(local_cache._entries.keys()), [('test', 1), ('test', 3)])
+
+    def test_load_language(self):
+        '''
+        Test that languages are only loaded once
+        '''
+        with self.assertNumQueries(1):
+            self.assertEqual(load_language('de').short_name, 'de')
+            self.assertEqual(load_language('de').short_name, 'de')
+
+        with self.assertNumQueries(2):
+            self.assertEqual(load_language('xx').short_name, 'en')
+
+        language = Language.objects.get(short_name='de')
+        language.full_name = 'German'
+        language.save()
+        self.assertEqual(load_language('de').full_name, 'German')
+
+    def test_reference_data(self):
+        '''
+        Test the cached reference tables and their invalidation
+        '''
+        with self.assertNumQueries(3):
+            self.assertEqual(len(get_days_of_week()), 7)
+            self.assertEqual(len(get_days_of_week()), 7)
+            self.assertIsNone(get_license('Apache'))
+            self.assertIsNone(get_license('Apache'))
+            self.assertTrue(get_current_site().domain)
+            self.assertTrue(get_current_site().domain)
+
+        License.objects.create(short_name='Apache', full_name='Apache License')
+        self.assertEqual(get_license('Apache').full_name, 'Apache License')
+
+        # Updates that don't send signals are not seen
+        DaysOfWeek.objects.filter(pk=7).update(day_of_week='Day 7')
+        self.assertNotEqual(get_days_of_week()[6].day_of_week, 'Day 7')
+        DaysOfWeek.objects.get(pk=6).delete()
+        self.assertEqual(len(get_days_of_week()), 6)
+        self.assertEqual(get_days_of_week()[5].day_of_week, 'Day 7')
+
+        self.assertIn('days-of-week', reference_cache.stats())
@@ -0,0 +1,100 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from wger.utils.timeseries import TimeSeries
+
+
+class TimeSeriesTestCase(SimpleTestCase):
+    '''
+    Tests the compact time series used for the charts
+    '''
+
+    def get_series(self, values):
+        '''
+        Helper function that returns a series with one point per day
+        '''
+        start = datetime.date(2016, 1, 1)
+        return TimeSeries.from_rows((start + datetime.timedelta(days=i), value)
+                                    for i, value in enumerate(values))
+
+    def test_chart_data(self):
+        '''
+        Test reading rows and returning the chart data
+        '''
+        series = TimeSeries.from_rows([(datetime.date(2016, 1, 1), Decimal('80.50')),
+                                       (datetime.date(2016, 1, 3), 81)])
+        self.assertEqual(len(series), 2)
+        self.assertEqual(series.get_chart_data('weight'),
+                         [{'date': '2016-01-01', 'weight': 80.5},
+                          {'date': '2016-01-03', 'weight': 81.0}])
+        self.assertEqual(series.get_chart_data('weight', reps=8)[0],
+                         {'date': '2016-01-01', 'weight': 80.5, 'reps': 8})
+
+    def test_append_max(self):
+        '''
+        Test that only the highest value of a date is kept
+        '''
+        series = TimeSeries()
+        series.append_max(datetime.date(2016, 1, 1), 50)
+        series.append_max(datetime.date(2016, 1, 1), Decimal('52.5'))
+        series.append_max(datetime.date(2016, 1, 1), 40)
+        series.append_max(datetime.date(2016, 1, 2), 45)
+        self.assertEqual([i['weight'] for i in series.get_chart_data('weight')], [52.5, 45])
+
+    def test_downsample_short(self):
+        '''
+        Test that short series are not changed
+        '''
+        series = self.get_series([1, 2, 3])
+        self.assertIs(series.downsample(3), series)
+        self.assertIs(series.downsample(100, 'minmax'), series)
+        self.assertRaises(ValueError, series.downsample, 2, 'average')
+
+    def test_downsample_lttb(self):
+        '''
+        Test that LTTB keeps the ends and the outliers
+        '''
+        values = [80] * 1000
+        values[500] = 90
+        values[700] = 70
+        series = self.get_series(values).downsample(20)
+
+        self.assertEqual(len(series), 20)
+        self.assertEqual(series.days[0], datetime.date(2016, 1, 1).toordinal())
+        self.assertEqual(series.days[-1], (datetime.date(2016, 1, 1) +
+                                           datetime.timedelta(days=999)).toordinal())
+        self.assertIn(90, series.values)
+        self.assertIn(70, series.values)
+        self.assertEqual(list(series.days), sorted(series.days))
+
+        # At least three points are kept
+        self.assertEqual(len(self.get_series(values).downsample(1)), 3)
+
+    def test_downsample_minmax(self):
+        '''
+        Test that the lowest and highest value of each bucket are kept
+        '''
+        values = [float(i % 10) for i in range(1002)]
+        series = self.get_series(values).downsample(22, 'minmax')
+
+        self.assertLessEqual(len(series), 22)
+        self.assertEqual(series.values[0], 0)
+        self.assertEqual(series.values[-1], 1)
+        self.assertEqual(sorted(set(series.values[1:-1])), [0, 9])
+        self.assertEqual(list(series.days), sorted(series.days))
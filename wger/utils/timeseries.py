@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Compact time series for the charts
+
+The points are kept in two arrays, the dates as ordinal numbers and the values
+as floats. For users with years of daily entries this is much smaller and
+faster than model instances or lists of dictionaries.
+'''
+
+import datetime
+from array import array
+
+DOWNSAMPLING_METHODS = ('lttb', 'minmax')
+'''
+Supported downsampling methods, see TimeSeries.downsample()
+'''
+
+MIN_POINTS = 3
+'''
+Minimum number of points of a downsampled series, the first and last point are
+always kept
+'''
+
+
+class TimeSeries(object):
+    '''
+    Series of (date, value) points, ordered by date
+    '''
+
+    def __init__(self):
+        self.days = array('l')
+        self.values = array('d')
+
+    @classmethod
+    def from_rows(cls, rows):
+        '''
+        Creates a series from (date, value) tuples, e.g. from values_list()
+
+        :param rows: iterable of tuples, ordered by date
+        '''
+        series = cls()
+        for date, value in rows:
+            series.days.append(date.toordinal())
+            series.values.append(float(value))
+        return series
+
+    def __len__(self):
+        return len(self.days)
+
+    def append_max(self, date, value):
+        '''
+        Adds a point, or raises the value of the last point if it has the same date
+
+        :param date: the date of the point, not earlier than the last one
+        :param value: the value, anything that can be converted to a float
+        '''
+        day = date.toordinal()
+        value = float(value)
+        if self.days and self.days[-1] == day:
+            self.values[-1] = max(self.values[-1], value)
+        else:
+            self.days.append(day)
+            self.values.append(value)
+
+    def downsample(self, points, method='lttb'):
+        '''
+        Returns a series with at most the given number of points
+
+        The first and last point are always kept. The 'lttb' method (Largest
+        Triangle Three Buckets) keeps the points that best preserve the shape
+        of the curve, 'minmax' keeps the lowest and highest point of equally
+        sized buckets.
+
+        :param points: the maximum number of points, at least MIN_POINTS
+        :param method: one of DOWNSAMPLING_METHODS
+        :return: a new series, or this one if it is short enough
+        '''
+        if method not in DOWNSAMPLING_METHODS:
+            raise ValueError('Unknown downsampling method: {0}'.format(method))
+
+        points = max(points, MIN_POINTS)
+        if len(self) <= points:
+            return self
+
+        if method == 'lttb':
+            indices = self._lttb(points)
+        else:
+            indices = self._minmax(points)
+
+        series = TimeSeries()
+        for i in indices:
+            series.days.append(self.days[i])
+            series.values.append(self.values[i])
+        return series
+
+    def _lttb(self, points):
+        '''
+        Returns the indices of the points selected by Largest Triangle Three Buckets
+        '''
+        days = self.days
+        values = self.values
+        size = len(days)
+
+        # The first and last point are buckets of their own
+        bucket_size = float(size - 2) / (points - 2)
+        indices = [0]
+        selected = 0
+        for bucket in range(points - 2):
+            start = int(bucket * bucket_size) + 1
+            end = int((bucket + 1) * bucket_size) + 1
+
+            # The average point of the next bucket is the third corner of the triangles
+            next_end = min(int((bucket + 2) * bucket_size) + 1, size)
+            average_day = sum(days[end:next_end]) / float(next_end - end)
+            average_value = sum(values[end:next_end]) / float(next_end - end)
+
+            selected_day = days[selected]
+            selected_value = values[selected]
+            max_area = -1
+            for i in range(start, end):
+                area = abs((selected_day - average_day) * (values[i] - selected_value) -
+                           (selected_day - days[i]) * (average_value - selected_value))
+                if area > max_area:
+                    max_area = area
+                    next_selected = i
+            indices.append(next_selected)
+            selected = next_selected
+
+        indices.append(size - 1)
+        return indices
+
+    def _minmax(self, points):
+        '''
+        Returns the indices of the lowest and highest point of each bucket
+        '''
+        values = self.values
+        size = len(values)
+
+        # Two points per bucket, the first and last point are kept separately
+        buckets = (points - 2) // 2
+        bucket_size = float(size - 2) / max(buckets, 1)
+        indices = [0]
+        for bucket in range(buckets):
+            start = int(bucket * bucket_size) + 1
+            end = int((bucket + 1) * bucket_size) + 1
+            if start >= end:
+                continue
+
+            lowest = min(range(start, end), key=values.__getitem__)
+            highest = max(range(start, end), key=values.__getitem__)
+            indices.extend(sorted(set((lowest, highest))))
+
+        indices.append(size - 1)
+        return indices
+
+    def get_chart_data(self, key, **extra):
+        '''
+        Returns the points as a list of dictionaries, as used by the D3 charts
+
+        :param key: the name of the value, e.g. 'weight'
+        :param extra: further values that are added to all points, e.g. reps=8
+        :return: list of dictionaries with the ISO date, the value and the extras
+        '''
+        chart_data = []
+        fromordinal = datetime.date.fromordinal
+        for day, value in zip(self.days, self.values):
+            point = {'date': fromordinal(day).isoformat(), key: value}
+            point.update(extra)
+            chart_data.append(point)
+        return chart_data
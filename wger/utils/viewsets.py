@@ -15,7 +15,27 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
-from rest_framework import exceptions, viewsets
+import copy
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.encoding import force_bytes
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import exceptions, status, viewsets
+from rest_framework.decorators import list_route
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from wger.utils.cache import cache_mapper, get_catalog_version
+from wger.utils.permissions import get_owner_ids, is_owner
 
 
 class WgerOwnerObjectModelViewSet(viewsets.ModelViewSet):
@@ -27,26 +47,304 @@ class WgerOwnerObjectModelViewSet(viewsets.ModelViewSet):
         '''
         Check for creation (PUT, POST)
         '''
-        for entry in self.get_owner_objects():
-            if request.data.get(entry[1]):
-                pk = request.data.get(entry[1])
-                obj = entry[0].objects.get(pk=pk)
-                if obj.get_owner_object().user != request.user:
-                    raise exceptions.PermissionDenied(
-                        'You are not allowed to do this')
-        else:
-            return super(WgerOwnerObjectModelViewSet, self).create(request, *args, **kwargs)
+        self.check_owner_objects(request)
+        return super(WgerOwnerObjectModelViewSet, self).create(request, *args, **kwargs)
 
     def update(self, request, *args, **kwargs):
         '''
         Check for updates (PUT, PATCH)
         '''
-        for entry in self.get_owner_objects():
-            if request.data.get(entry[1]):
-                pk = request.data.get(entry[1])
-                obj = entry[0].objects.get(pk=pk)
-                if obj.get_owner_object().user != request.user:
-                    raise exceptions.PermissionDenied(
-                        'You are not allowed to do this')
+        self.check_owner_objects(request)
+        return super(WgerOwnerObjectModelViewSet, self).update(request, *args, **kwargs)
+
+    def check_owner_objects(self, request):
+        '''
+        Checks that the objects referenced in the request belong to the user
+
+        Objects that don't exist are left to the serializer's validation.
+        '''
+        for model, field in self.get_owner_objects():
+            pk = request.data.get(field)
+            if not pk:
+                continue
+            for user_id in get_owner_ids(request, model, [pk]).values():
+                if user_id != request.user.pk:
+                    raise exceptions.PermissionDenied('You are not allowed to do this')
+
+
+class CatalogViewSetMixin(object):
+    '''
+    Conditional GET and response cache for the list and detail pages of the
+    public catalog (exercises, ingredients, units, etc.)
+
+    The responses get an ETag and a Last-Modified header derived from the
+    catalog version of the model, which is incremented when an object is saved
+    or deleted (see reset_catalog_version). If the client already has the
+    current version, 304 is returned without querying the database. Responses
+    to anonymous users are additionally cached in the shared cache.
+
+    The browsable API is not affected, it shows the logged in user.
+    '''
+
+    def list(self, request, *args, **kwargs):
+        return self.get_catalog_response(super(CatalogViewSetMixin, self).list,
+                                         request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_catalog_response(super(CatalogViewSetMixin, self).retrieve,
+                                         request, *args, **kwargs)
+
+    def get_catalog_response(self, handler, request, *args, **kwargs):
+        '''
+        Returns 304, the cached response or the response of the handler
+        '''
+        if isinstance(request.accepted_renderer, BrowsableAPIRenderer):
+            return handler(request, *args, **kwargs)
+
+        model = self.get_queryset().model
+        version = get_catalog_version(model)
+        variant = self.get_catalog_variant(request)
+        etag = quote_etag(u'{0:x}-{1}'.format(version, variant))
+        last_modified = version // 1000000
+
+        if self.is_not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
         else:
-            return super(WgerOwnerObjectModelViewSet, self).update(request, *args, **kwargs)
+            response = self.get_cached_response(handler, request, model, version, variant,
+                                                *args, **kwargs)
+
+        # The ETag depends on the format, so does every response, even a 304
+        patch_vary_headers(response, ('Accept', ))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_cached_response(self, handler, request, model, version, variant, *args, **kwargs):
+        '''
+        Returns the response from the shared cache for anonymous users
+
+        The content is cached together with the headers set by the viewset,
+        e.g. Allow and Vary.
+        '''
+        timeout = settings.WGER_SETTINGS['CATALOG_API_CACHE_TIMEOUT']
+        if not timeout or request.user.is_authenticated():
+            return handler(request, *args, **kwargs)
+
+        key = cache_mapper.get_catalog_response_key(model, version, variant)
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for name, value in headers:
+                response[name] = value
+            return response
+
+        def save_response(response):
+            if response.status_code == 200:
+                headers = [(name, response[name]) for name in ('Content-Type', 'Allow', 'Vary')
+                           if response.has_header(name)]
+                cache.set(key, (response.content, headers), timeout)
+
+        response = handler(request, *args, **kwargs)
+        response.add_post_render_callback(save_response)
+        return response
+
+    def get_catalog_variant(self, request):
+        '''
+        Returns a hash of everything, other than the data, the response depends on
+
+        The query parameters are sorted, so that their order doesn't matter.
+        The host is part of the pagination links.
+        '''
+        query = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        variant = u'|'.join((request.scheme,
+                             request.get_host(),
+                             request.path,
+                             repr(query),
+                             request.accepted_media_type))
+        return hashlib.md5(force_bytes(variant)).hexdigest()
+
+    @staticmethod
+    def is_not_modified(request, etag, last_modified):
+        '''
+        Checks the If-None-Match and If-Modified-Since headers of the request
+
+        If-Modified-Since is ignored if If-None-Match is present, see RFC 7232
+        '''
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag.strip('"') in etags
+
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE'))
+        return if_modified_since is not None and last_modified <= if_modified_since
+
+
+class PrefetchedObjects(object):
+    '''
+    Replaces the queryset of a related field with objects loaded beforehand
+    '''
+
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get(self, pk):
+        try:
+            return self.objects[int(pk)]
+        except KeyError:
+            raise ObjectDoesNotExist()
+
+
+class BulkWriteMixin(object):
+    '''
+    Adds a bulk/ endpoint that creates (POST) or updates (PATCH) a list of
+    objects of the user at once
+
+    The related objects of all entries are loaded with one query per field,
+    restricted to the user's own for the fields in get_owner_objects(). New
+    and updated objects are written without calling save(), so there are no
+    signals; the viewset does what they would in bulk_write_done() once for
+    the whole list.
+    '''
+
+    bulk_max_objects = 200
+    '''
+    Maximum number of objects per request
+    '''
+
+    bulk_natural_key = None
+    '''
+    Fields that identify the new objects of the user, e.g. ('date', )
+
+    If set, the IDs of the inserted objects are read back by these fields,
+    otherwise they are the user's rows after the previous last one
+    '''
+
+    @list_route(methods=['post', 'patch'])
+    def bulk(self, request):
+        '''
+        Creates or updates the objects in the request
+        '''
+        data = request.data
+        if not isinstance(data, list) or not data:
+            return Response({'detail': 'Expected a list of objects'},
+                            status.HTTP_400_BAD_REQUEST)
+        if len(data) > self.bulk_max_objects:
+            return Response({'detail': 'At most {0} objects are allowed'.format(
+                             self.bulk_max_objects)},
+                            status.HTTP_400_BAD_REQUEST)
+
+        instances = None
+        if request.method == 'PATCH':
+            try:
+                ids = [int(item['id']) for item in data]
+            except (KeyError, TypeError, ValueError):
+                return Response({'detail': 'Every object needs its id'},
+                                status.HTTP_400_BAD_REQUEST)
+            objects = self.get_queryset().in_bulk(ids)
+            if len(objects) != len(ids) or len(set(ids)) != len(ids):
+                return Response({'detail': 'Unknown or duplicate ids'},
+                                status.HTTP_400_BAD_REQUEST)
+            instances = [objects[pk] for pk in ids]
+
+        serializer = self.get_serializer(data=data, many=True, partial=instances is not None)
+        self.prefetch_related_objects(serializer.child, data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            with transaction.atomic():
+                if instances is None:
+                    previous = []
+                    objects = self.perform_bulk_create(serializer.validated_data)
+                else:
+                    previous = [copy.copy(obj) for obj in instances]
+                    objects = self.perform_bulk_update(instances, serializer.validated_data)
+        except IntegrityError:
+            return Response({'detail': 'The objects conflict with existing ones'},
+                            status.HTTP_400_BAD_REQUEST)
+
+        self.bulk_write_done(objects, previous)
+        return Response(self.get_serializer(objects, many=True).data,
+                        status.HTTP_201_CREATED if instances is None else status.HTTP_200_OK)
+
+    def prefetch_related_objects(self, serializer, data):
+        '''
+        Loads the related objects of all entries with one query per field
+        '''
+        owner_fields = [i[1] for i in getattr(self, 'get_owner_objects', list)()]
+        for name, field in serializer.fields.items():
+            if field.read_only or not isinstance(field, PrimaryKeyRelatedField):
+                continue
+
+            pks = set()
+            for item in data:
+                try:
+                    pks.add(int(item[name]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+
+            queryset = field.get_queryset()
+            objects = queryset.in_bulk(pks) if pks else {}
+            if name in owner_fields:
+                if queryset.model.owner_field != 'user':
+                    get_owner_ids(self.request, queryset.model, pks)
+                objects = dict((pk, obj) for pk, obj in objects.items()
+                               if is_owner(self.request, obj))
+            field.queryset = PrefetchedObjects(objects)
+
+    def perform_bulk_create(self, validated_data):
+        '''
+        Inserts the new objects for the user and returns them
+        '''
+        model = self.get_queryset().model
+        objects = [model(user=self.request.user, **item) for item in validated_data]
+        if not self.bulk_natural_key:
+            # bulk_create doesn't set the IDs. Locking the user serializes the
+            # bulk requests of the user, so the new rows are the ones after
+            # the previous last one
+            User.objects.select_for_update().get(pk=self.request.user.pk)
+            queryset = model.objects.filter(user=self.request.user)
+            last_pk = queryset.aggregate(last=Max('pk'))['last'] or 0
+            model.objects.bulk_create(objects)
+            pks = queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)
+            if len(pks) != len(objects):
+                raise IntegrityError('Could not read back the IDs of the new objects')
+            for obj, pk in zip(objects, pks):
+                obj.pk = pk
+            return objects
+
+        # bulk_create doesn't set the IDs, read them back by the natural key
+        model.objects.bulk_create(objects)
+        key_field = self.bulk_natural_key[0]
+        rows = (model.objects.filter(user=self.request.user)
+                             .filter(**{key_field + '__in': set(getattr(obj, key_field)
+                                                                for obj in objects)})
+                             .values_list('pk', *self.bulk_natural_key))
+        pks = dict((row[1:], row[0]) for row in rows)
+        if len(pks) != len(objects):
+            raise IntegrityError('Could not read back the IDs of the new objects')
+        for obj in objects:
+            obj.pk = pks[tuple(getattr(obj, i) for i in self.bulk_natural_key)]
+        return objects
+
+    def perform_bulk_update(self, instances, validated_data):
+        '''
+        Saves the changed objects and returns them
+        '''
+        model = self.get_queryset().model
+        fields = [i for i in model._meta.concrete_fields if not i.primary_key]
+        for obj, item in zip(instances, validated_data):
+            for key, value in item.items():
+                setattr(obj, key, value)
+            model.objects.filter(pk=obj.pk).update(
+                **dict((i.attname, getattr(obj, i.attname)) for i in fields))
+        return instances
+
+    def bulk_write_done(self, objects, previous):
+        '''
+        Called after the objects were written, e.g. to reset caches
+
+        :param objects: the created or updated objects
+        :param previous: copies of the updated objects before the changes
+        '''
+        pass
@@ -27,6 +27,7 @@ from django.forms.widgets import (
     CheckboxChoiceInput)
 
 from django.forms import fields
+from django.core.exceptions import ValidationError
 
 from django.utils.translation import ugettext as _
 from django.utils.encoding import force_text
@@ -234,3 +235,37 @@ class TranslatedSelect(Select):
         return super(TranslatedSelect, self).render_option(selected_choices,
                                                            option_value,
                                                            _(option_label))
+
+
+class ObjectChoiceField(fields.ChoiceField):
+    '''
+    Choice field for model instances that are already loaded
+
+    Like ModelChoiceField, the cleaned value is the instance, but it is looked
+    up in a dictionary by its primary key. Validating many forms with the same
+    choices, e.g. in a formset, doesn't need any queries.
+    '''
+
+    def __init__(self, objects, *args, **kwargs):
+        self.objects = dict((force_text(obj.pk), obj) for obj in objects)
+        choices = [('', '---------')] + [(obj.pk, force_text(obj)) for obj in objects]
+        super(ObjectChoiceField, self).__init__(choices, *args, **kwargs)
+
+    def to_python(self, value):
+        '''
+        Returns the instance of the selected primary key or None
+        '''
+        if value in self.empty_values:
+            return None
+        try:
+            return self.objects[force_text(value)]
+        except KeyError:
+            raise ValidationError(self.error_messages['invalid_choice'],
+                                  code='invalid_choice',
+                                  params={'value': value})
+
+    def validate(self, value):
+        '''
+        Only check that a value is given, the choice was checked in to_python()
+        '''
+        fields.Field.validate(self, value)
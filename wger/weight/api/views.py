@@ -15,21 +15,31 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
+from django.utils.dateparse import parse_date
+from rest_framework import status
 from rest_framework import viewsets
+from rest_framework.decorators import list_route
+from rest_framework.response import Response
 from wger.weight.api.serializers import WeightEntrySerializer
 
 from wger.weight.models import WeightEntry
+from wger.weight.trend import forget_weight_trend, get_weight_trend
+from wger.utils.cache import reset_weight_trend
+from wger.utils.pagination import KeysetPagination
+from wger.utils.viewsets import BulkWriteMixin
 
 
-class WeightEntryViewSet(viewsets.ModelViewSet):
+class WeightEntryViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     '''
     API endpoint for nutrition plan objects
     '''
     serializer_class = WeightEntrySerializer
     is_private = True
-    ordering_fields = '__all__'
+    pagination_class = KeysetPagination
+    ordering_fields = ('date', )
     filter_fields = ('date',
                      'weight')
+    bulk_natural_key = ('date', )
 
     def get_queryset(self):
         '''
@@ -42,3 +52,33 @@ class WeightEntryViewSet(viewsets.ModelViewSet):
         Set the owner
         '''
         serializer.save(user=self.request.user)
+
+    @list_route()
+    def trend(self, request):
+        '''
+        Return the smoothed trend and the weekly rate of change of the weight
+
+        The trend is calculated over all entries, ?date_min=2016-01-01 only
+        returns the points from that date on.
+        '''
+        date_min = request.query_params.get('date_min')
+        if date_min:
+            try:
+                date_min = parse_date(date_min)
+            except ValueError:
+                date_min = None
+            if not date_min:
+                return Response({'detail': 'date_min must be a date, e.g. 2016-01-01'},
+                                status.HTTP_400_BAD_REQUEST)
+
+        trend = get_weight_trend(request.user)
+        return Response({'smoothing': trend.smoothing,
+                         'current': trend.get_current(),
+                         'results': trend.get_points(date_min)})
+
+    def bulk_write_done(self, objects, previous):
+        '''
+        Reset the cached weight trend
+        '''
+        reset_weight_trend(self.request.user.pk)
+        forget_weight_trend(self.request.user)
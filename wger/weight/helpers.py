@@ -20,12 +20,13 @@ import datetime
 import decimal
 import csv
 import json
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict, namedtuple
 
 from django.core.cache import cache
+from django.db.models.query import QuerySet
 
-from wger.utils.helpers import DecimalJsonEncoder
 from wger.utils.cache import cache_mapper
+from wger.utils.timeseries import TimeSeries
 from wger.weight.models import WeightEntry
 from wger.manager.models import WorkoutSession
 from wger.manager.models import WorkoutLog
@@ -150,56 +151,73 @@ def group_log_entries(user, year, month, day=None):
     return out
 
 
-def process_log_entries(logs):
+LogEntry = namedtuple('LogEntry', ('exercise_id', 'date', 'reps', 'weight'))
+'''
+The values of a workout log used for the log tables and charts
+'''
+
+
+def read_log_entries(logs):
+    '''
+    Reads the values of workout logs needed for the log tables and charts
+
+    Querysets are read with values_list(), creating model instances is much
+    slower for long histories. Other iterables, e.g. lists of logs, are
+    returned unchanged.
+    '''
+    if isinstance(logs, QuerySet):
+        return [LogEntry(*i) for i in logs.values_list(*LogEntry._fields).iterator()]
+    return logs
+
+
+def process_log_entries(logs, points=None):
     '''
     Processes and regroups a list of log entries so they can be rendered
     and passed to the D3 library to render a chart
+
+    The chart has a series for each number of repetitions. If on a day there
+    are several entries with the same number of repetitions, but different
+    weights, only the entry with the higher weight is shown in the chart.
+
+    :param logs: queryset or list of logs, ordered by date
+    :param points: optional maximum number of points of each series, see
+                   TimeSeries.downsample()
     '''
 
     entry_log = OrderedDict()
-    entry_list = {}
+    series = OrderedDict()
+
+    # Group by date and find the maximum weight per date per repetition
+    for entry in read_log_entries(logs):
+        entry_log.setdefault(entry.date, []).append(entry)
+
+    for date, entries in entry_log.items():
+        for entry in entries:
+            series.setdefault(entry.reps, TimeSeries()).append_max(date, entry.weight)
+
     chart_data = []
-    max_weight = {}
-
-    # Group by date
-    for entry in logs:
-
-        if not entry_log.get(entry.date):
-            entry_log[entry.date] = []
-        entry_log[entry.date].append(entry)
-
-        # Find the maximum weight per date per repetition.
-        # If on a day there are several entries with the same number of
-        # repetitions, but different weights, only the entry with the
-        # higher weight is shown in the chart
-        if not max_weight.get(entry.date):
-            max_weight[entry.date] = {entry.reps: entry.weight}
-
-        if not max_weight[entry.date].get(entry.reps):
-            max_weight[entry.date][entry.reps] = entry.weight
-
-        if entry.weight > max_weight[entry.date][entry.reps]:
-            max_weight[entry.date][entry.reps] = entry.weight
-
-    for entry in logs:
-        if not entry_list.get(entry.reps):
-            entry_list[entry.reps] = {'list': [], 'seen': []}
-
-        # Only add if weight is the maximum for the day
-        if entry.weight != max_weight[entry.date][entry.reps]:
-            continue
-        if (entry.date, entry.reps, entry.weight) in entry_list[entry.reps]['seen']:
-            continue
-
-        entry_list[entry.reps]['seen'].append(
-            (entry.date, entry.reps, entry.weight))
-        entry_list[entry.reps]['list'].append({'date': entry.date,
-                                               'weight': entry.weight,
-                                               'reps': entry.reps})
-    for rep in entry_list:
-        chart_data.append(entry_list[rep]['list'])
-
-    return entry_log, json.dumps(chart_data, cls=DecimalJsonEncoder)
+    for reps, rep_series in series.items():
+        if points:
+            rep_series = rep_series.downsample(points)
+        chart_data.append(rep_series.get_chart_data('weight', reps=reps))
+
+    return entry_log, json.dumps(chart_data)
+
+
+def process_log_entries_by_exercise(logs):
+    '''
+    Processes the log entries of several exercises, see process_log_entries
+
+    The logs are read in one go and split by exercise, keeping their order.
+    Returns a dictionary with the entry log and chart data of each exercise
+    that has logs.
+    '''
+    exercise_logs = defaultdict(list)
+    for entry in read_log_entries(logs):
+        exercise_logs[entry.exercise_id].append(entry)
+
+    return {exercise_id: process_log_entries(entries)
+            for exercise_id, entries in exercise_logs.items()}
 
 
 def get_last_entries(user, amount=5):
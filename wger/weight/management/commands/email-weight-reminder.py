@@ -16,71 +16,45 @@
 
 import datetime
 
-from django.template import loader
-from django.core.management.base import BaseCommand
-from django.core import mail
+from django.db.models import Max
 from django.utils.translation import ugettext_lazy as _
-from django.utils import translation
-from django.conf import settings
 
-from django.contrib.sites.models import Site
 from wger.core.models import UserProfile
-from wger.weight.models import WeightEntry
+from wger.utils.reference import get_current_site
+from wger.utils.reminders import ReminderCommand
 
 
-class Command(BaseCommand):
+class Command(ReminderCommand):
     '''
     Helper admin command to send out email reminders
     '''
 
     help = 'Send out automatic emails to remind the user to enter the weight'
+    subject = _('You have to enter your weight')
+    template_name = 'workout/email_weight_reminder.tpl'
 
-    def handle(self, **options):
-
-        profile_list = UserProfile.objects.filter(
-            num_days_weight_reminder__gt=0)
-
-        for profile in profile_list:
-
-            # Only continue if the user has provided an email address.
-            # Checking it here so we check for NULL values and emtpy strings
-            if not profile.user.email:
-                continue
-
-            today = datetime.datetime.now().date()
-
-            try:
-                last_entry = WeightEntry.objects.filter(
-                    user=profile.user).latest().date
-                datediff = (today - last_entry).days
-
-                if datediff >= profile.num_days_weight_reminder:
-                    self.send_email(profile.user, last_entry, datediff)
-            except WeightEntry.DoesNotExist:
-                pass
-
-    @staticmethod
-    def send_email(user, last_entry, datediff):
+    def get_reminders(self, options):
         '''
-        Notify a user to input the weight entry
+        Find the users whose last weight entry is older than their setting
 
-        :type user User
-        :type last_entry Date
+        The date of the last entry of all users is read with one query
         '''
+        today = datetime.date.today()
+        site = get_current_site()
 
-        # Compose and send the email
-        translation.activate(user.userprofile.notification_language.short_name)
+        profile_list = UserProfile.objects.filter(num_days_weight_reminder__gt=0) \
+            .exclude(user__email='') \
+            .exclude(user__email__isnull=True) \
+            .annotate(last_entry=Max('user__weightentry__date')) \
+            .filter(last_entry__isnull=False) \
+            .select_related('user', 'notification_language')
 
-        context = {'site': Site.objects.get_current(),
-                   'date': last_entry,
-                   'days': datediff,
-                   'user': user}
-
-        subject = _('You have to enter your weight')
-        message = loader.render_to_string(
-            'workout/email_weight_reminder.tpl', context)
-        mail.send_mail(subject,
-                       message,
-                       settings.WGER_SETTINGS['EMAIL_FROM'],
-                       [user.email],
-                       fail_silently=True)
+        reminders = []
+        for profile in profile_list:
+            datediff = (today - profile.last_entry).days
+            if datediff >= profile.num_days_weight_reminder:
+                reminders.append((profile, {'site': site,
+                                            'date': profile.last_entry,
+                                            'days': datediff,
+                                            'user': profile.user}))
+        return reminders
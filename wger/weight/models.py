@@ -60,6 +60,11 @@ class WeightEntry(models.Model):
         '''
         return u"{0}: {1:.2f} kg".format(self.date, self.weight)
 
+    owner_field = 'user'
+    '''
+    Lookup of the user owning the object, the query version of get_owner_object()
+    '''
+
     def get_owner_object(self):
         '''
         Returns the object that has owner information
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+from django.db.models.signals import post_save, post_delete
+
+from wger.utils.cache import reset_weight_trend
+from wger.weight.models import WeightEntry
+from wger.weight.trend import forget_weight_trend
+
+
+def update_trend(sender, instance, **kwargs):
+    '''
+    Resets the cached weight trend
+
+    New entries are not appended to the cached trend, as that could lose
+    entries saved at the same time by another request.
+    '''
+    reset_weight_trend(instance.user_id)
+
+    # The user object of the entry, if loaded, is usually the request's one
+    user = getattr(instance, WeightEntry._meta.get_field('user').get_cache_name(), None)
+    if user is not None:
+        forget_weight_trend(user)
+
+
+post_save.connect(update_trend, sender=WeightEntry)
+post_delete.connect(update_trend, sender=WeightEntry)
@@ -17,6 +17,9 @@ from datetime import timedelta, datetime
 from django.contrib.auth.models import User
 from django.core import mail
 from django.core.management import call_command
+from django.utils.six import StringIO
+
+from wger.core.models import Language
 
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
 from wger.weight.models import WeightEntry
@@ -98,3 +101,39 @@ class EmailWeightReminderTestCase(WorkoutManagerTestCase):
 
         call_command("email-weight-reminder")
         self.assertEqual(len(mail.outbox), 0)
+
+    def test_dry_run(self):
+        '''
+        Test that no emails are sent with --dry-run
+        '''
+        user = User.objects.get(pk=2)
+        user.userprofile.num_days_weight_reminder = 3
+        user.userprofile.save()
+
+        out = StringIO()
+        call_command("email-weight-reminder", dry_run=True, verbosity=2, stdout=out)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIn('* test (', out.getvalue())
+        self.assertIn('Would send 1 email reminders', out.getvalue())
+        self.assertIn(' ms', out.getvalue())
+
+    def test_languages_and_queries(self):
+        '''
+        Test that the emails are in the notification language of each user and
+        the number of queries does not depend on the number of users
+        '''
+        for pk, language in ((1, 'de'), (2, 'en')):
+            user = User.objects.get(pk=pk)
+            user.email = 'user{0}@example.com'.format(pk)
+            user.save()
+            user.userprofile.num_days_weight_reminder = 3
+            user.userprofile.notification_language = Language.objects.get(short_name=language)
+            user.userprofile.save()
+        WeightEntry.objects.create(user_id=1, date=datetime(2016, 1, 1), weight=80)
+
+        # The site and the reminders
+        with self.assertNumQueries(2):
+            call_command("email-weight-reminder")
+        self.assertEqual(sorted((i.to[0], i.subject) for i in mail.outbox),
+                         [('user1@example.com', 'Du musst dein Gewicht eingeben'),
+                          ('user2@example.com', 'You have to enter your weight')])
@@ -16,6 +16,7 @@ import datetime
 import decimal
 
 from django.core.urlresolvers import reverse
+from rest_framework.test import APIClient
 
 from wger.core.tests import api_base_test
 from wger.core.tests.base_testcase import WorkoutManagerAddTestCase
@@ -116,3 +117,30 @@ class WeightEntryTestCase(api_base_test.ApiBaseResourceTestCase):
     private_resource = True
     data = {'weight': 100,
             'date': datetime.date(2013, 2, 1)}
+
+
+class WeightEntryBulkApiTestCase(WorkoutManagerTestCase):
+    '''
+    Tests creating several weight entries at once
+    '''
+
+    client_class = APIClient
+    url = '/api/v2/weightentry/bulk/'
+
+    def test_create(self):
+        '''
+        Test creating the entries
+        '''
+        self.user_login('test')
+        data = [{'date': '2016-04-0{0}'.format(i), 'weight': 80 + i} for i in range(1, 5)]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 201)
+        for entry in response.data:
+            weight_entry = WeightEntry.objects.get(pk=entry['id'])
+            self.assertEqual(weight_entry.user.username, 'test')
+            self.assertEqual(str(weight_entry.date), str(entry['date']))
+
+        # The dates must be unique
+        response = self.client.post(self.url, data[:1], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(WeightEntry.objects.filter(date='2016-04-01').count(), 1)
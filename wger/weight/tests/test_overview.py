@@ -64,3 +64,47 @@ class WeightExportCsvTestCase(WorkoutManagerTestCase):
         '''
         self.user_login('test')
         self.csv_export()
+
+
+class WeightChartDataTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the data of the weight chart
+    '''
+
+    def test_chart_data(self):
+        '''
+        Test that all entries are returned, ordered by date
+        '''
+        self.user_login('test')
+        response = self.client.get(reverse('weight:weight-data'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(response.data[0], {'date': '2012-10-01', 'weight': 77.0})
+        self.assertEqual(response.data[2], {'date': '2012-11-01', 'weight': 80.6})
+
+        response = self.client.get(reverse('weight:weight-data'),
+                                   {'date_min': '2013-01-01', 'date_max': '2013-01-20'})
+        self.assertEqual([i['date'] for i in response.data],
+                         ['2013-01-01', '2013-01-10', '2013-01-20'])
+
+    def test_downsampling(self):
+        '''
+        Test downsampling the entries to a number of points
+        '''
+        self.user_login('test')
+        for method in ('lttb', 'minmax'):
+            response = self.client.get(reverse('weight:weight-data'),
+                                       {'points': 4, 'method': method})
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data), 4)
+            self.assertEqual(response.data[0]['date'], '2012-10-01')
+            self.assertEqual(response.data[-1]['date'], '2013-01-30')
+
+    def test_downsampling_invalid(self):
+        '''
+        Test invalid downsampling parameters
+        '''
+        self.user_login('test')
+        for params in ({'points': 'many'}, {'points': -1}, {'points': 10, 'method': 'avg'}):
+            response = self.client.get(reverse('weight:weight-data'), params)
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,308 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.test import SimpleTestCase
+from mock import patch
+from rest_framework.test import APIClient
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.cache import cache_mapper
+from wger.weight.models import WeightEntry
+from wger.weight.trend import WeightTrend, get_weight_trend
+
+
+class WeightTrendHelperTestCase(SimpleTestCase):
+    '''
+    Tests calculating the weight trend
+    '''
+
+    def test_trend(self):
+        '''
+        Test the trend and the weekly rate, also with gaps between the entries
+        '''
+        trend = WeightTrend.from_rows([(datetime.date(2016, 1, 1), Decimal('80')),
+                                       (datetime.date(2016, 1, 2), Decimal('81')),
+                                       (datetime.date(2016, 1, 4), 79)])
+        self.assertEqual(len(trend), 3)
+        self.assertEqual(list(trend.weights), [80, 81, 79])
+
+        # 10% of the difference per day
+        self.assertAlmostEqual(trend.trend[0], 80)
+        self.assertAlmostEqual(trend.trend[1], 80.1)
+        self.assertAlmostEqual(trend.trend[2], 80.1 - 0.19 * 1.1)
+
+        self.assertIsNone(trend.get_rate(0))
+        self.assertAlmostEqual(trend.get_rate(1), 0.7)
+        self.assertEqual(trend.get_current(), {'date': datetime.date(2016, 1, 4),
+                                               'weight': 79.0,
+                                               'trend': 79.89,
+                                               'rate': -0.25})
+
+    def test_rate_period(self):
+        '''
+        Test that the rate is measured over the last week
+        '''
+        start = datetime.date(2016, 1, 1)
+        trend = WeightTrend.from_rows((start + datetime.timedelta(days=i), 80 + i % 2)
+                                      for i in range(30))
+        self.assertAlmostEqual(trend.get_rate(29), trend.trend[29] - trend.trend[22])
+
+    def test_append(self):
+        '''
+        Test that only entries after the last one can be appended
+        '''
+        trend = WeightTrend()
+        self.assertIsNone(trend.get_current())
+        self.assertTrue(trend.append(datetime.date(2016, 1, 2), 80))
+        self.assertFalse(trend.append(datetime.date(2016, 1, 2), 81))
+        self.assertFalse(trend.append(datetime.date(2016, 1, 1), 81))
+        self.assertEqual(len(trend), 1)
+
+    def test_timeline(self):
+        '''
+        Test looking up the entry closest to a date
+        '''
+        trend = WeightTrend.from_rows([(datetime.date(2016, 1, 1), Decimal('80.5')),
+                                       (datetime.date(2016, 1, 5), Decimal('81.25'))])
+        self.assertEqual(trend.get_closest_index(datetime.date(2015, 1, 1)), 0)
+        self.assertEqual(trend.get_closest_index(datetime.date(2016, 1, 2)), 0)
+        self.assertEqual(trend.get_closest_index(datetime.date(2016, 1, 3)), 0)
+        self.assertEqual(trend.get_closest_index(datetime.date(2016, 1, 4)), 1)
+        self.assertEqual(trend.get_closest_index(datetime.date(2016, 1, 5)), 1)
+        self.assertEqual(trend.get_closest_index(datetime.date(2017, 1, 1)), 1)
+        self.assertEqual(WeightTrend().get_closest_index(datetime.date(2016, 1, 1)), -1)
+
+        self.assertEqual(trend.get_date(1), datetime.date(2016, 1, 5))
+        self.assertEqual(str(trend.get_weight(0)), '80.50')
+        self.assertEqual(str(trend.get_weight(1)), '81.25')
+
+    def test_points(self):
+        '''
+        Test the index lookup and the points from a date on
+        '''
+        start = datetime.date(2016, 1, 1)
+        trend = WeightTrend.from_rows((start + datetime.timedelta(days=2 * i), 80)
+                                      for i in range(5))
+        self.assertEqual(trend.get_index(datetime.date(2015, 12, 31)), -1)
+        self.assertEqual(trend.get_index(datetime.date(2016, 1, 3)), 1)
+        self.assertEqual(trend.get_index(datetime.date(2016, 1, 4)), 1)
+        self.assertEqual(len(trend.get_points()), 5)
+        self.assertEqual([i['date'] for i in trend.get_points(datetime.date(2016, 1, 4))],
+                         [datetime.date(2016, 1, 5),
+                          datetime.date(2016, 1, 7),
+                          datetime.date(2016, 1, 9)])
+
+
+class WeightTrendCacheTestCase(WorkoutManagerTestCase):
+    '''
+    Tests caching the weight trend and updating it with the entries
+    '''
+
+    def setUp(self):
+        super(WeightTrendCacheTestCase, self).setUp()
+        self.user = User.objects.get(username='test')
+
+    def get_cached(self):
+        '''
+        Helper function that returns the cached trend of the user
+        '''
+        return cache.get(cache_mapper.get_weight_trend(self.user))
+
+    def get_trend(self):
+        '''
+        Helper function that returns the trend as a new request would
+        '''
+        return get_weight_trend(User.objects.get(pk=self.user.pk))
+
+    def test_cache(self):
+        '''
+        Test that the trend is calculated once and then cached
+        '''
+        self.assertIsNone(self.get_cached())
+        with self.assertNumQueries(1):
+            trend = get_weight_trend(self.user)
+        self.assertEqual(len(trend), 7)
+        self.assertEqual(trend.get_current()['trend'], 82.48)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_weight_trend(self.user)), 7)
+
+    def test_new_entry(self):
+        '''
+        Test that new entries reset the cached trend
+        '''
+        get_weight_trend(self.user)
+        WeightEntry.objects.create(user=self.user, date=datetime.date(2013, 2, 1), weight=84)
+        self.assertIsNone(self.get_cached())
+
+        trend = get_weight_trend(self.user)
+        self.assertEqual(len(trend), 8)
+        self.assertEqual(trend.get_current(),
+                         WeightTrend.from_rows(WeightEntry.objects.filter(user=self.user)
+                                               .values_list('date', 'weight')).get_current())
+
+    def test_stale_cache(self):
+        '''
+        Test that a new entry does not keep a stale cached trend
+
+        E.g. another request cached the trend before an entry was saved
+        '''
+        stale = WeightTrend.from_rows(WeightEntry.objects.filter(user=self.user)
+                                      .exclude(date=datetime.date(2013, 1, 30))
+                                      .order_by('date')
+                                      .values_list('date', 'weight'))
+        cache.set(cache_mapper.get_weight_trend(self.user), stale)
+        WeightEntry.objects.create(user=self.user, date=datetime.date(2013, 2, 1), weight=84)
+
+        trend = get_weight_trend(self.user)
+        self.assertEqual(len(trend), 8)
+        self.assertEqual(trend.get_index(datetime.date(2013, 1, 30)), 6)
+
+    def test_changed_entries(self):
+        '''
+        Test that earlier, edited and deleted entries reset the cached trend
+        '''
+        get_weight_trend(self.user)
+        WeightEntry.objects.create(user=self.user, date=datetime.date(2012, 12, 1), weight=80)
+        self.assertIsNone(self.get_cached())
+        self.assertEqual(len(get_weight_trend(self.user)), 8)
+
+        entry = WeightEntry.objects.get(user=self.user, date=datetime.date(2013, 1, 30))
+        entry.weight = 90
+        entry.save()
+        self.assertIsNone(self.get_cached())
+        self.assertEqual(self.get_trend().get_current()['weight'], 90)
+
+        entry.delete()
+        self.assertIsNone(self.get_cached())
+        self.assertEqual(len(self.get_trend()), 7)
+
+    def test_memoized_trend(self):
+        '''
+        Test that the trend is only read once from the cache per user object
+        '''
+        get_weight_trend(self.user)
+        profile = self.user.userprofile
+        with patch('wger.weight.trend.cache.get') as mock_get:
+            self.assertEqual(profile.weight, Decimal('83'))
+            self.assertEqual(get_weight_trend(self.user).get_current()['weight'], 83)
+            self.assertFalse(mock_get.called)
+
+        # Saving an entry of the user forgets it
+        profile.user_bodyweight(90)
+        self.assertEqual(profile.weight, 90)
+        self.assertEqual(self.get_trend().get_current()['weight'], 90)
+
+    def test_bulk_api(self):
+        '''
+        Test that the entries created with the bulk endpoint reset the trend
+        '''
+        get_weight_trend(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post('/api/v2/weightentry/bulk/',
+                                    [{'date': '2013-02-01', 'weight': 84}],
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(self.get_cached())
+        self.assertEqual(len(get_weight_trend(self.user)), 8)
+
+
+class WeightTrendApiTestCase(WorkoutManagerTestCase):
+    '''
+    Tests the weight trend endpoint of the API
+    '''
+    client_class = APIClient
+    url = '/api/v2/weightentry/trend/'
+
+    def test_trend(self):
+        '''
+        Test the trend of the user's entries
+        '''
+        self.user_login('test')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['smoothing'], 0.1)
+        self.assertEqual(response.data['current'], {'date': datetime.date(2013, 1, 30),
+                                                    'weight': 83.0,
+                                                    'trend': 82.48,
+                                                    'rate': 0.68})
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertEqual(response.data['results'][1], {'date': datetime.date(2012, 10, 10),
+                                                       'weight': 77.2,
+                                                       'trend': 77.12,
+                                                       'rate': 0.1})
+
+        response = self.client.get(self.url, {'date_min': '2013-01-10'})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['current']['date'], datetime.date(2013, 1, 30))
+
+    def test_invalid_date(self):
+        '''
+        Test an invalid start date
+        '''
+        self.user_login('test')
+        for date_min in ('yesterday', '2013-02-30'):
+            response = self.client.get(self.url, {'date_min': date_min})
+            self.assertEqual(response.status_code, 400)
+
+    def test_other_user(self):
+        '''
+        Test that users only get their own trend
+        '''
+        self.user_login('admin')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(len(response.data['results']), 7)
+
+    def test_logged_out(self):
+        '''
+        Test that the trend is not available without a login
+        '''
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+
+class WeightTrendPageTestCase(WorkoutManagerTestCase):
+    '''
+    Tests showing the weight trend on the pages
+    '''
+
+    def test_overview(self):
+        '''
+        Test the trend on the weight overview
+        '''
+        self.user_login('test')
+        response = self.client.get(reverse('weight:overview', kwargs={'username': 'test'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['weight_trend']['trend'], 82.48)
+        self.assertEqual([i[3] for i in response.context['last_five_weight_entries_details']],
+                         [82.48, 81.52, 80.61, 80.0, 80.26])
+        self.assertContains(response, '82.5')
+
+    def test_dashboard(self):
+        '''
+        Test the trend on the dashboard
+        '''
+        self.user_login('test')
+        response = self.client.get(reverse('core:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['weight_trend']['rate'], 0.68)
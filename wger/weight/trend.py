@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+'''
+Smoothed trend of the body weight
+
+Daily weigh-ins vary by a kilo or more because of water and food, the trend
+is an exponentially weighted moving average of the entries that shows the
+actual change.
+'''
+
+import bisect
+import datetime
+from array import array
+from decimal import Decimal
+
+from django.core.cache import cache
+
+from wger.utils.cache import cache_mapper
+from wger.weight.models import WeightEntry
+
+TREND_SMOOTHING = 0.1
+'''
+Weight of a new entry in the trend, per day since the last entry
+'''
+
+RATE_DAYS = 7
+'''
+Period of the rate of change, the rates are in kg (or lb) per week
+'''
+
+
+class WeightTrend(object):
+    '''
+    The weight entries of a user with their trend, ordered by date
+
+    The trend of an entry moves towards its weight by TREND_SMOOTHING for
+    every day since the previous entry, so gaps between the entries are
+    handled correctly.
+    '''
+
+    def __init__(self, smoothing=TREND_SMOOTHING):
+        self.smoothing = smoothing
+        self.days = array('l')
+        self.weights = array('d')
+        self.trend = array('d')
+
+    @classmethod
+    def from_rows(cls, rows, smoothing=TREND_SMOOTHING):
+        '''
+        Calculates the trend of (date, weight) tuples in one pass
+
+        :param rows: iterable of tuples, ordered by date, e.g. from values_list()
+        '''
+        trend = cls(smoothing)
+        for date, weight in rows:
+            trend.append(date, weight)
+        return trend
+
+    def __len__(self):
+        return len(self.days)
+
+    def append(self, date, weight):
+        '''
+        Adds an entry after the last one and updates the trend
+
+        :return: False if the entry is not after the last one, in that case
+                 the trend has to be calculated again
+        '''
+        day = date.toordinal()
+        weight = float(weight)
+        if not self.days:
+            trend = weight
+        elif day <= self.days[-1]:
+            return False
+        else:
+            factor = 1 - (1 - self.smoothing) ** (day - self.days[-1])
+            trend = self.trend[-1] + factor * (weight - self.trend[-1])
+
+        self.days.append(day)
+        self.weights.append(weight)
+        self.trend.append(trend)
+        return True
+
+    def get_index(self, date):
+        '''
+        Returns the index of the last entry on or before the date, or -1
+        '''
+        return bisect.bisect_right(self.days, date.toordinal()) - 1
+
+    def get_closest_index(self, date):
+        '''
+        Returns the index of the entry closest to the date, or -1
+
+        If two entries are equally close, the earlier one is returned.
+        '''
+        index = bisect.bisect_left(self.days, date.toordinal())
+        if index == len(self.days) or (index and date.toordinal() - self.days[index - 1] <=
+                                       self.days[index] - date.toordinal()):
+            index -= 1
+        return index
+
+    def get_date(self, index):
+        '''
+        Returns the date of an entry
+        '''
+        return datetime.date.fromordinal(self.days[index])
+
+    def get_weight(self, index):
+        '''
+        Returns the weight of an entry as a Decimal, as saved in the database
+        '''
+        return Decimal('{0:.2f}'.format(self.weights[index]))
+
+    def get_rate(self, index):
+        '''
+        Returns the change of the trend per week up to the entry
+
+        The change is measured from the last entry at least RATE_DAYS before,
+        or from the first one. Returns None for the first entry.
+        '''
+        day = self.days[index]
+        start = max(bisect.bisect_right(self.days, day - RATE_DAYS) - 1, 0)
+        if start >= index:
+            return None
+        return (self.trend[index] - self.trend[start]) * RATE_DAYS / (day - self.days[start])
+
+    def get_point(self, index):
+        '''
+        Returns the date, weight, trend and weekly rate of an entry
+        '''
+        rate = self.get_rate(index)
+        return {'date': self.get_date(index),
+                'weight': self.weights[index],
+                'trend': round(self.trend[index], 2),
+                'rate': None if rate is None else round(rate, 2)}
+
+    def get_current(self):
+        '''
+        Returns the point of the last entry, or None if there are no entries
+        '''
+        return self.get_point(len(self) - 1) if self.days else None
+
+    def get_points(self, date_min=None):
+        '''
+        Returns the points of all entries, optionally from the given date on
+        '''
+        start = bisect.bisect_left(self.days, date_min.toordinal()) if date_min else 0
+        return [self.get_point(i) for i in range(start, len(self))]
+
+
+def get_weight_trend(user):
+    '''
+    Returns the weight trend of a user, calculating it if it is not cached
+
+    Besides the trend, this is the cached timeline of the user's weight, used
+    e.g. to look up the current weight or the one closest to a date. It is
+    also kept on the user object, so a request only reads it from the cache
+    once, see forget_weight_trend().
+    '''
+    trend = getattr(user, '_weight_trend', None)
+    if trend is not None:
+        return trend
+
+    key = cache_mapper.get_weight_trend(user)
+    trend = cache.get(key)
+    if trend is None:
+        trend = WeightTrend.from_rows(WeightEntry.objects.filter(user=user)
+                                      .order_by('date')
+                                      .values_list('date', 'weight')
+                                      .iterator())
+        cache.set(key, trend)
+    user._weight_trend = trend
+    return trend
+
+
+def forget_weight_trend(user):
+    '''
+    Removes the weight trend kept on the user object by get_weight_trend()
+    '''
+    user.__dict__.pop('_weight_trend', None)
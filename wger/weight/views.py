@@ -32,6 +32,7 @@ from django.db.models import Max
 from django.views.generic import CreateView
 from django.views.generic import UpdateView
 
+from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 
@@ -40,8 +41,11 @@ from formtools.preview import FormPreview
 from wger.weight.forms import WeightForm
 from wger.weight.models import WeightEntry
 from wger.weight import helpers
+from wger.weight.trend import get_weight_trend
+from wger.utils.cache import reset_weight_trend
 from wger.utils.helpers import check_access
 from wger.utils.generic_views import WgerFormMixin
+from wger.utils.timeseries import DOWNSAMPLING_METHODS, TimeSeries
 
 
 logger = logging.getLogger(__name__)
@@ -153,12 +157,17 @@ def overview(request, username=None):
                                      'month': max_date.month,
                                      'day': max_date.day}
 
-    last_weight_entries = helpers.get_last_entries(user)
+    weight_trend = get_weight_trend(user)
+    last_weight_entries = []
+    for entry_detail in helpers.get_last_entries(user):
+        point = weight_trend.get_point(weight_trend.get_index(entry_detail[0].date))
+        last_weight_entries.append(entry_detail + (point['trend'], ))
 
     template_data['is_owner'] = is_owner
     template_data['owner_user'] = user
     template_data['show_shariff'] = is_owner
     template_data['last_five_weight_entries_details'] = last_weight_entries
+    template_data['weight_trend'] = weight_trend.get_current()
     return render(request, 'overview.html', template_data)
 
 
@@ -166,6 +175,9 @@ def overview(request, username=None):
 def get_weight_data(request, username=None):
     '''
     Process the data to pass it to the JS libraries to generate an SVG image
+
+    The entries can be downsampled to a number of points, e.g. ?points=200
+    and optionally ?method=minmax, see TimeSeries.downsample()
     '''
 
     is_owner, user = check_access(request.user, username)
@@ -173,20 +185,29 @@ def get_weight_data(request, username=None):
     date_min = request.GET.get('date_min', False)
     date_max = request.GET.get('date_max', True)
 
+    try:
+        points = int(request.GET.get('points', 0))
+    except ValueError:
+        points = -1
+    method = request.GET.get('method', 'lttb')
+    if points < 0 or method not in DOWNSAMPLING_METHODS:
+        return Response({'detail': 'points must be a positive number and method one of '
+                                   '{0}'.format(', '.join(DOWNSAMPLING_METHODS))},
+                        status.HTTP_400_BAD_REQUEST)
+
     if date_min and date_max:
         weights = WeightEntry.objects.filter(user=user,
                                              date__range=(date_min, date_max))
     else:
         weights = WeightEntry.objects.filter(user=user)
 
-    chart_data = []
-
-    for i in weights:
-        chart_data.append({'date': i.date,
-                           'weight': i.weight})
+    # Only the values are read, creating model instances is much slower
+    series = TimeSeries.from_rows(weights.order_by('date').values_list('date', 'weight').iterator())
+    if points:
+        series = series.downsample(points, method)
 
     # Return the results to the client
-    return Response(chart_data)
+    return Response(series.get_chart_data('weight'))
 
 
 class WeightCsvImportFormPreview(FormPreview):
@@ -212,5 +233,6 @@ class WeightCsvImportFormPreview(FormPreview):
         weight_list, error_list = helpers.parse_weight_csv(
             request, cleaned_data)
         WeightEntry.objects.bulk_create(weight_list)
+        reset_weight_trend(request.user.pk)
         return HttpResponseRedirect(reverse('weight:overview',
                                             kwargs={'username': request.user.username}))